@@ -0,0 +1,413 @@
+# Libraries
+import numpy as np
+from enum import Enum
+# Scripts
+from Code.types import *
+from Code.elements.quadrature import CellType, QuadratureFamily, get_line_rule
+
+
+'''
+Script-specific typing setup
+'''
+
+# 1D basis tables: (total points, order+1) values or derivatives of every basis function at every point
+BasisTableType : TypeAlias = Annotated[NumericMatrixValueType, Literal["(total points, order+1)"]]
+# Per-element tensors in tensor-product layout, with the first dimension fastest: (total elements, [n_z,] [n_y,] n_x)
+TensorCoefficientsType : TypeAlias = NumericTensorValueType
+
+class BasisType(Enum):
+    HIERARCHICAL = "Hierarchical"
+    GLL_NODAL = "GLL nodal"
+
+# Reference vertices in VTK order, on the reference cells of `elements/quadrature.py`
+CELLS_REF_VRTS_VEC_CRDS = {
+    CellType.LINE: ((-1,), (1,)),
+    CellType.QUADRILATERAL: ((-1, -1), (1, -1), (1, 1), (-1, 1)),
+    CellType.HEXAHEDRON: (
+        (-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+        (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)
+        ),
+    CellType.TRIANGLE: ((0, 0), (1, 0), (0, 1)),
+    CellType.TETRAHEDRON: ((0, 0, 0), (1, 0, 0), (0, 1, 0), (0, 0, 1)),
+    CellType.WEDGE: ((0, 0, -1), (1, 0, -1), (0, 1, -1), (0, 0, 1), (1, 0, 1), (0, 1, 1)),
+    CellType.PYRAMID: ((-1, -1, 0), (1, -1, 0), (1, 1, 0), (-1, 1, 0), (0, 0, 1))
+    }
+
+
+'''
+1D bases on the reference interval [-1, 1]
+'''
+
+def compute_Legendre_values(
+    ord : NumericIntegerValueType,
+    pnts : Annotated[NumericVectorValueType, Literal["(total points,)"]]
+    ) -> Tuple[BasisTableType, BasisTableType]:
+    """
+    Legendre polynomials `P_0, ..., P_ord` and their derivatives, from the three-term (Bonnet) recurrence `(k+1)·P_{k+1} = (2k+1)·ξ·P_k - k·P_{k-1}`.
+    """
+
+    pnts = np.asarray(pnts, dtype=float)
+    vals = np.zeros((len(pnts), ord+1))
+    derivs = np.zeros((len(pnts), ord+1))
+    vals[:, 0] = 1.0
+    if ord >= 1:
+        vals[:, 1] = pnts
+        derivs[:, 1] = 1.0
+    for k in range(1, ord):
+        vals[:, k+1] = ((2*k+1) * pnts * vals[:, k] - k * vals[:, k-1]) / (k+1)
+        # P'_{k+1} = P'_{k-1} + (2k+1)·P_k
+        derivs[:, k+1] = derivs[:, k-1] + (2*k+1) * vals[:, k]
+
+    return vals, derivs
+
+def compute_hierarchical_values(
+    ord : NumericIntegerValueType,
+    pnts : Annotated[NumericVectorValueType, Literal["(total points,)"]]
+    ) -> Tuple[BasisTableType, BasisTableType]:
+    """
+    Hierarchical (integrated Legendre) basis: the two linear vertex modes `(1∓ξ)/2`, then the bubbles `φ_k = (P_k - P_{k-2})/√(2(2k-1))` for `k = 2, ..., ord`.
+
+    Bubbles vanish at both ends, so raising the order only appends functions, and their derivatives `√((2k-1)/2)·P_{k-1}` are orthogonal, which keeps the 1D stiffness diagonal in the interior.
+    """
+
+    leg_vals, leg_derivs = compute_Legendre_values(max(ord, 1), pnts)
+    vals = np.zeros((len(pnts), ord+1))
+    derivs = np.zeros((len(pnts), ord+1))
+    vals[:, 0] = (1 - leg_vals[:, 1]) / 2
+    vals[:, 1] = (1 + leg_vals[:, 1]) / 2
+    derivs[:, 0] = -0.5
+    derivs[:, 1] = 0.5
+    for k in range(2, ord+1):
+        scale = 1 / np.sqrt(2 * (2*k-1))
+        vals[:, k] = scale * (leg_vals[:, k] - leg_vals[:, k-2])
+        derivs[:, k] = scale * (leg_derivs[:, k] - leg_derivs[:, k-2])
+
+    return vals, derivs
+
+def compute_GLL_nodal_values(
+    ord : NumericIntegerValueType,
+    pnts : Annotated[NumericVectorValueType, Literal["(total points,)"]]
+    ) -> Tuple[BasisTableType, BasisTableType]:
+    """
+    Lagrange basis on the `ord+1` Gauss–Lobatto–Legendre nodes, evaluated stably with the barycentric formula.
+    At points coinciding with a node, values are exactly the Kronecker delta and derivatives are taken from the nodal differentiation matrix.
+    """
+
+    # Same (real, sorted) nodes as the GLL quadrature rule, so collocated tables are exactly the identity
+    nds, _ = get_line_rule(ord+1, QuadratureFamily.GLL)
+    pnts = np.asarray(pnts, dtype=float)
+
+    # Barycentric weights wⱼ = 1/Πₖ≠ⱼ(xⱼ - xₖ)
+    nds_diffs = nds[:, None] - nds[None, :]
+    np.fill_diagonal(nds_diffs, 1.0)
+    bary_wghts = 1 / np.prod(nds_diffs, axis=1)
+    # Differentiation matrix Dᵢⱼ = ℓ'ⱼ(xᵢ)
+    diff_mtrx = (bary_wghts[None, :] / bary_wghts[:, None]) / nds_diffs
+    np.fill_diagonal(diff_mtrx, 0.0)
+    np.fill_diagonal(diff_mtrx, -diff_mtrx.sum(axis=1))
+
+    pnts_diffs = pnts[:, None] - nds[None, :]
+    on_nds_mask = np.isclose(pnts_diffs, 0.0, rtol=0.0, atol=1e-14)
+    pnts_on_nds_mask = on_nds_mask.any(axis=1)
+    pnts_diffs[on_nds_mask] = 1.0
+
+    terms = bary_wghts[None, :] / pnts_diffs
+    terms_sum = terms.sum(axis=1, keepdims=True)
+    vals = terms / terms_sum
+    # Quotient rule on ℓⱼ = (wⱼ/(x - xⱼ))/S with S = Σₖ wₖ/(x - xₖ): ℓ'ⱼ = ℓⱼ·(Σₖ wₖ/(x - xₖ)²/S - 1/(x - xⱼ))
+    derivs = vals * ((terms / pnts_diffs).sum(axis=1, keepdims=True) / terms_sum - 1 / pnts_diffs)
+
+    nds_is = np.argmax(on_nds_mask[pnts_on_nds_mask], axis=1)
+    vals[pnts_on_nds_mask] = np.eye(ord+1)[nds_is]
+    derivs[pnts_on_nds_mask] = diff_mtrx[nds_is]
+
+    return vals, derivs
+
+def compute_1D_basis_values(
+    ord : NumericIntegerValueType,
+    pnts : Annotated[NumericVectorValueType, Literal["(total points,)"]],
+    basis_type : BasisType = BasisType.HIERARCHICAL
+    ) -> Tuple[BasisTableType, BasisTableType]:
+
+    match basis_type:
+        case BasisType.HIERARCHICAL:
+            return compute_hierarchical_values(ord, pnts)
+        case BasisType.GLL_NODAL:
+            return compute_GLL_nodal_values(ord, pnts)
+        case _:
+            raise ValueError(f"Unsupported basis type {basis_type}.")
+
+def compute_tensor_product_values(
+    ord : NumericIntegerValueType,
+    pnts_vec_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]],
+    basis_type : BasisType = BasisType.HIERARCHICAL
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total points, (order+1)^dimensions)"]],
+        Annotated[NumericTensorValueType, Literal["(total points, (order+1)^dimensions, dimensions)"]]
+        ]:
+    """
+    Dense values & reference gradients of the tensor-product basis at arbitrary reference points, for element matrices and point evaluation; functions are products of 1D ones, first dimension fastest.
+    """
+
+    num_of_pnts, dimalty = pnts_vec_crds.shape
+    tbls = [compute_1D_basis_values(ord, pnts_vec_crds[:, curr_dim_i], basis_type) for curr_dim_i in range(dimalty)]
+    vals = np.ones((num_of_pnts, 1))
+    ref_grads = np.ones((num_of_pnts, 1, dimalty))
+    for curr_dim_i, (curr_vals, curr_derivs) in enumerate(tbls):
+        # Later dimensions vary slower
+        vals = (curr_vals[:, :, None] * vals[:, None, :]).reshape(num_of_pnts, -1)
+        curr_fctrs = np.stack([curr_derivs if curr_drctn_i == curr_dim_i else curr_vals for curr_drctn_i in range(dimalty)], axis=-1)
+        ref_grads = (curr_fctrs[:, :, None, :] * ref_grads[:, None, :, :]).reshape(num_of_pnts, -1, dimalty)
+
+    return vals, ref_grads
+
+
+'''
+Linear (vertex) shape functions of all cell types
+'''
+
+def compute_barycentric_values(
+    pnts : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total points, dimensions+1)"]],
+        Annotated[NumericTensorValueType, Literal["(total points, dimensions+1, dimensions)"]]
+        ]:
+
+    dimalty = pnts.shape[1]
+    vals = np.concatenate([1 - pnts.sum(axis=1, keepdims=True), pnts], axis=1)
+    ref_grads = np.broadcast_to(np.concatenate([-np.ones((1, dimalty)), np.eye(dimalty)]), (len(pnts), dimalty+1, dimalty))
+
+    return vals, np.array(ref_grads)
+
+def compute_linear_shape_values(
+    cell_type : CellType,
+    pnts : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total points, total vertices)"]],
+        Annotated[NumericTensorValueType, Literal["(total points, total vertices, dimensions)"]]
+        ]:
+    """
+    Values & reference gradients of the vertex shape functions of a cell, in VTK vertex order: (multi)linear on lines, quadrilaterals & hexahedra, barycentric on simplices, barycentric times linear on wedges.
+
+    Pyramids use the rational (Bedrosian) functions `Nᵢ = ((1 + sₓξ - ζ)(1 + s_yη - ζ) + sₓs_yξηζ)/(4(1-ζ))` for base vertices `(sₓ, s_y, 0)` and `N = ζ` for the apex, which are conforming with both the quadrilateral and triangular faces of neighbors; they are singular at the apex only, where quadrature points never are.
+    """
+
+    pnts = np.asarray(pnts, dtype=float)
+    num_of_pnts = len(pnts)
+    match cell_type:
+        case CellType.LINE | CellType.QUADRILATERAL | CellType.HEXAHEDRON:
+            signs = np.array(CELLS_REF_VRTS_VEC_CRDS[cell_type], dtype=float)
+            # (1 + sᵢξᵢ)/2 per direction
+            fctrs = (1 + signs[None, :, :] * pnts[:, None, :]) / 2
+            vals = np.prod(fctrs, axis=2)
+            ref_grads = np.empty((num_of_pnts,) + signs.shape)
+            for curr_dim_i in range(signs.shape[1]):
+                ref_grads[:, :, curr_dim_i] = (signs[:, curr_dim_i] / 2) * np.prod(np.delete(fctrs, curr_dim_i, axis=2), axis=2)
+        case CellType.TRIANGLE | CellType.TETRAHEDRON:
+            vals, ref_grads = compute_barycentric_values(pnts)
+        case CellType.WEDGE:
+            tri_vals, tri_ref_grads = compute_barycentric_values(pnts[:, :2])
+            lwr = (1 - pnts[:, 2:]) / 2
+            uppr = (1 + pnts[:, 2:]) / 2
+            vals = np.concatenate([tri_vals * lwr, tri_vals * uppr], axis=1)
+            ref_grads = np.concatenate([
+                np.concatenate([tri_ref_grads * lwr[:, :, None], -tri_vals[:, :, None] / 2], axis=2),
+                np.concatenate([tri_ref_grads * uppr[:, :, None], tri_vals[:, :, None] / 2], axis=2)
+                ], axis=1)
+        case CellType.PYRAMID:
+            ξ, η, ζ = (pnts[:, curr_dim_i:curr_dim_i+1] for curr_dim_i in range(3))
+            signs = np.array(CELLS_REF_VRTS_VEC_CRDS[cell_type][:4], dtype=float)
+            sx, sy = signs[None, :, 0], signs[None, :, 1]
+            dnmntr = 4 * (1 - ζ)
+            x_fctrs = 1 + sx*ξ - ζ
+            y_fctrs = 1 + sy*η - ζ
+            nmrtrs = x_fctrs * y_fctrs + sx*sy*ξ*η*ζ
+            # d(X/D)/dζ = X'/D + 4X/D² for D = 4(1-ζ)
+            base_ref_grads = np.stack([
+                (sx*y_fctrs + sx*sy*η*ζ) / dnmntr,
+                (sy*x_fctrs + sx*sy*ξ*ζ) / dnmntr,
+                (-x_fctrs - y_fctrs + sx*sy*ξ*η) / dnmntr + 4 * nmrtrs / dnmntr**2
+                ], axis=2)
+            vals = np.concatenate([nmrtrs / dnmntr, ζ], axis=1)
+            ref_grads = np.concatenate([base_ref_grads, np.broadcast_to([[[0.0, 0.0, 1.0]]], (num_of_pnts, 1, 3))], axis=1)
+        case _:
+            raise ValueError(f"Unsupported cell type {cell_type}.")
+
+    return vals, ref_grads
+
+
+'''
+Tensor-product bases with sum factorization
+'''
+
+def apply_along_axes(
+    tnsr : TensorCoefficientsType,
+    mtrcs : List[NumericMatrixValueType]
+    ) -> TensorCoefficientsType:
+    """
+    Contracts every reference direction of a batch of tensors with its own 1D matrix: `result[e, a, b, c] = Σ mtrcs[2][c,k]·mtrcs[1][b,j]·mtrcs[0][a,i]·tnsr[e, i, j, k]`, one direction at a time.
+
+    `mtrcs` are given first dimension first, while tensor axes are stored first dimension last (fastest).
+    Each contraction costs O(n^(d+1)) per element instead of the O(n^(2d)) of applying the full tensor-product matrix.
+    """
+
+    dimalty = len(mtrcs)
+    for curr_dim_i, curr_mtrx in enumerate(mtrcs):
+        axis = dimalty - curr_dim_i
+        tnsr = np.moveaxis(np.tensordot(tnsr, curr_mtrx, axes=([axis], [1])), -1, axis)
+    return tnsr
+
+class TensorProductBasis:
+    """
+    Tensor-product basis of a given order on the reference line `[-1, 1]`, quadrilateral `[-1, 1]²` or hexahedron `[-1, 1]³`, tabulated at the tensor-product points `pnts` (e.g. Gauss or GLL quadrature points).
+
+    Local basis functions and points are indexed lexicographically with the first dimension fastest, i.e. per-element coefficients have shape `(total elements, [n_z,] [n_y,] n_x)`.
+    Interpolation, gradients and their transposes (integration against the basis) are all sum-factorized: only the 1D tables are stored, and they are applied one direction at a time.
+    """
+
+    def __init__(
+        self,
+        ord : NumericIntegerValueType,
+        dimalty : NumericIntegerValueType,
+        pnts : Annotated[NumericVectorValueType, Literal["(total 1D points,)"]],
+        basis_type : BasisType = BasisType.HIERARCHICAL
+        ):
+
+        if dimalty not in (1, 2, 3):
+            raise ValueError(f"Tensor-product bases are only supported in 1D, 2D and 3D, not {dimalty}D.")
+
+        self.ord = ord
+        self.dimalty = dimalty
+        self.pnts = np.asarray(pnts, dtype=float)
+        self.basis_type = basis_type
+        self.vals, self.derivs = compute_1D_basis_values(ord, self.pnts, basis_type)
+
+    @property
+    def num_of_fns(self) -> NumericIntegerValueType:
+        return (self.ord + 1)**self.dimalty
+    @property
+    def num_of_pnts(self) -> NumericIntegerValueType:
+        return len(self.pnts)**self.dimalty
+
+    def to_tensor(
+        self,
+        arr : NumericMatrixValueType,
+        n : NumericIntegerValueType
+        ) -> TensorCoefficientsType:
+
+        return np.reshape(arr, (-1,) + (n,)*self.dimalty)
+
+    def interpolate(
+        self,
+        coefs : Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]]
+        ) -> Annotated[NumericMatrixValueType, Literal["(total elements, total points)"]]:
+
+        result = apply_along_axes(self.to_tensor(coefs, self.ord+1), [self.vals]*self.dimalty)
+        return result.reshape(len(result), -1)
+
+    def interpolate_gradients(
+        self,
+        coefs : Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]]
+        ) -> Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions)"]]:
+        """
+        Reference gradients `∂u/∂ξ_d` at every point: the derivative table along direction `d`, value tables along all others.
+        """
+
+        coefs = self.to_tensor(coefs, self.ord+1)
+        result = np.stack([
+            apply_along_axes(coefs, [self.derivs if curr_dim_i == curr_drctn_i else self.vals for curr_dim_i in range(self.dimalty)])
+            for curr_drctn_i in range(self.dimalty)
+            ], axis=-1)
+        return result.reshape(len(result), -1, self.dimalty)
+
+    def integrate(
+        self,
+        vals : Annotated[NumericMatrixValueType, Literal["(total elements, total points)"]]
+        ) -> Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]]:
+        """
+        Transpose of `interpolate()`: `Σ_q φ_i(ξ_q)·vals_q` for every basis function; with quadrature-weighted `vals` this is `∫ φ_i·v`.
+        """
+
+        result = apply_along_axes(self.to_tensor(vals, len(self.pnts)), [self.vals.T]*self.dimalty)
+        return result.reshape(len(result), -1)
+
+    def integrate_gradients(
+        self,
+        flxs : Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions)"]]
+        ) -> Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]]:
+        """
+        Transpose of `interpolate_gradients()`: `Σ_q Σ_d ∂φ_i/∂ξ_d(ξ_q)·flxs_qd`.
+        """
+
+        result = 0
+        for curr_drctn_i in range(self.dimalty):
+            result = result + apply_along_axes(
+                self.to_tensor(flxs[..., curr_drctn_i], len(self.pnts)),
+                [self.derivs.T if curr_dim_i == curr_drctn_i else self.vals.T for curr_dim_i in range(self.dimalty)]
+                )
+        return result.reshape(len(result), -1)
+
+
+'''
+Matrix-free element operators
+'''
+
+def compute_tensor_weights(
+    wghts : Annotated[NumericVectorValueType, Literal["(total 1D points,)"]],
+    dimalty : NumericIntegerValueType
+    ) -> Annotated[NumericVectorValueType, Literal["(total points,)"]]:
+
+    result = np.ones(1)
+    for _ in range(dimalty):
+        result = np.outer(result, wghts).ravel()
+    return result
+
+def compute_geometric_factors(
+    els_vrts_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, 2^dimensions, dimensions)"]],
+    pnts : Annotated[NumericVectorValueType, Literal["(total 1D points,)"]],
+    wghts : Annotated[NumericVectorValueType, Literal["(total 1D points,)"]]
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total elements, total points)"]],
+        Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions, dimensions)"]]
+        ]:
+    """
+    Quadrature-weighted Jacobian determinants `w_q·|J|` and stiffness factors `w_q·|J|·J⁻¹·J⁻ᵀ` for (multi)linear element geometries.
+
+    Vertices are given in lexicographic (tensor) order, first dimension fastest, i.e. `(0, 1)` on lines, `(00, 10, 01, 11)` on quadrilaterals; VTK-ordered quadrilaterals/hexahedra need their last two vertices of each face swapped.
+    """
+
+    dimalty = els_vrts_vec_crds.shape[-1]
+    geo_basis = TensorProductBasis(1, dimalty, pnts)
+
+    # Jᵢⱼ = ∂xᵢ/∂ξⱼ, interpolated from the vertices with the linear basis
+    jacs = np.stack([
+        geo_basis.interpolate_gradients(els_vrts_vec_crds[:, :, curr_dim_i])
+        for curr_dim_i in range(dimalty)
+        ], axis=-2)
+    dets = np.linalg.det(jacs)
+    inv_jacs = np.linalg.inv(jacs)
+
+    wghtd_dets = dets * compute_tensor_weights(wghts, dimalty)[None, :]
+    stiff_fctrs = wghtd_dets[..., None, None] * (inv_jacs @ np.swapaxes(inv_jacs, -1, -2))
+
+    return wghtd_dets, stiff_fctrs
+
+def apply_mass(
+    basis : TensorProductBasis,
+    coefs : Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]],
+    wghtd_dets : Annotated[NumericMatrixValueType, Literal["(total elements, total points)"]]
+    ) -> Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]]:
+
+    return basis.integrate(wghtd_dets * basis.interpolate(coefs))
+
+def apply_stiffness(
+    basis : TensorProductBasis,
+    coefs : Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]],
+    stiff_fctrs : Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions, dimensions)"]]
+    ) -> Annotated[NumericMatrixValueType, Literal["(total elements, total basis functions)"]]:
+    """
+    Element stiffness (Laplacian) action `K_e·u_e = Σ_q ∇φ·(w|J|J⁻¹J⁻ᵀ)·∇u`, without ever forming `K_e`.
+    """
+
+    ref_grads = basis.interpolate_gradients(coefs)
+    return basis.integrate_gradients(np.einsum("eqij,eqj->eqi", stiff_fctrs, ref_grads))
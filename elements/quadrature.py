@@ -0,0 +1,333 @@
+# Libraries
+import numpy as np
+from scipy.special import roots_jacobi
+from dataclasses import dataclass
+from enum import Enum
+from functools import lru_cache
+from itertools import permutations
+# Scripts
+from Code.types import *
+from Code.utilities.auxilary import compute_Gauss_Lobatto_values
+
+
+'''
+Script-specific typing setup
+'''
+
+class CellType(Enum):
+    LINE = "Line"
+    QUADRILATERAL = "Quadrilateral"
+    HEXAHEDRON = "Hexahedron"
+    TRIANGLE = "Triangle"
+    TETRAHEDRON = "Tetrahedron"
+    WEDGE = "Wedge"
+    PYRAMID = "Pyramid"
+
+class QuadratureFamily(Enum):
+    GAUSS = "Gauss–Legendre"
+    GLL = "Gauss–Lobatto–Legendre"
+
+CELLS_DIMALTIES = {
+    CellType.LINE: 1,
+    CellType.QUADRILATERAL: 2,
+    CellType.HEXAHEDRON: 3,
+    CellType.TRIANGLE: 2,
+    CellType.TETRAHEDRON: 3,
+    CellType.WEDGE: 3,
+    CellType.PYRAMID: 3
+    }
+TENSOR_CELL_TYPES = (CellType.LINE, CellType.QUADRILATERAL, CellType.HEXAHEDRON)
+
+# Symmetric simplex rules, as (degree ⟼ [(barycentric orbit generator, weight per point), ...]) with weights summing to 1
+# Every permutation of a generator's coordinates is a point of the rule
+DUNAVANT_RULES = {
+    1: [((1/3, 1/3, 1/3), 1.0)],
+    2: [((2/3, 1/6, 1/6), 1/3)],
+    3: [
+        ((1/3, 1/3, 1/3), -0.5625),
+        ((0.6, 0.2, 0.2), 25/48)
+        ],
+    4: [
+        ((0.108103018168070, 0.445948490915965, 0.445948490915965), 0.223381589678011),
+        ((0.816847572980459, 0.091576213509771, 0.091576213509771), 0.109951743655322)
+        ],
+    5: [
+        ((1/3, 1/3, 1/3), 0.225),
+        ((0.059715871789770, 0.470142064105115, 0.470142064105115), 0.132394152788506),
+        ((0.797426985353087, 0.101286507323456, 0.101286507323456), 0.125939180544827)
+        ],
+    6: [
+        ((0.501426509658179, 0.249286745170910, 0.249286745170910), 0.116786275726379),
+        ((0.873821971016996, 0.063089014491502, 0.063089014491502), 0.050844906370207),
+        ((0.053145049844817, 0.310352451033784, 0.636502499121399), 0.082851075618374)
+        ]
+    }
+KEAST_RULES = {
+    1: [((1/4, 1/4, 1/4, 1/4), 1.0)],
+    2: [((0.5854101966249685, 0.1381966011250105, 0.1381966011250105, 0.1381966011250105), 1/4)],
+    3: [
+        ((1/4, 1/4, 1/4, 1/4), -4/5),
+        ((1/2, 1/6, 1/6, 1/6), 9/20)
+        ]
+    }
+
+
+'''
+Quadrature rules
+'''
+
+@dataclass(frozen=True)
+class QuadratureRule:
+    """
+    Points (in reference coordinates) and weights of a quadrature rule, exact for polynomials up to `deg`.
+
+    Reference cells are `[-1, 1]ᵈ` for lines/quadrilaterals/hexahedra (points ordered lexicographically, first dimension fastest) and the unit simplices for triangles/tetrahedra, so weights sum to the reference volume.
+    """
+
+    cell_type : CellType
+    family : QuadratureFamily
+    deg : NumericIntegerValueType
+    pnts : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]
+    wghts : Annotated[NumericVectorValueType, Literal["(total points,)"]]
+
+    @property
+    def num_of_pnts(self) -> NumericIntegerValueType:
+        return len(self.wghts)
+
+def compute_Gauss_rule(
+    num_of_pnts : NumericIntegerValueType
+    ) -> Tuple[Annotated[NumericVectorValueType, Literal["(total points,)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+
+    return np.polynomial.legendre.leggauss(num_of_pnts)
+
+def compute_GLL_rule(
+    num_of_pnts : NumericIntegerValueType
+    ) -> Tuple[Annotated[NumericVectorValueType, Literal["(total points,)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+
+    if num_of_pnts < 2:
+        raise ValueError(f"Gauss–Lobatto–Legendre rules need at least 2 points, not {num_of_pnts}.")
+    # The interior points are polynomial roots, which NumPy may return as complex with zero imaginary parts (and unsorted)
+    pnts = np.sort(np.real(compute_Gauss_Lobatto_values(num_of_pnts, -1, 1)))
+    # wᵢ = 2/(n(n-1)·P_{n-1}(xᵢ)²)
+    Legendre_vals = np.polynomial.legendre.Legendre.basis(num_of_pnts-1)(pnts)
+    wghts = 2 / (num_of_pnts * (num_of_pnts-1) * Legendre_vals**2)
+
+    return pnts, wghts
+
+def compute_number_of_points(
+    deg : NumericIntegerValueType,
+    family : QuadratureFamily
+    ) -> NumericIntegerValueType:
+
+    # n-point Gauss is exact to degree 2n-1, n-point GLL to degree 2n-3
+    match family:
+        case QuadratureFamily.GAUSS:
+            return max(1, -(-(deg+1) // 2))
+        case QuadratureFamily.GLL:
+            return max(2, -(-(deg+3) // 2))
+        case _:
+            raise ValueError(f"Unsupported quadrature family {family}.")
+
+def compute_tensor_rule(
+    pnts : Annotated[NumericVectorValueType, Literal["(total 1D points,)"]],
+    wghts : Annotated[NumericVectorValueType, Literal["(total 1D points,)"]],
+    dimalty : NumericIntegerValueType
+    ) -> Tuple[Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+
+    # Reversed meshgrid axes make the first dimension the fastest-varying
+    tnsr_pnts = np.stack(
+        [curr_crds.ravel() for curr_crds in np.meshgrid(*[pnts]*dimalty, indexing="ij")[::-1]],
+        axis = 1
+        )
+    tnsr_wghts = np.ones(1)
+    for _ in range(dimalty):
+        tnsr_wghts = np.outer(tnsr_wghts, wghts).ravel()
+
+    return tnsr_pnts, tnsr_wghts
+
+def expand_symmetric_rule(
+    orbits : List[Tuple[Tuple[NumericDecimalValueType, ...], NumericDecimalValueType]]
+    ) -> Tuple[Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+
+    bary_crds = []
+    wghts = []
+    for curr_gnrtr, curr_wght in orbits:
+        # Distinct permutations of the generator, in a deterministic order
+        curr_perms = np.unique(np.array(list(permutations(curr_gnrtr))), axis=0)
+        bary_crds.append(curr_perms)
+        wghts.append(np.full(len(curr_perms), curr_wght))
+    bary_crds = np.concatenate(bary_crds)
+
+    # Cartesian coordinates on the unit simplex are the last barycentric coordinates
+    return bary_crds[:, 1:], np.concatenate(wghts)
+
+def compute_collapsed_rule(
+    deg : NumericIntegerValueType,
+    dimalty : NumericIntegerValueType
+    ) -> Tuple[Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+    """
+    Conical (Stroud) product rule for the unit simplex: Gauss–Jacobi rules in the collapsed (Duffy) directions absorb the transformation's Jacobian, so any degree is reachable.
+    Weights sum to 1, like the tabulated symmetric rules.
+    """
+
+    num_of_pnts = compute_number_of_points(deg, QuadratureFamily.GAUSS)
+    # Direction k (from the apex down) carries the Jacobian factor (1-t)^(d-1-k), mapped from [-1, 1] to [0, 1]
+    axes_rules = []
+    for curr_dim_i in range(dimalty):
+        α = dimalty - 1 - curr_dim_i
+        curr_pnts, curr_wghts = roots_jacobi(num_of_pnts, α, 0)
+        axes_rules.append(((curr_pnts + 1) / 2, curr_wghts / 2**(α+1)))
+
+    grids = np.meshgrid(*[curr_pnts for curr_pnts, _ in axes_rules], indexing="ij")
+    grids_wghts = np.meshgrid(*[curr_wghts for _, curr_wghts in axes_rules], indexing="ij")
+    ts = [curr_grid.ravel() for curr_grid in grids]
+    wghts = np.prod([curr_grid.ravel() for curr_grid in grids_wghts], axis=0)
+
+    # x₀ = t₀, x₁ = (1-t₀)·t₁, x₂ = (1-t₀)(1-t₁)·t₂, ...
+    pnts = np.zeros((len(wghts), dimalty))
+    scale = np.ones(len(wghts))
+    for curr_dim_i in range(dimalty):
+        pnts[:, curr_dim_i] = scale * ts[curr_dim_i]
+        scale = scale * (1 - ts[curr_dim_i])
+
+    return pnts, wghts * np.prod(np.arange(1, dimalty+1))
+
+def compute_pyramid_rule(
+    deg : NumericIntegerValueType
+    ) -> Tuple[Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+    """
+    Collapsed rule for the reference pyramid (base `[-1, 1]²` at `z = 0`, apex at `z = 1`): `x = ξ(1-ζ)`, `y = η(1-ζ)`, `z = ζ`, with Gauss rules in `ξ`, `η` and a Gauss–Jacobi rule absorbing the Jacobian `(1-ζ)²` in `ζ`.
+    Weights sum to the reference volume, 4/3.
+    """
+
+    num_of_pnts = compute_number_of_points(deg, QuadratureFamily.GAUSS)
+    base_pnts, base_wghts = compute_tensor_rule(*compute_Gauss_rule(num_of_pnts), 2)
+    # ∫₀¹(1-ζ)²g(ζ)dζ = ⅛∫₋₁¹(1-t)²g((1+t)/2)dt
+    ζs, ζs_wghts = roots_jacobi(num_of_pnts, 2, 0)
+    ζs = (1 + ζs) / 2
+    ζs_wghts = ζs_wghts / 8
+
+    # Base points fastest
+    scales = np.repeat(1 - ζs, len(base_pnts))
+    pnts = np.column_stack([
+        np.tile(base_pnts[:, 0], num_of_pnts) * scales,
+        np.tile(base_pnts[:, 1], num_of_pnts) * scales,
+        np.repeat(ζs, len(base_pnts))
+        ])
+
+    return pnts, np.outer(ζs_wghts, base_wghts).ravel()
+
+def resolve_quadrature_degree(
+    cell_type : CellType,
+    deg : NumericIntegerValueType,
+    family : QuadratureFamily = QuadratureFamily.GAUSS
+    ) -> Tuple[NumericIntegerValueType, QuadratureFamily]:
+    """
+    Actual degree & family of the rule `get_quadrature_rule()` picks for a requested degree, e.g. 3 for degree 2 on a quadrilateral (2-point Gauss).
+    """
+
+    if deg < 0:
+        raise ValueError(f"Quadrature degree must be non-negative, not {deg}.")
+    deg = max(int(deg), 1)
+
+    if cell_type in TENSOR_CELL_TYPES:
+        num_of_pnts = compute_number_of_points(deg, family)
+        return (2*num_of_pnts - 1 if family == QuadratureFamily.GAUSS else 2*num_of_pnts - 3), family
+    # `family` only applies to tensor-product cells
+    if cell_type == CellType.WEDGE:
+        # The line factor is always at least as exact as the triangle factor
+        return resolve_quadrature_degree(CellType.TRIANGLE, deg)
+    if (cell_type == CellType.TRIANGLE and deg in DUNAVANT_RULES) or (cell_type == CellType.TETRAHEDRON and deg in KEAST_RULES):
+        return deg, QuadratureFamily.GAUSS
+    # Collapsed (Gauss–Jacobi) rules: n points per direction are exact to degree 2n-1
+    return 2*compute_number_of_points(deg, QuadratureFamily.GAUSS) - 1, QuadratureFamily.GAUSS
+
+def get_quadrature_rule(
+    cell_type : CellType,
+    deg : NumericIntegerValueType,
+    family : QuadratureFamily = QuadratureFamily.GAUSS
+    ) -> QuadratureRule:
+    """
+    Returns the cheapest registered rule integrating polynomials of degree `deg` exactly on `cell_type`.
+
+    Rules are memoized by their actual degree (see `resolve_quadrature_degree()`), so every request resolving to the same rule, however it is spelled, returns the very same (read-only) arrays, which can be safely shared and used as cache keys by identity.
+    Simplices use the symmetric Dunavant (triangles, up to degree 6) and Keast (tetrahedra, up to degree 3) rules, and collapsed Gauss–Jacobi rules beyond; `family` only applies to tensor-product cells.
+    Wedges (the unit triangle times `[-1, 1]`) use products of triangle & line rules, and pyramids collapsed rules (see `compute_pyramid_rule()`).
+    """
+
+    return compute_quadrature_rule(cell_type, *resolve_quadrature_degree(cell_type, deg, family))
+
+@lru_cache(maxsize=None)
+def compute_quadrature_rule(
+    cell_type : CellType,
+    deg : NumericIntegerValueType,
+    family : QuadratureFamily
+    ) -> QuadratureRule:
+    """
+    Memoized construction of the rule of (already resolved) degree `deg`; use `get_quadrature_rule()`, which normalizes its arguments first.
+    """
+
+    dimalty = CELLS_DIMALTIES[cell_type]
+
+    if cell_type in TENSOR_CELL_TYPES:
+        num_of_pnts = compute_number_of_points(deg, family)
+        match family:
+            case QuadratureFamily.GAUSS:
+                pnts, wghts = compute_Gauss_rule(num_of_pnts)
+            case QuadratureFamily.GLL:
+                pnts, wghts = compute_GLL_rule(num_of_pnts)
+        pnts, wghts = compute_tensor_rule(pnts, wghts, dimalty)
+    elif cell_type == CellType.WEDGE:
+        tri_rule = get_quadrature_rule(CellType.TRIANGLE, deg)
+        line_rule = get_quadrature_rule(CellType.LINE, deg)
+        # Triangle points fastest
+        pnts = np.column_stack([
+            np.tile(tri_rule.pnts, (line_rule.num_of_pnts, 1)),
+            np.repeat(line_rule.pnts[:, 0], tri_rule.num_of_pnts)
+            ])
+        wghts = np.outer(line_rule.wghts, tri_rule.wghts).ravel()
+    elif cell_type == CellType.PYRAMID:
+        pnts, wghts = compute_pyramid_rule(deg)
+    else:
+        symm_rules = DUNAVANT_RULES if cell_type == CellType.TRIANGLE else KEAST_RULES
+        if deg in symm_rules:
+            pnts, wghts = expand_symmetric_rule(symm_rules[deg])
+        else:
+            pnts, wghts = compute_collapsed_rule(deg, dimalty)
+        # Unit simplex volume 1/d!
+        wghts = wghts / np.prod(np.arange(1, dimalty+1))
+
+    pnts = np.ascontiguousarray(pnts, dtype=float)
+    wghts = np.ascontiguousarray(wghts, dtype=float)
+    pnts.flags.writeable = False
+    wghts.flags.writeable = False
+
+    return QuadratureRule(cell_type, family, deg, pnts, wghts)
+
+def get_line_rule(
+    num_of_pnts : NumericIntegerValueType,
+    family : QuadratureFamily = QuadratureFamily.GAUSS
+    ) -> Tuple[Annotated[NumericVectorValueType, Literal["(total points,)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+    """
+    Memoized 1D rule by number of points, e.g. for the sum-factorized kernels in `elements/basis.py`, which only need the 1D factors of a tensor-product rule.
+    """
+
+    return compute_line_rule(int(num_of_pnts), family)
+
+@lru_cache(maxsize=None)
+def compute_line_rule(
+    num_of_pnts : NumericIntegerValueType,
+    family : QuadratureFamily
+    ) -> Tuple[Annotated[NumericVectorValueType, Literal["(total points,)"]], Annotated[NumericVectorValueType, Literal["(total points,)"]]]:
+
+    match family:
+        case QuadratureFamily.GAUSS:
+            pnts, wghts = compute_Gauss_rule(num_of_pnts)
+        case QuadratureFamily.GLL:
+            pnts, wghts = compute_GLL_rule(num_of_pnts)
+        case _:
+            raise ValueError(f"Unsupported quadrature family {family}.")
+    pnts.flags.writeable = False
+    wghts.flags.writeable = False
+
+    return pnts, wghts
@@ -6,7 +6,8 @@ from dataclasses import dataclass
 from enum import Enum
 # Scripts
 from Code.types import *
-from Code.symbolic.space import Space, Dimension
+from Code.space.base import Space
+from Code.space.manifold.coordinate import Coordinate, Dimension
 
 
 '''
@@ -0,0 +1,639 @@
+# Libraries
+import os
+import shutil
+import tempfile
+import numpy as np
+import scipy.sparse as sps
+from math import factorial
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import MixedMesh
+from Code.elements.quadrature import CellType, get_quadrature_rule
+from Code.elements.basis import compute_linear_shape_values
+from Code.utilities.profiling import PROFILER
+
+
+'''
+Script-specific typing setup
+'''
+
+# Element kernels map a batch of element node coordinates, `(total elements, nodes per element, dimensions)`, to a batch of element matrices, `(total elements, local variables, local variables)`
+ElementKernelType : TypeAlias = Callable[[NumericTensorValueType], NumericTensorValueType]
+# Element source kernels map the same batch to element vectors, `(total elements, local variables)`
+ElementSourcesKernelType : TypeAlias = Callable[[NumericTensorValueType], NumericMatrixValueType]
+# Block element kernels (for nodes carrying a fixed block of `b` variables, e.g. displacement components or several fields) map the same batch to element matrices of dense `b×b` node-to-node blocks, `(total elements, nodes per element, nodes per element, b, b)`
+BlockElementKernelType : TypeAlias = Callable[[NumericTensorValueType], NumericTensorValueType]
+# ... and element vectors of `b`-blocks, `(total elements, nodes per element, b)`
+BlockElementSourcesKernelType : TypeAlias = Callable[[NumericTensorValueType], NumericTensorValueType]
+# Either an array already in memory, or the path to a `.npy` file to be memory-mapped
+ArrayInputType : TypeAlias = Union[np.ndarray, str, os.PathLike]
+
+# Cells whose linear kernels have closed forms (constant gradients)
+SIMPLEX_CELL_TYPES = (CellType.LINE, CellType.TRIANGLE, CellType.TETRAHEDRON)
+# Quadrature degree of the isoparametric kernels of the other cells: exact for (multi)linear mass & stiffness on affine cells
+LINEAR_KERNELS_QUADRATURE_DEGREE = 2
+
+# Bytes per stored index, as used by SciPy's compressed formats for all but enormous matrices
+INDEX_NUM_OF_BYTES = np.dtype(np.int32).itemsize
+VALUE_NUM_OF_BYTES = np.dtype(np.float64).itemsize
+
+
+'''
+Linear simplex element kernels
+'''
+
+def compute_simplex_gradients(
+    els_nds_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions)"]]
+    ) -> Tuple[
+        Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions)"]],
+        Annotated[NumericVectorValueType, Literal["(total elements,)"]]
+        ]:
+    """
+    Computes the (constant) physical gradients of the linear barycentric shape functions and the volumes of a batch of simplices (lines, triangles, tetrahedra).
+
+    For edge vectors `E` (rows `xᵢ - x₀`), the barycentric coordinates satisfy `λ = E⁻ᵀ·(x - x₀)`, so `∇λᵢ` is the `i`th column of `E⁻¹` and `∇λ₀ = -Σ∇λᵢ`.
+    """
+
+    els_edges = els_nds_vec_crds[:, 1:, :] - els_nds_vec_crds[:, :1, :]
+    els_dimalty = els_edges.shape[-1]
+
+    els_grads = np.empty_like(els_nds_vec_crds, dtype=float)
+    els_grads[:, 1:, :] = np.linalg.inv(els_edges).transpose(0, 2, 1)
+    els_grads[:, 0, :] = -els_grads[:, 1:, :].sum(axis=1)
+    els_vols = np.abs(np.linalg.det(els_edges)) / factorial(els_dimalty)
+
+    return els_grads, els_vols
+
+def simplex_stiffness_kernel(
+    els_nds_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions)"]]
+    ) -> Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions+1)"]]:
+    """
+    Element matrices of the volume term `∫(∇u·∇v)dΩ` for linear simplices: `Kᵢⱼ = |Ω|·∇λᵢ·∇λⱼ`.
+    """
+
+    els_grads, els_vols = compute_simplex_gradients(els_nds_vec_crds)
+    return els_vols[:, None, None] * (els_grads @ els_grads.transpose(0, 2, 1))
+
+def simplex_mass_kernel(
+    els_nds_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions)"]]
+    ) -> Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions+1)"]]:
+    """
+    Consistent element matrices of `∫(u·v)dΩ` for linear simplices: `Mᵢⱼ = |Ω|·(1 + δᵢⱼ)/((d+1)(d+2))`.
+    """
+
+    _, els_vols = compute_simplex_gradients(els_nds_vec_crds)
+    num_of_el_nds = els_nds_vec_crds.shape[1]
+    ref_mass = (np.ones((num_of_el_nds, num_of_el_nds)) + np.eye(num_of_el_nds)) / (num_of_el_nds * (num_of_el_nds+1))
+    return els_vols[:, None, None] * ref_mass
+
+def make_simplex_elasticity_kernel(
+    λ : NumericDecimalValueType,
+    μ : NumericDecimalValueType
+    ) -> BlockElementKernelType:
+    """
+    Block element kernel of linear (isotropic) elasticity, `∫(λ(∇·u)(∇·v) + 2μ ε(u):ε(v))dΩ`, for linear simplices with a displacement block per node: `Kᵢⱼ[a, b] = |Ω|·(λ∂ₐλᵢ∂_bλⱼ + μ∂_bλᵢ∂ₐλⱼ + μδₐ_b ∇λᵢ·∇λⱼ)`.
+    """
+
+    def kernel(els_nds_vec_crds):
+        els_grads, els_vols = compute_simplex_gradients(els_nds_vec_crds)
+        dimalty = els_grads.shape[-1]
+        # (total elements, i, j, a, b)
+        els_op_blks = λ * np.einsum("eia,ejb->eijab", els_grads, els_grads)
+        els_op_blks += μ * np.einsum("eib,eja->eijab", els_grads, els_grads)
+        els_op_blks += μ * np.einsum("eid,ejd->eij", els_grads, els_grads)[:, :, :, None, None] * np.eye(dimalty)
+        return els_vols[:, None, None, None, None] * els_op_blks
+
+    return kernel
+
+def make_block_diagonal_kernel(
+    el_kernel : ElementKernelType,
+    blk_size : NumericIntegerValueType
+    ) -> BlockElementKernelType:
+    """
+    Applies a scalar element kernel to every component of a `blk_size`-component unknown independently (e.g. a vector Laplacian or mass matrix): `Kᵢⱼ = kᵢⱼ·I`.
+    """
+
+    def kernel(els_nds_vec_crds):
+        return el_kernel(els_nds_vec_crds)[:, :, :, None, None] * np.eye(blk_size)
+
+    return kernel
+
+def simplex_sources_kernel(
+    els_nds_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions)"]]
+    ) -> Annotated[NumericMatrixValueType, Literal["(total elements, dimensions+1)"]]:
+    """
+    Element vectors of `∫(v)dΩ` (a unit source) for linear simplices: `fᵢ = |Ω|/(d+1)`. Scale by the source value for constant sources.
+    """
+
+    _, els_vols = compute_simplex_gradients(els_nds_vec_crds)
+    num_of_el_nds = els_nds_vec_crds.shape[1]
+    return np.repeat(els_vols[:, None] / num_of_el_nds, num_of_el_nds, axis=1)
+
+
+'''
+Linear isoparametric element kernels
+'''
+
+def compute_linear_geometric_factors(
+    cell_type : CellType,
+    els_nds_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, vertices per element, dimensions)"]],
+    deg : NumericIntegerValueType = LINEAR_KERNELS_QUADRATURE_DEGREE
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total points, vertices per element)"]],
+        Annotated[NumericTensorValueType, Literal["(total elements, total points, vertices per element, dimensions)"]],
+        Annotated[NumericMatrixValueType, Literal["(total elements, total points)"]]
+        ]:
+    """
+    Vertex shape function values, physical gradients `∇N = ∇_ξN·J⁻¹` and quadrature-weighted Jacobian determinants `w_q·|J|` of a batch of cells of one type, at the points of its quadrature rule.
+    """
+
+    rule = get_quadrature_rule(cell_type, deg)
+    vals, ref_grads = compute_linear_shape_values(cell_type, rule.pnts)
+    # Jᵢⱼ = Σᵥ xᵥᵢ·∂Nᵥ/∂ξⱼ
+    jacs = np.swapaxes(els_nds_vec_crds, 1, 2)[:, None] @ ref_grads
+    grads = ref_grads @ np.linalg.inv(jacs)
+
+    return vals, grads, rule.wghts * np.abs(np.linalg.det(jacs))
+
+def make_linear_stiffness_kernel(
+    cell_type : CellType
+    ) -> ElementKernelType:
+    """
+    Element kernel of `∫(∇u·∇v)dΩ` with the vertex shape functions of any cell type; simplices use their closed form.
+    """
+
+    if cell_type in SIMPLEX_CELL_TYPES:
+        return simplex_stiffness_kernel
+
+    def kernel(els_nds_vec_crds):
+        _, grads, wghtd_dets = compute_linear_geometric_factors(cell_type, els_nds_vec_crds)
+        num_of_els, _, num_of_el_nds, _ = grads.shape
+        # Σ_q over (point, dimension) pairs, as one batched matrix product
+        flat_grads = grads.transpose(0, 2, 1, 3).reshape(num_of_els, num_of_el_nds, -1)
+        wghtd_flat_grads = (wghtd_dets[:, :, None, None] * grads).transpose(0, 2, 1, 3).reshape(num_of_els, num_of_el_nds, -1)
+        return wghtd_flat_grads @ flat_grads.transpose(0, 2, 1)
+
+    return kernel
+
+def make_linear_mass_kernel(
+    cell_type : CellType
+    ) -> ElementKernelType:
+
+    if cell_type in SIMPLEX_CELL_TYPES:
+        return simplex_mass_kernel
+
+    def kernel(els_nds_vec_crds):
+        vals, _, wghtd_dets = compute_linear_geometric_factors(cell_type, els_nds_vec_crds)
+        return (vals.T[None] * wghtd_dets[:, None, :]) @ vals
+
+    return kernel
+
+def make_linear_sources_kernel(
+    cell_type : CellType
+    ) -> ElementSourcesKernelType:
+
+    if cell_type in SIMPLEX_CELL_TYPES:
+        return simplex_sources_kernel
+
+    def kernel(els_nds_vec_crds):
+        vals, _, wghtd_dets = compute_linear_geometric_factors(cell_type, els_nds_vec_crds)
+        return wghtd_dets @ vals
+
+    return kernel
+
+
+'''
+In-memory (vectorized) assembly
+'''
+
+def compute_elements_variables_indices(
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    nds_vars_is : Annotated[NumericMatrixValueType, Literal["(total nodes, variables per node)"]]
+    ) -> Annotated[NumericMatrixValueType, Literal["(total elements, local variables)"]]:
+
+    # Node ordering convention within an element: [NODE 0 VARIABLES, NODE 1 VARIABLES, ...]
+    return nds_vars_is[els_nds_is].reshape(len(els_nds_is), -1)
+
+def assemble_matrix(
+    els_vars_is : Annotated[NumericMatrixValueType, Literal["(total elements, local variables)"]],
+    els_op_coefs : Annotated[NumericTensorValueType, Literal["(total elements, local variables, local variables)"]],
+    num_of_vars : NumericIntegerValueType
+    ) -> NumericSparseMatrixValueType:
+    """
+    Scatters a batch of element matrices into a global CSR matrix in one pass; duplicate (shared-variable) entries are summed during the COO ⟼ CSR conversion.
+    """
+
+    rows_is = np.broadcast_to(els_vars_is[:, :, None], els_op_coefs.shape).ravel()
+    cols_is = np.broadcast_to(els_vars_is[:, None, :], els_op_coefs.shape).ravel()
+
+    result = sps.csr_array(
+        (els_op_coefs.ravel(), (rows_is, cols_is)),
+        shape = (num_of_vars, num_of_vars)
+        )
+    result.sum_duplicates()
+
+    return result
+
+def assemble_vector(
+    els_vars_is : Annotated[NumericMatrixValueType, Literal["(total elements, local variables)"]],
+    els_srcs : Annotated[NumericMatrixValueType, Literal["(total elements, local variables)"]],
+    num_of_vars : NumericIntegerValueType
+    ) -> Annotated[NumericVectorValueType, Literal["(total variables,)"]]:
+
+    return np.bincount(els_vars_is.ravel(), weights=els_srcs.ravel(), minlength=num_of_vars)
+
+@PROFILER.instrument(cat="assembly")
+def assemble(
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+    el_kernel : ElementKernelType,
+    nds_vars_is : Annotated[NumericMatrixValueType, Literal["(total nodes, variables per node)"]] = None,
+    el_srcs_kernel : ElementSourcesKernelType = None,
+    cnstrnt_mtrx : NumericSparseMatrixValueType = None
+    ) -> Tuple[NumericSparseMatrixValueType, Annotated[NumericVectorValueType, Literal["(total variables,)"]]]:
+    """
+    Assembles the global operator (and, if an element sources kernel is provided, the global sources) with all elements batched into a single kernel call.
+
+    With a (hanging-node) constraint matrix `C`, the constrained system `Cᵀ·K·C`, `Cᵀ·f` is returned instead; see `fem/hanging.py`.
+    """
+
+    if nds_vars_is is None:
+        nds_vars_is = np.arange(len(nds_vec_crds))[:, None]
+    num_of_vars = int(nds_vars_is.max()) + 1
+
+    els_vars_is = compute_elements_variables_indices(els_nds_is, nds_vars_is)
+    els_nds_vec_crds = nds_vec_crds[els_nds_is]
+
+    op_coefs = assemble_matrix(els_vars_is, el_kernel(els_nds_vec_crds), num_of_vars)
+    srcs = None
+    if el_srcs_kernel is not None:
+        srcs = assemble_vector(els_vars_is, el_srcs_kernel(els_nds_vec_crds), num_of_vars)
+
+    if cnstrnt_mtrx is not None:
+        op_coefs = sps.csr_array(cnstrnt_mtrx.T @ op_coefs @ cnstrnt_mtrx)
+        if srcs is not None:
+            srcs = cnstrnt_mtrx.T @ srcs
+
+    return op_coefs, srcs
+
+@PROFILER.instrument(cat="assembly")
+def assemble_mixed(
+    mesh : MixedMesh,
+    els_kernels : Dict[CellType, ElementKernelType] = None,
+    els_srcs_kernels : Dict[CellType, ElementSourcesKernelType] = None,
+    cnstrnt_mtrx : NumericSparseMatrixValueType = None
+    ) -> Tuple[NumericSparseMatrixValueType, Annotated[NumericVectorValueType, Literal["(total variables,)"]]]:
+    """
+    Counterpart of `assemble()` for meshes of several cell types: one batched kernel call per (homogeneous) block, then a single scatter of all blocks' entries.
+    Kernels default to the linear stiffness (and no sources); every block's cell type must have a kernel.
+    """
+
+    if els_kernels is None:
+        els_kernels = {curr_cell_type: make_linear_stiffness_kernel(curr_cell_type) for curr_cell_type in mesh.blks}
+    num_of_vars = mesh.num_of_vars
+
+    rows_is, cols_is, op_coefs_vals = [], [], []
+    srcs_vars_is, srcs_vals = [], []
+    for curr_cell_type, curr_els_nds_is in mesh.blks.items():
+        if curr_cell_type not in els_kernels:
+            raise ValueError(f"No element kernel given for the block of {curr_cell_type.value} cells.")
+        with PROFILER.timer(f"assemble_mixed/{curr_cell_type.value}", cat="assembly"):
+            els_vars_is = compute_elements_variables_indices(curr_els_nds_is, mesh.nds_vars_is)
+            els_nds_vec_crds = mesh.nds_vec_crds[curr_els_nds_is]
+            els_op_coefs = els_kernels[curr_cell_type](els_nds_vec_crds)
+            rows_is.append(np.broadcast_to(els_vars_is[:, :, None], els_op_coefs.shape).ravel())
+            cols_is.append(np.broadcast_to(els_vars_is[:, None, :], els_op_coefs.shape).ravel())
+            op_coefs_vals.append(els_op_coefs.ravel())
+            if (els_srcs_kernels is not None) and (curr_cell_type in els_srcs_kernels):
+                srcs_vars_is.append(els_vars_is.ravel())
+                srcs_vals.append(els_srcs_kernels[curr_cell_type](els_nds_vec_crds).ravel())
+
+    op_coefs = sps.csr_array(
+        (np.concatenate(op_coefs_vals), (np.concatenate(rows_is), np.concatenate(cols_is))),
+        shape = (num_of_vars, num_of_vars)
+        )
+    op_coefs.sum_duplicates()
+    srcs = None
+    if els_srcs_kernels is not None:
+        srcs = np.zeros(num_of_vars)
+        if srcs_vars_is:
+            srcs += np.bincount(np.concatenate(srcs_vars_is), weights=np.concatenate(srcs_vals), minlength=num_of_vars)
+
+    if cnstrnt_mtrx is not None:
+        op_coefs = sps.csr_array(cnstrnt_mtrx.T @ op_coefs @ cnstrnt_mtrx)
+        if srcs is not None:
+            srcs = cnstrnt_mtrx.T @ srcs
+
+    return op_coefs, srcs
+
+
+'''
+Block (multi-component) assembly
+'''
+
+def flatten_element_blocks(
+    els_op_blks : Annotated[NumericTensorValueType, Literal["(total elements, nodes per element, nodes per element, b, b)"]]
+    ) -> Annotated[NumericTensorValueType, Literal["(total elements, local variables, local variables)"]]:
+    """
+    Converts block element matrices to plain ones, following the `[NODE 0 VARIABLES, NODE 1 VARIABLES, ...]` convention, so block kernels also work with `assemble()` & `assemble_out_of_core()`.
+    """
+
+    num_of_els, num_of_el_nds, _, blk_size, _ = els_op_blks.shape
+    return els_op_blks.transpose(0, 1, 3, 2, 4).reshape(num_of_els, num_of_el_nds*blk_size, num_of_el_nds*blk_size)
+
+class BlockSparsityPattern:
+    """
+    Node-to-node sparsity of a mesh, in block CSR (BSR) layout, along with the permutation that sorts the elements' node pairs into it.
+
+    The pattern only depends on the connectivity, so it can be computed once per mesh and reused for every assembly on it (e.g. every time step or Newton iteration), reducing each assembly to one gather and one segmented sum over the element blocks.
+    """
+
+    def __init__(
+        self,
+        els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+        num_of_nds : NumericIntegerValueType
+        ):
+
+        self.num_of_nds = num_of_nds
+        num_of_el_nds = els_nds_is.shape[1]
+        rows_is = np.repeat(els_nds_is, num_of_el_nds, axis=1).ravel().astype(np.int64)
+        cols_is = np.tile(els_nds_is, (1, num_of_el_nds)).ravel().astype(np.int64)
+        keys = rows_is * num_of_nds + cols_is
+
+        # Stable sort, so every block's contributions are summed in element order (deterministically)
+        self.perm = np.argsort(keys, kind="stable")
+        srtd_keys = keys[self.perm]
+        is_first = np.empty(len(srtd_keys), dtype=bool)
+        is_first[:1] = True
+        is_first[1:] = srtd_keys[1:] != srtd_keys[:-1]
+        self.blks_starts = np.flatnonzero(is_first)
+
+        unique_keys = srtd_keys[self.blks_starts]
+        self.indices = (unique_keys % num_of_nds).astype(np.int32)
+        self.indptr = np.zeros(num_of_nds + 1, dtype=np.int32)
+        np.cumsum(np.bincount(unique_keys // num_of_nds, minlength=num_of_nds), out=self.indptr[1:])
+
+    @property
+    def num_of_blks(self) -> NumericIntegerValueType:
+        return len(self.indices)
+
+def assemble_block_matrix(
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    els_op_blks : Annotated[NumericTensorValueType, Literal["(total elements, nodes per element, nodes per element, b, b)"]],
+    num_of_nds : NumericIntegerValueType,
+    ptrn : BlockSparsityPattern = None
+    ) -> NumericSparseMatrixValueType:
+    """
+    Scatters a batch of block element matrices straight into a global BSR matrix of `b×b` blocks, with variable `nd·b + c` for component `c` of node `nd`.
+    Only one column index is stored per block (rather than per entry), and SpMV runs over dense blocks.
+    """
+
+    if ptrn is None:
+        ptrn = BlockSparsityPattern(els_nds_is, num_of_nds)
+    blk_size = els_op_blks.shape[-1]
+
+    # Segmented sum of the sorted blocks; duplicates are contiguous after sorting
+    blks = els_op_blks.reshape(-1, blk_size, blk_size)[ptrn.perm]
+    data = np.add.reduceat(blks, ptrn.blks_starts, axis=0)
+
+    return sps.bsr_array(
+        (data, ptrn.indices, ptrn.indptr),
+        shape = (num_of_nds*blk_size, num_of_nds*blk_size)
+        )
+
+def assemble_block_vector(
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    els_srcs_blks : Annotated[NumericTensorValueType, Literal["(total elements, nodes per element, b)"]],
+    num_of_nds : NumericIntegerValueType
+    ) -> Annotated[NumericVectorValueType, Literal["(total variables,)"]]:
+
+    blk_size = els_srcs_blks.shape[-1]
+    els_vars_is = els_nds_is[:, :, None] * blk_size + np.arange(blk_size)
+
+    return np.bincount(els_vars_is.ravel(), weights=els_srcs_blks.ravel(), minlength=num_of_nds*blk_size)
+
+@PROFILER.instrument(cat="assembly")
+def assemble_blocks(
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+    el_blk_kernel : BlockElementKernelType,
+    el_srcs_blk_kernel : BlockElementSourcesKernelType = None,
+    ptrn : BlockSparsityPattern = None
+    ) -> Tuple[NumericSparseMatrixValueType, Annotated[NumericVectorValueType, Literal["(total variables,)"]]]:
+    """
+    Block counterpart of `assemble()`: every node carries the same block of variables (node-major), and the global operator is returned in BSR format.
+    """
+
+    num_of_nds = len(nds_vec_crds)
+    els_nds_vec_crds = nds_vec_crds[els_nds_is]
+
+    op_coefs = assemble_block_matrix(els_nds_is, el_blk_kernel(els_nds_vec_crds), num_of_nds, ptrn)
+    srcs = None
+    if el_srcs_blk_kernel is not None:
+        srcs = assemble_block_vector(els_nds_is, el_srcs_blk_kernel(els_nds_vec_crds), num_of_nds)
+
+    return op_coefs, srcs
+
+def split_block_solution(
+    soln : Annotated[NumericVectorValueType, Literal["(total variables,)"]],
+    blk_size : NumericIntegerValueType
+    ) -> Annotated[NumericMatrixValueType, Literal["(total nodes, b)"]]:
+
+    return soln.reshape(-1, blk_size)
+
+
+'''
+Out-of-core (streaming) assembly
+'''
+
+def load_array(
+    arr : ArrayInputType
+    ) -> np.ndarray:
+
+    # Memory-map paths so that only the pages actually sliced get read
+    if isinstance(arr, (str, os.PathLike)):
+        return np.load(arr, mmap_mode='r')
+    return arr
+
+def compute_chunk_size(
+    mem_bdgt : NumericIntegerValueType,
+    num_of_el_nds : NumericIntegerValueType,
+    dimalty : NumericIntegerValueType,
+    num_of_loc_vars : NumericIntegerValueType
+    ) -> NumericIntegerValueType:
+    """
+    Largest number of elements whose assembly working set fits within `mem_bdgt` bytes.
+
+    Per element, the working set is the gathered connectivity, indices & coordinates, the element matrix, its COO triplets (which SciPy copies once while converting) and the chunk's CSR result.
+    """
+
+    num_of_loc_entries = num_of_loc_vars**2
+    el_num_of_bytes = (
+        num_of_el_nds * (8 + 8*dimalty)                                 # Connectivity & gathered coordinates
+        + num_of_loc_vars * 8                                            # Element variable indices
+        + num_of_loc_entries * VALUE_NUM_OF_BYTES                        # Element matrix
+        + 2 * num_of_loc_entries * (2*8 + VALUE_NUM_OF_BYTES)            # COO triplets, plus conversion copy
+        + num_of_loc_entries * (INDEX_NUM_OF_BYTES + VALUE_NUM_OF_BYTES) # Chunk CSR
+        )
+
+    return max(1, int(mem_bdgt // el_num_of_bytes))
+
+def compute_csr_number_of_bytes(
+    mat : NumericSparseMatrixValueType
+    ) -> NumericIntegerValueType:
+
+    return mat.data.nbytes + mat.indices.nbytes + mat.indptr.nbytes
+
+def spill_csr(
+    mat : NumericSparseMatrixValueType,
+    spill_dir : str,
+    blk_i : IndexType
+    ) -> str:
+
+    blk_path = os.path.join(spill_dir, f"blk_{blk_i}")
+    os.makedirs(blk_path)
+    np.save(os.path.join(blk_path, "data.npy"), mat.data)
+    np.save(os.path.join(blk_path, "indices.npy"), mat.indices)
+    np.save(os.path.join(blk_path, "indptr.npy"), mat.indptr)
+
+    return blk_path
+
+def load_csr_rows(
+    blk_path : str,
+    rows_start_i : IndexType,
+    rows_stop_i : IndexType,
+    num_of_cols : NumericIntegerValueType
+    ) -> NumericSparseMatrixValueType:
+    """
+    Loads rows `[rows_start_i, rows_stop_i)` of a spilled CSR block, only touching the pages of the memory-mapped arrays covering those rows.
+    """
+
+    indptr = np.load(os.path.join(blk_path, "indptr.npy"), mmap_mode='r')
+    entries_start_i = int(indptr[rows_start_i])
+    entries_stop_i = int(indptr[rows_stop_i])
+    data = np.load(os.path.join(blk_path, "data.npy"), mmap_mode='r')[entries_start_i:entries_stop_i]
+    indices = np.load(os.path.join(blk_path, "indices.npy"), mmap_mode='r')[entries_start_i:entries_stop_i]
+    rows_indptr = np.asarray(indptr[rows_start_i:rows_stop_i+1]) - entries_start_i
+
+    return sps.csr_array(
+        (np.array(data), np.array(indices), rows_indptr),
+        shape = (rows_stop_i - rows_start_i, num_of_cols)
+        )
+
+def merge_spilled_blocks(
+    blks_paths : List[str],
+    num_of_vars : NumericIntegerValueType,
+    mem_bdgt : NumericIntegerValueType
+    ) -> NumericSparseMatrixValueType:
+    """
+    Final merge pass: sums the spilled blocks band of rows by band of rows, so at most one band of every block is resident alongside the (growing) result.
+    """
+
+    # Estimate the band height from the average number of stored entries per row across all blocks
+    total_num_of_entries = sum(
+        int(np.load(os.path.join(curr_blk_path, "indptr.npy"), mmap_mode='r')[-1])
+        for curr_blk_path in blks_paths
+        )
+    entry_num_of_bytes = INDEX_NUM_OF_BYTES + VALUE_NUM_OF_BYTES
+    avg_row_num_of_bytes = max(1.0, total_num_of_entries * entry_num_of_bytes / num_of_vars)
+    band_num_of_rows = max(1, int(mem_bdgt // (2 * avg_row_num_of_bytes)))
+
+    bands = []
+    for curr_band_start_i in range(0, num_of_vars, band_num_of_rows):
+        curr_band_stop_i = min(curr_band_start_i + band_num_of_rows, num_of_vars)
+        curr_band = None
+        for curr_blk_path in blks_paths:
+            curr_blk_band = load_csr_rows(curr_blk_path, curr_band_start_i, curr_band_stop_i, num_of_vars)
+            curr_band = curr_blk_band if curr_band is None else curr_band + curr_blk_band
+        bands.append(curr_band)
+
+    return sps.csr_array(sps.vstack(bands, format='csr'))
+
+@PROFILER.instrument(cat="assembly")
+def assemble_out_of_core(
+    els_nds_is : ArrayInputType,
+    nds_vec_crds : ArrayInputType,
+    el_kernel : ElementKernelType,
+    nds_vars_is : ArrayInputType = None,
+    el_srcs_kernel : ElementSourcesKernelType = None,
+    mem_bdgt : NumericIntegerValueType = 2**30,
+    spill_dir : str = None
+    ) -> Tuple[NumericSparseMatrixValueType, Annotated[NumericVectorValueType, Literal["(total variables,)"]]]:
+    """
+    Streams element connectivity & node coordinates in chunks (typically from memory-mapped `.npy` files), assembles each chunk's contributions, and spills partially reduced CSR blocks to `spill_dir` whenever the in-memory accumulation exceeds its share of `mem_bdgt` bytes.
+    A final merge pass then sums the spilled blocks into the global CSR matrix.
+
+    Half of the budget is reserved for the chunk working set and half for the in-memory accumulation; the merge pass works within the full budget on top of the output itself.
+    If `spill_dir` is not provided, a temporary directory is used and removed afterwards.
+    """
+
+    els_nds_is = load_array(els_nds_is)
+    nds_vec_crds = load_array(nds_vec_crds)
+    if nds_vars_is is None:
+        nds_vars_is = np.arange(len(nds_vec_crds))[:, None]
+    else:
+        nds_vars_is = load_array(nds_vars_is)
+    num_of_vars = int(np.max(nds_vars_is)) + 1
+    num_of_els, num_of_el_nds = els_nds_is.shape
+
+    chnk_size = compute_chunk_size(
+        mem_bdgt // 2,
+        num_of_el_nds,
+        nds_vec_crds.shape[1],
+        num_of_el_nds * nds_vars_is.shape[1]
+        )
+    acc_mem_bdgt = mem_bdgt // 2
+
+    # Spill directory handling
+    rmv_spill_dir = spill_dir is None
+    if spill_dir is None:
+        spill_dir = tempfile.mkdtemp(prefix="fem_assembly_")
+    else:
+        os.makedirs(spill_dir, exist_ok=True)
+
+    blks_paths = []
+    try:
+        acc = None
+        srcs = np.zeros(num_of_vars) if el_srcs_kernel is not None else None
+        for curr_chnk_start_i in range(0, num_of_els, chnk_size):
+            with PROFILER.timer("assemble_out_of_core/chunk", cat="assembly"):
+                curr_chnk_stop_i = min(curr_chnk_start_i + chnk_size, num_of_els)
+
+                # Only the current chunk (and the coordinate pages it references) are read from disk
+                curr_chnk_els_nds_is = np.asarray(els_nds_is[curr_chnk_start_i:curr_chnk_stop_i])
+                curr_chnk_els_nds_vec_crds = np.asarray(nds_vec_crds[curr_chnk_els_nds_is], dtype=float)
+                curr_chnk_els_vars_is = compute_elements_variables_indices(curr_chnk_els_nds_is, np.asarray(nds_vars_is))
+
+                curr_chnk_op_coefs = assemble_matrix(
+                    curr_chnk_els_vars_is,
+                    el_kernel(curr_chnk_els_nds_vec_crds),
+                    num_of_vars
+                    )
+                acc = curr_chnk_op_coefs if acc is None else acc + curr_chnk_op_coefs
+                if srcs is not None:
+                    srcs += assemble_vector(curr_chnk_els_vars_is, el_srcs_kernel(curr_chnk_els_nds_vec_crds), num_of_vars)
+
+                # Spill once the partially reduced accumulation outgrows its share of the budget
+                if compute_csr_number_of_bytes(acc) > acc_mem_bdgt:
+                    blks_paths.append(spill_csr(acc, spill_dir, len(blks_paths)))
+                    acc = None
+                    PROFILER.count("assemble_out_of_core/spills")
+
+        # Nothing was spilled; the accumulation is already the result
+        if not blks_paths:
+            op_coefs = acc if acc is not None else sps.csr_array((num_of_vars, num_of_vars))
+            return op_coefs, srcs
+        if acc is not None:
+            blks_paths.append(spill_csr(acc, spill_dir, len(blks_paths)))
+            acc = None
+
+        with PROFILER.timer("assemble_out_of_core/merge", cat="assembly"):
+            op_coefs = merge_spilled_blocks(blks_paths, num_of_vars, mem_bdgt)
+        return op_coefs, srcs
+
+    finally:
+        if rmv_spill_dir:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+        else:
+            for curr_blk_path in blks_paths:
+                shutil.rmtree(curr_blk_path, ignore_errors=True)
@@ -0,0 +1,233 @@
+# Libraries
+import os
+import re
+import time
+import numpy as np
+import scipy.sparse as sps
+# Scripts
+from Code.types import *
+from Code.mesh.io import PathType, AttributesType, ArraysType, write_arrays, read_arrays, read_header
+from Code.utilities.auxilary import KernelCache
+
+
+'''
+Script-specific typing setup
+'''
+
+STATIC_FILE_NAME_FORMAT = "static_{vrsn:08d}.fem"
+STEP_FILE_NAME_FORMAT = "step_{itr:012d}.fem"
+STATIC_FILE_NAME_PATTERN = re.compile(r"static_(\d{8})\.fem")
+STEP_FILE_NAME_PATTERN = re.compile(r"step_(\d{12})\.fem")
+
+
+'''
+Checkpointing
+'''
+
+class Checkpointer:
+    """
+    Incremental binary checkpoints for long-running simulations, written with the format in `mesh/io.py`.
+
+    State is split by how often it changes:
+    - "Static" files hold the mesh & assembled system, and are only rewritten when the operator version changes.
+    - "Step" files hold the small, per-iteration state (solution vector, time & iteration counters) plus the version of the static file they belong to.
+
+    Every file is written to a temporary name and then atomically renamed, so a crash mid-write never corrupts the latest complete checkpoint.
+    Compiled kernels can be kept alongside in `kernel_cache` (see `make_callable()`), so a restart needs neither the assembly nor the symbolic pipeline to be rebuilt.
+    """
+
+    def __init__(
+        self,
+        chkpt_dir : PathType,
+        itr_intrvl : NumericIntegerValueType = 1,
+        wall_intrvl : NumericDecimalValueType = None,
+        num_of_kept_steps : NumericIntegerValueType = 2
+        ):
+
+        self.chkpt_dir = chkpt_dir
+        os.makedirs(self.chkpt_dir, exist_ok=True)
+        # Checkpoint every `itr_intrvl` iterations and/or every `wall_intrvl` seconds of wall time
+        self.itr_intrvl = itr_intrvl
+        self.wall_intrvl = wall_intrvl
+        self.num_of_kept_steps = num_of_kept_steps
+        self.kernel_cache = KernelCache(os.path.join(self.chkpt_dir, "kernels"))
+
+        self.last_chkpt_itr = None
+        self.last_chkpt_wall_time = time.perf_counter()
+        self.static_vrsn = None
+
+    def is_due(
+        self,
+        itr : NumericIntegerValueType
+        ) -> bool:
+
+        if (self.itr_intrvl is not None) and (self.last_chkpt_itr is None or itr - self.last_chkpt_itr >= self.itr_intrvl):
+            return True
+        if (self.wall_intrvl is not None) and (time.perf_counter() - self.last_chkpt_wall_time >= self.wall_intrvl):
+            return True
+        return False
+
+    def write_file(
+        self,
+        file_name : str,
+        kind : NameType,
+        arrays : ArraysType,
+        attrs : AttributesType
+        ):
+
+        # Unset state (e.g. the solution before the first solve) is left out, and restored as `None`
+        arrays = {curr_name: curr_arr for curr_name, curr_arr in arrays.items() if curr_arr is not None}
+        # Written atomically, so a crash mid-write leaves the previous checkpoint intact
+        write_arrays(os.path.join(self.chkpt_dir, file_name), kind=kind, arrays=arrays, attrs=attrs)
+
+    def write_static(
+        self,
+        vrsn : IndexType,
+        mesh_arrays : ArraysType,
+        op_coefs : NumericSparseMatrixValueType = None,
+        srcs : NumericValueType = None
+        ):
+
+        arrays = dict(mesh_arrays)
+        attrs = {}
+        if op_coefs is not None:
+            op_coefs = sps.csr_array(op_coefs)
+            arrays["op_coefs_data"] = op_coefs.data
+            arrays["op_coefs_indices"] = op_coefs.indices
+            arrays["op_coefs_indptr"] = op_coefs.indptr
+            attrs["op_coefs_shape"] = list(op_coefs.shape)
+        if srcs is not None:
+            arrays["srcs"] = srcs
+
+        self.write_file(STATIC_FILE_NAME_FORMAT.format(vrsn=vrsn), "CheckpointStatic", arrays, attrs)
+        self.static_vrsn = vrsn
+
+    def write_step(
+        self,
+        itr : NumericIntegerValueType,
+        t : NumericDecimalValueType,
+        soln : NumericValueType,
+        vrsn : IndexType,
+        extra_arrays : ArraysType = None
+        ):
+
+        arrays = {"soln": soln}
+        if extra_arrays is not None:
+            arrays.update(extra_arrays)
+        self.write_file(
+            STEP_FILE_NAME_FORMAT.format(itr=itr),
+            "CheckpointStep",
+            arrays,
+            {"itr": int(itr), "t": float(t), "vrsn": int(vrsn)}
+            )
+
+        self.last_chkpt_itr = itr
+        self.last_chkpt_wall_time = time.perf_counter()
+        self.prune()
+
+    def checkpoint(
+        self,
+        itr : NumericIntegerValueType,
+        t : NumericDecimalValueType,
+        soln : NumericValueType,
+        vrsn : IndexType,
+        mesh_arrays : ArraysType,
+        op_coefs : NumericSparseMatrixValueType = None,
+        srcs : NumericValueType = None,
+        extra_arrays : ArraysType = None,
+        force : bool = False
+        ) -> bool:
+        """
+        Writes a checkpoint if one is due (or `force`d): the static state only if its version changed since the last write, then the step state.
+        Returns whether a checkpoint was written.
+        """
+
+        if not (force or self.is_due(itr)):
+            return False
+
+        if vrsn != self.static_vrsn:
+            self.write_static(vrsn, mesh_arrays, op_coefs, srcs)
+        self.write_step(itr, t, soln, vrsn, extra_arrays)
+
+        return True
+
+    def list_steps(self) -> List[NumericIntegerValueType]:
+
+        return sorted(
+            int(curr_match.group(1))
+            for curr_file_name in os.listdir(self.chkpt_dir)
+            if (curr_match := STEP_FILE_NAME_PATTERN.fullmatch(curr_file_name))
+            )
+
+    def prune(self):
+
+        # Old step files, then static files no longer referenced by any kept step
+        steps_itrs = self.list_steps()
+        for curr_itr in steps_itrs[:-self.num_of_kept_steps]:
+            os.remove(os.path.join(self.chkpt_dir, STEP_FILE_NAME_FORMAT.format(itr=curr_itr)))
+        kept_vrsns = {
+            read_header(os.path.join(self.chkpt_dir, STEP_FILE_NAME_FORMAT.format(itr=curr_itr)))[0]["attrs"]["vrsn"]
+            for curr_itr in steps_itrs[-self.num_of_kept_steps:]
+            }
+        for curr_file_name in os.listdir(self.chkpt_dir):
+            curr_match = STATIC_FILE_NAME_PATTERN.fullmatch(curr_file_name)
+            if curr_match and int(curr_match.group(1)) not in kept_vrsns:
+                os.remove(os.path.join(self.chkpt_dir, curr_file_name))
+
+    def restore(
+        self,
+        mmap : bool = True
+        ) -> Dict[str, Any]:
+        """
+        Loads the latest complete checkpoint.
+
+        Returns the iteration & time counters, the solution, the operator version, the mesh arrays and (if checkpointed) the assembled operator & sources, without touching any symbolic machinery.
+        State that was `None` when checkpointed (e.g. the solution before the first solve) is restored as `None`.
+        """
+
+        steps_itrs = self.list_steps()
+        if not steps_itrs:
+            raise FileNotFoundError(f"No checkpoints found in \"{self.chkpt_dir}\".")
+
+        step_attrs, step_arrays = read_arrays(
+            os.path.join(self.chkpt_dir, STEP_FILE_NAME_FORMAT.format(itr=steps_itrs[-1])),
+            kind = "CheckpointStep",
+            mmap = mmap
+            )
+        static_attrs, static_arrays = read_arrays(
+            os.path.join(self.chkpt_dir, STATIC_FILE_NAME_FORMAT.format(vrsn=step_attrs["vrsn"])),
+            kind = "CheckpointStatic",
+            mmap = mmap
+            )
+
+        op_coefs = None
+        if "op_coefs_shape" in static_attrs:
+            op_coefs = sps.csr_array(
+                (
+                    static_arrays.pop("op_coefs_data"),
+                    static_arrays.pop("op_coefs_indices"),
+                    static_arrays.pop("op_coefs_indptr")
+                    ),
+                shape = tuple(static_attrs["op_coefs_shape"])
+                )
+        srcs = static_arrays.pop("srcs", None)
+        # Step state is small and about to be overwritten by the resumed run, so detach it from the file
+        soln = step_arrays.pop("soln", None)
+        if soln is not None:
+            soln = np.array(soln)
+
+        # Resuming shouldn't immediately rewrite what was just read
+        self.static_vrsn = step_attrs["vrsn"]
+        self.last_chkpt_itr = step_attrs["itr"]
+        self.last_chkpt_wall_time = time.perf_counter()
+
+        return {
+            "itr": step_attrs["itr"],
+            "t": step_attrs["t"],
+            "vrsn": step_attrs["vrsn"],
+            "soln": soln,
+            "mesh_arrays": static_arrays,
+            "op_coefs": op_coefs,
+            "srcs": srcs,
+            "extra_arrays": step_arrays
+            }
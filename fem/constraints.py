@@ -2,7 +2,7 @@
 import sympy as sp
 # Scripts
 from Code.types import *
-from Code.symbolic.space import Space
+from Code.space.base import Space
 from Code.symbolic.geometry import Boundary, Domain
 from Code.symbolic.math import Expression, Argument
 from Code.symbolic.math import Derivative
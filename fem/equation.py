@@ -3,7 +3,7 @@ import sympy as sp
 import numpy as np
 # Scripts
 from Code.types import *
-from Code.symbolic.space import PhysicalSpace
+from Code.space.manifold.coordinate import PhysicalSpace
 from Code.symbolic.math import SymbolicMathematicalObject, Expression, Argument, Operator
 from Code.symbolic.math import Derivative, Gradient, Divergence, Laplacian
 from Code.symbolic.geometry import Boundary, Domain
@@ -0,0 +1,494 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+from dataclasses import dataclass
+from functools import lru_cache
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh
+from Code.mesh.adaptivity import LINE, TRIANGLE, QUADRILATERAL
+from Code.elements.basis import BasisType, CELLS_REF_VRTS_VEC_CRDS, compute_tensor_product_values, compute_barycentric_values
+from Code.elements.quadrature import CellType, get_quadrature_rule, get_line_rule
+from Code.space.topological.polytypes import Triangle, Quadrilateral
+from Code.fem.assembly import assemble_block_matrix, assemble_block_vector
+from Code.utilities.profiling import PROFILER
+
+
+'''
+Script-specific typing setup
+'''
+
+# Scalar fields map physical points, `(..., dimensions)`, to values, `(...)`
+FieldFunctionType : TypeAlias = Callable[[NumericTensorValueType], NumericTensorValueType]
+
+# Connectivity templates of the 2D cells, whose components (edges) are their facets
+CELLS_TEMPLATES = {
+    TRIANGLE: Triangle,
+    QUADRILATERAL: Quadrilateral
+    }
+CELLS_TYPES = {
+    LINE: CellType.LINE,
+    TRIANGLE: CellType.TRIANGLE,
+    QUADRILATERAL: CellType.QUADRILATERAL
+    }
+# Vertex order of each cell's (multi)linear geometry basis: lexicographic for tensor-product cells
+CELLS_GEO_VRTS_ORDERS = {
+    LINE: (0, 1),
+    TRIANGLE: (0, 1, 2),
+    QUADRILATERAL: (0, 1, 3, 2)
+    }
+
+# Facet sides, for interior facets: 0 ("minus", whose outward normal is used) and 1 ("plus"); boundary facets only have side 0
+NUM_OF_INTR_SIDES = 2
+NUM_OF_BNDRY_SIDES = 1
+
+
+'''
+Facet tables
+'''
+
+@lru_cache(maxsize=None)
+def compute_facets_local_vertices(
+    el_kind : Tuple[NumericIntegerValueType, NumericIntegerValueType]
+    ) -> Tuple[Tuple[IndexType, ...], ...]:
+    """
+    Local vertices of every facet of a cell, in the cell's (counterclockwise) orientation.
+
+    For 2D cells they follow from the `CMPNTS_CNCTVTY` template: edge `i` connects to its (previous, next) edges, so it runs from vertex `i` (shared with the previous edge) to the vertex it shares with the next edge.
+    The facets of a line are its two vertices.
+    """
+
+    if el_kind == LINE:
+        return ((0,), (1,))
+    if el_kind not in CELLS_TEMPLATES:
+        raise ValueError(f"Facet tables are only supported for lines, triangles and quadrilaterals, not for {el_kind[0]}D elements with {el_kind[1]} nodes.")
+
+    return tuple(
+        (curr_facet_i, curr_cnctvty[1])
+        for curr_facet_i, curr_cnctvty in enumerate(CELLS_TEMPLATES[el_kind].CMPNTS_CNCTVTY)
+        )
+
+@dataclass
+class FacetTable:
+    """
+    Every facet of a mesh as `(element, local facet)` on both of its sides, plus the orientation of side 1 relative to side 0 (0 if it traverses the facet the same way, 1 if reversed).
+    Boundary facets have a single side: their side 1 element & local facet are -1.
+    """
+
+    facets_els_is : Annotated[NumericMatrixValueType, Literal["(total facets, 2)"]]
+    facets_loc_is : Annotated[NumericMatrixValueType, Literal["(total facets, 2)"]]
+    facets_ornttns : Annotated[NumericVectorValueType, Literal["(total facets,)"]]
+
+    @property
+    def num_of_facets(self) -> NumericIntegerValueType:
+        return len(self.facets_els_is)
+    @property
+    def intr_mask(self) -> Annotated[NumericVectorValueType, Literal["(total facets,)"]]:
+        return self.facets_els_is[:, 1] >= 0
+
+def compute_facet_table(
+    mesh : Mesh
+    ) -> FacetTable:
+
+    el_kind = (mesh.dimalty, mesh.els_nds_is.shape[1])
+    facets_loc_vrts_is = np.array(compute_facets_local_vertices(el_kind))
+    num_of_el_facets = len(facets_loc_vrts_is)
+
+    # Every element's facets, as global vertex tuples in the element's own orientation
+    els_facets_nds_is = mesh.els_nds_is[:, facets_loc_vrts_is].reshape(-1, facets_loc_vrts_is.shape[1])
+    els_facets_els_is = np.repeat(np.arange(mesh.num_of_els), num_of_el_facets)
+    els_facets_loc_is = np.tile(np.arange(num_of_el_facets), mesh.num_of_els)
+
+    # Matching (orientation-independent) facets are adjacent after sorting; conforming facets appear once (boundary) or twice (interior)
+    _, facets_ids = np.unique(np.sort(els_facets_nds_is, axis=1), axis=0, return_inverse=True)
+    facets_ids = facets_ids.ravel()
+    ordr = np.argsort(facets_ids, kind="stable")
+    srtd_ids = facets_ids[ordr]
+    is_first = np.empty(len(srtd_ids), dtype=bool)
+    is_first[:1] = True
+    is_first[1:] = srtd_ids[1:] != srtd_ids[:-1]
+    first_is = ordr[is_first]
+    nxt_is = np.flatnonzero(is_first) + 1
+    has_second = np.zeros(len(first_is), dtype=bool)
+    has_second[nxt_is < len(ordr)] = ~is_first[nxt_is[nxt_is < len(ordr)]]
+    second_is = np.full(len(first_is), -1)
+    second_is[has_second] = ordr[nxt_is[has_second]]
+
+    facets_els_is = np.full((len(first_is), 2), -1)
+    facets_loc_is = np.full((len(first_is), 2), -1)
+    facets_els_is[:, 0] = els_facets_els_is[first_is]
+    facets_loc_is[:, 0] = els_facets_loc_is[first_is]
+    facets_els_is[has_second, 1] = els_facets_els_is[second_is[has_second]]
+    facets_loc_is[has_second, 1] = els_facets_loc_is[second_is[has_second]]
+    # Edges are reversed when they start at different vertices; point facets have no orientation
+    facets_ornttns = np.zeros(len(first_is), dtype=np.int8)
+    if facets_loc_vrts_is.shape[1] > 1:
+        facets_ornttns[has_second] = els_facets_nds_is[first_is[has_second], 0] != els_facets_nds_is[second_is[has_second], 0]
+
+    return FacetTable(facets_els_is, facets_loc_is, facets_ornttns)
+
+
+'''
+Discontinuous spaces & batched trace evaluation
+'''
+
+class DGSpace:
+    """
+    Discontinuous (element-wise) polynomial space on a mesh of lines, quadrilaterals (tensor-product bases of any order, lexicographic) or triangles (linear).
+
+    Every element owns its `num_of_fns` variables, numbered `el·n + i`, so DG operators are naturally block sparse with element-to-element `n×n` blocks.
+    """
+
+    def __init__(
+        self,
+        mesh : Mesh,
+        ord : NumericIntegerValueType = 1,
+        basis_type : BasisType = BasisType.HIERARCHICAL
+        ):
+
+        self.mesh = mesh
+        self.ord = ord
+        self.basis_type = basis_type
+        self.el_kind = (mesh.dimalty, mesh.els_nds_is.shape[1])
+        if self.el_kind not in CELLS_TYPES:
+            raise ValueError(f"DG spaces are only supported on lines, triangles and quadrilaterals, not on {mesh.dimalty}D elements with {mesh.els_nds_is.shape[1]} nodes.")
+        if (self.el_kind == TRIANGLE) and (ord != 1):
+            raise ValueError(f"DG spaces on triangles are only supported for linear (order 1) elements, not order {ord}.")
+
+    @property
+    def dimalty(self) -> NumericIntegerValueType:
+        return self.mesh.dimalty
+    @property
+    def num_of_fns(self) -> NumericIntegerValueType:
+        return self.dimalty + 1 if self.el_kind == TRIANGLE else (self.ord + 1)**self.dimalty
+    @property
+    def num_of_vars(self) -> NumericIntegerValueType:
+        return self.mesh.num_of_els * self.num_of_fns
+
+    def evaluate_basis(
+        self,
+        ref_pnts_vec_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]],
+        ord : NumericIntegerValueType = None
+        ) -> Tuple[
+            Annotated[NumericMatrixValueType, Literal["(total points, total basis functions)"]],
+            Annotated[NumericTensorValueType, Literal["(total points, total basis functions, dimensions)"]]
+            ]:
+        """
+        Basis values & reference gradients at arbitrary reference points (order `ord`, the space's own by default).
+        Tensor-product functions are products of 1D ones, first dimension fastest; simplex functions are the barycentric coordinates.
+        """
+
+        ord = self.ord if ord is None else ord
+        if self.el_kind == TRIANGLE:
+            return compute_barycentric_values(ref_pnts_vec_crds)
+
+        return compute_tensor_product_values(ord, ref_pnts_vec_crds, self.basis_type)
+
+    def evaluate_geometry(
+        self,
+        els_is : Annotated[NumericVectorValueType, Literal["(total elements,)"]],
+        geo_vals : Annotated[NumericTensorValueType, Literal["(total elements, total points, vertices per element)"]],
+        geo_ref_grads : Annotated[NumericTensorValueType, Literal["(total elements, total points, vertices per element, dimensions)"]]
+        ) -> Tuple[
+            Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions)"]],
+            Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions, dimensions)"]]
+            ]:
+        """
+        Physical points and Jacobians `Jᵢⱼ = ∂xᵢ/∂ξⱼ` of the (multi)linear geometry map, from its basis tabulated per element and point.
+        """
+
+        els_vrts_vec_crds = self.mesh.nds_vec_crds[self.mesh.els_nds_is[els_is][:, CELLS_GEO_VRTS_ORDERS[self.el_kind]]]
+        pnts_vec_crds = geo_vals @ els_vrts_vec_crds
+        jacs = np.swapaxes(els_vrts_vec_crds, 1, 2)[:, None] @ geo_ref_grads
+
+        return pnts_vec_crds, jacs
+
+@dataclass
+class ElementValues:
+    """
+    Everything a volume kernel needs at the quadrature points of all elements at once.
+    """
+
+    # Quadrature weights times |det J|
+    wghts : Annotated[NumericMatrixValueType, Literal["(total elements, total points)"]]
+    pnts_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions)"]]
+    vals : Annotated[NumericMatrixValueType, Literal["(total points, total basis functions)"]]
+    grads : Annotated[NumericTensorValueType, Literal["(total elements, total points, total basis functions, dimensions)"]]
+
+@dataclass
+class FacetValues:
+    """
+    Everything a numerical flux needs at the quadrature points of a batch of facets at once, on each of their sides.
+
+    Points are matched across sides (side 1 traverses the facet according to its orientation), and normals point out of side 0.
+    """
+
+    # Quadrature weights times the facet's surface measure
+    wghts : Annotated[NumericMatrixValueType, Literal["(total facets, total points)"]]
+    pnts_vec_crds : Annotated[NumericTensorValueType, Literal["(total facets, total points, dimensions)"]]
+    nrmls : Annotated[NumericTensorValueType, Literal["(total facets, total points, dimensions)"]]
+    vals : Annotated[NumericTensorValueType, Literal["(total facets, sides, total points, total basis functions)"]]
+    grads : Annotated[NumericTensorValueType, Literal["(total facets, sides, total points, total basis functions, dimensions)"]]
+    # Length scale h_F = min(|K|/|F|) over the facet's sides, e.g. for interior penalties
+    scales : Annotated[NumericVectorValueType, Literal["(total facets,)"]]
+
+def compute_element_values(
+    spce : DGSpace
+    ) -> ElementValues:
+
+    # Exact for mass matrices on affine cells
+    rule = get_quadrature_rule(CELLS_TYPES[spce.el_kind], 2*spce.ord + 1)
+    vals, ref_grads = spce.evaluate_basis(rule.pnts)
+    geo_vals, geo_ref_grads = spce.evaluate_basis(rule.pnts, 1)
+
+    num_of_els = spce.mesh.num_of_els
+    pnts_vec_crds, jacs = spce.evaluate_geometry(
+        np.arange(num_of_els),
+        np.broadcast_to(geo_vals, (num_of_els,) + geo_vals.shape),
+        np.broadcast_to(geo_ref_grads, (num_of_els,) + geo_ref_grads.shape)
+        )
+    # ∂φ/∂xⱼ = Σᵢ ∂φ/∂ξᵢ·(J⁻¹)ᵢⱼ
+    grads = ref_grads @ np.linalg.inv(jacs)
+
+    return ElementValues(rule.wghts * np.abs(np.linalg.det(jacs)), pnts_vec_crds, vals, grads)
+
+def compute_facet_values(
+    spce : DGSpace,
+    table : FacetTable,
+    facets_is : Annotated[NumericVectorValueType, Literal["(total facets in batch,)"]],
+    els_vols : Annotated[NumericVectorValueType, Literal["(total elements,)"]]
+    ) -> FacetValues:
+    """
+    Tabulates the basis & geometry once per (local facet, orientation) on the reference cell, then gathers and maps them for the whole batch.
+    Interior facets get both sides; boundary facets (all of them, or none, in a batch) get side 0 only.
+    """
+
+    facets_loc_vrts_is = np.array(compute_facets_local_vertices(spce.el_kind))
+    ref_vrts_vec_crds = np.array(CELLS_REF_VRTS_VEC_CRDS[CELLS_TYPES[spce.el_kind]], dtype=float)
+    num_of_el_facets = len(facets_loc_vrts_is)
+
+    # Reference points per (local facet, orientation, point), and the reference facets' scaled outward normals N·dS_ref/ds
+    if spce.dimalty == 1:
+        facet_wghts = np.ones(1)
+        ref_pnts_vec_crds = np.broadcast_to(ref_vrts_vec_crds[facets_loc_vrts_is[:, 0]][:, None, None, :], (num_of_el_facets, 2, 1, 1))
+        ref_nrmls = ref_vrts_vec_crds[facets_loc_vrts_is[:, 0]]
+    else:
+        # Gauss points are symmetric, so a reversed facet is traversed by negating them
+        facet_pnts, facet_wghts = get_line_rule(spce.ord + 1)
+        facet_pnts = np.stack([facet_pnts, -facet_pnts])
+        strts = ref_vrts_vec_crds[facets_loc_vrts_is[:, 0]]
+        ends = ref_vrts_vec_crds[facets_loc_vrts_is[:, 1]]
+        ref_pnts_vec_crds = (
+            ((1 - facet_pnts) / 2)[None, :, :, None] * strts[:, None, None, :]
+            + ((1 + facet_pnts) / 2)[None, :, :, None] * ends[:, None, None, :]
+            )
+        # Counterclockwise cells: the outward normal is the tangent dξ/ds rotated clockwise
+        ref_tngnts = (ends - strts) / 2
+        ref_nrmls = np.stack([ref_tngnts[:, 1], -ref_tngnts[:, 0]], axis=1)
+    ref_shape = ref_pnts_vec_crds.shape[:3]
+    vals, ref_grads = spce.evaluate_basis(ref_pnts_vec_crds.reshape(-1, spce.dimalty))
+    geo_vals, geo_ref_grads = spce.evaluate_basis(ref_pnts_vec_crds.reshape(-1, spce.dimalty), 1)
+    vals = vals.reshape(ref_shape + vals.shape[1:])
+    ref_grads = ref_grads.reshape(ref_shape + ref_grads.shape[1:])
+    geo_vals = geo_vals.reshape(ref_shape + geo_vals.shape[1:])
+    geo_ref_grads = geo_ref_grads.reshape(ref_shape + geo_ref_grads.shape[1:])
+
+    facets_els_is = table.facets_els_is[facets_is]
+    facets_loc_is = table.facets_loc_is[facets_is]
+    num_of_sides = NUM_OF_INTR_SIDES if (len(facets_is) > 0) and (facets_els_is[0, 1] >= 0) else NUM_OF_BNDRY_SIDES
+    sides_vals = []
+    sides_grads = []
+    for curr_side_i in range(num_of_sides):
+        els_is = facets_els_is[:, curr_side_i]
+        locs_is = facets_loc_is[:, curr_side_i]
+        ornttns_is = table.facets_ornttns[facets_is] if curr_side_i > 0 else np.zeros(len(facets_is), dtype=np.int8)
+        pnts_vec_crds, jacs = spce.evaluate_geometry(els_is, geo_vals[locs_is, ornttns_is], geo_ref_grads[locs_is, ornttns_is])
+        inv_jacs = np.linalg.inv(jacs)
+        sides_vals.append(vals[locs_is, ornttns_is])
+        sides_grads.append(ref_grads[locs_is, ornttns_is] @ inv_jacs)
+        if curr_side_i == 0:
+            # Nanson's formula: n·dS = det(J)·J⁻ᵀ·N·dS_ref
+            scld_nrmls = np.einsum("fq,fqij,fi->fqj", np.linalg.det(jacs), inv_jacs, ref_nrmls[locs_is])
+            facets_pnts_vec_crds = pnts_vec_crds
+
+    scld_nrmls_norms = np.linalg.norm(scld_nrmls, axis=-1)
+    wghts = facet_wghts[None, :] * scld_nrmls_norms
+    facets_meas = wghts.sum(axis=1)
+    scales = (els_vols[facets_els_is[:, :num_of_sides]] / facets_meas[:, None]).min(axis=1)
+
+    return FacetValues(
+        wghts = wghts,
+        pnts_vec_crds = facets_pnts_vec_crds,
+        nrmls = scld_nrmls / scld_nrmls_norms[..., None],
+        vals = np.stack(sides_vals, axis=1),
+        grads = np.stack(sides_grads, axis=1),
+        scales = scales
+        )
+
+
+'''
+Numerical fluxes
+'''
+
+@dataclass
+class DGForm:
+    """
+    A DG discretization as three batched kernels:
+        - `vol_kernel(ElementValues)` ⟼ element matrices `(E, n, n)` & sources `(E, n)` (or None)
+        - `intr_kernel(FacetValues)` ⟼ interior facet matrices `(F, 2, 2, n, n)`, indexed `[test side, trial side]`
+        - `bndry_kernel(FacetValues)` ⟼ boundary facet matrices `(F, 1, 1, n, n)` & sources `(F, 1, n)` (or None)
+    """
+
+    vol_kernel : Callable[[ElementValues], Tuple[NumericTensorValueType, NumericMatrixValueType]]
+    intr_kernel : Callable[[FacetValues], NumericTensorValueType] = None
+    bndry_kernel : Callable[[FacetValues], Tuple[NumericTensorValueType, NumericTensorValueType]] = None
+
+def contract_traces(
+    wghts : Annotated[NumericMatrixValueType, Literal["(total facets, total points)"]],
+    tst_vals : Annotated[NumericTensorValueType, Literal["(total facets, sides, total points, total basis functions)"]],
+    trl_vals : Annotated[NumericTensorValueType, Literal["(total facets, sides, total points, total basis functions)"]]
+    ) -> Annotated[NumericTensorValueType, Literal["(total facets, sides, sides, total basis functions, total basis functions)"]]:
+    """
+    `Σ_q w_q·tst[a, q, i]·trl[b, q, j]` for every facet and pair of sides, as one batched matrix product (multi-operand `einsum` calls are not BLAS-backed).
+    """
+
+    num_of_facets, num_of_sides, num_of_pnts, num_of_fns = tst_vals.shape
+    wghtd_tst_vals = (wghts[:, None, :, None] * tst_vals).transpose(0, 1, 3, 2).reshape(num_of_facets, num_of_sides*num_of_fns, num_of_pnts)
+    result = wghtd_tst_vals @ trl_vals.transpose(0, 2, 1, 3).reshape(num_of_facets, num_of_pnts, num_of_sides*num_of_fns)
+    return result.reshape(num_of_facets, num_of_sides, num_of_fns, num_of_sides, num_of_fns).transpose(0, 1, 3, 2, 4)
+
+def compute_jump_signs(
+    num_of_sides : NumericIntegerValueType
+    ) -> Annotated[NumericVectorValueType, Literal["(sides,)"]]:
+
+    # [v] = v₀ - v₁ along the normal out of side 0
+    return np.array([1.0, -1.0])[:num_of_sides]
+
+def make_interior_penalty_form(
+    src_fn : FieldFunctionType = None,
+    bndry_fn : FieldFunctionType = None,
+    ord : NumericIntegerValueType = 1,
+    pnlty_coef : NumericDecimalValueType = 10.0
+    ) -> DGForm:
+    """
+    Symmetric interior penalty (SIPG) discretization of `-Δu = f`, with `u = g` weakly imposed on the boundary (Nitsche):
+    `∫∇u·∇v dΩ - Σ_F ∫({∇u}·n[v] + [u]{∇v}·n - σ[u][v])dS`, with averages `{·}`, jumps `[·]` and penalty `σ = C·(p+1)²/h_F` for the space's order `p`.
+    On boundary facets, averages & jumps reduce to the one-sided traces, and `g` enters as `∫g·(σv - ∇v·n)dS`.
+    """
+
+    def vol_kernel(el_vals):
+        num_of_els, _, num_of_fns, _ = el_vals.grads.shape
+        wghtd_grads = (el_vals.wghts[:, :, None, None] * el_vals.grads).transpose(0, 2, 1, 3).reshape(num_of_els, num_of_fns, -1)
+        els_op_coefs = wghtd_grads @ el_vals.grads.transpose(0, 2, 1, 3).reshape(num_of_els, num_of_fns, -1).transpose(0, 2, 1)
+        els_srcs = None
+        if src_fn is not None:
+            els_srcs = np.einsum("eq,qi,eq->ei", el_vals.wghts, el_vals.vals, src_fn(el_vals.pnts_vec_crds))
+        return els_op_coefs, els_srcs
+
+    def make_facet_coefs(facet_vals):
+        num_of_sides = facet_vals.vals.shape[1]
+        # One-sided traces are their own averages
+        avg_wght = 1 / num_of_sides
+        jump_signs = compute_jump_signs(num_of_sides)
+        pnltys = pnlty_coef * (ord + 1)**2 / facet_vals.scales
+        nrml_grads = np.einsum("fsqnd,fqd->fsqn", facet_vals.grads, facet_vals.nrmls)
+        # -{∂u/∂n}[v], then its transpose, then σ[u][v]; (test side a, trial side b)
+        cnsstncy = (-avg_wght * jump_signs)[None, :, None, None, None] * contract_traces(facet_vals.wghts, facet_vals.vals, nrml_grads)
+        pnlty = (pnltys[:, None, None] * np.outer(jump_signs, jump_signs))[..., None, None] * contract_traces(facet_vals.wghts, facet_vals.vals, facet_vals.vals)
+        return cnsstncy + cnsstncy.transpose(0, 2, 1, 4, 3) + pnlty, pnltys, nrml_grads
+
+    def intr_kernel(facet_vals):
+        return make_facet_coefs(facet_vals)[0]
+
+    def bndry_kernel(facet_vals):
+        facets_op_coefs, pnltys, nrml_grads = make_facet_coefs(facet_vals)
+        facets_srcs = None
+        if bndry_fn is not None:
+            bndry_vals = facet_vals.wghts * bndry_fn(facet_vals.pnts_vec_crds)
+            facets_srcs = np.einsum("fq,fsqi->fsi", bndry_vals, pnltys[:, None, None, None] * facet_vals.vals - nrml_grads)
+        return facets_op_coefs, facets_srcs
+
+    return DGForm(vol_kernel, intr_kernel, bndry_kernel)
+
+def make_upwind_advection_form(
+    vel_fn : Callable[[NumericTensorValueType], NumericTensorValueType],
+    src_fn : FieldFunctionType = None,
+    inflow_fn : FieldFunctionType = None,
+    rctn : NumericDecimalValueType = 0.0
+    ) -> DGForm:
+    """
+    Upwind discretization of `∇·(βu) + c·u = f`, with `u = g` on the inflow boundary (`β·n < 0`):
+    `∫(c·u·v - u·β·∇v)dΩ + Σ_F ∫(β·n)·u*·[v]dS`, where the numerical flux takes the upwind trace `u*`.
+    """
+
+    def vol_kernel(el_vals):
+        vels = vel_fn(el_vals.pnts_vec_crds)
+        els_op_coefs = rctn * np.einsum("eq,qi,qj->eij", el_vals.wghts, el_vals.vals, el_vals.vals)
+        els_op_coefs -= np.einsum("eq,eqid,eqd,qj->eij", el_vals.wghts, el_vals.grads, vels, el_vals.vals)
+        els_srcs = None
+        if src_fn is not None:
+            els_srcs = np.einsum("eq,qi,eq->ei", el_vals.wghts, el_vals.vals, src_fn(el_vals.pnts_vec_crds))
+        return els_op_coefs, els_srcs
+
+    def intr_kernel(facet_vals):
+        nrml_vels = np.einsum("fqd,fqd->fq", vel_fn(facet_vals.pnts_vec_crds), facet_vals.nrmls)
+        # Trial side 0 is upwind where β·n > 0, trial side 1 elsewhere
+        upwnd_vels = np.stack([np.maximum(nrml_vels, 0), np.minimum(nrml_vels, 0)], axis=1)
+        jump_signs = compute_jump_signs(NUM_OF_INTR_SIDES)
+        return jump_signs[None, :, None, None, None] * contract_traces(facet_vals.wghts, facet_vals.vals, upwnd_vels[..., None] * facet_vals.vals)
+
+    def bndry_kernel(facet_vals):
+        nrml_vels = np.einsum("fqd,fqd->fq", vel_fn(facet_vals.pnts_vec_crds), facet_vals.nrmls)
+        # Outflow carries the interior trace out; inflow brings g in, as sources
+        facets_op_coefs = contract_traces(facet_vals.wghts * np.maximum(nrml_vels, 0), facet_vals.vals, facet_vals.vals)
+        facets_srcs = None
+        if inflow_fn is not None:
+            facets_srcs = -np.einsum("fq,fq,fq,fsqi->fsi", facet_vals.wghts, np.minimum(nrml_vels, 0), inflow_fn(facet_vals.pnts_vec_crds), facet_vals.vals)
+        return facets_op_coefs, facets_srcs
+
+    return DGForm(vol_kernel, intr_kernel, bndry_kernel)
+
+
+'''
+DG assembly
+'''
+
+@PROFILER.instrument(cat="assembly")
+def assemble_DG(
+    spce : DGSpace,
+    form : DGForm,
+    table : FacetTable = None
+    ) -> Tuple[NumericSparseMatrixValueType, Annotated[NumericVectorValueType, Literal["(total variables,)"]]]:
+    """
+    Assembles a DG form into a block-sparse (BSR) operator of element-to-element blocks: volume kernels fill the diagonal blocks and interior fluxes the couplings between neighbors.
+    Each of the three kernels is called once, on all elements or facets of its kind.
+    """
+
+    if table is None:
+        table = compute_facet_table(spce.mesh)
+    num_of_els = spce.mesh.num_of_els
+    el_vals = compute_element_values(spce)
+    els_vols = el_vals.wghts.sum(axis=1)
+
+    # Elements, interior facets & boundary facets are scattered as "elements" of 1, 2 and 1 "nodes" (mesh elements), with a block per node pair
+    els_op_coefs, els_srcs = form.vol_kernel(el_vals)
+    els_is = np.arange(num_of_els)[:, None]
+    op_coefs = assemble_block_matrix(els_is, els_op_coefs[:, None, None], num_of_els)
+    srcs = np.zeros(spce.num_of_vars)
+    if els_srcs is not None:
+        srcs += assemble_block_vector(els_is, els_srcs[:, None], num_of_els)
+
+    intr_mask = table.intr_mask
+    if (form.intr_kernel is not None) and intr_mask.any():
+        intr_facets_is = np.flatnonzero(intr_mask)
+        facets_op_coefs = form.intr_kernel(compute_facet_values(spce, table, intr_facets_is, els_vols))
+        op_coefs = op_coefs + assemble_block_matrix(table.facets_els_is[intr_facets_is], facets_op_coefs, num_of_els)
+    if (form.bndry_kernel is not None) and (~intr_mask).any():
+        bndry_facets_is = np.flatnonzero(~intr_mask)
+        facets_op_coefs, facets_srcs = form.bndry_kernel(compute_facet_values(spce, table, bndry_facets_is, els_vols))
+        bndry_els_is = table.facets_els_is[bndry_facets_is][:, :NUM_OF_BNDRY_SIDES]
+        op_coefs = op_coefs + assemble_block_matrix(bndry_els_is, facets_op_coefs, num_of_els)
+        if facets_srcs is not None:
+            srcs += assemble_block_vector(bndry_els_is, facets_srcs, num_of_els)
+
+    return sps.bsr_array(op_coefs, blocksize=(spce.num_of_fns, spce.num_of_fns)), srcs
@@ -0,0 +1,156 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh
+
+
+'''
+Script-specific typing setup
+'''
+
+SolutionType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+ReducedSolutionType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total unconstrained variables,)"]]
+
+
+'''
+Constraint matrices
+'''
+
+def compute_constraint_matrix(
+    mesh : Mesh,
+    num_of_vars : NumericIntegerValueType = None
+    ) -> Annotated[NumericSparseMatrixValueType, Literal["(total variables, total unconstrained variables)"]]:
+    """
+    Builds the sparse constraint matrix `C` for which `u = C·ũ`, where `ũ` holds only the unconstrained variables.
+
+    Unconstrained rows of `C` are rows of the identity; the rows of a hanging node's variables hold its master weights, matched variable-by-variable (the k-th variable of a hanging node follows the k-th variables of its masters).
+    Masters that are themselves hanging are resolved by repeated substitution, so `C` never refers to a constrained variable.
+    `num_of_vars` may exceed the mesh's own variables (e.g. with the higher-order modes of `mesh/adaptivity.py`'s hierarchical spaces), the extra ones being unconstrained.
+    """
+
+    num_of_vars = mesh.num_of_vars if num_of_vars is None else num_of_vars
+    num_of_vars_per_nd = mesh.nds_vars_is.shape[1]
+
+    hngng_vars_is = mesh.nds_vars_is[mesh.hngng_nds_is].ravel()
+    cnstrnd_vars_mask = np.zeros(num_of_vars, dtype=bool)
+    cnstrnd_vars_mask[hngng_vars_is] = True
+    free_vars_is = np.flatnonzero(~cnstrnd_vars_mask)
+
+    # Variable-level constraints: (hanging node, master, variable) ⟼ (row, column, weight)
+    num_of_mstrs = mesh.hngng_nds_mstrs_is.shape[1]
+    rows_is = np.repeat(mesh.nds_vars_is[mesh.hngng_nds_is], num_of_mstrs, axis=0).ravel()
+    cols_is = mesh.nds_vars_is[mesh.hngng_nds_mstrs_is.ravel()].ravel()
+    wghts = np.repeat(mesh.hngng_nds_wghts.ravel(), num_of_vars_per_nd)
+
+    # Full-size substitution operator T (u = T·u), identity on unconstrained variables
+    subst = sps.csr_array(
+        (
+            np.concatenate([np.ones(len(free_vars_is)), wghts]),
+            (np.concatenate([free_vars_is, rows_is]), np.concatenate([free_vars_is, cols_is]))
+            ),
+        shape = (num_of_vars, num_of_vars)
+        )
+    # Chained hanging nodes: T ⟵ T·T until no column refers to a constrained variable
+    while np.any(cnstrnd_vars_mask[subst.indices]):
+        subst = subst @ subst
+        subst.eliminate_zeros()
+
+    return sps.csr_array(subst[:, free_vars_is])
+
+
+class HangingNodeConstraints:
+    """
+    Eliminates hanging-node variables from assembled systems: `K·u = f` becomes `(Cᵀ·K·C)·ũ = Cᵀ·f`, and the full solution is recovered as `u = C·ũ`.
+
+    Both products are sparse-sparse, so no dense intermediate is ever formed.
+    The constraint matrix is cached against the mesh's identity and version, and only rebuilt after the mesh has been refined (or replaced).
+    """
+
+    def __init__(self):
+
+        self.mesh = None
+        self.vrsn = None
+        self.cnstrnt_mtrx = None
+        self.free_vars_is = None
+        self.num_of_blds = 0
+
+    def is_current(
+        self,
+        mesh : Mesh,
+        num_of_vars : NumericIntegerValueType = None
+        ) -> bool:
+
+        num_of_vars = mesh.num_of_vars if num_of_vars is None else num_of_vars
+        return (self.cnstrnt_mtrx is not None) and (mesh is self.mesh) and (mesh.vrsn == self.vrsn) and (self.cnstrnt_mtrx.shape[0] == num_of_vars)
+
+    def get_constraint_matrix(
+        self,
+        mesh : Mesh,
+        num_of_vars : NumericIntegerValueType = None
+        ) -> NumericSparseMatrixValueType:
+
+        num_of_vars = mesh.num_of_vars if num_of_vars is None else num_of_vars
+        if self.is_current(mesh, num_of_vars):
+            return self.cnstrnt_mtrx
+
+        cnstrnt_mtrx = compute_constraint_matrix(mesh, num_of_vars)
+        cnstrnd_vars_mask = np.zeros(num_of_vars, dtype=bool)
+        cnstrnd_vars_mask[mesh.nds_vars_is[mesh.hngng_nds_is].ravel()] = True
+
+        self.mesh = mesh
+        self.vrsn = mesh.vrsn
+        self.cnstrnt_mtrx = cnstrnt_mtrx
+        self.free_vars_is = np.flatnonzero(~cnstrnd_vars_mask)
+        self.num_of_blds += 1
+
+        return cnstrnt_mtrx
+
+    def condense(
+        self,
+        mesh : Mesh,
+        op_coefs : NumericSparseMatrixValueType,
+        srcs : SolutionType = None
+        ) -> Tuple[NumericSparseMatrixValueType, ReducedSolutionType]:
+
+        cnstrnt_mtrx = self.get_constraint_matrix(mesh, op_coefs.shape[0])
+        # Conforming meshes need no elimination
+        if len(mesh.hngng_nds_is) == 0:
+            return op_coefs, srcs
+
+        op_coefs = sps.csr_array(cnstrnt_mtrx.T @ sps.csr_array(op_coefs) @ cnstrnt_mtrx)
+        if srcs is not None:
+            srcs = cnstrnt_mtrx.T @ np.asarray(srcs)
+
+        return op_coefs, srcs
+
+    def expand(
+        self,
+        mesh : Mesh,
+        rdcd_soln : ReducedSolutionType
+        ) -> SolutionType:
+
+        if len(mesh.hngng_nds_is) == 0:
+            return rdcd_soln
+        cnstrnt_mtrx = self.get_constraint_matrix(mesh, len(rdcd_soln) + mesh.nds_vars_is[mesh.hngng_nds_is].size)
+
+        return cnstrnt_mtrx @ rdcd_soln
+
+    def reduce_indices(
+        self,
+        mesh : Mesh,
+        vars_is : Annotated[NumericVectorValueType, Literal["(total variables to map,)"]],
+        num_of_vars : NumericIntegerValueType = None
+        ) -> Annotated[NumericVectorValueType, Literal["(total unconstrained variables to map,)"]]:
+        """
+        Maps (e.g. Dirichlet) variable indices into the reduced numbering, dropping any that are constrained.
+        Constrained variables on a fixed boundary follow their fixed masters, so dropping them loses nothing.
+        """
+
+        self.get_constraint_matrix(mesh, num_of_vars)
+        vars_is = np.asarray(vars_is)
+
+        rdcd_vars_is = np.searchsorted(self.free_vars_is, vars_is)
+        rdcd_vars_is = np.minimum(rdcd_vars_is, len(self.free_vars_is) - 1)
+        return rdcd_vars_is[self.free_vars_is[rdcd_vars_is] == vars_is]
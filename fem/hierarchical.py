@@ -0,0 +1,145 @@
+# Libraries
+import numpy as np
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh
+from Code.mesh.adaptivity import HierarchicalVariables, compute_hierarchical_variables
+from Code.elements.basis import compute_tensor_product_values, compute_geometric_factors
+from Code.elements.quadrature import get_line_rule, compute_tensor_rule
+from Code.fem.assembly import assemble_matrix, assemble_vector
+from Code.fem.facets import CELLS_GEO_VRTS_ORDERS
+from Code.utilities.profiling import PROFILER
+
+
+'''
+Script-specific typing setup
+'''
+
+SolutionType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+# Scalar fields map physical points, `(total points, dimensions)`, to values, `(total points,)`
+FieldFunctionType : TypeAlias = Callable[[Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]], NumericVectorValueType]
+
+
+'''
+Order-aware element tables
+'''
+
+def compute_order_tables(
+    mesh : Mesh,
+    els_is : Annotated[NumericVectorValueType, Literal["(total elements of the order,)"]],
+    ord : NumericIntegerValueType,
+    num_of_pnts : NumericIntegerValueType = None
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total points, (order+1)^dimensions)"]],
+        Annotated[NumericTensorValueType, Literal["(total points, (order+1)^dimensions, dimensions)"]],
+        Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions)"]],
+        Annotated[NumericMatrixValueType, Literal["(total elements, total points)"]],
+        Annotated[NumericTensorValueType, Literal["(total elements, total points, dimensions, dimensions)"]]
+        ]:
+    """
+    Hierarchical basis tables, physical points and geometric factors of a group of same-order elements, on a tensor Gauss rule (`order+2` points per direction by default, exact for mass matrices on affine cells).
+    """
+
+    el_kind = (mesh.dimalty, mesh.els_nds_is.shape[1])
+    num_of_pnts = ord + 2 if num_of_pnts is None else num_of_pnts
+    pnts, wghts = get_line_rule(num_of_pnts)
+    tnsr_pnts, _ = compute_tensor_rule(pnts, wghts, mesh.dimalty)
+
+    vals, ref_grads = compute_tensor_product_values(ord, tnsr_pnts)
+    els_vrts_vec_crds = mesh.nds_vec_crds[mesh.els_nds_is[els_is][:, CELLS_GEO_VRTS_ORDERS[el_kind]]]
+    geo_vals, _ = compute_tensor_product_values(1, tnsr_pnts)
+    els_pnts_vec_crds = np.einsum("qv,evd->eqd", geo_vals, els_vrts_vec_crds)
+    wghtd_dets, stiff_fctrs = compute_geometric_factors(els_vrts_vec_crds, pnts, wghts)
+
+    return vals, ref_grads, els_pnts_vec_crds, wghtd_dets, stiff_fctrs
+
+
+'''
+Assembly
+'''
+
+@PROFILER.instrument(cat="assembly")
+def assemble_hierarchical(
+    mesh : Mesh,
+    src_fn : FieldFunctionType = None,
+    rctn : NumericDecimalValueType = 0.0,
+    vars : HierarchicalVariables = None
+    ) -> Tuple[NumericSparseMatrixValueType, Annotated[NumericVectorValueType, Literal["(total variables,)"]]]:
+    """
+    Assembles `∫(∇u·∇v + rctn·u·v)dΩ` (and `∫f·v dΩ`) in the hierarchical space of the mesh's per-element orders, one batched kernel per order.
+
+    Variables follow `compute_hierarchical_variables()`: vertex modes are the mesh's own variables, so hanging-node constraints apply as usual (see `HangingNodeConstraints`, which leaves the higher-order modes unconstrained).
+    """
+
+    vars = compute_hierarchical_variables(mesh) if vars is None else vars
+
+    op_coefs = 0
+    srcs = np.zeros(vars.num_of_vars)
+    for curr_ord, curr_els_is in vars.ords_els_is.items():
+        vals, ref_grads, els_pnts_vec_crds, wghtd_dets, stiff_fctrs = compute_order_tables(mesh, curr_els_is, curr_ord)
+        curr_els_sgns = vars.ords_els_sgns[curr_ord]
+        sgns_outers = curr_els_sgns[:, :, None] * curr_els_sgns[:, None, :]
+
+        els_op_coefs = np.einsum("qid,eqdk,qjk->eij", ref_grads, stiff_fctrs, ref_grads, optimize=True)
+        if rctn:
+            els_op_coefs = els_op_coefs + rctn * np.einsum("qi,eq,qj->eij", vals, wghtd_dets, vals, optimize=True)
+        op_coefs = op_coefs + assemble_matrix(vars.ords_els_vars_is[curr_ord], sgns_outers * els_op_coefs, vars.num_of_vars)
+
+        if src_fn is not None:
+            pnts_srcs = src_fn(els_pnts_vec_crds.reshape(-1, mesh.dimalty)).reshape(wghtd_dets.shape)
+            els_srcs = (wghtd_dets * pnts_srcs) @ vals
+            srcs += assemble_vector(vars.ords_els_vars_is[curr_ord], curr_els_sgns * els_srcs, vars.num_of_vars)
+
+    return op_coefs.tocsr(), srcs
+
+
+'''
+Post-processing
+'''
+
+def evaluate_hierarchical(
+    mesh : Mesh,
+    soln : SolutionType,
+    els_is : Annotated[NumericVectorValueType, Literal["(total points,)"]],
+    ref_pnts_vec_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]],
+    vars : HierarchicalVariables = None
+    ) -> Annotated[NumericVectorValueType, Literal["(total points,)"]]:
+    """
+    Values of a hierarchical solution at reference points of the given elements (one point per entry).
+    """
+
+    vars = compute_hierarchical_variables(mesh) if vars is None else vars
+    els_is = np.asarray(els_is)
+
+    result = np.zeros(len(els_is))
+    for curr_ord, curr_ord_els_is in vars.ords_els_is.items():
+        curr_mask = np.isin(els_is, curr_ord_els_is)
+        if not np.any(curr_mask):
+            continue
+        curr_rows_is = np.searchsorted(curr_ord_els_is, els_is[curr_mask])
+        vals, _ = compute_tensor_product_values(curr_ord, ref_pnts_vec_crds[curr_mask])
+        curr_coefs = vars.ords_els_sgns[curr_ord][curr_rows_is] * soln[vars.ords_els_vars_is[curr_ord][curr_rows_is]]
+        result[curr_mask] = np.sum(vals * curr_coefs, axis=1)
+
+    return result
+
+def compute_elements_L2_errors(
+    mesh : Mesh,
+    soln : SolutionType,
+    exact_fn : FieldFunctionType,
+    vars : HierarchicalVariables = None
+    ) -> Annotated[NumericVectorValueType, Literal["(total elements,)"]]:
+    """
+    Element L² errors `‖u - u_h‖_K` of a hierarchical solution, on a Gauss rule two points richer than assembly's; a natural `estimate_fn` for `adapt()` when the exact solution is known.
+    """
+
+    vars = compute_hierarchical_variables(mesh) if vars is None else vars
+
+    result = np.zeros(mesh.num_of_els)
+    for curr_ord, curr_els_is in vars.ords_els_is.items():
+        vals, _, els_pnts_vec_crds, wghtd_dets, _ = compute_order_tables(mesh, curr_els_is, curr_ord, curr_ord + 4)
+        curr_coefs = vars.ords_els_sgns[curr_ord] * soln[vars.ords_els_vars_is[curr_ord]]
+        diffs = exact_fn(els_pnts_vec_crds.reshape(-1, mesh.dimalty)).reshape(wghtd_dets.shape) - curr_coefs @ vals.T
+        result[curr_els_is] = np.sqrt(np.sum(wghtd_dets * diffs**2, axis=1))
+
+    return result
@@ -0,0 +1,415 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spsla
+from dataclasses import dataclass, field
+from enum import Enum
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh
+from Code.mesh.adaptivity import encode_edges
+from Code.elements.basis import TensorProductBasis, BasisType
+from Code.elements.quadrature import get_line_rule
+from Code.fem.assembly import assemble_matrix, assemble_block_matrix, assemble_block_vector
+from Code.fem.multigrid import MultigridSolver
+from Code.fem.solve import FactorizationCache, FactorizationMethod
+from Code.utilities.profiling import PROFILER
+
+
+'''
+Script-specific typing setup
+'''
+
+# Body forces map physical points, `(..., dimensions)`, to force vectors, `(..., dimensions)`
+ForceFunctionType : TypeAlias = Callable[[NumericTensorValueType], NumericTensorValueType]
+
+class BlockPreconditionerType(Enum):
+    # diag(Â, Ŝ): symmetric positive definite, as MINRES requires
+    BLOCK_DIAGONAL = "Block-diagonal"
+    # [[Â, Bᵀ], [0, -Ŝ]]: fewer iterations, but needs a nonsymmetric Krylov method (GMRES)
+    BLOCK_TRIANGULAR = "Block-triangular"
+
+class KrylovMethod(Enum):
+    MINRES = "MINRES"
+    GMRES = "GMRES"
+
+class SchurApproximationType(Enum):
+    # Ŝ = Mp/ν, factored once
+    PRESSURE_MASS = "Pressure mass"
+    # Ŝ = diag(Mp)/ν, spectrally equivalent to Mp for (bi/tri)linear pressures, and free to apply
+    DIAGONAL_PRESSURE_MASS = "Diagonal pressure mass"
+
+# Krylov vectors kept by GMRES between restarts; block-triangular preconditioning rarely needs more than a few dozen iterations
+GMRES_RESTART = 100
+
+# VTK (counterclockwise) ⟼ lexicographic (first dimension fastest) quadrilateral vertex order
+QUADRILATERAL_LEXICOGRAPHIC_ORDER = (0, 1, 3, 2)
+# Quadrilateral edges, as VTK vertex pairs, i.e. (bottom, right, top, left)
+QUADRILATERAL_EDGES = ((0, 1), (1, 2), (2, 3), (3, 0))
+
+
+'''
+Taylor–Hood (Q2/Q1) spaces
+'''
+
+@dataclass
+class TaylorHoodSpaces:
+    """
+    Inf-sup (LBB) stable velocity/pressure pair on a quadrilateral mesh: continuous biquadratic (Q2) velocities and continuous bilinear (Q1) pressures.
+
+    Velocity nodes are the mesh nodes, followed by one node per edge (at its midpoint) and one per element (at its center), so pressure node `i` is velocity node `i`.
+    Both connectivities are lexicographic (first dimension fastest), matching `TensorProductBasis` with GLL nodal functions; velocity variables are node-major, `nd·d + c`.
+    """
+
+    vel_nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total velocity nodes, dimensions)"]]
+    vel_els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, 9)"]]
+    prs_els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, 4)"]]
+    num_of_prs_nds : NumericIntegerValueType
+
+    @property
+    def dimalty(self) -> NumericIntegerValueType:
+        return self.vel_nds_vec_crds.shape[1]
+    @property
+    def num_of_vel_nds(self) -> NumericIntegerValueType:
+        return len(self.vel_nds_vec_crds)
+    @property
+    def num_of_vel_vars(self) -> NumericIntegerValueType:
+        return self.num_of_vel_nds * self.dimalty
+
+def create_Taylor_Hood_spaces(
+    mesh : Mesh
+    ) -> TaylorHoodSpaces:
+
+    if (mesh.dimalty != 2) or (mesh.els_nds_is.shape[1] != 4):
+        raise ValueError(f"Taylor–Hood spaces are only supported on quadrilateral meshes, not on {mesh.dimalty}D elements with {mesh.els_nds_is.shape[1]} nodes.")
+
+    els_nds_is = mesh.els_nds_is
+    num_of_els = mesh.num_of_els
+    num_of_nds = mesh.num_of_nds
+
+    # One midpoint node per unique edge
+    els_edges_nds_is = els_nds_is[:, np.array(QUADRILATERAL_EDGES)].reshape(-1, 2)
+    _, first_is, edges_is = np.unique(encode_edges(els_edges_nds_is, num_of_nds), return_index=True, return_inverse=True)
+    edges_vec_crds = mesh.nds_vec_crds[els_edges_nds_is[first_is]].mean(axis=1)
+    els_edges_nds_is = num_of_nds + edges_is.reshape(num_of_els, len(QUADRILATERAL_EDGES))
+    # One center node per element; midpoints & centers lie on the bilinear geometry map
+    ctrs_vec_crds = mesh.nds_vec_crds[els_nds_is].mean(axis=1)
+    els_ctrs_nds_is = num_of_nds + len(first_is) + np.arange(num_of_els)
+
+    vrts_is = els_nds_is
+    edges_is = els_edges_nds_is
+    vel_els_nds_is = np.stack([
+        vrts_is[:, 0], edges_is[:, 0], vrts_is[:, 1],
+        edges_is[:, 3], els_ctrs_nds_is, edges_is[:, 1],
+        vrts_is[:, 3], edges_is[:, 2], vrts_is[:, 2]
+        ], axis=1)
+
+    return TaylorHoodSpaces(
+        vel_nds_vec_crds = np.concatenate([mesh.nds_vec_crds, edges_vec_crds, ctrs_vec_crds]),
+        vel_els_nds_is = vel_els_nds_is,
+        prs_els_nds_is = els_nds_is[:, QUADRILATERAL_LEXICOGRAPHIC_ORDER],
+        num_of_prs_nds = num_of_nds
+        )
+
+
+'''
+Saddle-point (Stokes) assembly
+'''
+
+@dataclass
+class SaddlePointSystem:
+    """
+    Blocks of the saddle-point system `[[A, Bᵀ], [B, 0]]·[u; p] = [f; g]`, along with the pressure mass matrix `Mp` its preconditioners approximate the Schur complement `B·A⁻¹·Bᵀ` with.
+    """
+
+    vel_op_coefs : Annotated[NumericSparseMatrixValueType, Literal["(total velocity variables, total velocity variables)"]]
+    div_coefs : Annotated[NumericSparseMatrixValueType, Literal["(total pressure variables, total velocity variables)"]]
+    prs_mass_coefs : Annotated[NumericSparseMatrixValueType, Literal["(total pressure variables, total pressure variables)"]]
+    vel_srcs : Annotated[NumericVectorValueType, Literal["(total velocity variables,)"]]
+    prs_srcs : Annotated[NumericVectorValueType, Literal["(total pressure variables,)"]]
+
+@PROFILER.instrument(cat="assembly")
+def assemble_Stokes(
+    spcs : TaylorHoodSpaces,
+    visc : NumericDecimalValueType = 1.0,
+    frc_fn : ForceFunctionType = None
+    ) -> SaddlePointSystem:
+    """
+    Assembles the Stokes problem `-ν·Δu + ∇p = f`, `∇·u = 0` on Taylor–Hood spaces, with all elements batched: `A = ν∫∇u:∇v`, `B = -∫q·∇·v` and `Mp = ∫p·q`.
+    """
+
+    dimalty = spcs.dimalty
+    # 3 Gauss points per direction integrate the (affine-geometry) Q2 stiffness & Q2·Q1 divergence exactly
+    pnts, wghts = get_line_rule(3)
+    vel_basis = TensorProductBasis(2, dimalty, pnts, BasisType.GLL_NODAL)
+    prs_basis = TensorProductBasis(1, dimalty, pnts, BasisType.GLL_NODAL)
+
+    # Reference tables, by interpolating every basis function's unit coefficients
+    vel_vals = vel_basis.interpolate(np.eye(vel_basis.num_of_fns)).T
+    vel_ref_grads = vel_basis.interpolate_gradients(np.eye(vel_basis.num_of_fns))
+    prs_vals = prs_basis.interpolate(np.eye(prs_basis.num_of_fns)).T
+
+    # Bilinear geometry from the pressure (vertex) nodes; Jᵢⱼ = ∂xᵢ/∂ξⱼ
+    els_vrts_vec_crds = spcs.vel_nds_vec_crds[spcs.prs_els_nds_is]
+    jacs = np.stack([
+        prs_basis.interpolate_gradients(els_vrts_vec_crds[:, :, curr_dim_i])
+        for curr_dim_i in range(dimalty)
+        ], axis=-2)
+    wghtd_dets = np.linalg.det(jacs) * np.outer(wghts, wghts).ravel()[None, :]
+    # ∂φ/∂xⱼ = Σᵢ ∂φ/∂ξᵢ·(J⁻¹)ᵢⱼ
+    vel_grads = np.einsum("iqc,eqcd->eqid", vel_ref_grads, np.linalg.inv(jacs))
+
+    els_vel_op_coefs = visc * np.einsum("eq,eqid,eqjd->eij", wghtd_dets, vel_grads, vel_grads)
+    els_div_coefs = -np.einsum("eq,qk,eqic->ekic", wghtd_dets, prs_vals, vel_grads)
+    els_prs_mass_coefs = np.einsum("eq,qk,ql->ekl", wghtd_dets, prs_vals, prs_vals)
+
+    vel_op_coefs = assemble_block_matrix(spcs.vel_els_nds_is, els_vel_op_coefs[..., None, None] * np.eye(dimalty), spcs.num_of_vel_nds)
+    prs_mass_coefs = assemble_matrix(spcs.prs_els_nds_is, els_prs_mass_coefs, spcs.num_of_prs_nds)
+    # Rectangular, so scattered directly rather than through `assemble_matrix()`
+    els_vel_vars_is = spcs.vel_els_nds_is[:, :, None] * dimalty + np.arange(dimalty)
+    div_coefs = sps.csr_array(
+        (
+            els_div_coefs.ravel(),
+            (
+                np.broadcast_to(spcs.prs_els_nds_is[:, :, None, None], els_div_coefs.shape).ravel(),
+                np.broadcast_to(els_vel_vars_is[:, None, :, :], els_div_coefs.shape).ravel()
+                )
+            ),
+        shape = (spcs.num_of_prs_nds, spcs.num_of_vel_vars)
+        )
+    div_coefs.sum_duplicates()
+
+    vel_srcs = np.zeros(spcs.num_of_vel_vars)
+    if frc_fn is not None:
+        els_pnts_vec_crds = np.stack([
+            prs_basis.interpolate(els_vrts_vec_crds[:, :, curr_dim_i])
+            for curr_dim_i in range(dimalty)
+            ], axis=-1)
+        els_srcs = np.einsum("eq,qi,eqc->eic", wghtd_dets, vel_vals, frc_fn(els_pnts_vec_crds))
+        vel_srcs = assemble_block_vector(spcs.vel_els_nds_is, els_srcs, spcs.num_of_vel_nds)
+
+    return SaddlePointSystem(vel_op_coefs, div_coefs, prs_mass_coefs, vel_srcs, np.zeros(spcs.num_of_prs_nds))
+
+def constrain_velocity(
+    sys : SaddlePointSystem,
+    fxd_vars_is : Annotated[NumericVectorValueType, Literal["(total fixed velocity variables,)"]],
+    fxd_vals : Annotated[NumericVectorValueType, Literal["(total fixed velocity variables,)"]]
+    ) -> Tuple[SaddlePointSystem, Annotated[NumericVectorValueType, Literal["(total free velocity variables,)"]]]:
+    """
+    Eliminates prescribed (Dirichlet) velocity variables, moving their contributions to the sources; returns the reduced system and the indices of the remaining (free) velocity variables.
+    """
+
+    num_of_vel_vars = sys.vel_op_coefs.shape[0]
+    free_mask = np.ones(num_of_vel_vars, dtype=bool)
+    free_mask[fxd_vars_is] = False
+    free_vars_is = np.flatnonzero(free_mask)
+    fxd_soln = np.zeros(num_of_vel_vars)
+    fxd_soln[fxd_vars_is] = fxd_vals
+
+    vel_op_coefs = sps.csr_array(sys.vel_op_coefs)
+    div_coefs = sps.csr_array(sys.div_coefs)
+    reduced_sys = SaddlePointSystem(
+        vel_op_coefs = vel_op_coefs[free_vars_is][:, free_vars_is],
+        div_coefs = div_coefs[:, free_vars_is],
+        prs_mass_coefs = sys.prs_mass_coefs,
+        vel_srcs = (sys.vel_srcs - vel_op_coefs @ fxd_soln)[free_vars_is],
+        prs_srcs = sys.prs_srcs - div_coefs @ fxd_soln
+        )
+
+    return reduced_sys, free_vars_is
+
+
+'''
+Block-preconditioned Krylov solver
+'''
+
+@dataclass
+class SaddlePointInfo:
+
+    cnvrgd : bool = False
+    num_of_itrs : NumericIntegerValueType = 0
+    # Relative residual norms as monitored by the Krylov method: of the residual for MINRES, of the preconditioned residual for GMRES
+    resid_norms : List[NumericDecimalValueType] = field(default_factory=list)
+
+class SaddlePointSolver:
+    """
+    Iterative solver for the (symmetric indefinite) saddle-point systems of mixed formulations, `[[A, Bᵀ], [B, 0]]`, which avoids factoring the whole indefinite operator.
+
+    It is preconditioned blockwise, with `Â ≈ A` (one multigrid V-cycle by default, or a cached sparse factorization) and a Schur complement approximation `Ŝ ≈ B·A⁻¹·Bᵀ` from the pressure mass matrix, `Ŝ = Mp/ν`.
+    For inf-sup stable pairs both are spectrally equivalent to their targets independently of the mesh size, so iteration counts stay bounded under refinement.
+    With `fltng_prs` (e.g. velocities prescribed on the whole boundary), the pressure is only defined up to a constant: the pressure sources are made consistent and the returned pressure has zero mean.
+    """
+
+    def __init__(
+        self,
+        vel_op_coefs : NumericSparseMatrixValueType,
+        div_coefs : NumericSparseMatrixValueType,
+        prs_mass_coefs : NumericSparseMatrixValueType,
+        visc : NumericDecimalValueType = 1.0,
+        prcndtnr_type : BlockPreconditionerType = BlockPreconditionerType.BLOCK_DIAGONAL,
+        krylov_mthd : KrylovMethod = None,
+        schur_aprxmtn : SchurApproximationType = SchurApproximationType.PRESSURE_MASS,
+        vel_mthd : FactorizationMethod = FactorizationMethod.MULTIGRID,
+        fltng_prs : bool = False
+        ):
+
+        # Default: the cheapest method the preconditioner allows
+        if krylov_mthd is None:
+            krylov_mthd = KrylovMethod.MINRES if prcndtnr_type == BlockPreconditionerType.BLOCK_DIAGONAL else KrylovMethod.GMRES
+        if (krylov_mthd == KrylovMethod.MINRES) and (prcndtnr_type != BlockPreconditionerType.BLOCK_DIAGONAL):
+            raise ValueError(f"MINRES requires a symmetric positive definite preconditioner, which {prcndtnr_type.value} preconditioners are not; use GMRES instead.")
+
+        self.vel_op_coefs = sps.csr_array(vel_op_coefs)
+        self.div_coefs = sps.csr_array(div_coefs)
+        self.div_coefs_T = sps.csr_array(self.div_coefs.T)
+        self.prs_mass_coefs = sps.csr_array(prs_mass_coefs)
+        self.visc = visc
+        self.prcndtnr_type = prcndtnr_type
+        self.krylov_mthd = krylov_mthd
+        self.fltng_prs = fltng_prs
+        self.num_of_vel_vars = self.vel_op_coefs.shape[0]
+        self.num_of_prs_vars = self.div_coefs.shape[0]
+
+        self.op_coefs = sps.block_array([[self.vel_op_coefs, self.div_coefs_T], [self.div_coefs, None]], format="csr")
+
+        # Â⁻¹: a V-cycle from a zero initial guess is a fixed SPD operator, as MINRES requires
+        match vel_mthd:
+            case FactorizationMethod.MULTIGRID:
+                self.vel_slvr = MultigridSolver(self.vel_op_coefs).vcycle
+            case _:
+                self.vel_slvr = FactorizationCache(vel_mthd).factorize(self.vel_op_coefs)
+        # Ŝ⁻¹ = ν·Mp⁻¹
+        match schur_aprxmtn:
+            case SchurApproximationType.PRESSURE_MASS:
+                prs_mass_fctrztn = FactorizationCache().factorize(self.prs_mass_coefs)
+                self.schur_slvr = lambda prs_resid: visc * prs_mass_fctrztn(prs_resid)
+            case SchurApproximationType.DIAGONAL_PRESSURE_MASS:
+                prs_mass_diag_inv = 1 / self.prs_mass_coefs.diagonal()
+                self.schur_slvr = lambda prs_resid: visc * prs_mass_diag_inv * prs_resid
+            case _:
+                raise ValueError(f"Unsupported Schur complement approximation {schur_aprxmtn}.")
+
+    def apply_preconditioner(
+        self,
+        resid : Annotated[NumericVectorValueType, Literal["(total velocity variables + total pressure variables,)"]]
+        ) -> Annotated[NumericVectorValueType, Literal["(total velocity variables + total pressure variables,)"]]:
+
+        vel_resid = resid[:self.num_of_vel_vars]
+        prs_resid = resid[self.num_of_vel_vars:]
+        match self.prcndtnr_type:
+            case BlockPreconditionerType.BLOCK_DIAGONAL:
+                prs_crrctn = self.schur_slvr(prs_resid)
+                vel_crrctn = self.vel_slvr(vel_resid)
+            case BlockPreconditionerType.BLOCK_TRIANGULAR:
+                # Back substitution through [[Â, Bᵀ], [0, -Ŝ]]
+                prs_crrctn = -self.schur_slvr(prs_resid)
+                vel_crrctn = self.vel_slvr(vel_resid - self.div_coefs_T @ prs_crrctn)
+            case _:
+                raise ValueError(f"Unsupported block preconditioner {self.prcndtnr_type}.")
+
+        return np.concatenate([vel_crrctn, prs_crrctn])
+
+    def as_preconditioner(self) -> spsla.LinearOperator:
+
+        return spsla.LinearOperator(self.op_coefs.shape, matvec=self.apply_preconditioner, dtype=float)
+
+    @PROFILER.instrument(cat="solve")
+    def solve(
+        self,
+        vel_srcs : Annotated[NumericVectorValueType, Literal["(total velocity variables,)"]],
+        prs_srcs : Annotated[NumericVectorValueType, Literal["(total pressure variables,)"]] = None,
+        rtol : NumericDecimalValueType = 1e-8,
+        max_num_of_itrs : NumericIntegerValueType = 500
+        ) -> Tuple[
+            Annotated[NumericVectorValueType, Literal["(total velocity variables,)"]],
+            Annotated[NumericVectorValueType, Literal["(total pressure variables,)"]],
+            SaddlePointInfo
+            ]:
+
+        if prs_srcs is None:
+            prs_srcs = np.zeros(self.num_of_prs_vars)
+        if self.fltng_prs:
+            # Constant pressures span the kernel of Bᵀ, to which the range of B is orthogonal
+            prs_srcs = prs_srcs - prs_srcs.mean()
+        srcs = np.concatenate([vel_srcs, prs_srcs])
+        srcs_norm = np.linalg.norm(srcs)
+
+        info = SaddlePointInfo()
+        match self.krylov_mthd:
+            case KrylovMethod.MINRES:
+                def record(soln):
+                    info.num_of_itrs += 1
+                    info.resid_norms.append(np.linalg.norm(srcs - self.op_coefs @ soln) / srcs_norm)
+                    PROFILER.record("saddle_point/resid_norm", info.resid_norms[-1])
+                    PROFILER.count("saddle_point/itrs")
+                soln, exit_code = spsla.minres(
+                    self.op_coefs,
+                    srcs,
+                    rtol = rtol,
+                    maxiter = max_num_of_itrs,
+                    M = self.as_preconditioner(),
+                    callback = record
+                    )
+            case KrylovMethod.GMRES:
+                def record(rel_resid_norm):
+                    info.num_of_itrs += 1
+                    info.resid_norms.append(rel_resid_norm)
+                    PROFILER.record("saddle_point/resid_norm", rel_resid_norm)
+                    PROFILER.count("saddle_point/itrs")
+                # SciPy stops a restart cycle on the preconditioned residual, and only checks the true one at its end
+                soln, exit_code = spsla.gmres(
+                    self.op_coefs,
+                    srcs,
+                    rtol = rtol,
+                    restart = min(GMRES_RESTART, max_num_of_itrs),
+                    maxiter = -(-max_num_of_itrs // GMRES_RESTART),
+                    M = self.as_preconditioner(),
+                    callback = record,
+                    callback_type = "pr_norm"
+                    )
+            case _:
+                raise ValueError(f"Unsupported Krylov method {self.krylov_mthd}.")
+        info.cnvrgd = (exit_code == 0)
+
+        vel_soln = soln[:self.num_of_vel_vars]
+        prs_soln = soln[self.num_of_vel_vars:]
+        if self.fltng_prs:
+            # Zero mean pressure, ∫p = 0
+            prs_mass_totals = self.prs_mass_coefs.sum(axis=0)
+            prs_soln = prs_soln - (prs_mass_totals @ prs_soln) / prs_mass_totals.sum()
+
+        return vel_soln, prs_soln, info
+
+def solve_Stokes(
+    spcs : TaylorHoodSpaces,
+    sys : SaddlePointSystem,
+    fxd_vars_is : Annotated[NumericVectorValueType, Literal["(total fixed velocity variables,)"]],
+    fxd_vals : Annotated[NumericVectorValueType, Literal["(total fixed velocity variables,)"]],
+    visc : NumericDecimalValueType = 1.0,
+    rtol : NumericDecimalValueType = 1e-8,
+    **slvr_kwargs
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total velocity nodes, dimensions)"]],
+        Annotated[NumericVectorValueType, Literal["(total pressure nodes,)"]],
+        SaddlePointInfo
+        ]:
+    """
+    Solves an assembled Stokes system with prescribed velocities; `slvr_kwargs` are passed on to `SaddlePointSolver`.
+    Pass `fltng_prs=True` when velocities are prescribed on the whole boundary, since the pressure is then only defined up to a constant.
+    """
+
+    reduced_sys, free_vars_is = constrain_velocity(sys, fxd_vars_is, fxd_vals)
+    slvr = SaddlePointSolver(
+        reduced_sys.vel_op_coefs,
+        reduced_sys.div_coefs,
+        reduced_sys.prs_mass_coefs,
+        visc,
+        **slvr_kwargs
+        )
+    free_vel_soln, prs_soln, info = slvr.solve(reduced_sys.vel_srcs, reduced_sys.prs_srcs, rtol)
+
+    vel_soln = np.zeros(spcs.num_of_vel_vars)
+    vel_soln[fxd_vars_is] = fxd_vals
+    vel_soln[free_vars_is] = free_vel_soln
+
+    return vel_soln.reshape(-1, spcs.dimalty), prs_soln, info
@@ -0,0 +1,377 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spsla
+from dataclasses import dataclass, field
+from enum import Enum
+# Scripts
+from Code.types import *
+from Code.utilities.profiling import PROFILER
+
+
+'''
+Script-specific typing setup
+'''
+
+SolutionType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+ProlongationType : TypeAlias = Annotated[NumericSparseMatrixValueType, Literal["(total fine variables, total coarse variables)"]]
+
+class SmootherType(Enum):
+    JACOBI = "Jacobi"
+    CHEBYSHEV = "Chebyshev"
+
+# Damping of the weighted Jacobi smoother, relative to 1/ρ(D⁻¹A)
+JACOBI_DAMPING = 4/3
+# Fraction of ρ(D⁻¹A) below which the Chebyshev smoother leaves error components to the coarse grid
+# Halving the mesh size leaves the upper ~3/4 of the spectrum unresolved on the coarse grid
+CHEBYSHEV_LOWER_FRACTION = 1/4
+# Safety factor on the power-iteration estimate of ρ(D⁻¹A), which approaches it from below
+SPECTRAL_RADIUS_SAFETY = 1.1
+
+
+'''
+Transfer operators
+'''
+
+def compute_structured_prolongation(
+    nums_of_crs_els_per_dim : Tuple[NumericIntegerValueType, ...]
+    ) -> ProlongationType:
+    """
+    Nodal (multi)linear interpolation from a structured mesh onto the mesh with every element split in two along every dimension, both numbered like `generate_structured_mesh()` (first dimension fastest).
+    """
+
+    result = sps.csr_array(np.ones((1, 1)))
+    for curr_num_of_els in nums_of_crs_els_per_dim:
+        # 1D: even fine nodes coincide with coarse nodes, odd ones are midpoints
+        crs_is = np.arange(curr_num_of_els+1)
+        mid_is = np.arange(curr_num_of_els)
+        curr_prlngtn = sps.csr_array(
+            (
+                np.concatenate([np.ones(len(crs_is)), np.full(2*len(mid_is), 0.5)]),
+                (np.concatenate([2*crs_is, np.repeat(2*mid_is+1, 2)]), np.concatenate([crs_is, np.stack([mid_is, mid_is+1], axis=1).ravel()]))
+                ),
+            shape = (2*curr_num_of_els+1, curr_num_of_els+1)
+            )
+        # Later dimensions vary slower, so they are the outer Kronecker factors
+        result = sps.kron(curr_prlngtn, result, format="csr")
+
+    return sps.csr_array(result)
+
+def restrict_prolongation(
+    prlngtn : ProlongationType,
+    fine_vars_is : Annotated[NumericVectorValueType, Literal["(total kept fine variables,)"]],
+    crs_vars_is : Annotated[NumericVectorValueType, Literal["(total kept coarse variables,)"]]
+    ) -> ProlongationType:
+
+    # E.g. to the free (non-Dirichlet) variables of both levels
+    return sps.csr_array(sps.csr_array(prlngtn)[fine_vars_is][:, crs_vars_is])
+
+def compute_strength_of_connection(
+    op_coefs : NumericSparseMatrixValueType,
+    thrshld : NumericDecimalValueType
+    ) -> NumericSparseMatrixValueType:
+
+    # Symmetric strength: |aᵢⱼ| ≥ θ·√(|aᵢᵢ·aⱼⱼ|), without the diagonal
+    op_coefs = sps.coo_array(op_coefs)
+    diag = np.abs(op_coefs.diagonal())
+    strng_mask = (op_coefs.row != op_coefs.col) & (np.abs(op_coefs.data) >= thrshld * np.sqrt(diag[op_coefs.row] * diag[op_coefs.col]))
+
+    return sps.csr_array(
+        (np.ones(int(np.count_nonzero(strng_mask))), (op_coefs.row[strng_mask], op_coefs.col[strng_mask])),
+        shape = op_coefs.shape
+        )
+
+def compute_aggregates(
+    strngth : NumericSparseMatrixValueType,
+    seed : NumericIntegerValueType = 0
+    ) -> Annotated[NumericVectorValueType, Literal["(total variables,)"]]:
+    """
+    Aggregates variables around the roots of a distance-2 maximal independent set of the strength graph, found with vectorized (Luby-style) random-priority rounds.
+    Every variable joins a strongly connected root's aggregate, or failing that, a strongly connected neighbor's; isolated variables become singleton aggregates.
+    """
+
+    num_of_vars = strngth.shape[0]
+    adj = sps.csr_array(strngth + sps.eye_array(num_of_vars, format="csr"))
+    adj.data[:] = 1.0
+    dist2_adj = sps.csr_array(adj @ adj)
+    # Path counts are irrelevant, only reachability
+    dist2_adj.data[:] = 1.0
+
+    rng = np.random.default_rng(seed)
+    prrts = rng.permutation(num_of_vars).astype(float) + 1
+    # 1: root, -1: excluded (within distance 2 of a root), 0: undecided
+    stts = np.zeros(num_of_vars, dtype=np.int8)
+    while np.any(stts == 0):
+        undcdd_prrts = np.where(stts == 0, prrts, 0.0)
+        # Local maxima of the undecided priorities within distance 2 become roots
+        nbrs_max_prrts = (dist2_adj @ sps.diags_array(undcdd_prrts)).max(axis=1).toarray().ravel()
+        new_roots_mask = (stts == 0) & (undcdd_prrts >= nbrs_max_prrts)
+        stts[new_roots_mask] = 1
+        near_roots_mask = (dist2_adj @ new_roots_mask.astype(float)) > 0
+        stts[(stts == 0) & near_roots_mask] = -1
+
+    # Roots and their strong neighbors
+    roots_is = np.flatnonzero(stts == 1)
+    aggs_is = np.full(num_of_vars, -1)
+    aggs_is[roots_is] = np.arange(len(roots_is))
+    root_ids = np.zeros(num_of_vars)
+    root_ids[roots_is] = np.arange(len(roots_is)) + 1
+    nbr_root_ids = (adj @ sps.diags_array(root_ids)).max(axis=1).toarray().ravel()
+    join_mask = (aggs_is < 0) & (nbr_root_ids > 0)
+    aggs_is[join_mask] = nbr_root_ids[join_mask].astype(int) - 1
+
+    # Remaining variables join any aggregated strong neighbor
+    while True:
+        agg_ids = np.where(aggs_is >= 0, aggs_is + 1, 0).astype(float)
+        nbr_agg_ids = (adj @ sps.diags_array(agg_ids)).max(axis=1).toarray().ravel()
+        join_mask = (aggs_is < 0) & (nbr_agg_ids > 0)
+        if not np.any(join_mask):
+            break
+        aggs_is[join_mask] = nbr_agg_ids[join_mask].astype(int) - 1
+
+    unaggd_mask = aggs_is < 0
+    aggs_is[unaggd_mask] = aggs_is.max() + 1 + np.arange(int(np.count_nonzero(unaggd_mask)))
+
+    return aggs_is
+
+def estimate_spectral_radius(
+    op_coefs : NumericSparseMatrixValueType,
+    diag_inv : Annotated[NumericVectorValueType, Literal["(total variables,)"]],
+    num_of_itrs : NumericIntegerValueType = 15,
+    seed : NumericIntegerValueType = 0
+    ) -> NumericDecimalValueType:
+
+    # Power iteration on D⁻¹A
+    v = np.random.default_rng(seed).random(op_coefs.shape[0])
+    ρ = 0.0
+    for _ in range(num_of_itrs):
+        w = diag_inv * (op_coefs @ v)
+        ρ = np.linalg.norm(w) / np.linalg.norm(v)
+        v = w / np.linalg.norm(w)
+
+    return ρ
+
+def compute_smoothed_aggregation_prolongation(
+    op_coefs : NumericSparseMatrixValueType,
+    strngth_thrshld : NumericDecimalValueType = 0.08,
+    near_null_space : Annotated[NumericVectorValueType, Literal["(total variables,)"]] = None
+    ) -> Tuple[ProlongationType, Annotated[NumericVectorValueType, Literal["(total coarse variables,)"]]]:
+    """
+    Tentative prolongation from aggregates (the near-null-space vector, normalized per aggregate), smoothed by one damped Jacobi step `P = (I - ω·D⁻¹A)·T`.
+    Returns the prolongation and the coarse near-null-space vector.
+    """
+
+    num_of_vars = op_coefs.shape[0]
+    if near_null_space is None:
+        near_null_space = np.ones(num_of_vars)
+
+    aggs_is = compute_aggregates(compute_strength_of_connection(op_coefs, strngth_thrshld))
+    num_of_aggs = int(aggs_is.max()) + 1
+
+    # Per-aggregate normalization (the 1-column QR of the near-null-space block)
+    aggs_norms = np.sqrt(np.bincount(aggs_is, weights=near_null_space**2, minlength=num_of_aggs))
+    tntv_prlngtn = sps.csr_array(
+        (near_null_space / aggs_norms[aggs_is], (np.arange(num_of_vars), aggs_is)),
+        shape = (num_of_vars, num_of_aggs)
+        )
+
+    diag_inv = 1 / op_coefs.diagonal()
+    ω = JACOBI_DAMPING / estimate_spectral_radius(op_coefs, diag_inv)
+    prlngtn = tntv_prlngtn - ω * (sps.diags_array(diag_inv) @ (op_coefs @ tntv_prlngtn))
+
+    return sps.csr_array(prlngtn), aggs_norms
+
+
+'''
+Multigrid hierarchy & cycles
+'''
+
+@dataclass
+class MultigridLevel:
+
+    op_coefs : NumericSparseMatrixValueType
+    diag_inv : Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+    spctrl_rad : NumericDecimalValueType
+    # From the next coarser level onto this one; None on the coarsest level
+    prlngtn : ProlongationType = None
+    restrctn : NumericSparseMatrixValueType = None
+
+@dataclass
+class MultigridInfo:
+
+    cnvrgd : bool = False
+    num_of_itrs : NumericIntegerValueType = 0
+    resid_norms : List[NumericDecimalValueType] = field(default_factory=list)
+
+class MultigridSolver:
+    """
+    V-cycle multigrid for symmetric positive definite (e.g. Poisson) systems, usable standalone (`solve()`) or as a preconditioner for a Krylov method (`as_preconditioner()`).
+
+    The hierarchy is built once: transfer operators are given (geometric multigrid, e.g. from `compute_structured_prolongation()` or `refine_h()`) or built by smoothed aggregation (algebraic multigrid), and coarse operators are the Galerkin products `Pᵀ·A·P`.
+    Restrictions, inverse diagonals and spectral radius estimates are all cached per level, and the coarsest level is factored once, so each cycle costs O(N) vectorized sparse products.
+    """
+
+    def __init__(
+        self,
+        op_coefs : NumericSparseMatrixValueType,
+        prlngtns : List[ProlongationType] = None,
+        smoother : SmootherType = SmootherType.CHEBYSHEV,
+        num_of_smthng_itrs : NumericIntegerValueType = 2,
+        strngth_thrshld : NumericDecimalValueType = 0.08,
+        max_crs_size : NumericIntegerValueType = 500,
+        max_num_of_lvls : NumericIntegerValueType = 20
+        ):
+
+        self.smoother = smoother
+        self.num_of_smthng_itrs = num_of_smthng_itrs
+
+        # Geometric prolongations are given finest first; algebraic ones are built until the operator is small enough
+        self.lvls = []
+        op_coefs = sps.csr_array(op_coefs)
+        near_null_space = None
+        for curr_lvl_i in range(max_num_of_lvls):
+            diag_inv = 1 / op_coefs.diagonal()
+            lvl = MultigridLevel(op_coefs, diag_inv, SPECTRAL_RADIUS_SAFETY * estimate_spectral_radius(op_coefs, diag_inv))
+            self.lvls.append(lvl)
+
+            if prlngtns is not None:
+                if curr_lvl_i >= len(prlngtns):
+                    break
+                prlngtn = sps.csr_array(prlngtns[curr_lvl_i])
+            else:
+                if op_coefs.shape[0] <= max_crs_size:
+                    break
+                prlngtn, near_null_space = compute_smoothed_aggregation_prolongation(op_coefs, strngth_thrshld, near_null_space)
+                # Stalled coarsening
+                if prlngtn.shape[1] >= op_coefs.shape[0]:
+                    break
+
+            lvl.prlngtn = prlngtn
+            lvl.restrctn = sps.csr_array(prlngtn.T)
+            op_coefs = sps.csr_array(lvl.restrctn @ op_coefs @ prlngtn)
+
+        self.crs_fctrztn = spsla.splu(sps.csc_matrix(self.lvls[-1].op_coefs))
+
+    @property
+    def num_of_lvls(self) -> NumericIntegerValueType:
+        return len(self.lvls)
+    @property
+    def op_cmplxty(self) -> NumericDecimalValueType:
+        return sum(curr_lvl.op_coefs.nnz for curr_lvl in self.lvls) / self.lvls[0].op_coefs.nnz
+
+    def smooth(
+        self,
+        lvl : MultigridLevel,
+        soln : SolutionType,
+        srcs : SolutionType
+        ) -> SolutionType:
+
+        match self.smoother:
+            case SmootherType.JACOBI:
+                ω = JACOBI_DAMPING / lvl.spctrl_rad
+                for _ in range(self.num_of_smthng_itrs):
+                    soln = soln + ω * lvl.diag_inv * (srcs - lvl.op_coefs @ soln)
+            case SmootherType.CHEBYSHEV:
+                # Chebyshev iteration on D⁻¹A, damping its spectrum over [ρ/4, ρ]
+                uppr = lvl.spctrl_rad
+                lwr = CHEBYSHEV_LOWER_FRACTION * uppr
+                θ = (uppr + lwr) / 2
+                δ = (uppr - lwr) / 2
+                σ = θ / δ
+                ρ = 1 / σ
+                resid = lvl.diag_inv * (srcs - lvl.op_coefs @ soln)
+                drctn = resid / θ
+                for _ in range(self.num_of_smthng_itrs):
+                    soln = soln + drctn
+                    resid = resid - lvl.diag_inv * (lvl.op_coefs @ drctn)
+                    new_ρ = 1 / (2*σ - ρ)
+                    drctn = new_ρ * ρ * drctn + (2 * new_ρ / δ) * resid
+                    ρ = new_ρ
+            case _:
+                raise ValueError(f"Unsupported smoother {self.smoother}.")
+
+        return soln
+
+    def vcycle(
+        self,
+        srcs : SolutionType,
+        soln : SolutionType = None,
+        lvl_i : NumericIntegerValueType = 0
+        ) -> SolutionType:
+
+        lvl = self.lvls[lvl_i]
+        if lvl_i == self.num_of_lvls - 1:
+            return self.crs_fctrztn.solve(srcs)
+        if soln is None:
+            soln = np.zeros_like(srcs)
+
+        soln = self.smooth(lvl, soln, srcs)
+        crs_resid = lvl.restrctn @ (srcs - lvl.op_coefs @ soln)
+        soln = soln + lvl.prlngtn @ self.vcycle(crs_resid, None, lvl_i+1)
+        soln = self.smooth(lvl, soln, srcs)
+
+        return soln
+
+    @PROFILER.instrument(cat="solve")
+    def solve(
+        self,
+        srcs : SolutionType,
+        soln0 : SolutionType = None,
+        rtol : NumericDecimalValueType = 1e-8,
+        max_num_of_itrs : NumericIntegerValueType = 100
+        ) -> Tuple[SolutionType, MultigridInfo]:
+
+        info = MultigridInfo()
+        op_coefs = self.lvls[0].op_coefs
+        soln = np.zeros_like(srcs, dtype=float) if soln0 is None else np.array(soln0, dtype=float)
+        srcs_norm = np.linalg.norm(srcs)
+        resid_norm = np.linalg.norm(srcs - op_coefs @ soln)
+        info.resid_norms.append(resid_norm)
+        for curr_itr in range(max_num_of_itrs):
+            if resid_norm <= rtol * srcs_norm:
+                info.cnvrgd = True
+                break
+            soln = self.vcycle(srcs, soln)
+            resid_norm = np.linalg.norm(srcs - op_coefs @ soln)
+            info.resid_norms.append(resid_norm)
+            info.num_of_itrs = curr_itr + 1
+            PROFILER.record("multigrid/resid_norm", resid_norm)
+            PROFILER.count("multigrid/itrs")
+        else:
+            info.cnvrgd = resid_norm <= rtol * srcs_norm
+
+        return soln, info
+
+    def as_preconditioner(self) -> spsla.LinearOperator:
+
+        # One V-cycle from a zero initial guess is a fixed, symmetric linear operator, as CG requires
+        return spsla.LinearOperator(self.lvls[0].op_coefs.shape, matvec=self.vcycle, dtype=float)
+
+    @PROFILER.instrument(cat="solve")
+    def solve_preconditioned(
+        self,
+        srcs : SolutionType,
+        rtol : NumericDecimalValueType = 1e-8,
+        max_num_of_itrs : NumericIntegerValueType = 100
+        ) -> Tuple[SolutionType, MultigridInfo]:
+        """
+        Multigrid-preconditioned conjugate gradients; more robust than plain V-cycles on unstructured and adaptively refined meshes, at the same O(N) cost per iteration.
+        """
+
+        info = MultigridInfo()
+        def record(soln):
+            info.num_of_itrs += 1
+            info.resid_norms.append(np.linalg.norm(srcs - self.lvls[0].op_coefs @ soln))
+            PROFILER.record("multigrid_cg/resid_norm", info.resid_norms[-1])
+            PROFILER.count("multigrid_cg/itrs")
+        soln, exit_code = spsla.cg(
+            self.lvls[0].op_coefs,
+            srcs,
+            rtol = rtol,
+            maxiter = max_num_of_itrs,
+            M = self.as_preconditioner(),
+            callback = record
+            )
+        info.cnvrgd = (exit_code == 0)
+
+        return soln, info
@@ -0,0 +1,301 @@
+# Libraries
+import sympy as sp
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spsla
+from dataclasses import dataclass, field
+# Scripts
+from Code.types import *
+from Code.symbolic.math import SymbolicMathematicalObject, Expression, Argument, Operator
+from Code.symbolic.math import Derivative
+from Code.utilities.auxilary import KernelCache, make_callable
+from Code.utilities.profiling import PROFILER
+
+
+'''
+Script-specific typing setup
+'''
+
+SolutionType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+ResidualFunctionType : TypeAlias = Callable[[SolutionType], SolutionType]
+JacobianFunctionType : TypeAlias = Callable[[SolutionType], NumericSparseMatrixValueType]
+NodalFunctionType : TypeAlias = Callable[[SolutionType], SolutionType]
+
+
+'''
+Symbolic derivation & compilation
+'''
+
+def compile_nonlinear_source(
+    src : SymbolicMathematicalObject,
+    unknown : Argument,
+    cache : KernelCache = None
+    ) -> Tuple[NodalFunctionType, NodalFunctionType]:
+    """
+    Compiles a source `s(u)` that depends on the unknown function, and its derivative `s'(u)` (derived symbolically with the `Derivative` operator), into vectorized callables of the unknown's (nodal) values.
+
+    If a `cache` is provided, both kernels are stored in it, keyed by their expressions, so a restarted run can reuse them.
+    """
+
+    unknown_sym = sp.Symbol(unknown.name)
+    args = {unknown: unknown_sym}
+
+    # Expressions are already evaluated; operators must be called with the unknown's placeholder substituted
+    if isinstance(src, Operator):
+        src_expr = src(args)[0]
+    elif isinstance(src, Expression):
+        src_expr = src.val
+    else:
+        raise TypeError(f"Nonlinear sources must be an Expression or Operator, not {type(src).__name__}.")
+    src_deriv_expr = Derivative(src, [unknown_sym])(args)[0]
+
+    src_fn = make_callable((unknown_sym,), src_expr, cache=cache)
+    src_deriv_fn = make_callable((unknown_sym,), src_deriv_expr, cache=cache)
+
+    # Constant expressions lambdify to scalars; broadcast them to the nodal values
+    def vectorize(fn):
+        return lambda u: np.broadcast_to(np.asarray(fn(u), dtype=float), np.shape(u))
+
+    return vectorize(src_fn), vectorize(src_deriv_fn)
+
+
+'''
+Nonlinear problems
+'''
+
+class SemilinearProblem:
+    """
+    Residual & Jacobian of the discretized semilinear problem `L(u) = s(u)`, with `L` linear (e.g. the Laplacian) and a nonlinear source `s`.
+
+    After integration by parts, `-K·u = M_L·s(u)`, so `R(u) = K·u + M_L·s(u)` and `J(u) = K + M_L·diag(s'(u))`.
+    The source is integrated with nodal quadrature (the lumped mass `M_L`), so the Jacobian's nonlinear part is diagonal and no element-level reassembly is ever needed.
+    Fixed (Dirichlet) variables are held at `fxd_vals`, and residuals/Jacobians are only formed over the free variables.
+    """
+
+    def __init__(
+        self,
+        stiff_op_coefs : NumericSparseMatrixValueType,
+        mass_op_coefs : NumericSparseMatrixValueType,
+        src_fn : NodalFunctionType,
+        src_deriv_fn : NodalFunctionType,
+        fxd_vars_is : Annotated[NumericVectorValueType, Literal["(total fixed variables,)"]] = None,
+        fxd_vals : Union[NumericScalarValueType, Annotated[NumericVectorValueType, Literal["(total fixed variables,)"]]] = 0.0
+        ):
+
+        num_of_vars = stiff_op_coefs.shape[0]
+        self.num_of_vars = num_of_vars
+
+        # Free/fixed variable split
+        self.fxd_vars_is = np.zeros(0, dtype=int) if fxd_vars_is is None else np.asarray(fxd_vars_is)
+        self.fxd_vals = np.broadcast_to(np.asarray(fxd_vals, dtype=float), self.fxd_vars_is.shape)
+        free_vars_mask = np.ones(num_of_vars, dtype=bool)
+        free_vars_mask[self.fxd_vars_is] = False
+        self.free_vars_is = np.flatnonzero(free_vars_mask)
+
+        stiff_op_coefs = sps.csr_array(stiff_op_coefs)
+        self.stiff_op_coefs = stiff_op_coefs[self.free_vars_is][:, self.free_vars_is]
+        self.stiff_fxd_srcs = stiff_op_coefs[self.free_vars_is][:, self.fxd_vars_is] @ self.fxd_vals
+        self.lumped_mass = np.asarray(sps.csr_array(mass_op_coefs).sum(axis=1)).ravel()[self.free_vars_is]
+
+        self.src_fn = src_fn
+        self.src_deriv_fn = src_deriv_fn
+
+    def resid(
+        self,
+        u_free : Annotated[NumericVectorValueType, Literal["(total free variables,)"]]
+        ) -> Annotated[NumericVectorValueType, Literal["(total free variables,)"]]:
+
+        return self.stiff_op_coefs @ u_free + self.stiff_fxd_srcs + self.lumped_mass * self.src_fn(u_free)
+
+    def jac(
+        self,
+        u_free : Annotated[NumericVectorValueType, Literal["(total free variables,)"]]
+        ) -> NumericSparseMatrixValueType:
+
+        return sps.csr_array(self.stiff_op_coefs + sps.diags_array(self.lumped_mass * self.src_deriv_fn(u_free)))
+
+    def restrict(
+        self,
+        u : SolutionType
+        ) -> Annotated[NumericVectorValueType, Literal["(total free variables,)"]]:
+
+        return np.asarray(u, dtype=float)[self.free_vars_is]
+
+    def expand(
+        self,
+        u_free : Annotated[NumericVectorValueType, Literal["(total free variables,)"]]
+        ) -> SolutionType:
+
+        result = np.empty(self.num_of_vars)
+        result[self.free_vars_is] = u_free
+        result[self.fxd_vars_is] = self.fxd_vals
+        return result
+
+
+'''
+Newton–Krylov solver
+'''
+
+@dataclass
+class NewtonInfo:
+
+    cnvrgd : bool = False
+    # Stopped because the line search failed even with a fresh Jacobian
+    stgntd : bool = False
+    num_of_itrs : NumericIntegerValueType = 0
+    num_of_jac_evals : NumericIntegerValueType = 0
+    num_of_lin_itrs : NumericIntegerValueType = 0
+    resid_norms : List[NumericDecimalValueType] = field(default_factory=list)
+
+class NewtonKrylovSolver:
+    """
+    Inexact Newton iteration with a backtracking (Armijo) line search, solving each linearized step with preconditioned GMRES to an adaptive (Eisenstat–Walker) tolerance.
+
+    With `jac_refresh_intrvl = k > 1` this becomes modified Newton: the Jacobian and its ILU preconditioner are only refreshed every `k` iterations (or after a failed line search).
+    A line search that cannot reduce the residual above `min_step_len` rejects the step, keeping the current iterate, and the step is retried with a refreshed Jacobian; if even a fresh Jacobian's step is rejected, the solve stops unconverged.
+    In between, the stale Jacobian either serves as the linear operator itself or, with `jac_free`, only as the preconditioner for a finite-difference Jacobian-vector product of the current residual, which keeps Newton's convergence rate at the cost of one residual evaluation per Krylov iteration.
+    """
+
+    def __init__(
+        self,
+        resid_fn : ResidualFunctionType,
+        jac_fn : JacobianFunctionType,
+        rtol : NumericDecimalValueType = 1e-8,
+        atol : NumericDecimalValueType = 1e-12,
+        max_num_of_itrs : NumericIntegerValueType = 50,
+        jac_refresh_intrvl : NumericIntegerValueType = 1,
+        jac_free : bool = False,
+        max_frcng_term : NumericDecimalValueType = 0.1,
+        line_search_c : NumericDecimalValueType = 1e-4,
+        min_step_len : NumericDecimalValueType = 1e-4,
+        ilu_drop_tol : NumericDecimalValueType = 1e-4,
+        ilu_fill_fctr : NumericDecimalValueType = 10.0
+        ):
+
+        self.resid_fn = resid_fn
+        self.jac_fn = jac_fn
+        self.rtol = rtol
+        self.atol = atol
+        self.max_num_of_itrs = max_num_of_itrs
+        self.jac_refresh_intrvl = jac_refresh_intrvl
+        self.jac_free = jac_free
+        self.max_frcng_term = max_frcng_term
+        self.line_search_c = line_search_c
+        self.min_step_len = min_step_len
+        self.ilu_drop_tol = ilu_drop_tol
+        self.ilu_fill_fctr = ilu_fill_fctr
+
+    def build_preconditioner(
+        self,
+        jac : NumericSparseMatrixValueType
+        ) -> spsla.LinearOperator:
+
+        try:
+            ilu = spsla.spilu(sps.csc_matrix(jac), drop_tol=self.ilu_drop_tol, fill_factor=self.ilu_fill_fctr)
+        # Singular/ill-conditioned pivots; fall back to Jacobi
+        except RuntimeError:
+            diag = jac.diagonal()
+            diag[diag == 0] = 1.0
+            return spsla.LinearOperator(jac.shape, matvec=lambda v: v / diag)
+        return spsla.LinearOperator(jac.shape, matvec=ilu.solve)
+
+    def solve(
+        self,
+        u0 : SolutionType
+        ) -> Tuple[SolutionType, NewtonInfo]:
+
+        info = NewtonInfo()
+        u = np.array(u0, dtype=float)
+        resid = self.resid_fn(u)
+        resid_norm = np.linalg.norm(resid)
+        info.resid_norms.append(resid_norm)
+        PROFILER.record("newton/resid_norm", resid_norm)
+        tol = max(self.atol, self.rtol * resid_norm)
+
+        jac = None
+        precond = None
+        itrs_since_refresh = 0
+        frcng_term = self.max_frcng_term
+        for curr_itr in range(self.max_num_of_itrs):
+            if resid_norm <= tol:
+                info.cnvrgd = True
+                break
+
+            # (Modified Newton) Jacobian & preconditioner refresh
+            jac_is_fresh = (jac is None) or (itrs_since_refresh >= self.jac_refresh_intrvl)
+            if jac_is_fresh:
+                jac = self.jac_fn(u)
+                precond = self.build_preconditioner(jac)
+                info.num_of_jac_evals += 1
+                itrs_since_refresh = 0
+            itrs_since_refresh += 1
+
+            # Linear operator: stale Jacobian, or matrix-free directional differences of the current residual
+            if self.jac_free:
+                curr_u, curr_resid = u, resid
+                u_norm = np.linalg.norm(u)
+                def jac_matvec(v):
+                    v_norm = np.linalg.norm(v)
+                    if v_norm == 0:
+                        return np.zeros_like(v)
+                    ε = np.sqrt(np.finfo(float).eps) * (1 + u_norm) / v_norm
+                    return (self.resid_fn(curr_u + ε*v) - curr_resid) / ε
+                lin_op = spsla.LinearOperator(jac.shape, matvec=jac_matvec)
+            else:
+                lin_op = jac
+
+            # Inexact linear solve: ‖J·δ + R‖ ≤ η‖R‖
+            num_of_lin_itrs = [0]
+            def count_lin_itr(_):
+                num_of_lin_itrs[0] += 1
+            step, _ = spsla.gmres(
+                lin_op,
+                -resid,
+                rtol = frcng_term,
+                M = precond,
+                callback = count_lin_itr,
+                callback_type = "pr_norm"
+                )
+            info.num_of_lin_itrs += num_of_lin_itrs[0]
+            PROFILER.count("newton/lin_itrs", num_of_lin_itrs[0])
+
+            # Backtracking line search on ‖R‖
+            step_len = 1.0
+            while True:
+                new_u = u + step_len * step
+                new_resid = self.resid_fn(new_u)
+                new_resid_norm = np.linalg.norm(new_resid)
+                if new_resid_norm <= (1 - self.line_search_c * step_len) * resid_norm:
+                    break
+                if step_len * 0.5 < self.min_step_len:
+                    step_len = None
+                    break
+                step_len *= 0.5
+
+            # Stagnation: keep the current iterate, and retry with a fresh Jacobian unless this one already was
+            if step_len is None:
+                info.resid_norms.append(resid_norm)
+                info.num_of_itrs = curr_itr + 1
+                PROFILER.count("newton/line_search_failures")
+                if jac_is_fresh:
+                    info.stgntd = True
+                    break
+                itrs_since_refresh = self.jac_refresh_intrvl
+                continue
+
+            # Eisenstat–Walker (choice 2) forcing term, safeguarded against dropping too quickly
+            prev_frcng_term = frcng_term
+            frcng_term = 0.9 * (new_resid_norm / resid_norm)**2
+            if 0.9 * prev_frcng_term**2 > 0.1:
+                frcng_term = max(frcng_term, 0.9 * prev_frcng_term**2)
+            frcng_term = min(max(frcng_term, 0.5 * tol / max(new_resid_norm, tol)), self.max_frcng_term)
+
+            u, resid, resid_norm = new_u, new_resid, new_resid_norm
+            info.resid_norms.append(resid_norm)
+            info.num_of_itrs = curr_itr + 1
+            PROFILER.record("newton/resid_norm", resid_norm)
+            PROFILER.count("newton/itrs")
+        else:
+            info.cnvrgd = resid_norm <= tol
+
+        return u, info
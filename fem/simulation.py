@@ -1,21 +1,159 @@
 # Libraries
 import numpy as np
 # Scripts
-import PYTHON.space as spce
-import PYTHON.equation as eqn
-import PYTHON.mesh as msh
+from Code.types import *
+from Code.mesh.mesh import Mesh, generate_structured_mesh
+from Code.fem.solve import FactorizationCache, FactorizationMethod
+from Code.fem.solve import solve, solve_for_sources
+from Code.fem.hanging import HangingNodeConstraints
+from Code.mesh.io import PathType, ArraysType, write_arrays, read_arrays
+from Code.fem.checkpoint import Checkpointer
+# SymPy (and the symbolic pipeline built on it) is only imported to read domain bounds, so restoring & re-solving a checkpointed simulation stays SymPy-free
+if TYPE_CHECKING:
+    from Code.symbolic.geometry import Domain
+    from Code.fem.equation import GoverningEquation
 
 
+def compute_domain_bounds(
+    phys_dom : "Domain"
+    ) -> Tuple[Tuple[NumericDecimalValueType, ...], Tuple[NumericDecimalValueType, ...]]:
+    """
+    Lower & upper bounds of a box domain, from boundaries which each bound a single dimension linearly (e.g. `x ≥ 0`, `2y ≤ 1`).
+    """
+
+    import sympy as sp
+    from Code.symbolic.geometry import Boundary
+
+    dims_syms = phys_dom.host_spce.dims_syms()
+    lwr_bnds = [None] * len(dims_syms)
+    uppr_bnds = [None] * len(dims_syms)
+    for curr_bdry in phys_dom.bdrys:
+        # Standard form `a·xᵢ + b ≤ 0` inside
+        curr_expr = sp.expand(Boundary.convert_equation_to_expression(curr_bdry.eq))
+        curr_dims_is = [curr_dim_idx for curr_dim_idx, curr_sym in enumerate(dims_syms) if curr_expr.has(curr_sym)]
+        if (len(curr_dims_is) != 1) or (sp.degree(curr_expr, dims_syms[curr_dims_is[0]]) != 1):
+            raise ValueError(f"Boundary \"{curr_bdry.name}\" of domain \"{phys_dom.name}\" does not bound a single dimension linearly, so the domain is not a box.")
+        curr_dim_idx = curr_dims_is[0]
+        curr_slope = float(curr_expr.coeff(dims_syms[curr_dim_idx]))
+        curr_bnd = -float(curr_expr.subs(dims_syms[curr_dim_idx], 0)) / curr_slope
+        if curr_slope > 0:
+            uppr_bnds[curr_dim_idx] = curr_bnd if uppr_bnds[curr_dim_idx] is None else min(uppr_bnds[curr_dim_idx], curr_bnd)
+        else:
+            lwr_bnds[curr_dim_idx] = curr_bnd if lwr_bnds[curr_dim_idx] is None else max(lwr_bnds[curr_dim_idx], curr_bnd)
+
+    if any(curr_bnd is None for curr_bnd in lwr_bnds + uppr_bnds):
+        raise ValueError(f"Domain \"{phys_dom.name}\" is not bounded in every dimension.")
+
+    return tuple(lwr_bnds), tuple(uppr_bnds)
+
 class Simulation():
+
+    # Solve routines live in solve.py
+    solve = solve
+    solve_for_sources = solve_for_sources
+
     def __init__(
         self,
         name                : str,
-        fem_eqn             : eqn.FiniteElementMethodEquation,
-        phys_dom            : spce.Domain,
-        nums_of_els_per_dim : list[int]
+        fem_eqn             : "GoverningEquation",
+        phys_dom            : "Domain",
+        nums_of_els_per_dim : Tuple[NumericIntegerValueType, ...],
+        fctrztn_mthd        : FactorizationMethod = FactorizationMethod.LU
         ):
 
         self.name = name
         self.fem_eqn = fem_eqn
-        # Mesh
-        self.mesh = msh.Mesh(phys_dom, self.fem_eqn.template_el, nums_of_els_per_dim)
\ No newline at end of file
+        # Structured mesh of the (box) physical domain
+        self.mesh = generate_structured_mesh(*compute_domain_bounds(phys_dom), nums_of_els_per_dim)
+        # Assembled system & factorization reuse across solves
+        self.glbl_op_coefs = None
+        self.glbl_op_coefs_vrsn = 0
+        self.glbl_srcs = None
+        self.fctrztn_cache = FactorizationCache(fctrztn_mthd)
+        # Hanging-node constraint matrix, cached while the mesh is unchanged
+        self.hngng_cnstrnts = HangingNodeConstraints()
+        self.soln = None
+        self.soln_prev = None
+        # Progress counters for iterative/transient runs
+        self.itr = 0
+        self.t = 0.0
+
+    def save(
+        self,
+        path : PathType
+        ):
+        """
+        Writes the mesh arrays and, if available, the last solution & sources to a single binary file.
+        The governing equation is symbolic and is not saved; it is reattached by loading into a `Simulation` constructed with it.
+        """
+
+        arrays = {
+            curr_name: getattr(self.mesh, curr_name)
+            for curr_name in self.mesh.ARRAYS_NAMES
+            }
+        if self.soln is not None:
+            arrays["soln"] = self.soln
+        if self.glbl_srcs is not None:
+            arrays["glbl_srcs"] = self.glbl_srcs
+
+        write_arrays(
+            path,
+            kind = type(self).__name__,
+            arrays = arrays,
+            attrs = {"name": self.name, "mesh_vrsn": self.mesh.vrsn}
+            )
+
+    def load(
+        self,
+        path : PathType,
+        mmap : bool = True
+        ):
+
+        attrs, arrays = read_arrays(path, kind=type(self).__name__, mmap=mmap)
+        self.soln = arrays.pop("soln", None)
+        self.glbl_srcs = arrays.pop("glbl_srcs", None)
+        self.mesh = Mesh(**arrays, vrsn=attrs.get("mesh_vrsn", 0))
+        # Loaded meshes invalidate any assembled operator
+        self.glbl_op_coefs = None
+        self.fctrztn_cache.clear()
+
+    def checkpoint(
+        self,
+        chkptr : Checkpointer,
+        force : bool = False,
+        extra_arrays : ArraysType = None
+        ) -> bool:
+
+        return chkptr.checkpoint(
+            itr = self.itr,
+            t = self.t,
+            soln = self.soln,
+            vrsn = self.glbl_op_coefs_vrsn,
+            mesh_arrays = {
+                curr_name: getattr(self.mesh, curr_name)
+                for curr_name in self.mesh.ARRAYS_NAMES
+                },
+            op_coefs = self.glbl_op_coefs,
+            srcs = self.glbl_srcs,
+            extra_arrays = extra_arrays,
+            force = force
+            )
+
+    def restore(
+        self,
+        chkptr : Checkpointer
+        ):
+        """
+        Restores the mesh, assembled system, solution and counters from the latest checkpoint, so the run can continue without reassembly.
+        """
+
+        state = chkptr.restore()
+        self.mesh = Mesh(**state["mesh_arrays"])
+        self.glbl_op_coefs = state["op_coefs"]
+        self.glbl_op_coefs_vrsn = state["vrsn"]
+        self.glbl_srcs = state["srcs"]
+        self.soln = state["soln"]
+        self.itr = state["itr"]
+        self.t = state["t"]
+        self.soln_prev = state["extra_arrays"].get("soln_prev")
+        self.fctrztn_cache.clear()
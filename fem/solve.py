@@ -1,6 +1,151 @@
 # Libraries
 import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.linalg as spsla
+from enum import Enum
+# Scripts
+from Code.types import *
+from Code.fem.multigrid import MultigridSolver, ProlongationType
+from Code.utilities.profiling import PROFILER
 
+# Optional CHOLMOD bindings; sparse Cholesky is unavailable without them
+try:
+    from sksparse.cholmod import cholesky as cholmod_cholesky
+except ImportError:
+    cholmod_cholesky = None
+
+
+'''
+Script-specific typing setup
+'''
+
+# Sources may be a single right-hand side or a block of them
+SourcesType : TypeAlias = Union[
+    Annotated[NumericVectorValueType, Literal["(total variables,)"]],
+    Annotated[NumericMatrixValueType, Literal["(total variables, total right-hand sides)"]]
+    ]
+FactorizationType : TypeAlias = Callable[[SourcesType], SourcesType]
+
+class FactorizationMethod(Enum):
+    LU = "LU"
+    CHOLESKY = "Cholesky"
+    # Not a factorization, but cached & reused the same way: a multigrid hierarchy driving preconditioned CG
+    MULTIGRID = "Multigrid"
+
+
+'''
+Factorization reuse
+'''
+
+class FactorizationCache:
+    """
+    Keeps the sparse factorization of the most recently factored global operator matrix so that repeated solves against the same operator only cost triangular solves.
+
+    The cache is keyed on the identity of the matrix object and a caller-maintained version number: whoever modifies a matrix in place is responsible for bumping its version.
+    A reference to the factored matrix is held, so its `id()` can not be recycled by another object while cached.
+    """
+
+    def __init__(
+        self,
+        mthd : FactorizationMethod = FactorizationMethod.LU,
+        prlngtns : List[ProlongationType] = None,
+        rtol : NumericDecimalValueType = 1e-10
+        ):
+
+        self.mthd = mthd
+        # Multigrid only: geometric transfer operators (finest first; algebraic multigrid without them) & CG tolerance
+        self.prlngtns = prlngtns
+        self.rtol = rtol
+
+        self.op_coefs = None
+        self.vrsn = None
+        self.fctrztn = None
+
+        # Bookkeeping, mostly useful for verifying reuse in parameter sweeps
+        self.num_of_fctrztns = 0
+        self.num_of_slvs = 0
+
+    def is_current(
+        self,
+        op_coefs : NumericSparseMatrixValueType,
+        vrsn : IndexType = 0
+        ) -> bool:
+
+        return (self.fctrztn is not None) and (op_coefs is self.op_coefs) and (vrsn == self.vrsn)
+
+    @PROFILER.instrument(cat="solve")
+    def factorize(
+        self,
+        op_coefs : NumericSparseMatrixValueType,
+        vrsn : IndexType = 0
+        ) -> FactorizationType:
+        """
+        Returns the factorization of `op_coefs`, only computing it if the cached one belongs to a different matrix or version.
+        """
+
+        if self.is_current(op_coefs, vrsn):
+            PROFILER.count("factorization/reuses")
+            return self.fctrztn
+
+        # Both SuperLU and CHOLMOD expect compressed sparse columns
+        op_coefs_csc = sps.csc_matrix(op_coefs)
+        match self.mthd:
+            case FactorizationMethod.LU:
+                fctrztn = spsla.splu(op_coefs_csc).solve
+            case FactorizationMethod.CHOLESKY:
+                if cholmod_cholesky is None:
+                    raise ImportError("Sparse Cholesky factorization requires scikit-sparse (sksparse.cholmod) to be installed.")
+                fctrztn = cholmod_cholesky(op_coefs_csc)
+            case FactorizationMethod.MULTIGRID:
+                mg_slvr = MultigridSolver(op_coefs, self.prlngtns)
+                def fctrztn(srcs):
+                    if srcs.ndim == 1:
+                        return mg_slvr.solve_preconditioned(srcs, self.rtol)[0]
+                    return np.stack([mg_slvr.solve_preconditioned(curr_srcs, self.rtol)[0] for curr_srcs in srcs.T], axis=1)
+            case _:
+                raise ValueError(f"Unsupported factorization method {self.mthd}.")
+
+        self.op_coefs = op_coefs
+        self.vrsn = vrsn
+        self.fctrztn = fctrztn
+        self.num_of_fctrztns += 1
+
+        return fctrztn
+
+    def solve(
+        self,
+        op_coefs : NumericSparseMatrixValueType,
+        srcs : SourcesType,
+        vrsn : IndexType = 0
+        ) -> SourcesType:
+        """
+        Solves `op_coefs·soln = srcs`, where `srcs` is either a `(total variables,)` vector or a `(total variables, total right-hand sides)` block of them.
+        A block of right-hand sides is solved in a single call against a single factorization.
+        """
+
+        srcs = np.asarray(srcs, dtype=float)
+        if srcs.ndim not in (1, 2):
+            raise ValueError(f"Sources must be of shape (total variables,) or (total variables, total right-hand sides), not {srcs.shape}.")
+        if srcs.shape[0] != op_coefs.shape[0]:
+            raise ValueError(f"Number of source rows ({srcs.shape[0]}) does not match number of operator rows ({op_coefs.shape[0]}).")
+
+        fctrztn = self.factorize(op_coefs, vrsn)
+        with PROFILER.timer("FactorizationCache.substitute", cat="solve"):
+            soln = fctrztn(srcs)
+        self.num_of_slvs += 1 if srcs.ndim == 1 else srcs.shape[1]
+
+        return soln
+
+    def clear(self):
+
+        self.op_coefs = None
+        self.vrsn = None
+        self.fctrztn = None
+
+
+'''
+Simulation solve routines
+'''
 
 def solve(self, n_quad_points=2):
 
@@ -17,7 +162,7 @@ def solve(self, n_quad_points=2):
     for curr_el_i in range(glbl_num_phys_els):
         curr_el_nds_glbl_is = glbl_els_nds_is[curr_el_i]
         curr_el_nds_vars_glbl_is = np.concatenate([
-            glbl_nds_vars_is[curr_nd_glbl_i] 
+            glbl_nds_vars_is[curr_nd_glbl_i]
             for curr_nd_glbl_i in curr_el_nds_glbl_is
             ])
         curr_el_nds_vec_crds = glbl_nds_vec_crds[curr_el_nds_glbl_is]
@@ -36,5 +181,35 @@ def solve(self, n_quad_points=2):
         glbl_op_coefs[np.ix_(curr_el_nds_vars_glbl_is, curr_el_nds_vars_glbl_is)] += curr_el_op_coefs
         glbl_srcs[curr_el_nds_vars_glbl_is] += curr_el_srcs.flatten()
 
-    soln = np.linalg.solve(glbl_op_coefs, glbl_srcs)
-    soln = soln.flatten()
\ No newline at end of file
+    # Eliminate hanging-node variables (a no-op on conforming meshes)
+    glbl_op_coefs, glbl_srcs = self.hngng_cnstrnts.condense(self.mesh, sps.csr_array(glbl_op_coefs), glbl_srcs)
+
+    # Keep the assembled system around; a new operator invalidates any cached factorization
+    self.glbl_op_coefs = sps.csc_array(glbl_op_coefs)
+    self.glbl_op_coefs_vrsn += 1
+    self.glbl_srcs = glbl_srcs
+
+    soln = self.fctrztn_cache.solve(self.glbl_op_coefs, glbl_srcs, self.glbl_op_coefs_vrsn)
+    soln = self.hngng_cnstrnts.expand(self.mesh, soln.flatten())
+    self.soln = soln
+
+    return soln
+
+
+def solve_for_sources(self, glbl_srcs):
+    """
+    Re-solves the last assembled operator against new sources without reassembling or refactoring it.
+
+    `glbl_srcs` may be a `(total variables, total right-hand sides)` block, in which case a parameter sweep over all of its columns costs one factorization plus one triangular solve per column.
+    """
+
+    if self.glbl_op_coefs is None:
+        raise RuntimeError("No global operator has been assembled yet, so there is nothing to re-solve against.")
+
+    # Sources are given over all variables; constrain them like the operator, then expand the solution(s) back
+    glbl_srcs = np.asarray(glbl_srcs, dtype=float)
+    if len(self.mesh.hngng_nds_is):
+        cnstrnt_mtrx = self.hngng_cnstrnts.get_constraint_matrix(self.mesh)
+        return cnstrnt_mtrx @ self.fctrztn_cache.solve(self.glbl_op_coefs, cnstrnt_mtrx.T @ glbl_srcs, self.glbl_op_coefs_vrsn)
+
+    return self.fctrztn_cache.solve(self.glbl_op_coefs, glbl_srcs, self.glbl_op_coefs_vrsn)
@@ -0,0 +1,261 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+from enum import Enum
+# Scripts
+from Code.types import *
+from Code.fem.solve import FactorizationCache, FactorizationMethod
+from Code.fem.assembly import ElementKernelType, ElementSourcesKernelType, assemble
+from Code.fem.checkpoint import Checkpointer
+
+
+'''
+Script-specific typing setup
+'''
+
+SolutionType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+# Sources are either constant or a function of time
+SourcesInputType : TypeAlias = Union[SolutionType, Callable[[NumericDecimalValueType], SolutionType]]
+
+class TimeScheme(Enum):
+    IMPLICIT_EULER = "Implicit Euler"
+    CRANK_NICOLSON = "Crank–Nicolson"
+    BDF2 = "BDF2"
+    EXPLICIT_RK4 = "Explicit RK4"
+
+# Implicit one-step schemes as θ-methods: (M + θΔt·K)·uⁿ⁺¹ = (M - (1-θ)Δt·K)·uⁿ + Δt·(θ·fⁿ⁺¹ + (1-θ)·fⁿ)
+THETA_SCHEMES_THETAS = {
+    TimeScheme.IMPLICIT_EULER: 1.0,
+    TimeScheme.CRANK_NICOLSON: 0.5
+    }
+# Relative (to Δt) tolerance within which times are considered equal
+TIME_TOL = 1e-9
+
+
+'''
+Time integration
+'''
+
+def compute_step_size(
+    t : NumericDecimalValueType,
+    t_end : NumericDecimalValueType,
+    dt : NumericDecimalValueType
+    ) -> NumericDecimalValueType:
+
+    # Snap to the nominal step within round-off, so a final step that is "almost" Δt doesn't invalidate the cached step matrix
+    rmng_t = t_end - t
+    if rmng_t >= dt * (1 - TIME_TOL):
+        return dt
+    return rmng_t
+
+def advance_time(
+    t : NumericDecimalValueType,
+    curr_dt : NumericDecimalValueType,
+    t_end : NumericDecimalValueType,
+    dt : NumericDecimalValueType
+    ) -> NumericDecimalValueType:
+
+    # Land exactly on t_end rather than accumulating round-off past or short of it
+    result = t + curr_dt
+    if abs(t_end - result) <= TIME_TOL * dt:
+        result = t_end
+    return result
+
+class TimeIntegrator:
+    """
+    Integrates the semi-discrete system `M·u̇ + K·u = f(t)` in time.
+
+    `M` and `K` are assembled once. Implicit schemes factor their step matrix `M + cΔt·K` once and reuse the factorization for as long as `Δt` (and hence the step matrix) stays the same.
+    The explicit RK4 scheme uses the lumped (row-sum) mass, so every stage is one sparse matrix-vector product and one elementwise division, with no assembly or solves.
+
+    Fixed (Dirichlet) variables are held at `fxd_vals` by solving only for the free variables.
+    """
+
+    def __init__(
+        self,
+        mass_op_coefs : NumericSparseMatrixValueType,
+        stiff_op_coefs : NumericSparseMatrixValueType,
+        srcs : SourcesInputType = None,
+        scheme : TimeScheme = TimeScheme.IMPLICIT_EULER,
+        fxd_vars_is : Annotated[NumericVectorValueType, Literal["(total fixed variables,)"]] = None,
+        fxd_vals : Union[NumericScalarValueType, Annotated[NumericVectorValueType, Literal["(total fixed variables,)"]]] = 0.0,
+        fctrztn_mthd : FactorizationMethod = FactorizationMethod.LU
+        ):
+
+        self.scheme = scheme
+        num_of_vars = mass_op_coefs.shape[0]
+
+        # Free/fixed variable split
+        self.fxd_vars_is = np.zeros(0, dtype=int) if fxd_vars_is is None else np.asarray(fxd_vars_is)
+        self.fxd_vals = np.broadcast_to(np.asarray(fxd_vals, dtype=float), self.fxd_vars_is.shape)
+        free_vars_mask = np.ones(num_of_vars, dtype=bool)
+        free_vars_mask[self.fxd_vars_is] = False
+        self.free_vars_is = np.flatnonzero(free_vars_mask)
+
+        mass_op_coefs = sps.csr_array(mass_op_coefs)
+        stiff_op_coefs = sps.csr_array(stiff_op_coefs)
+        # Free-free blocks drive the solves; free-fixed blocks lift the fixed values onto the sources
+        self.mass_op_coefs = mass_op_coefs[self.free_vars_is][:, self.free_vars_is]
+        self.stiff_op_coefs = stiff_op_coefs[self.free_vars_is][:, self.free_vars_is]
+        self.stiff_fxd_srcs = stiff_op_coefs[self.free_vars_is][:, self.fxd_vars_is] @ self.fxd_vals
+        self.lumped_mass = np.asarray(self.mass_op_coefs.sum(axis=1)).ravel()
+
+        self.srcs = srcs
+        self.num_of_vars = num_of_vars
+
+        # Step matrix, rebuilt only when its coefficient changes
+        self.step_coef = None
+        self.step_op_coefs = None
+        self.fctrztn_cache = FactorizationCache(fctrztn_mthd)
+
+    @classmethod
+    def from_kernels(
+        cls,
+        els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+        nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+        mass_kernel : ElementKernelType,
+        stiff_kernel : ElementKernelType,
+        srcs_kernel : ElementSourcesKernelType = None,
+        nds_vars_is : Annotated[NumericMatrixValueType, Literal["(total nodes, variables per node)"]] = None,
+        **kwargs
+        ) -> "TimeIntegrator":
+
+        mass_op_coefs, _ = assemble(els_nds_is, nds_vec_crds, mass_kernel, nds_vars_is)
+        stiff_op_coefs, srcs = assemble(els_nds_is, nds_vec_crds, stiff_kernel, nds_vars_is, srcs_kernel)
+        if "srcs" not in kwargs:
+            kwargs["srcs"] = srcs
+
+        return cls(mass_op_coefs, stiff_op_coefs, **kwargs)
+
+    def evaluate_sources(
+        self,
+        t : NumericDecimalValueType
+        ) -> Annotated[NumericVectorValueType, Literal["(total free variables,)"]]:
+
+        result = -self.stiff_fxd_srcs
+        if self.srcs is None:
+            return result
+        srcs = self.srcs(t) if callable(self.srcs) else self.srcs
+        return result + np.asarray(srcs)[self.free_vars_is]
+
+    def get_step_op_coefs(
+        self,
+        step_coef : NumericDecimalValueType
+        ) -> NumericSparseMatrixValueType:
+
+        # Keep the same matrix object for as long as the coefficient is unchanged, so the factorization cache keeps hitting
+        if step_coef != self.step_coef:
+            self.step_op_coefs = sps.csc_array(self.mass_op_coefs + step_coef * self.stiff_op_coefs)
+            self.step_coef = step_coef
+        return self.step_op_coefs
+
+    def solve_step(
+        self,
+        step_coef : NumericDecimalValueType,
+        srcs : Annotated[NumericVectorValueType, Literal["(total free variables,)"]]
+        ) -> Annotated[NumericVectorValueType, Literal["(total free variables,)"]]:
+
+        step_op_coefs = self.get_step_op_coefs(step_coef)
+        return self.fctrztn_cache.solve(step_op_coefs, srcs, vrsn=step_coef)
+
+    def compute_rate(
+        self,
+        u_free : Annotated[NumericVectorValueType, Literal["(total free variables,)"]],
+        t : NumericDecimalValueType
+        ) -> Annotated[NumericVectorValueType, Literal["(total free variables,)"]]:
+
+        # u̇ = M_L⁻¹·(f - K·u)
+        return (self.evaluate_sources(t) - self.stiff_op_coefs @ u_free) / self.lumped_mass
+
+    def step(
+        self,
+        u : SolutionType,
+        t : NumericDecimalValueType,
+        dt : NumericDecimalValueType,
+        u_prev : SolutionType = None
+        ) -> SolutionType:
+        """
+        Advances `u` from `t` to `t + dt`. BDF2 needs the previous solution `u_prev`, and falls back to an implicit Euler step without it (e.g. on the first step).
+        """
+
+        u_free = u[self.free_vars_is]
+
+        match self.scheme:
+            case TimeScheme.IMPLICIT_EULER | TimeScheme.CRANK_NICOLSON:
+                θ = THETA_SCHEMES_THETAS[self.scheme]
+                srcs = self.mass_op_coefs @ u_free + dt * θ * self.evaluate_sources(t + dt)
+                if θ != 1.0:
+                    srcs += dt * (1 - θ) * (self.evaluate_sources(t) - self.stiff_op_coefs @ u_free)
+                u_free_new = self.solve_step(θ * dt, srcs)
+            case TimeScheme.BDF2:
+                if u_prev is None:
+                    srcs = self.mass_op_coefs @ u_free + dt * self.evaluate_sources(t + dt)
+                    u_free_new = self.solve_step(dt, srcs)
+                else:
+                    # (M + ⅔Δt·K)·uⁿ⁺¹ = M·(4uⁿ - uⁿ⁻¹)/3 + ⅔Δt·fⁿ⁺¹
+                    u_prev_free = u_prev[self.free_vars_is]
+                    srcs = self.mass_op_coefs @ ((4*u_free - u_prev_free) / 3) + (2/3) * dt * self.evaluate_sources(t + dt)
+                    u_free_new = self.solve_step((2/3) * dt, srcs)
+            case TimeScheme.EXPLICIT_RK4:
+                k1 = self.compute_rate(u_free, t)
+                k2 = self.compute_rate(u_free + 0.5*dt*k1, t + 0.5*dt)
+                k3 = self.compute_rate(u_free + 0.5*dt*k2, t + 0.5*dt)
+                k4 = self.compute_rate(u_free + dt*k3, t + dt)
+                u_free_new = u_free + (dt/6) * (k1 + 2*k2 + 2*k3 + k4)
+            case _:
+                raise ValueError(f"Unsupported time scheme {self.scheme}.")
+
+        result = np.empty(self.num_of_vars)
+        result[self.free_vars_is] = u_free_new
+        result[self.fxd_vars_is] = self.fxd_vals
+
+        return result
+
+    def integrate(
+        self,
+        u0 : SolutionType,
+        t0 : NumericDecimalValueType,
+        t_end : NumericDecimalValueType,
+        dt : NumericDecimalValueType,
+        callback : Callable[[NumericIntegerValueType, NumericDecimalValueType, SolutionType], Any] = None
+        ) -> SolutionType:
+
+        u = np.array(u0, dtype=float)
+        u_prev = None
+        t = t0
+        itr = 0
+        while t_end - t > TIME_TOL * dt:
+            curr_dt = compute_step_size(t, t_end, dt)
+            u, u_prev = self.step(u, t, curr_dt, u_prev if curr_dt == dt else None), u
+            t = advance_time(t, curr_dt, t_end, dt)
+            itr += 1
+            if callback is not None:
+                callback(itr, t, u)
+
+        return u
+
+    def run(
+        self,
+        sim : "Simulation",
+        t_end : NumericDecimalValueType,
+        dt : NumericDecimalValueType,
+        chkptr : Checkpointer = None
+        ) -> SolutionType:
+        """
+        Advances a `Simulation` from its current `(t, itr, soln)` state to `t_end`, checkpointing as `chkptr` comes due.
+        The previous solution is checkpointed too, so a restarted BDF2 run resumes without dropping to first order.
+        """
+
+        u = np.array(sim.soln, dtype=float)
+        u_prev = getattr(sim, "soln_prev", None)
+        while t_end - sim.t > TIME_TOL * dt:
+            curr_dt = compute_step_size(sim.t, t_end, dt)
+            u, u_prev = self.step(u, sim.t, curr_dt, u_prev if curr_dt == dt else None), u
+            sim.t = advance_time(sim.t, curr_dt, t_end, dt)
+            sim.itr += 1
+            sim.soln = u
+            sim.soln_prev = u_prev
+            if chkptr is not None:
+                sim.checkpoint(chkptr, extra_arrays={"soln_prev": u_prev})
+
+        return u
@@ -0,0 +1,709 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+from dataclasses import dataclass, field
+from enum import Enum
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh
+
+
+'''
+Script-specific typing setup
+'''
+
+SolutionType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+IndicatorsType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total elements,)"]]
+SourceFunctionType : TypeAlias = Callable[[Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]], NumericVectorValueType]
+
+class RefinementType(Enum):
+    H = "h"
+    P = "p"
+    HP = "hp"
+
+# Element kinds supported by h-refinement, keyed by (dimensionality, vertices per element)
+LINE = (1, 2)
+TRIANGLE = (2, 3)
+QUADRILATERAL = (2, 4)
+
+# Local vertex pairs of each element edge, in the same cyclic order as the element's vertices
+ELEMENTS_EDGES_LOC_IS = {
+    LINE: ((0, 1),),
+    TRIANGLE: ((0, 1), (1, 2), (2, 0)),
+    QUADRILATERAL: ((0, 1), (1, 2), (2, 3), (3, 0))
+    }
+# Element kinds supporting orders > 1, with the hierarchical tensor-product bases of `elements/basis.py`
+HIERARCHICAL_KINDS = (LINE, QUADRILATERAL)
+# Local variables of tensor-product (lexicographic) index (i, j) ⟼ (local edge, local vertex at ξ = -1, local vertex at ξ = +1) of quadrilateral edge modes, in terms of the 1D function index (0, 1 or bubble)
+QUADRILATERAL_EDGES_MODES = {
+    # Bubble in ξ on η = ∓1
+    (None, 0): (0, 0, 1),
+    (None, 1): (2, 3, 2),
+    # Bubble in η on ξ = ∓1
+    (0, None): (3, 0, 3),
+    (1, None): (1, 1, 2)
+    }
+# Children of a refined element in terms of its local vertices (0, 1, ...), its edges' midpoints ("m0", "m1", ...) and, for quadrilaterals, its center ("c")
+ELEMENTS_CHILDREN = {
+    LINE: ((0, "m0"), ("m0", 1)),
+    TRIANGLE: ((0, "m0", "m2"), ("m0", 1, "m1"), ("m2", "m1", 2), ("m0", "m1", "m2")),
+    QUADRILATERAL: ((0, "m0", "c", "m3"), ("m0", 1, "m1", "c"), ("c", "m1", 2, "m2"), ("m3", "c", "m2", 3))
+    }
+
+
+'''
+Element geometry
+'''
+
+def compute_elements_volumes(
+    mesh : Mesh
+    ) -> Annotated[NumericVectorValueType, Literal["(total elements,)"]]:
+
+    els_nds_vec_crds = mesh.nds_vec_crds[mesh.els_nds_is]
+    match (mesh.dimalty, mesh.els_nds_is.shape[1]):
+        case (1, 2):
+            return np.abs(els_nds_vec_crds[:, 1, 0] - els_nds_vec_crds[:, 0, 0])
+        # Shoelace formula, for any (convex or not) polygon with cyclically ordered vertices
+        case (2, _):
+            x = els_nds_vec_crds[:, :, 0]
+            y = els_nds_vec_crds[:, :, 1]
+            return 0.5 * np.abs(np.sum(x * np.roll(y, -1, axis=1) - np.roll(x, -1, axis=1) * y, axis=1))
+        case (3, 4):
+            edges = els_nds_vec_crds[:, 1:, :] - els_nds_vec_crds[:, :1, :]
+            return np.abs(np.linalg.det(edges)) / 6
+        case (3, 8):
+            # Six tetrahedra around the 0-6 diagonal (VTK ordering)
+            result = np.zeros(len(els_nds_vec_crds))
+            for curr_a_i, curr_b_i in ((1, 2), (2, 3), (3, 7), (7, 4), (4, 5), (5, 1)):
+                edges = np.stack([
+                    els_nds_vec_crds[:, curr_a_i] - els_nds_vec_crds[:, 0],
+                    els_nds_vec_crds[:, curr_b_i] - els_nds_vec_crds[:, 0],
+                    els_nds_vec_crds[:, 6] - els_nds_vec_crds[:, 0]
+                    ], axis=1)
+                result += np.abs(np.linalg.det(edges)) / 6
+            return result
+        case _:
+            raise ValueError(f"Element volumes are not supported for {mesh.els_nds_is.shape[1]}-node elements in {mesh.dimalty}D.")
+
+def compute_elements_diameters(
+    mesh : Mesh
+    ) -> Annotated[NumericVectorValueType, Literal["(total elements,)"]]:
+
+    els_nds_vec_crds = mesh.nds_vec_crds[mesh.els_nds_is]
+    dists = np.linalg.norm(els_nds_vec_crds[:, :, None, :] - els_nds_vec_crds[:, None, :, :], axis=-1)
+    return dists.max(axis=(1, 2))
+
+def compute_elements_gradients(
+    mesh : Mesh,
+    soln : SolutionType
+    ) -> Annotated[NumericMatrixValueType, Literal["(total elements, dimensions)"]]:
+    """
+    Element gradients of a nodal solution, as the least-squares linear fit through each element's nodal values.
+
+    This is the exact gradient for linear simplices, and the centroid gradient for (bi/tri)linear elements on parallelepipeds, since the higher-order terms are orthogonal to linear functions on their symmetric vertex sets.
+    """
+
+    els_nds_vec_crds = mesh.nds_vec_crds[mesh.els_nds_is]
+    els_nds_vals = soln[mesh.nds_vars_is[mesh.els_nds_is, 0]]
+
+    els_dx = els_nds_vec_crds - els_nds_vec_crds.mean(axis=1, keepdims=True)
+    els_du = els_nds_vals - els_nds_vals.mean(axis=1, keepdims=True)
+    # Normal equations: (dXᵀ·dX)·g = dXᵀ·du
+    return np.linalg.solve(
+        els_dx.transpose(0, 2, 1) @ els_dx,
+        (els_dx.transpose(0, 2, 1) @ els_du[:, :, None])
+        )[:, :, 0]
+
+
+'''
+A posteriori error estimation
+'''
+
+def estimate_recovery_errors(
+    mesh : Mesh,
+    soln : SolutionType
+    ) -> IndicatorsType:
+    """
+    Zienkiewicz–Zhu (recovery-based) error indicators `η_K = ‖G(u_h) - ∇u_h‖_K`, where the recovered gradient `G(u_h)` is the volume-weighted average of the element gradients around each node.
+    The norm is approximated with nodal quadrature over the element's vertices.
+    """
+
+    els_vols = compute_elements_volumes(mesh)
+    els_grads = compute_elements_gradients(mesh, soln)
+
+    # Recovered nodal gradients
+    num_of_el_nds = mesh.els_nds_is.shape[1]
+    nds_wghts = np.bincount(mesh.els_nds_is.ravel(), weights=np.repeat(els_vols, num_of_el_nds), minlength=mesh.num_of_nds)
+    nds_grads = np.stack([
+        np.bincount(mesh.els_nds_is.ravel(), weights=np.repeat(els_vols * els_grads[:, curr_dim_i], num_of_el_nds), minlength=mesh.num_of_nds)
+        for curr_dim_i in range(mesh.dimalty)
+        ], axis=1) / np.maximum(nds_wghts, np.finfo(float).tiny)[:, None]
+
+    errs = nds_grads[mesh.els_nds_is] - els_grads[:, None, :]
+    return np.sqrt(els_vols * np.mean(np.sum(errs**2, axis=-1), axis=1))
+
+def compute_facets(
+    mesh : Mesh
+    ) -> Tuple[
+        Annotated[NumericMatrixValueType, Literal["(total interior facets, 2)"]],
+        Annotated[NumericMatrixValueType, Literal["(total interior facets, 2)"]]
+        ]:
+    """
+    Interior facets of a conforming 1D/2D mesh: the two elements sharing each, and its nodes (in 1D, both entries are the shared node).
+    """
+
+    el_kind = (mesh.dimalty, mesh.els_nds_is.shape[1])
+    if el_kind == LINE:
+        facets_nds_is = mesh.els_nds_is.reshape(-1, 1).repeat(2, axis=1)
+    elif el_kind in ELEMENTS_EDGES_LOC_IS:
+        edges_loc_is = np.array(ELEMENTS_EDGES_LOC_IS[el_kind])
+        facets_nds_is = np.sort(mesh.els_nds_is[:, edges_loc_is].reshape(-1, 2), axis=1)
+    else:
+        raise ValueError(f"Facets are only supported for lines, triangles and quadrilaterals.")
+    facets_els_is = np.repeat(np.arange(mesh.num_of_els), len(facets_nds_is) // mesh.num_of_els)
+
+    # Interior facets appear exactly twice
+    _, facets_ids, facets_cnts = np.unique(facets_nds_is, axis=0, return_inverse=True, return_counts=True)
+    facets_ids = facets_ids.ravel()
+    ordr = np.argsort(facets_ids, kind="stable")
+    sorted_ids = facets_ids[ordr]
+    pairs_mask = (sorted_ids[:-1] == sorted_ids[1:])
+    first_is = ordr[:-1][pairs_mask]
+    second_is = ordr[1:][pairs_mask]
+
+    return (
+        np.stack([facets_els_is[first_is], facets_els_is[second_is]], axis=1),
+        facets_nds_is[first_is]
+        )
+
+def estimate_residual_errors(
+    mesh : Mesh,
+    soln : SolutionType,
+    src_fn : SourceFunctionType = None
+    ) -> IndicatorsType:
+    """
+    Residual-based error indicators for `-∇²u = f` with (bi)linear elements: `η_K² = h_K²‖f‖²_K + ½Σ_F h_F‖[∇u_h·n]‖²_F`, summing over the interior facets `F` of `K`.
+
+    The element residual uses a one-point (centroid) quadrature of `f`, and gradient jumps use the element gradients from `compute_elements_gradients()`.
+    Hanging-node facets, being non-matching, contribute no jump term.
+    """
+
+    els_vols = compute_elements_volumes(mesh)
+    els_diams = compute_elements_diameters(mesh)
+    els_grads = compute_elements_gradients(mesh, soln)
+
+    errs_sqrd = np.zeros(mesh.num_of_els)
+    if src_fn is not None:
+        els_cntrs = mesh.nds_vec_crds[mesh.els_nds_is].mean(axis=1)
+        errs_sqrd += els_diams**2 * els_vols * np.asarray(src_fn(els_cntrs))**2
+
+    facets_els_is, facets_nds_is = compute_facets(mesh)
+    if mesh.dimalty == 1:
+        facets_lens = np.ones(len(facets_els_is))
+        jumps = els_grads[facets_els_is[:, 0], 0] - els_grads[facets_els_is[:, 1], 0]
+    else:
+        facets_tngnts = mesh.nds_vec_crds[facets_nds_is[:, 1]] - mesh.nds_vec_crds[facets_nds_is[:, 0]]
+        facets_lens = np.linalg.norm(facets_tngnts, axis=1)
+        facets_nrmls = np.stack([facets_tngnts[:, 1], -facets_tngnts[:, 0]], axis=1) / facets_lens[:, None]
+        jumps = np.sum((els_grads[facets_els_is[:, 0]] - els_grads[facets_els_is[:, 1]]) * facets_nrmls, axis=1)
+    # ∫_F h_F·jump² dS, shared equally between the facet's two elements
+    facets_errs_sqrd = 0.5 * facets_lens * facets_lens * jumps**2
+    errs_sqrd += np.bincount(facets_els_is.ravel(), weights=np.repeat(facets_errs_sqrd, 2), minlength=mesh.num_of_els)
+
+    return np.sqrt(errs_sqrd)
+
+
+'''
+Marking
+'''
+
+def mark_dorfler(
+    errs : IndicatorsType,
+    θ : NumericDecimalValueType = 0.5
+    ) -> Annotated[NumericVectorValueType, Literal["(total marked elements,)"]]:
+    """
+    Dörfler (bulk) marking: the smallest set of elements `M` with `Σ_M η_K² ≥ θ·Σ η_K²`.
+    """
+
+    errs_sqrd = errs**2
+    ordr = np.argsort(errs_sqrd)[::-1]
+    cum_errs_sqrd = np.cumsum(errs_sqrd[ordr])
+    num_of_marked = int(np.searchsorted(cum_errs_sqrd, θ * cum_errs_sqrd[-1])) + 1
+
+    return np.sort(ordr[:min(num_of_marked, len(errs))])
+
+
+'''
+Refinement
+'''
+
+def encode_edges(
+    edges_nds_is : Annotated[NumericMatrixValueType, Literal["(total edges, 2)"]],
+    num_of_nds : NumericIntegerValueType
+    ) -> Annotated[NumericVectorValueType, Literal["(total edges,)"]]:
+
+    # Orientation-independent integer key per edge
+    edges_nds_is = np.sort(edges_nds_is, axis=1)
+    return edges_nds_is[:, 0].astype(np.int64) * num_of_nds + edges_nds_is[:, 1]
+
+def close_marking(
+    mesh : Mesh,
+    marked_els_mask : Annotated[NumericVectorValueType, Literal["(total elements,)"]]
+    ) -> Annotated[NumericVectorValueType, Literal["(total elements,)"]]:
+    """
+    Extends the marking until refinement keeps the mesh 1-irregular: an element with a hanging vertex can only be refined together with the coarse neighbor(s) owning that hanging node's master edge.
+    """
+
+    if len(mesh.hngng_nds_is) == 0:
+        return marked_els_mask
+
+    el_kind = (mesh.dimalty, mesh.els_nds_is.shape[1])
+    edges_loc_is = np.array(ELEMENTS_EDGES_LOC_IS[el_kind])
+    els_edges_keys = encode_edges(mesh.els_nds_is[:, edges_loc_is].reshape(-1, 2), mesh.num_of_nds).reshape(mesh.num_of_els, -1)
+    hngng_nds_keys = encode_edges(mesh.hngng_nds_mstrs_is, mesh.num_of_nds)
+    hngng_nds_mask = np.zeros(mesh.num_of_nds, dtype=bool)
+    hngng_nds_mask[mesh.hngng_nds_is] = True
+    hngng_nds_slots = np.full(mesh.num_of_nds, -1)
+    hngng_nds_slots[mesh.hngng_nds_is] = np.arange(len(mesh.hngng_nds_is))
+
+    marked_els_mask = marked_els_mask.copy()
+    while True:
+        # Master edges of the hanging vertices of marked elements
+        marked_nds_is = mesh.els_nds_is[marked_els_mask].ravel()
+        marked_hngng_nds_is = np.unique(marked_nds_is[hngng_nds_mask[marked_nds_is]])
+        reqd_keys = hngng_nds_keys[hngng_nds_slots[marked_hngng_nds_is]]
+        # Coarse elements owning those edges
+        new_marked_els_mask = marked_els_mask | np.isin(els_edges_keys, reqd_keys).any(axis=1)
+        if np.array_equal(new_marked_els_mask, marked_els_mask):
+            return marked_els_mask
+        marked_els_mask = new_marked_els_mask
+
+def refine_h(
+    mesh : Mesh,
+    marked_els_is : Annotated[NumericVectorValueType, Literal["(total marked elements,)"]]
+    ) -> Tuple[Mesh, NumericSparseMatrixValueType]:
+    """
+    Uniformly subdivides the marked lines (into 2), triangles or quadrilaterals (into 4), reusing existing hanging nodes as edge midpoints.
+    Unrefined neighbors of refined 2D elements are not touched; the new edge midpoints on their edges become hanging nodes, constrained to the average of the edge's end nodes.
+
+    Returns the refined mesh and the prolongation (interpolation) matrix from the old nodes to the new nodes, e.g. for transferring solutions and building multigrid hierarchies.
+    """
+
+    el_kind = (mesh.dimalty, mesh.els_nds_is.shape[1])
+    if el_kind not in ELEMENTS_CHILDREN:
+        raise ValueError(f"h-refinement is only supported for lines, triangles and quadrilaterals.")
+    num_of_nds = mesh.num_of_nds
+
+    marked_els_mask = np.zeros(mesh.num_of_els, dtype=bool)
+    marked_els_mask[marked_els_is] = True
+    marked_els_mask = close_marking(mesh, marked_els_mask)
+    marked_els_is = np.flatnonzero(marked_els_mask)
+    marked_els_nds_is = mesh.els_nds_is[marked_els_is]
+
+    # Edge midpoints: reuse hanging nodes where they already exist, otherwise create new nodes
+    edges_loc_is = np.array(ELEMENTS_EDGES_LOC_IS[el_kind])
+    marked_edges_nds_is = marked_els_nds_is[:, edges_loc_is].reshape(-1, 2)
+    marked_edges_keys = encode_edges(marked_edges_nds_is, num_of_nds)
+    unq_keys, unq_is, marked_edges_ids = np.unique(marked_edges_keys, return_index=True, return_inverse=True)
+    unq_edges_nds_is = np.sort(marked_edges_nds_is[unq_is], axis=1)
+
+    hngng_nds_keys = encode_edges(mesh.hngng_nds_mstrs_is, num_of_nds)
+    exstng_mask = np.isin(unq_keys, hngng_nds_keys)
+    hngng_ordr = np.argsort(hngng_nds_keys)
+    hngng_slots = np.searchsorted(hngng_nds_keys[hngng_ordr], unq_keys[exstng_mask])
+
+    unq_mids_is = np.empty(len(unq_keys), dtype=np.int64)
+    unq_mids_is[exstng_mask] = mesh.hngng_nds_is[hngng_ordr[hngng_slots]]
+    num_of_new_mids = int(np.count_nonzero(~exstng_mask))
+    unq_mids_is[~exstng_mask] = num_of_nds + np.arange(num_of_new_mids)
+    new_mids_nds_is = unq_edges_nds_is[~exstng_mask]
+
+    # Quadrilateral centers are always new
+    num_of_new_cntrs = len(marked_els_is) if el_kind == QUADRILATERAL else 0
+    new_cntrs_is = num_of_nds + num_of_new_mids + np.arange(num_of_new_cntrs)
+
+    # New node coordinates & prolongation rows (averages of the parent nodes)
+    new_nds_vec_crds = np.concatenate([
+        mesh.nds_vec_crds,
+        mesh.nds_vec_crds[new_mids_nds_is].mean(axis=1),
+        mesh.nds_vec_crds[marked_els_nds_is].mean(axis=1) if num_of_new_cntrs else np.zeros((0, mesh.dimalty))
+        ])
+    new_num_of_nds = len(new_nds_vec_crds)
+    prlngtn = sps.csr_array(
+        (
+            np.concatenate([np.ones(num_of_nds), np.full(2*num_of_new_mids, 0.5), np.full(4*num_of_new_cntrs, 0.25)]),
+            (
+                np.concatenate([np.arange(num_of_nds), np.repeat(num_of_nds + np.arange(num_of_new_mids), 2), np.repeat(new_cntrs_is, 4)]),
+                np.concatenate([np.arange(num_of_nds), new_mids_nds_is.ravel(), marked_els_nds_is.ravel() if num_of_new_cntrs else np.zeros(0, dtype=int)])
+                )
+            ),
+        shape = (new_num_of_nds, num_of_nds)
+        )
+
+    # Children connectivity
+    marked_els_mids_is = unq_mids_is[marked_edges_ids].reshape(len(marked_els_is), -1)
+    def resolve(loc):
+        if isinstance(loc, int):
+            return marked_els_nds_is[:, loc]
+        if loc == "c":
+            return new_cntrs_is
+        return marked_els_mids_is[:, int(loc[1:])]
+    children = [
+        np.stack([resolve(curr_loc) for curr_loc in curr_child], axis=1)
+        for curr_child in ELEMENTS_CHILDREN[el_kind]
+        ]
+    num_of_children = len(children)
+    kept_els_is = np.flatnonzero(~marked_els_mask)
+    new_els_nds_is = np.concatenate([mesh.els_nds_is[kept_els_is], *children])
+    new_els_prnts_is = np.concatenate([kept_els_is, np.tile(marked_els_is, num_of_children)])
+
+    # Hanging nodes: midpoints (old or new) whose parent edge still exists in the refined mesh
+    new_els_edges_keys = encode_edges(new_els_nds_is[:, edges_loc_is].reshape(-1, 2), new_num_of_nds)
+    cand_mstrs_is = np.concatenate([mesh.hngng_nds_mstrs_is, new_mids_nds_is]).astype(np.int64)
+    cand_nds_is = np.concatenate([mesh.hngng_nds_is, unq_mids_is[~exstng_mask]]).astype(np.int64)
+    hngng_mask = np.isin(encode_edges(cand_mstrs_is, new_num_of_nds), new_els_edges_keys) if len(cand_nds_is) else np.zeros(0, dtype=bool)
+    if el_kind == LINE:
+        hngng_mask[:] = False
+
+    # Orders & tags are inherited from parents; the node ⟼ variable map is renumbered from scratch
+    refined_mesh = Mesh(
+        new_nds_vec_crds,
+        new_els_nds_is,
+        els_tags = mesh.els_tags[new_els_prnts_is],
+        nds_tags = np.concatenate([mesh.nds_tags, np.zeros(new_num_of_nds - num_of_nds, dtype=mesh.nds_tags.dtype)]),
+        els_ords = mesh.els_ords[new_els_prnts_is],
+        hngng_nds_is = cand_nds_is[hngng_mask],
+        hngng_nds_mstrs_is = cand_mstrs_is[hngng_mask],
+        hngng_nds_wghts = np.full((int(np.count_nonzero(hngng_mask)), 2), 0.5),
+        vrsn = mesh.vrsn + 1
+        )
+
+    return refined_mesh, prlngtn
+
+def refine_p(
+    mesh : Mesh,
+    marked_els_is : Annotated[NumericVectorValueType, Literal["(total marked elements,)"]],
+    max_ord : NumericIntegerValueType = 10
+    ) -> Tuple[Mesh, NumericSparseMatrixValueType]:
+    """
+    Raises the order of the marked elements by one (up to `max_ord`), leaving the geometry untouched.
+    The hierarchical space of the result contains the previous one, so `compute_variables_prolongation()` transfers solutions exactly; the returned (node) prolongation is the identity.
+    """
+
+    if (mesh.dimalty, mesh.els_nds_is.shape[1]) not in HIERARCHICAL_KINDS:
+        raise ValueError(f"p-refinement is only supported for lines and quadrilaterals.")
+
+    els_ords = mesh.els_ords.copy()
+    els_ords[marked_els_is] = np.minimum(els_ords[marked_els_is] + 1, max_ord)
+
+    refined_mesh = Mesh(
+        mesh.nds_vec_crds,
+        mesh.els_nds_is,
+        nds_vars_is = mesh.nds_vars_is,
+        els_tags = mesh.els_tags,
+        nds_tags = mesh.nds_tags,
+        els_ords = els_ords,
+        hngng_nds_is = mesh.hngng_nds_is,
+        hngng_nds_mstrs_is = mesh.hngng_nds_mstrs_is,
+        hngng_nds_wghts = mesh.hngng_nds_wghts,
+        vrsn = mesh.vrsn + 1
+        )
+
+    return refined_mesh, sps.eye_array(mesh.num_of_nds, format="csr")
+
+def split_hp_marking(
+    mesh : Mesh,
+    soln : SolutionType,
+    errs : IndicatorsType,
+    marked_els_is : Annotated[NumericVectorValueType, Literal["(total marked elements,)"]],
+    smth_tol : NumericDecimalValueType = 0.1,
+    max_ord : NumericIntegerValueType = 10
+    ) -> Tuple[
+        Annotated[NumericVectorValueType, Literal["(total h-marked elements,)"]],
+        Annotated[NumericVectorValueType, Literal["(total p-marked elements,)"]]
+        ]:
+    """
+    Splits marked elements into h- and p-refinement: where the error is small relative to the local gradient energy (`η_K ≤ smth_tol·‖∇u_h‖_K`), the solution is locally smooth and raising the order pays off; elsewhere (near singularities and layers) the element is subdivided.
+    Elements with non-matching edges keep linear traces there (see `compute_hierarchical_variables()`), so they are always subdivided.
+    """
+
+    els_grads = compute_elements_gradients(mesh, soln)
+    els_grad_norms = np.sqrt(compute_elements_volumes(mesh)) * np.linalg.norm(els_grads, axis=1)
+
+    nonmtchng_els_mask = np.isin(mesh.els_nds_is, mesh.hngng_nds_is).any(axis=1)
+    if len(mesh.hngng_nds_is):
+        edges_loc_is = np.array(ELEMENTS_EDGES_LOC_IS[(mesh.dimalty, mesh.els_nds_is.shape[1])])
+        els_edges_keys = encode_edges(mesh.els_nds_is[:, edges_loc_is].reshape(-1, 2), mesh.num_of_nds).reshape(mesh.num_of_els, -1)
+        nonmtchng_els_mask |= np.isin(els_edges_keys, encode_edges(mesh.hngng_nds_mstrs_is, mesh.num_of_nds)).any(axis=1)
+
+    smth_mask = (errs[marked_els_is] <= smth_tol * els_grad_norms[marked_els_is]) & (mesh.els_ords[marked_els_is] < max_ord) & ~nonmtchng_els_mask[marked_els_is]
+
+    return marked_els_is[~smth_mask], marked_els_is[smth_mask]
+
+
+'''
+Hierarchical variables
+'''
+
+@dataclass
+class HierarchicalVariables:
+    """
+    Variable numbering of the continuous hierarchical space with the per-element orders of `mesh.els_ords`: tensor-product integrated Legendre bases (see `elements/basis.py`) on lines and quadrilaterals.
+
+    The mesh's own (nodal) variables come first as the vertex modes, followed by every edge's modes and every element's interior (bubble) modes, so order-1 meshes keep exactly their mesh variables.
+    Edges take the lowest order of the elements sharing them (minimum rule), and non-matching edges (at hanging nodes) keep linear traces, so the space stays conforming.
+    Edge modes are oriented from the lower to the higher node index; odd modes change sign on elements traversing the edge the other way.
+
+    Elements are grouped by order, with local variables in tensor-product layout (first dimension fastest); local functions left out by a lower-order edge have sign 0.
+    """
+
+    num_of_vars : NumericIntegerValueType
+    ords_els_is : Dict[NumericIntegerValueType, Annotated[NumericVectorValueType, Literal["(total elements of the order,)"]]]
+    ords_els_vars_is : Dict[NumericIntegerValueType, Annotated[NumericMatrixValueType, Literal["(total elements of the order, (order+1)^dimensions)"]]]
+    ords_els_sgns : Dict[NumericIntegerValueType, Annotated[NumericMatrixValueType, Literal["(total elements of the order, (order+1)^dimensions)"]]]
+    # Edges by key (see `encode_edges()`), with their order and first variable
+    edges_keys : Annotated[NumericVectorValueType, Literal["(total edges,)"]]
+    edges_ords : Annotated[NumericVectorValueType, Literal["(total edges,)"]]
+    edges_vars_offsets : Annotated[NumericVectorValueType, Literal["(total edges,)"]]
+    els_vars_offsets : Annotated[NumericVectorValueType, Literal["(total elements,)"]]
+    # Vertex & edge variables on the domain boundary, e.g. for Dirichlet conditions
+    bndry_vars_is : Annotated[NumericVectorValueType, Literal["(total boundary variables,)"]]
+
+def compute_hierarchical_variables(
+    mesh : Mesh
+    ) -> HierarchicalVariables:
+
+    el_kind = (mesh.dimalty, mesh.els_nds_is.shape[1])
+    if el_kind not in HIERARCHICAL_KINDS:
+        raise ValueError(f"Hierarchical spaces are only supported on lines and quadrilaterals.")
+    if mesh.nds_vars_is.shape[1] != 1:
+        raise ValueError(f"Hierarchical spaces need exactly one variable per node, not {mesh.nds_vars_is.shape[1]}.")
+
+    num_of_nds = mesh.num_of_nds
+    num_of_els = mesh.num_of_els
+    dimalty = mesh.dimalty
+    els_ords = np.asarray(mesh.els_ords, dtype=np.int64)
+    nds_vars_is = mesh.nds_vars_is[:, 0]
+    hngng_nds_mask = np.zeros(num_of_nds, dtype=bool)
+    hngng_nds_mask[mesh.hngng_nds_is] = True
+
+    # Edges: the facets of quadrilaterals only, as 1D elements have no modes shared with neighbors beyond their vertices
+    if el_kind == QUADRILATERAL:
+        edges_loc_is = np.array(ELEMENTS_EDGES_LOC_IS[el_kind])
+        els_edges_keys = encode_edges(mesh.els_nds_is[:, edges_loc_is].reshape(-1, 2), num_of_nds)
+        edges_keys, els_edges_ids, edges_cnts = np.unique(els_edges_keys, return_inverse=True, return_counts=True)
+        els_edges_ids = els_edges_ids.reshape(num_of_els, -1)
+        edges_nds_is = np.stack([edges_keys // num_of_nds, edges_keys % num_of_nds], axis=1)
+
+        edges_ords = np.full(len(edges_keys), els_ords.max(initial=1))
+        np.minimum.at(edges_ords, els_edges_ids.ravel(), np.repeat(els_ords, len(edges_loc_is)))
+        nonmtchng_mask = hngng_nds_mask[edges_nds_is].any(axis=1) | np.isin(edges_keys, encode_edges(mesh.hngng_nds_mstrs_is, num_of_nds))
+        edges_ords[nonmtchng_mask] = 1
+        bndry_edges_mask = (edges_cnts == 1) & ~nonmtchng_mask
+        bndry_nds_is = np.unique(edges_nds_is[bndry_edges_mask])
+    else:
+        edges_keys = np.zeros(0, dtype=np.int64)
+        edges_ords = np.zeros(0, dtype=np.int64)
+        edges_nds_is = np.zeros((0, 2), dtype=np.int64)
+        bndry_edges_mask = np.zeros(0, dtype=bool)
+        nds_cnts = np.bincount(mesh.els_nds_is.ravel(), minlength=num_of_nds)
+        bndry_nds_is = np.flatnonzero(nds_cnts == 1)
+
+    edges_nums_of_vars = edges_ords - 1
+    edges_vars_offsets = mesh.num_of_vars + np.concatenate([[0], np.cumsum(edges_nums_of_vars)[:-1]]).astype(np.int64)
+    els_nums_of_vars = (els_ords - 1)**dimalty
+    els_vars_offsets = mesh.num_of_vars + int(edges_nums_of_vars.sum()) + np.concatenate([[0], np.cumsum(els_nums_of_vars)[:-1]]).astype(np.int64)
+    num_of_vars = mesh.num_of_vars + int(edges_nums_of_vars.sum()) + int(els_nums_of_vars.sum())
+
+    bndry_edges_is = np.flatnonzero(bndry_edges_mask)
+    bndry_vars_is = np.concatenate([
+        nds_vars_is[bndry_nds_is],
+        np.repeat(edges_vars_offsets[bndry_edges_is], edges_nums_of_vars[bndry_edges_is]) + compute_ranges(edges_nums_of_vars[bndry_edges_is])
+        ]).astype(np.int64)
+
+    ords_els_is, ords_els_vars_is, ords_els_sgns = {}, {}, {}
+    for curr_ord in np.unique(els_ords).tolist():
+        curr_els_is = np.flatnonzero(els_ords == curr_ord)
+        curr_els_nds_is = mesh.els_nds_is[curr_els_is]
+        curr_loc_is = np.stack(np.meshgrid(*[np.arange(curr_ord+1)]*dimalty, indexing="ij")[::-1], axis=-1).reshape(-1, dimalty)
+        curr_els_vars_is = np.zeros((len(curr_els_is), len(curr_loc_is)), dtype=np.int64)
+        curr_els_sgns = np.zeros((len(curr_els_is), len(curr_loc_is)))
+        for curr_fn_i, curr_loc in enumerate(curr_loc_is.tolist()):
+            bbbls = [curr_k for curr_k in curr_loc if curr_k >= 2]
+            # Vertex modes: the 1D functions (1∓ξ)/2 in every direction
+            if not bbbls:
+                curr_vrt_i = {(0,): 0, (1,): 1, (0, 0): 0, (1, 0): 1, (1, 1): 2, (0, 1): 3}[tuple(curr_loc)]
+                curr_els_vars_is[:, curr_fn_i] = nds_vars_is[curr_els_nds_is[:, curr_vrt_i]]
+                curr_els_sgns[:, curr_fn_i] = 1.0
+            # Interior modes: bubbles in every direction, first dimension fastest
+            elif len(bbbls) == dimalty:
+                intr_i = sum((curr_k - 2) * (curr_ord - 1)**curr_dim_i for curr_dim_i, curr_k in enumerate(curr_loc))
+                curr_els_vars_is[:, curr_fn_i] = els_vars_offsets[curr_els_is] + intr_i
+                curr_els_sgns[:, curr_fn_i] = 1.0
+            # Edge modes: kept up to the edge's order
+            else:
+                k = bbbls[0]
+                edge_loc_i, a_loc_i, b_loc_i = QUADRILATERAL_EDGES_MODES[tuple(None if curr_k >= 2 else curr_k for curr_k in curr_loc)]
+                curr_edges_ids = els_edges_ids[curr_els_is, edge_loc_i]
+                kept_mask = (k <= edges_ords[curr_edges_ids])
+                algnd_mask = curr_els_nds_is[:, a_loc_i] < curr_els_nds_is[:, b_loc_i]
+                curr_els_vars_is[:, curr_fn_i] = np.where(kept_mask, edges_vars_offsets[curr_edges_ids] + k - 2, 0)
+                curr_els_sgns[:, curr_fn_i] = kept_mask * np.where(algnd_mask, 1.0, (-1.0)**k)
+        ords_els_is[curr_ord] = curr_els_is
+        ords_els_vars_is[curr_ord] = curr_els_vars_is
+        ords_els_sgns[curr_ord] = curr_els_sgns
+
+    return HierarchicalVariables(
+        num_of_vars,
+        ords_els_is,
+        ords_els_vars_is,
+        ords_els_sgns,
+        edges_keys,
+        edges_ords,
+        edges_vars_offsets,
+        els_vars_offsets,
+        bndry_vars_is
+        )
+
+def compute_ranges(
+    lens : Annotated[NumericVectorValueType, Literal["(total ranges,)"]]
+    ) -> Annotated[NumericVectorValueType, Literal["(sum of lengths,)"]]:
+
+    # [0, ..., lens[0]-1, 0, ..., lens[1]-1, ...]
+    lens = np.asarray(lens, dtype=np.int64)
+    return np.arange(int(lens.sum())) - np.repeat(np.cumsum(lens) - lens, lens)
+
+def compute_variables_prolongation(
+    old_mesh : Mesh,
+    new_mesh : Mesh,
+    nds_prlngtn : NumericSparseMatrixValueType
+    ) -> Annotated[NumericSparseMatrixValueType, Literal["(total new variables, total old variables)"]]:
+    """
+    Variable-level prolongation from `old_mesh` to `new_mesh` (as returned by `refine_h()`/`refine_p()`, which keep the old node numbering), given their node prolongation.
+
+    Vertex modes are interpolated through `nds_prlngtn`; on meshes with orders > 1, the edge & interior modes of edges and elements present in both meshes are carried over one-to-one, which is exact for p-refinement.
+    The higher-order modes of subdivided edges and elements are dropped, so after h-refinement of such elements the result is only a (warm-start) approximation.
+    """
+
+    hrrchcl = (old_mesh.els_ords.max(initial=1) > 1) or (new_mesh.els_ords.max(initial=1) > 1)
+    if hrrchcl:
+        old_vars = compute_hierarchical_variables(old_mesh)
+        new_vars = compute_hierarchical_variables(new_mesh)
+        old_num_of_vars, new_num_of_vars = old_vars.num_of_vars, new_vars.num_of_vars
+    else:
+        old_num_of_vars, new_num_of_vars = old_mesh.num_of_vars, new_mesh.num_of_vars
+
+    # Vertex modes, variable-by-variable (the k-th variable of a new node follows the k-th variables of the old ones)
+    nds_prlngtn = sps.coo_array(nds_prlngtn)
+    num_of_vars_per_nd = new_mesh.nds_vars_is.shape[1]
+    rows_is = [new_mesh.nds_vars_is[nds_prlngtn.row].ravel()]
+    cols_is = [old_mesh.nds_vars_is[nds_prlngtn.col].ravel()]
+    wghts = [np.repeat(nds_prlngtn.data, num_of_vars_per_nd)]
+
+    if hrrchcl:
+        num_of_nds = new_mesh.num_of_nds
+
+        # Edges, matched by their (old) end nodes
+        old_edges_keys = encode_edges(np.stack([old_vars.edges_keys // old_mesh.num_of_nds, old_vars.edges_keys % old_mesh.num_of_nds], axis=1), num_of_nds)
+        new_edges_is = np.minimum(np.searchsorted(new_vars.edges_keys, old_edges_keys), max(len(new_vars.edges_keys) - 1, 0))
+        mtchd_mask = (new_vars.edges_keys[new_edges_is] == old_edges_keys) if len(new_vars.edges_keys) else np.zeros(len(old_edges_keys), dtype=bool)
+        old_edges_is = np.flatnonzero(mtchd_mask)
+        new_edges_is = new_edges_is[mtchd_mask]
+        edges_nums_of_vars = np.maximum(np.minimum(old_vars.edges_ords[old_edges_is], new_vars.edges_ords[new_edges_is]) - 1, 0)
+        mode_is = compute_ranges(edges_nums_of_vars)
+        rows_is.append(np.repeat(new_vars.edges_vars_offsets[new_edges_is], edges_nums_of_vars) + mode_is)
+        cols_is.append(np.repeat(old_vars.edges_vars_offsets[old_edges_is], edges_nums_of_vars) + mode_is)
+        wghts.append(np.ones(len(mode_is)))
+
+        # Elements, matched by their node sets
+        old_els_keys = np.sort(old_mesh.els_nds_is, axis=1)
+        new_els_keys = np.sort(new_mesh.els_nds_is, axis=1)
+        _, els_ids = np.unique(np.concatenate([old_els_keys, new_els_keys]), axis=0, return_inverse=True)
+        els_ids = els_ids.ravel()
+        new_els_is_by_id = np.full(int(els_ids.max()) + 1, -1)
+        new_els_is_by_id[els_ids[old_mesh.num_of_els:]] = np.arange(new_mesh.num_of_els)
+        old_to_new_els_is = new_els_is_by_id[els_ids[:old_mesh.num_of_els]]
+        dimalty = old_mesh.dimalty
+        for curr_old_ord, curr_old_els_is in old_vars.ords_els_is.items():
+            curr_new_els_is = old_to_new_els_is[curr_old_els_is]
+            curr_old_els_is = curr_old_els_is[curr_new_els_is >= 0]
+            curr_new_els_is = curr_new_els_is[curr_new_els_is >= 0]
+            for curr_new_ord in np.unique(new_mesh.els_ords[curr_new_els_is]).tolist():
+                curr_mask = new_mesh.els_ords[curr_new_els_is] == curr_new_ord
+                curr_ord = min(curr_old_ord, curr_new_ord)
+                if curr_ord < 2:
+                    continue
+                # Interior modes (k_0, k_1, ...) of both orders, first dimension fastest
+                curr_loc_is = np.stack(np.meshgrid(*[np.arange(curr_ord-1)]*dimalty, indexing="ij")[::-1], axis=-1).reshape(-1, dimalty)
+                old_intr_is = curr_loc_is @ ((curr_old_ord - 1)**np.arange(dimalty))
+                new_intr_is = curr_loc_is @ ((curr_new_ord - 1)**np.arange(dimalty))
+                rows_is.append((new_vars.els_vars_offsets[curr_new_els_is[curr_mask]][:, None] + new_intr_is).ravel())
+                cols_is.append((old_vars.els_vars_offsets[curr_old_els_is[curr_mask]][:, None] + old_intr_is).ravel())
+                wghts.append(np.ones(int(np.count_nonzero(curr_mask)) * len(curr_loc_is)))
+
+    result = sps.csr_array(
+        (np.concatenate(wghts), (np.concatenate(rows_is), np.concatenate(cols_is))),
+        shape = (new_num_of_vars, old_num_of_vars)
+        )
+    result.sum_duplicates()
+    return result
+
+
+'''
+Adaptive loop
+'''
+
+@dataclass
+class AdaptivityInfo:
+
+    cnvrgd : bool = False
+    nums_of_vars : List[NumericIntegerValueType] = field(default_factory=list)
+    errs : List[NumericDecimalValueType] = field(default_factory=list)
+
+def adapt(
+    mesh : Mesh,
+    solve_fn : Callable[[Mesh, SolutionType], SolutionType],
+    estimate_fn : Callable[[Mesh, SolutionType], IndicatorsType] = estimate_recovery_errors,
+    tol : NumericDecimalValueType = 1e-3,
+    max_num_of_itrs : NumericIntegerValueType = 20,
+    θ : NumericDecimalValueType = 0.5,
+    rfnmnt_type : RefinementType = RefinementType.H,
+    smth_tol : NumericDecimalValueType = 0.1,
+    max_ord : NumericIntegerValueType = 10
+    ) -> Tuple[Mesh, SolutionType, AdaptivityInfo]:
+    """
+    SOLVE ⟶ ESTIMATE ⟶ MARK ⟶ REFINE, until the estimated global error `(Σ η_K²)^½` drops below `tol`.
+
+    `solve_fn(mesh, soln_guess)` must solve on the given mesh, applying its hanging-node constraints; `soln_guess` is the previous solution prolongated onto the new mesh (`None` on the first solve), e.g. for warm-starting iterative solvers.
+    With p- or hp-refinement, solutions live in the mesh's hierarchical space (see `compute_hierarchical_variables()` & `fem/hierarchical.py`); the built-in estimators only see their vertex modes, so `estimate_fn` should account for the higher-order ones.
+    """
+
+    info = AdaptivityInfo()
+    soln_guess = None
+    for curr_itr_i in range(max_num_of_itrs):
+        soln = solve_fn(mesh, soln_guess)
+        errs = estimate_fn(mesh, soln)
+        glbl_err = float(np.sqrt(np.sum(errs**2)))
+        info.nums_of_vars.append(len(soln))
+        info.errs.append(glbl_err)
+        info.cnvrgd = glbl_err <= tol
+        # The returned solution must belong to the returned mesh
+        if info.cnvrgd or (curr_itr_i == max_num_of_itrs - 1):
+            break
+
+        marked_els_is = mark_dorfler(errs, θ)
+        match rfnmnt_type:
+            case RefinementType.H:
+                new_mesh, nds_prlngtn = refine_h(mesh, marked_els_is)
+            case RefinementType.P:
+                new_mesh, nds_prlngtn = refine_p(mesh, marked_els_is, max_ord)
+            case RefinementType.HP:
+                h_marked_els_is, p_marked_els_is = split_hp_marking(mesh, soln, errs, marked_els_is, smth_tol, max_ord)
+                # p first, so element indices stay valid for the h-refinement
+                new_mesh, nds_prlngtn = refine_p(mesh, p_marked_els_is, max_ord)
+                if len(h_marked_els_is):
+                    new_mesh, nds_prlngtn = refine_h(new_mesh, h_marked_els_is)
+        soln_guess = compute_variables_prolongation(mesh, new_mesh, nds_prlngtn) @ soln
+        mesh = new_mesh
+
+    return mesh, soln, info
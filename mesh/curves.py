@@ -0,0 +1,157 @@
+# Libraries
+import numpy as np
+from enum import Enum
+# Scripts
+from Code.types import *
+
+
+'''
+Script-specific typing setup
+'''
+
+PointsType : TypeAlias = Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]
+KeysType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total points,)"]]
+
+class SpaceFillingCurve(Enum):
+    # Bit interleaving: cheapest, but jumps across the domain at every power-of-two boundary
+    MORTON = "Morton"
+    # Gray-coded, rotated interleaving: consecutive keys are always adjacent grid cells
+    HILBERT = "Hilbert"
+
+# Grid bits per dimension beyond those needed to give every point its own cell on average
+CURVE_EXTRA_BITS = 3
+
+def compute_num_of_bits(
+    dimalty : NumericIntegerValueType,
+    num_of_pnts : NumericIntegerValueType
+    ) -> NumericIntegerValueType:
+    """
+    Grid resolution of the curve: about `2ᵈ` cells per point on average (finer grids only reorder points that are already neighbours, at a cost linear in the bits), capped so that the interleaved keys fit in 63 bits.
+    """
+
+    return int(min(63 // dimalty, np.ceil(np.log2(max(num_of_pnts, 2)) / dimalty) + CURVE_EXTRA_BITS))
+
+
+'''
+Quantization & bit interleaving
+'''
+
+def quantize_points(
+    pnts_vec_crds : PointsType,
+    num_of_bits : NumericIntegerValueType
+    ) -> Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]:
+    """
+    Integer grid coordinates `0 ≤ xᵢ < 2ᵇ` of the points in their bounding cube (a cube rather than a box, so that the curve's locality is isotropic).
+    """
+
+    lwr_bnds = pnts_vec_crds.min(axis=0)
+    extent = np.max(pnts_vec_crds.max(axis=0) - lwr_bnds)
+    scale = ((1 << num_of_bits) - 1) / extent if extent > 0 else 0.0
+    return np.clip(np.rint((pnts_vec_crds - lwr_bnds) * scale), 0, (1 << num_of_bits) - 1).astype(np.uint32 if num_of_bits <= 32 else np.uint64)
+
+def compute_spread_bytes(
+    dimalty : NumericIntegerValueType
+    ) -> Annotated[NumericVectorValueType, Literal["(256,)"]]:
+    """
+    Lookup table of every byte with its bits spread `d` apart (bit `j` moved to bit `d·j`).
+    """
+
+    bytes_vals = np.arange(256, dtype=np.uint64)
+    sprd_bytes = np.zeros(256, dtype=np.uint64)
+    for curr_bit_i in range(8):
+        sprd_bytes |= ((bytes_vals >> np.uint64(curr_bit_i)) & np.uint64(1)) << np.uint64(dimalty * curr_bit_i)
+    return sprd_bytes
+
+def interleave_bits(
+    grid_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]],
+    num_of_bits : NumericIntegerValueType
+    ) -> KeysType:
+    """
+    Keys whose bits, from the most significant, are the `b`-th bits of `x₀, x₁, ..., x_{d-1}`, then their `(b-1)`-th bits, and so on.
+    Bits are spread a byte at a time through a lookup table, so the cost is `d·⌈b/8⌉` gathers rather than `d·b` shifts.
+    """
+
+    dimalty = grid_crds.shape[1]
+    sprd_bytes = compute_spread_bytes(dimalty)
+    keys = np.zeros(len(grid_crds), dtype=np.uint64)
+    for curr_dim_i in range(dimalty):
+        for curr_byte_i in range(-(-num_of_bits // 8)):
+            curr_bytes = (grid_crds[:, curr_dim_i].astype(np.uint64) >> np.uint64(8 * curr_byte_i)) & np.uint64(255)
+            keys |= sprd_bytes[curr_bytes] << np.uint64(8 * dimalty * curr_byte_i + dimalty - 1 - curr_dim_i)
+    return keys
+
+
+'''
+Curve keys
+'''
+
+def compute_Morton_keys(
+    pnts_vec_crds : PointsType,
+    num_of_bits : NumericIntegerValueType = None
+    ) -> KeysType:
+
+    if num_of_bits is None:
+        num_of_bits = compute_num_of_bits(*pnts_vec_crds.shape[::-1])
+    return interleave_bits(quantize_points(pnts_vec_crds, num_of_bits), num_of_bits)
+
+def compute_Hilbert_keys(
+    pnts_vec_crds : PointsType,
+    num_of_bits : NumericIntegerValueType = None
+    ) -> KeysType:
+    """
+    Hilbert curve keys in any dimension, by Skilling's transform of the grid coordinates to the "transposed" Hilbert index (J. Skilling, Programming the Hilbert curve, AIP Conf. Proc. 707, 2004), vectorized over the points.
+    """
+
+    dimalty = pnts_vec_crds.shape[1]
+    if num_of_bits is None:
+        num_of_bits = compute_num_of_bits(dimalty, len(pnts_vec_crds))
+    # Contiguous per-dimension columns
+    x = list(quantize_points(pnts_vec_crds, num_of_bits).T.copy())
+    uint = x[0].dtype.type
+    is_set = np.empty_like(x[0])
+    swp = np.empty_like(x[0])
+
+    # Inverse undo excess work: per bit plane, from the most significant, invert (bit set) or exchange with x₀ (bit unset) the lower bits
+    # Branch-free and in place, with the bit broadcast to an all-ones/all-zeros mask
+    for curr_bit_i in range(num_of_bits-1, 0, -1):
+        p = uint((1 << curr_bit_i) - 1)
+        for curr_dim_i in range(dimalty):
+            np.right_shift(x[curr_dim_i], uint(curr_bit_i), out=is_set)
+            np.bitwise_and(is_set, uint(1), out=is_set)
+            np.negative(is_set, out=is_set)
+            if curr_dim_i:
+                np.bitwise_xor(x[0], x[curr_dim_i], out=swp)
+                np.bitwise_and(swp, p, out=swp)
+                swp &= ~is_set
+                x[curr_dim_i] ^= swp
+                is_set &= p
+                is_set |= swp
+                x[0] ^= is_set
+            else:
+                is_set &= p
+                x[0] ^= is_set
+    # Gray encoding
+    for curr_dim_i in range(1, dimalty):
+        x[curr_dim_i] ^= x[curr_dim_i-1]
+    t = np.zeros_like(x[0])
+    for curr_bit_i in range(num_of_bits-1, 0, -1):
+        np.right_shift(x[-1], uint(curr_bit_i), out=is_set)
+        np.bitwise_and(is_set, uint(1), out=is_set)
+        np.negative(is_set, out=is_set)
+        is_set &= uint((1 << curr_bit_i) - 1)
+        t ^= is_set
+    for curr_dim_i in range(dimalty):
+        x[curr_dim_i] ^= t
+
+    return interleave_bits(np.stack(x, axis=1), num_of_bits)
+
+def compute_curve_keys(
+    pnts_vec_crds : PointsType,
+    curve : SpaceFillingCurve = SpaceFillingCurve.HILBERT
+    ) -> KeysType:
+
+    match curve:
+        case SpaceFillingCurve.MORTON:
+            return compute_Morton_keys(pnts_vec_crds)
+        case SpaceFillingCurve.HILBERT:
+            return compute_Hilbert_keys(pnts_vec_crds)
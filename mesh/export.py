@@ -0,0 +1,378 @@
+# Libraries
+import os
+import base64
+import multiprocessing as mp
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from xml.sax.saxutils import quoteattr
+# Scripts
+from Code.types import *
+from Code.mesh.io import PathType, write_arrays, read_header
+
+
+'''
+Script-specific typing setup
+'''
+
+FieldsType : TypeAlias = Dict[NameType, Annotated[NumericValueType, Literal["(total points or cells,) or (total points or cells, components)"]]]
+
+class VTKEncoding(Enum):
+    RAW = "raw"
+    BASE64 = "base64"
+
+# VTK cell type ids, keyed by (dimensionality, nodes per element) for the linear elements
+VTK_CELL_TYPES = {
+    (0, 1): 1,  # VTK_VERTEX
+    (1, 2): 3,  # VTK_LINE
+    (2, 3): 5,  # VTK_TRIANGLE
+    (2, 4): 9,  # VTK_QUAD
+    (3, 4): 10, # VTK_TETRA
+    (3, 8): 12, # VTK_HEXAHEDRON
+    (3, 6): 13, # VTK_WEDGE
+    (3, 5): 14  # VTK_PYRAMID
+    }
+# XDMF topology names, keyed by VTK cell type id
+XDMF_TOPOLOGY_TYPES = {
+    1: "Polyvertex",
+    3: "Polyline",
+    5: "Triangle",
+    9: "Quadrilateral",
+    10: "Tetrahedron",
+    12: "Hexahedron",
+    13: "Wedge",
+    14: "Pyramid"
+    }
+VTK_DATA_TYPES = {
+    np.dtype(np.float32): "Float32",
+    np.dtype(np.float64): "Float64",
+    np.dtype(np.int8): "Int8",
+    np.dtype(np.int32): "Int32",
+    np.dtype(np.int64): "Int64",
+    np.dtype(np.uint8): "UInt8",
+    np.dtype(np.uint32): "UInt32",
+    np.dtype(np.uint64): "UInt64"
+    }
+# Every appended VTK array is prefixed by its byte count
+VTK_HEADER_DTYPE = np.dtype("<u8")
+
+
+'''
+Array preparation
+'''
+
+def infer_cell_type(
+    dimalty : NumericIntegerValueType,
+    num_of_el_nds : NumericIntegerValueType
+    ) -> NumericIntegerValueType:
+
+    if (dimalty, num_of_el_nds) not in VTK_CELL_TYPES:
+        raise ValueError(f"No VTK cell type is known for {num_of_el_nds}-node elements in {dimalty}D; provide one explicitly.")
+    return VTK_CELL_TYPES[(dimalty, num_of_el_nds)]
+
+def pad_to_3D(
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]]
+    ) -> Annotated[NumericMatrixValueType, Literal["(total nodes, 3)"]]:
+
+    # VTK & XDMF (XYZ) points are always 3D
+    result = np.zeros((len(nds_vec_crds), 3))
+    result[:, :nds_vec_crds.shape[1]] = nds_vec_crds
+    return result
+
+def normalize_field(
+    fld : NumericValueType
+    ) -> np.ndarray:
+
+    fld = np.asarray(fld)
+    if fld.dtype not in VTK_DATA_TYPES:
+        fld = fld.astype(np.float64)
+    return np.ascontiguousarray(fld, dtype=fld.dtype.newbyteorder('<'))
+
+
+'''
+VTK XML unstructured grid (.vtu/.pvtu)
+'''
+
+def write_vtu(
+    path : PathType,
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    pnt_flds : FieldsType = None,
+    cell_flds : FieldsType = None,
+    cell_type : NumericIntegerValueType = None,
+    encoding : VTKEncoding = VTKEncoding.RAW
+    ):
+    """
+    Writes a VTK XML unstructured grid with every array in the appended data section, each written as one bulk buffer write rather than cell by cell.
+    """
+
+    if pnt_flds is None:
+        pnt_flds = {}
+    if cell_flds is None:
+        cell_flds = {}
+    if cell_type is None:
+        cell_type = infer_cell_type(nds_vec_crds.shape[1], els_nds_is.shape[1])
+    num_of_nds = len(nds_vec_crds)
+    num_of_els, num_of_el_nds = els_nds_is.shape
+
+    # (XML section, name, array); order here is the order in the appended section
+    arrays = [("PointData", curr_name, normalize_field(curr_fld)) for curr_name, curr_fld in pnt_flds.items()]
+    arrays += [("CellData", curr_name, normalize_field(curr_fld)) for curr_name, curr_fld in cell_flds.items()]
+    arrays += [
+        ("Points", "Points", pad_to_3D(nds_vec_crds)),
+        ("Cells", "connectivity", np.ascontiguousarray(els_nds_is, dtype="<i8").ravel()),
+        ("Cells", "offsets", np.arange(1, num_of_els+1, dtype="<i8") * num_of_el_nds),
+        ("Cells", "types", np.full(num_of_els, cell_type, dtype=np.uint8))
+        ]
+
+    # Appended blocks: [UInt64 byte count][raw bytes], base64-encoded separately if requested
+    blks = []
+    offsets = []
+    curr_offset = 0
+    for _, _, curr_arr in arrays:
+        curr_header = np.array([curr_arr.nbytes], dtype=VTK_HEADER_DTYPE).tobytes()
+        if encoding == VTKEncoding.BASE64:
+            curr_blk = (base64.b64encode(curr_header), base64.b64encode(curr_arr.tobytes()))
+        else:
+            curr_blk = (curr_header, curr_arr)
+        blks.append(curr_blk)
+        offsets.append(curr_offset)
+        curr_offset += len(curr_blk[0]) + (curr_blk[1].nbytes if isinstance(curr_blk[1], np.ndarray) else len(curr_blk[1]))
+
+    def data_array_xml(section, name, arr, offset):
+        num_of_cmpnts = 1 if arr.ndim == 1 else int(np.prod(arr.shape[1:]))
+        name_attr = "" if section == "Points" else f" Name={quoteattr(name)}"
+        return (
+            f"<DataArray type=\"{VTK_DATA_TYPES[arr.dtype.newbyteorder('=')]}\"{name_attr} "
+            f"NumberOfComponents=\"{num_of_cmpnts}\" format=\"appended\" offset=\"{offset}\"/>\n"
+            )
+
+    xml = [
+        "<?xml version=\"1.0\"?>\n",
+        "<VTKFile type=\"UnstructuredGrid\" version=\"1.0\" byte_order=\"LittleEndian\" header_type=\"UInt64\">\n",
+        "<UnstructuredGrid>\n",
+        f"<Piece NumberOfPoints=\"{num_of_nds}\" NumberOfCells=\"{num_of_els}\">\n"
+        ]
+    for curr_section in ("PointData", "CellData", "Points", "Cells"):
+        xml.append(f"<{curr_section}>\n")
+        for (curr_arr_section, curr_name, curr_arr), curr_offset in zip(arrays, offsets):
+            if curr_arr_section == curr_section:
+                xml.append(data_array_xml(curr_section, curr_name, curr_arr, curr_offset))
+        xml.append(f"</{curr_section}>\n")
+    xml += [
+        "</Piece>\n",
+        "</UnstructuredGrid>\n",
+        f"<AppendedData encoding=\"{encoding.value}\">\n_"
+        ]
+
+    with open(path, "wb") as f:
+        f.write("".join(xml).encode("utf-8"))
+        for curr_header, curr_data in blks:
+            f.write(curr_header)
+            if isinstance(curr_data, np.ndarray):
+                curr_data.tofile(f)
+            else:
+                f.write(curr_data)
+        f.write(b"\n</AppendedData>\n</VTKFile>\n")
+
+def extract_piece(
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    pnt_flds : FieldsType,
+    cell_flds : FieldsType,
+    piece_els_is : Annotated[NumericVectorValueType, Literal["(piece elements,)"]]
+    ) -> Tuple[np.ndarray, np.ndarray, FieldsType, FieldsType]:
+    """
+    Restricts the mesh & fields to a subset of elements, renumbering the nodes they use contiguously.
+    """
+
+    piece_els_nds_is = np.asarray(els_nds_is[piece_els_is])
+    piece_nds_is, piece_els_nds_loc_is = np.unique(piece_els_nds_is, return_inverse=True)
+    piece_els_nds_loc_is = piece_els_nds_loc_is.reshape(piece_els_nds_is.shape)
+
+    return (
+        np.asarray(nds_vec_crds[piece_nds_is]),
+        piece_els_nds_loc_is,
+        {curr_name: np.asarray(curr_fld)[piece_nds_is] for curr_name, curr_fld in pnt_flds.items()},
+        {curr_name: np.asarray(curr_fld)[piece_els_is] for curr_name, curr_fld in cell_flds.items()}
+        )
+
+# Per-worker state, so the (possibly huge) global arrays are handed to each worker process once instead of once per piece
+_wrkr_state = {}
+
+def _init_piece_worker(*state):
+    _wrkr_state["state"] = state
+
+def _write_piece(
+    piece_path : PathType,
+    piece_els_is : np.ndarray,
+    cell_type : NumericIntegerValueType,
+    encoding : VTKEncoding
+    ):
+
+    nds_vec_crds, els_nds_is, pnt_flds, cell_flds = _wrkr_state["state"]
+    write_vtu(
+        piece_path,
+        *extract_piece(nds_vec_crds, els_nds_is, pnt_flds, cell_flds, piece_els_is),
+        cell_type = cell_type,
+        encoding = encoding
+        )
+
+def write_pvtu(
+    path : PathType,
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    pnt_flds : FieldsType = None,
+    cell_flds : FieldsType = None,
+    num_of_pieces : NumericIntegerValueType = None,
+    els_pieces_is : Annotated[NumericVectorValueType, Literal["(total elements,)"]] = None,
+    num_of_wrkrs : NumericIntegerValueType = None,
+    cell_type : NumericIntegerValueType = None,
+    encoding : VTKEncoding = VTKEncoding.RAW
+    ):
+    """
+    Writes a partitioned (parallel) VTK unstructured grid: one `.vtu` per piece, written concurrently by worker processes, plus the `.pvtu` index file referencing them.
+
+    Pieces are either given per element by `els_pieces_is` (e.g. from a mesh partition) or are `num_of_pieces` contiguous element ranges.
+    Where available, worker processes are forked so the global arrays are shared rather than copied.
+    """
+
+    if pnt_flds is None:
+        pnt_flds = {}
+    if cell_flds is None:
+        cell_flds = {}
+    if cell_type is None:
+        cell_type = infer_cell_type(nds_vec_crds.shape[1], els_nds_is.shape[1])
+    num_of_els = len(els_nds_is)
+
+    # Piece element index sets
+    if els_pieces_is is not None:
+        els_ordr = np.argsort(els_pieces_is, kind="stable")
+        pieces_starts = np.searchsorted(els_pieces_is[els_ordr], np.unique(els_pieces_is))
+        pieces_els_is = np.split(els_ordr, pieces_starts[1:])
+    else:
+        if num_of_pieces is None:
+            num_of_pieces = os.cpu_count() or 1
+        pieces_els_is = np.array_split(np.arange(num_of_els), num_of_pieces)
+
+    base_path, _ = os.path.splitext(path)
+    pieces_paths = [f"{base_path}_{curr_piece_i}.vtu" for curr_piece_i in range(len(pieces_els_is))]
+
+    # Workers
+    mp_cntxt = mp.get_context("fork") if "fork" in mp.get_all_start_methods() else None
+    with ProcessPoolExecutor(
+        max_workers = num_of_wrkrs,
+        mp_context = mp_cntxt,
+        initializer = _init_piece_worker,
+        initargs = (nds_vec_crds, els_nds_is, pnt_flds, cell_flds)
+        ) as executor:
+        futures = [
+            executor.submit(_write_piece, curr_piece_path, curr_piece_els_is, cell_type, encoding)
+            for curr_piece_path, curr_piece_els_is in zip(pieces_paths, pieces_els_is)
+            ]
+        # Surface any worker exceptions
+        for curr_future in futures:
+            curr_future.result()
+
+    # Index file
+    def p_data_array_xml(name, fld):
+        fld = normalize_field(fld)
+        num_of_cmpnts = 1 if fld.ndim == 1 else int(np.prod(fld.shape[1:]))
+        return f"<PDataArray type=\"{VTK_DATA_TYPES[fld.dtype.newbyteorder('=')]}\" Name={quoteattr(name)} NumberOfComponents=\"{num_of_cmpnts}\"/>\n"
+
+    xml = [
+        "<?xml version=\"1.0\"?>\n",
+        "<VTKFile type=\"PUnstructuredGrid\" version=\"1.0\" byte_order=\"LittleEndian\" header_type=\"UInt64\">\n",
+        "<PUnstructuredGrid GhostLevel=\"0\">\n",
+        "<PPointData>\n",
+        *[p_data_array_xml(curr_name, curr_fld) for curr_name, curr_fld in pnt_flds.items()],
+        "</PPointData>\n",
+        "<PCellData>\n",
+        *[p_data_array_xml(curr_name, curr_fld) for curr_name, curr_fld in cell_flds.items()],
+        "</PCellData>\n",
+        "<PPoints>\n<PDataArray type=\"Float64\" NumberOfComponents=\"3\"/>\n</PPoints>\n",
+        *[f"<Piece Source={quoteattr(os.path.basename(curr_piece_path))}/>\n" for curr_piece_path in pieces_paths],
+        "</PUnstructuredGrid>\n",
+        "</VTKFile>\n"
+        ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(xml))
+
+
+'''
+XDMF with raw binary sidecar
+'''
+
+def write_xdmf(
+    path : PathType,
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+    els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+    pnt_flds : FieldsType = None,
+    cell_flds : FieldsType = None,
+    cell_type : NumericIntegerValueType = None
+    ):
+    """
+    Writes an XDMF (v3) light-data XML file whose heavy data lives in a raw binary sidecar (`<path>.bin`) instead of HDF5.
+
+    The sidecar is an ordinary FEM binary file (see `io.py`), so each XDMF `DataItem` simply seeks to its aligned array, and the sidecar can also be memory-mapped back with `read_arrays()`.
+    """
+
+    if pnt_flds is None:
+        pnt_flds = {}
+    if cell_flds is None:
+        cell_flds = {}
+    if cell_type is None:
+        cell_type = infer_cell_type(nds_vec_crds.shape[1], els_nds_is.shape[1])
+    num_of_els, num_of_el_nds = els_nds_is.shape
+
+    base_path, _ = os.path.splitext(path)
+    sidecar_path = f"{base_path}.bin"
+    arrays = {
+        "geometry": pad_to_3D(nds_vec_crds),
+        "topology": np.ascontiguousarray(els_nds_is, dtype="<i8"),
+        **{f"node/{curr_name}": normalize_field(curr_fld) for curr_name, curr_fld in pnt_flds.items()},
+        **{f"cell/{curr_name}": normalize_field(curr_fld) for curr_name, curr_fld in cell_flds.items()}
+        }
+    write_arrays(sidecar_path, kind="XDMF", arrays=arrays)
+    header, data_start = read_header(sidecar_path)
+    sidecar_name = os.path.basename(sidecar_path)
+
+    def data_item_xml(name):
+        arr = arrays[name]
+        num_type = "Float" if arr.dtype.kind == "f" else ("UInt" if arr.dtype.kind == "u" else "Int")
+        dims = " ".join(str(curr_dim) for curr_dim in arr.shape)
+        seek = data_start + header["arrays"][name]["offset"]
+        return (
+            f"<DataItem Format=\"Binary\" Endian=\"Little\" NumberType=\"{num_type}\" Precision=\"{arr.dtype.itemsize}\" "
+            f"Dimensions=\"{dims}\" Seek=\"{seek}\">{sidecar_name}</DataItem>\n"
+            )
+
+    def attribute_xml(name, cntr):
+        arr = arrays[f"{cntr.lower()}/{name}"]
+        attr_type = "Scalar" if (arr.ndim == 1 or arr.shape[1] == 1) else "Vector"
+        return (
+            f"<Attribute Name={quoteattr(name)} AttributeType=\"{attr_type}\" Center=\"{cntr}\">\n"
+            + data_item_xml(f"{cntr.lower()}/{name}")
+            + "</Attribute>\n"
+            )
+
+    topo_type = XDMF_TOPOLOGY_TYPES[cell_type]
+    xml = [
+        "<?xml version=\"1.0\"?>\n",
+        "<Xdmf Version=\"3.0\">\n",
+        "<Domain>\n",
+        "<Grid Name=\"mesh\" GridType=\"Uniform\">\n",
+        f"<Topology TopologyType=\"{topo_type}\" NumberOfElements=\"{num_of_els}\" NodesPerElement=\"{num_of_el_nds}\">\n",
+        data_item_xml("topology"),
+        "</Topology>\n",
+        "<Geometry GeometryType=\"XYZ\">\n",
+        data_item_xml("geometry"),
+        "</Geometry>\n",
+        *[attribute_xml(curr_name, "Node") for curr_name in pnt_flds],
+        *[attribute_xml(curr_name, "Cell") for curr_name in cell_flds],
+        "</Grid>\n",
+        "</Domain>\n",
+        "</Xdmf>\n"
+        ]
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("".join(xml))
@@ -0,0 +1,142 @@
+# Libraries
+import os
+import json
+import struct
+import numpy as np
+# Scripts
+from Code.types import *
+
+
+'''
+Script-specific typing setup
+'''
+
+# File layout (all integers little-endian):
+#   [MAGIC (8 bytes)][FORMAT VERSION (uint32)][HEADER BYTES (uint32)][DATA START (uint64)]
+#   [HEADER (UTF-8 JSON)][PADDING][ARRAY 0][PADDING][ARRAY 1]...
+# Every array starts on an ALIGNMENT-byte boundary so it can be memory-mapped in place.
+MAGIC = b"FEMBIN\x00\x00"
+FORMAT_VERSION = 1
+PREFIX_FORMAT = "<8sIIQ"
+PREFIX_NUM_OF_BYTES = struct.calcsize(PREFIX_FORMAT)
+ALIGNMENT = 64
+
+PathType : TypeAlias = Union[str, os.PathLike]
+AttributesType : TypeAlias = Dict[NameType, Any]
+ArraysType : TypeAlias = Dict[NameType, np.ndarray]
+
+
+'''
+Reading & writing
+'''
+
+def align(
+    num_of_bytes : NumericIntegerValueType
+    ) -> NumericIntegerValueType:
+
+    return -(-num_of_bytes // ALIGNMENT) * ALIGNMENT
+
+def write_arrays(
+    path : PathType,
+    kind : NameType,
+    arrays : ArraysType,
+    attrs : AttributesType = None
+    ):
+    """
+    Writes named arrays (plus JSON-serializable attributes) to a single binary file: a small header describing every array, followed by the raw, aligned array bytes.
+    Arrays are written in bulk straight from their buffers, so memory-mapped inputs are streamed rather than copied.
+
+    The file is written next to `path` and then renamed over it, so `path` is never left half-written, and arrays memory-mapped from it (e.g. by `Mesh.load()`, saving back to the same path) stay valid while they are being written out.
+    """
+
+    if attrs is None:
+        attrs = {}
+
+    # Array table, with offsets relative to the start of the data section
+    arrays_info = {}
+    curr_offset = 0
+    for curr_name, curr_arr in arrays.items():
+        curr_arr = np.asarray(curr_arr)
+        arrays_info[curr_name] = {
+            "dtype": curr_arr.dtype.str,
+            "shape": list(curr_arr.shape),
+            "offset": curr_offset
+            }
+        curr_offset = align(curr_offset + curr_arr.nbytes)
+
+    header = json.dumps({
+        "kind": kind,
+        "attrs": attrs,
+        "arrays": arrays_info
+        }).encode("utf-8")
+    data_start = align(PREFIX_NUM_OF_BYTES + len(header))
+
+    tmp_path = f"{os.fspath(path)}.tmp"
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(struct.pack(PREFIX_FORMAT, MAGIC, FORMAT_VERSION, len(header), data_start))
+            f.write(header)
+            for curr_name, curr_arr in arrays.items():
+                f.seek(data_start + arrays_info[curr_name]["offset"])
+                # Non-contiguous views must be copied once to be written raw
+                np.ascontiguousarray(curr_arr).tofile(f)
+            # Pad the tail so the final array's page-aligned mapping never runs off the file
+            f.truncate(data_start + curr_offset)
+        # Existing memory maps keep the replaced file's data alive
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def read_header(
+    path : PathType
+    ) -> Tuple[Dict[str, Any], NumericIntegerValueType]:
+
+    with open(path, "rb") as f:
+        prefix = f.read(PREFIX_NUM_OF_BYTES)
+        if len(prefix) != PREFIX_NUM_OF_BYTES:
+            raise ValueError(f"File \"{path}\" is too short to be a FEM binary file.")
+        magic, vrsn, header_num_of_bytes, data_start = struct.unpack(PREFIX_FORMAT, prefix)
+        if magic != MAGIC:
+            raise ValueError(f"File \"{path}\" is not a FEM binary file.")
+        if vrsn > FORMAT_VERSION:
+            raise ValueError(f"File \"{path}\" uses format version {vrsn}, but only versions ≤ {FORMAT_VERSION} are supported.")
+        header = json.loads(f.read(header_num_of_bytes).decode("utf-8"))
+
+    return header, data_start
+
+def read_arrays(
+    path : PathType,
+    kind : NameType = None,
+    mmap : bool = True
+    ) -> Tuple[AttributesType, ArraysType]:
+    """
+    Reads a file written by `write_arrays()`.
+
+    With `mmap`, every array is a read-only `np.memmap` into the file, so opening costs only the header parse and slicing a region only touches the pages it covers.
+    """
+
+    header, data_start = read_header(path)
+    if (kind is not None) and (header["kind"] != kind):
+        raise ValueError(f"File \"{path}\" holds a \"{header['kind']}\", not a \"{kind}\".")
+
+    arrays = {}
+    for curr_name, curr_info in header["arrays"].items():
+        curr_dtype = np.dtype(curr_info["dtype"])
+        curr_shape = tuple(curr_info["shape"])
+        curr_offset = data_start + curr_info["offset"]
+        # Empty arrays can't be mapped
+        if 0 in curr_shape:
+            arrays[curr_name] = np.empty(curr_shape, dtype=curr_dtype)
+        elif mmap:
+            arrays[curr_name] = np.memmap(path, dtype=curr_dtype, mode='r', offset=curr_offset, shape=curr_shape)
+        else:
+            arrays[curr_name] = np.fromfile(
+                path,
+                dtype = curr_dtype,
+                count = int(np.prod(curr_shape)),
+                offset = curr_offset
+                ).reshape(curr_shape)
+
+    return header["attrs"], arrays
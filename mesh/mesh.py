@@ -1,6 +1,9 @@
 # Libraries
+import numpy as np
 # Scripts
 from Code.types import *
+from Code.mesh.io import PathType, write_arrays, read_arrays
+from Code.elements.quadrature import CellType
 
 
 # Delaunay/Advancing-Front meshing
@@ -15,6 +18,7 @@ from Code.types import *
 #   - to represent divergence-free constraints
 #   - for each admissible pressure mode
 # and linear tets do not pass this condition, since they use "P1" displacement/velocity & constant pressure (P0) if using "mixed formulation"
+# Taylor–Hood (Q2 velocity / Q1 pressure) quads do, see `fem/mixed.py`
 
 # A bilinear surface is any surface that can be written as:
 #   x(ξ,η) = A + Bξ + Cη + Dξη
@@ -32,6 +36,300 @@ Practical rule:
 '''
 
 class Mesh:
+    """
+    Array-based mesh storage: node coordinates, element connectivity, the node ⟼ variable (DOF) map, and optional integer entity tags for elements and nodes.
 
-    def __init__(self):
-        return None
\ No newline at end of file
+    Adaptively refined meshes additionally carry per-element polynomial orders and their hanging nodes, each constrained to the weighted average of its master nodes.
+    `vrsn` is bumped by every modification, so anything derived from the mesh can be cached against it.
+    """
+
+    # Arrays (de)serialized by save()/load(), in file order
+    ARRAYS_NAMES = (
+        "nds_vec_crds",
+        "els_nds_is",
+        "nds_vars_is",
+        "els_tags",
+        "nds_tags",
+        "els_ords",
+        "hngng_nds_is",
+        "hngng_nds_mstrs_is",
+        "hngng_nds_wghts"
+        )
+
+    def __init__(
+        self,
+        nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+        els_nds_is : Annotated[NumericMatrixValueType, Literal["(total elements, nodes per element)"]],
+        nds_vars_is : Annotated[NumericMatrixValueType, Literal["(total nodes, variables per node)"]] = None,
+        els_tags : Annotated[NumericVectorValueType, Literal["(total elements,)"]] = None,
+        nds_tags : Annotated[NumericVectorValueType, Literal["(total nodes,)"]] = None,
+        els_ords : Annotated[NumericVectorValueType, Literal["(total elements,)"]] = None,
+        hngng_nds_is : Annotated[NumericVectorValueType, Literal["(total hanging nodes,)"]] = None,
+        hngng_nds_mstrs_is : Annotated[NumericMatrixValueType, Literal["(total hanging nodes, masters per hanging node)"]] = None,
+        hngng_nds_wghts : Annotated[NumericMatrixValueType, Literal["(total hanging nodes, masters per hanging node)"]] = None,
+        vrsn : IndexType = 0
+        ):
+
+        self.nds_vec_crds = nds_vec_crds
+        self.els_nds_is = els_nds_is
+        # Default: one variable per node, numbered as the nodes are
+        if nds_vars_is is None:
+            nds_vars_is = np.arange(len(nds_vec_crds))[:, None]
+        self.nds_vars_is = nds_vars_is
+        # Default: untagged
+        if els_tags is None:
+            els_tags = np.zeros(len(els_nds_is), dtype=np.int32)
+        self.els_tags = els_tags
+        if nds_tags is None:
+            nds_tags = np.zeros(len(nds_vec_crds), dtype=np.int32)
+        self.nds_tags = nds_tags
+        # Default: (bi/tri)linear everywhere, conforming
+        if els_ords is None:
+            els_ords = np.ones(len(els_nds_is), dtype=np.int32)
+        self.els_ords = els_ords
+        if hngng_nds_is is None:
+            hngng_nds_is = np.zeros(0, dtype=np.int64)
+            hngng_nds_mstrs_is = np.zeros((0, 2), dtype=np.int64)
+            hngng_nds_wghts = np.zeros((0, 2))
+        self.hngng_nds_is = hngng_nds_is
+        self.hngng_nds_mstrs_is = hngng_nds_mstrs_is
+        self.hngng_nds_wghts = hngng_nds_wghts
+        self.vrsn = vrsn
+
+    @property
+    def dimalty(self) -> NumericIntegerValueType:
+        return self.nds_vec_crds.shape[1]
+    @property
+    def num_of_nds(self) -> NumericIntegerValueType:
+        return len(self.nds_vec_crds)
+    @property
+    def num_of_els(self) -> NumericIntegerValueType:
+        return len(self.els_nds_is)
+    @property
+    def num_of_vars(self) -> NumericIntegerValueType:
+        return int(self.nds_vars_is.max()) + 1 if self.nds_vars_is.size else 0
+
+    def save(
+        self,
+        path : PathType
+        ):
+
+        write_arrays(
+            path,
+            kind = type(self).__name__,
+            arrays = {
+                curr_name: getattr(self, curr_name)
+                for curr_name in self.ARRAYS_NAMES
+                },
+            attrs = {"vrsn": self.vrsn}
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path : PathType,
+        mmap : bool = True
+        ) -> "Mesh":
+        """
+        Loads a mesh saved by `save()`. With `mmap`, the arrays are read-only memory maps into the file, so nothing is read until it is sliced.
+        """
+
+        attrs, arrays = read_arrays(path, kind=cls.__name__, mmap=mmap)
+        return cls(**arrays, vrsn=attrs.get("vrsn", 0))
+
+
+# Cell types by (dimensionality, vertices per cell), for linear cells in VTK vertex order
+CELL_KINDS_TYPES = {
+    (1, 2): CellType.LINE,
+    (2, 3): CellType.TRIANGLE,
+    (2, 4): CellType.QUADRILATERAL,
+    (3, 4): CellType.TETRAHEDRON,
+    (3, 5): CellType.PYRAMID,
+    (3, 6): CellType.WEDGE,
+    (3, 8): CellType.HEXAHEDRON
+    }
+# Local vertices of every facet of the cell types, in VTK vertex order
+CELLS_FACETS_LOC_IS = {
+    CellType.LINE: ((0,), (1,)),
+    CellType.TRIANGLE: ((0, 1), (1, 2), (2, 0)),
+    CellType.QUADRILATERAL: ((0, 1), (1, 2), (2, 3), (3, 0)),
+    CellType.TETRAHEDRON: ((0, 1, 2), (0, 1, 3), (1, 2, 3), (0, 2, 3)),
+    CellType.PYRAMID: ((0, 1, 2, 3), (0, 1, 4), (1, 2, 4), (2, 3, 4), (3, 0, 4)),
+    CellType.WEDGE: ((0, 1, 2), (3, 4, 5), (0, 1, 4, 3), (1, 2, 5, 4), (2, 0, 3, 5)),
+    CellType.HEXAHEDRON: ((0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 5, 4), (1, 2, 6, 5), (2, 3, 7, 6), (3, 0, 4, 7))
+    }
+
+class MixedMesh:
+    """
+    Mesh of several cell types (e.g. hybrid hexahedron/wedge/pyramid/tetrahedron meshes), stored as homogeneous, contiguous blocks: one `(total cells, vertices per cell)` connectivity array per cell type, all sharing the node arrays.
+
+    Elements are numbered block by block, in `blks` order, so per-element data is contiguous per block too; every block can be processed by a single batched kernel call, as on a homogeneous mesh.
+    """
+
+    def __init__(
+        self,
+        nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+        blks : Dict[CellType, Annotated[NumericMatrixValueType, Literal["(total cells, vertices per cell)"]]],
+        nds_vars_is : Annotated[NumericMatrixValueType, Literal["(total nodes, variables per node)"]] = None,
+        vrsn : IndexType = 0
+        ):
+
+        for curr_cell_type, curr_els_nds_is in blks.items():
+            if CELL_KINDS_TYPES.get((nds_vec_crds.shape[1], curr_els_nds_is.shape[1])) != curr_cell_type:
+                raise ValueError(f"Block of {curr_cell_type.value} cells has {curr_els_nds_is.shape[1]} vertices per cell, which does not match a {nds_vec_crds.shape[1]}D {curr_cell_type.value}.")
+
+        self.nds_vec_crds = nds_vec_crds
+        # Empty blocks are dropped, so every block can be batched
+        self.blks = {
+            curr_cell_type: curr_els_nds_is
+            for curr_cell_type, curr_els_nds_is in blks.items()
+            if len(curr_els_nds_is)
+            }
+        if nds_vars_is is None:
+            nds_vars_is = np.arange(len(nds_vec_crds))[:, None]
+        self.nds_vars_is = nds_vars_is
+        self.vrsn = vrsn
+
+    @property
+    def dimalty(self) -> NumericIntegerValueType:
+        return self.nds_vec_crds.shape[1]
+    @property
+    def num_of_nds(self) -> NumericIntegerValueType:
+        return len(self.nds_vec_crds)
+    @property
+    def num_of_els(self) -> NumericIntegerValueType:
+        return sum(len(curr_els_nds_is) for curr_els_nds_is in self.blks.values())
+    @property
+    def num_of_vars(self) -> NumericIntegerValueType:
+        return int(self.nds_vars_is.max()) + 1 if self.nds_vars_is.size else 0
+    @property
+    def blks_offsets(self) -> Dict[CellType, IndexType]:
+        """
+        First global element index of every block.
+        """
+
+        offsets = np.cumsum([0] + [len(curr_els_nds_is) for curr_els_nds_is in self.blks.values()])
+        return dict(zip(self.blks, offsets.tolist()))
+
+    @classmethod
+    def from_cells(
+        cls,
+        nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+        cells_nds_is : List[Tuple[IndexType, ...]]
+        ) -> Tuple["MixedMesh", Annotated[NumericVectorValueType, Literal["(total cells,)"]]]:
+        """
+        Groups a list of cells of any (supported) types into blocks, with cell types inferred from their numbers of vertices.
+        Also returns the permutation from block order to the given order (`perm[new element] = old cell`), so per-cell data can be reordered along.
+        """
+
+        dimalty = nds_vec_crds.shape[1]
+        cells_sizes = np.fromiter((len(curr_cell_nds_is) for curr_cell_nds_is in cells_nds_is), dtype=np.int64, count=len(cells_nds_is))
+        blks = {}
+        perm = []
+        # Blocks in order of increasing vertices per cell
+        for curr_size in np.unique(cells_sizes):
+            curr_cell_type = CELL_KINDS_TYPES.get((dimalty, int(curr_size)))
+            if curr_cell_type is None:
+                raise ValueError(f"No {dimalty}D cell type has {curr_size} vertices.")
+            curr_cells_is = np.flatnonzero(cells_sizes == curr_size)
+            blks[curr_cell_type] = np.array([cells_nds_is[curr_cell_i] for curr_cell_i in curr_cells_is], dtype=np.int64)
+            perm.append(curr_cells_is)
+
+        return cls(nds_vec_crds, blks), np.concatenate(perm)
+
+    @classmethod
+    def from_mesh(
+        cls,
+        mesh : Mesh
+        ) -> "MixedMesh":
+
+        cell_type = CELL_KINDS_TYPES[(mesh.dimalty, mesh.els_nds_is.shape[1])]
+        return cls(mesh.nds_vec_crds, {cell_type: mesh.els_nds_is}, mesh.nds_vars_is, mesh.vrsn)
+
+    def block_mesh(
+        self,
+        cell_type : CellType
+        ) -> Mesh:
+        """
+        A homogeneous `Mesh` view of one block (sharing the node arrays), for routines that only handle a single cell type.
+        """
+
+        return Mesh(self.nds_vec_crds, self.blks[cell_type], self.nds_vars_is, vrsn=self.vrsn)
+
+    def save(
+        self,
+        path : PathType
+        ):
+
+        write_arrays(
+            path,
+            kind = type(self).__name__,
+            arrays = {
+                "nds_vec_crds": self.nds_vec_crds,
+                "nds_vars_is": self.nds_vars_is,
+                **{
+                    f"blk_{curr_cell_type.name}": curr_els_nds_is
+                    for curr_cell_type, curr_els_nds_is in self.blks.items()
+                    }
+                },
+            attrs = {"vrsn": self.vrsn}
+            )
+
+    @classmethod
+    def load(
+        cls,
+        path : PathType,
+        mmap : bool = True
+        ) -> "MixedMesh":
+
+        attrs, arrays = read_arrays(path, kind=cls.__name__, mmap=mmap)
+        blks = {
+            CellType[curr_name.removeprefix("blk_")]: curr_arr
+            for curr_name, curr_arr in arrays.items()
+            if curr_name.startswith("blk_")
+            }
+        return cls(arrays["nds_vec_crds"], blks, arrays["nds_vars_is"], attrs.get("vrsn", 0))
+
+
+def generate_structured_mesh(
+    lwr_bnds : Tuple[NumericDecimalValueType, ...],
+    uppr_bnds : Tuple[NumericDecimalValueType, ...],
+    nums_of_els_per_dim : Tuple[NumericIntegerValueType, ...]
+    ) -> Mesh:
+    """
+    Generates a structured mesh of a box, made of lines, quadrilaterals or hexahedra depending on its dimensionality.
+    Nodes are numbered lexicographically with the first dimension fastest, and element nodes follow the VTK ordering (counterclockwise, bottom face before top face).
+    """
+
+    dimalty = len(nums_of_els_per_dim)
+    if dimalty not in (1, 2, 3):
+        raise ValueError(f"Structured meshes are only supported in 1D, 2D and 3D, not {dimalty}D.")
+
+    # Node coordinates; reversed meshgrid axes make the first dimension the fastest-varying
+    axes_crds = [
+        np.linspace(curr_lwr_bnd, curr_uppr_bnd, curr_num_of_els+1)
+        for curr_lwr_bnd, curr_uppr_bnd, curr_num_of_els in zip(lwr_bnds, uppr_bnds, nums_of_els_per_dim)
+        ]
+    nds_vec_crds = np.stack(
+        [curr_crds.ravel() for curr_crds in np.meshgrid(*axes_crds[::-1], indexing="ij")[::-1]],
+        axis = 1
+        )
+
+    # Lowest-corner node of every element, then offsets to its other vertices
+    nds_shape = tuple(curr_num_of_els+1 for curr_num_of_els in nums_of_els_per_dim[::-1])
+    nds_is = np.arange(np.prod(nds_shape)).reshape(nds_shape)
+    crnr_nds_is = nds_is[tuple(slice(0, -1) for _ in range(dimalty))].ravel()
+    strides = np.cumprod((1,) + tuple(curr_num_of_els+1 for curr_num_of_els in nums_of_els_per_dim[:-1]))
+    match dimalty:
+        case 1:
+            vert_offsets = ((0,), (1,))
+        case 2:
+            vert_offsets = ((0, 0), (1, 0), (1, 1), (0, 1))
+        case 3:
+            vert_offsets = (
+                (0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0),
+                (0, 0, 1), (1, 0, 1), (1, 1, 1), (0, 1, 1)
+                )
+    els_nds_is = crnr_nds_is[:, None] + np.array(vert_offsets) @ strides
+
+    return Mesh(nds_vec_crds, els_nds_is)
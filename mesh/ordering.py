@@ -0,0 +1,152 @@
+# Libraries
+import numpy as np
+from dataclasses import dataclass
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh, MixedMesh
+from Code.mesh.curves import SpaceFillingCurve, compute_curve_keys
+
+
+'''
+Script-specific typing setup
+'''
+
+PermutationType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total entities,)"]]
+MeshType : TypeAlias = Union[Mesh, MixedMesh]
+
+
+'''
+Permutations
+'''
+
+def compute_curve_order(
+    pnts_vec_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]],
+    curve : SpaceFillingCurve = SpaceFillingCurve.HILBERT
+    ) -> PermutationType:
+    """
+    Permutation sorting points along a space-filling curve (`perm[new] = old`); points sharing a curve cell keep their relative order.
+    """
+
+    return np.argsort(compute_curve_keys(pnts_vec_crds, curve), kind="stable")
+
+def invert_permutation(
+    perm : PermutationType
+    ) -> PermutationType:
+
+    inv_perm = np.empty_like(perm)
+    inv_perm[perm] = np.arange(len(perm), dtype=perm.dtype)
+    return inv_perm
+
+@dataclass
+class MeshReordering:
+    """
+    Permutations applied by `reorder_mesh()`, as new ⟼ old maps (`perm[new] = old`) and their old ⟼ new inverses.
+    Results computed on the reordered mesh are brought back to the original numbering (e.g. for output next to the original mesh) by the `restore_*()` methods.
+    """
+
+    els_perm : PermutationType
+    nds_perm : PermutationType
+    vars_perm : PermutationType
+    els_inv_perm : PermutationType
+    nds_inv_perm : PermutationType
+    vars_inv_perm : PermutationType
+
+    def restore_elements(
+        self,
+        els_vals : Annotated[NumericTensorValueType, Literal["(total elements, ..)"]]
+        ) -> Annotated[NumericTensorValueType, Literal["(total elements, ..)"]]:
+
+        return els_vals[self.els_inv_perm]
+
+    def restore_nodes(
+        self,
+        nds_vals : Annotated[NumericTensorValueType, Literal["(total nodes, ..)"]]
+        ) -> Annotated[NumericTensorValueType, Literal["(total nodes, ..)"]]:
+
+        return nds_vals[self.nds_inv_perm]
+
+    def restore_variables(
+        self,
+        vars_vals : Annotated[NumericTensorValueType, Literal["(total variables, ..)"]]
+        ) -> Annotated[NumericTensorValueType, Literal["(total variables, ..)"]]:
+
+        return vars_vals[self.vars_inv_perm]
+
+
+'''
+Reordering
+'''
+
+def compute_variables_permutation(
+    nds_vars_is : Annotated[NumericMatrixValueType, Literal["(total nodes, variables per node)"]],
+    num_of_vars : NumericIntegerValueType
+    ) -> PermutationType:
+    """
+    Variables numbered in order of first appearance along the (already reordered) nodes, so that the rows and columns of assembled operators follow the node order; variables not attached to any node keep their relative order, last.
+    """
+
+    flat_vars_is = nds_vars_is.ravel()
+    _, first_is = np.unique(flat_vars_is, return_index=True)
+    vars_perm = flat_vars_is[np.sort(first_is)]
+    unattchd = np.ones(num_of_vars, dtype=bool)
+    unattchd[vars_perm] = False
+    return np.concatenate([vars_perm, np.flatnonzero(unattchd)]).astype(np.int64)
+
+def reorder_mesh(
+    mesh : MeshType,
+    curve : SpaceFillingCurve = SpaceFillingCurve.HILBERT,
+    reorder_els : bool = True,
+    reorder_nds : bool = True
+    ) -> Tuple[MeshType, MeshReordering]:
+    """
+    Renumbers the elements (by their centroids) and the nodes (by their coordinates) along a space-filling curve, so that elements consecutive in assembly loops are close in space and gather nearby nodes, and assembled operators are banded around their diagonal (local SpMV accesses).
+    Variables are renumbered to follow the nodes.
+
+    Every connectivity and per-entity array is permuted consistently (elements, tags, orders, hanging nodes and their masters), and mixed meshes are reordered within each block, so blocks stay contiguous.
+    Returns the reordered mesh (with a bumped version, as anything cached against the mesh is invalidated) and the permutations.
+    """
+
+    num_of_vars = mesh.num_of_vars
+    if isinstance(mesh, MixedMesh):
+        blks_els_perms = []
+        for curr_els_nds_is in mesh.blks.values():
+            blks_els_perms.append(compute_curve_order(mesh.nds_vec_crds[curr_els_nds_is].mean(axis=1), curve) if reorder_els else np.arange(len(curr_els_nds_is)))
+        els_perm = np.concatenate([np.zeros(0, dtype=np.int64)] + [
+            curr_offset + curr_blk_els_perm
+            for curr_offset, curr_blk_els_perm in zip(mesh.blks_offsets.values(), blks_els_perms)
+            ])
+    else:
+        els_perm = compute_curve_order(mesh.nds_vec_crds[mesh.els_nds_is].mean(axis=1), curve) if reorder_els else np.arange(mesh.num_of_els)
+    nds_perm = compute_curve_order(mesh.nds_vec_crds, curve) if reorder_nds else np.arange(mesh.num_of_nds)
+    nds_inv_perm = invert_permutation(nds_perm)
+    vars_perm = compute_variables_permutation(mesh.nds_vars_is[nds_perm], num_of_vars)
+    vars_inv_perm = invert_permutation(vars_perm)
+    rrdrng = MeshReordering(els_perm, nds_perm, vars_perm, invert_permutation(els_perm), nds_inv_perm, vars_inv_perm)
+
+    nds_vec_crds = mesh.nds_vec_crds[nds_perm]
+    nds_vars_is = vars_inv_perm[mesh.nds_vars_is[nds_perm]]
+    if isinstance(mesh, MixedMesh):
+        rrdrd_mesh = MixedMesh(
+            nds_vec_crds,
+            {
+                curr_cell_type: nds_inv_perm[curr_els_nds_is[curr_blk_els_perm]]
+                for (curr_cell_type, curr_els_nds_is), curr_blk_els_perm in zip(mesh.blks.items(), blks_els_perms)
+                },
+            nds_vars_is,
+            vrsn = mesh.vrsn + 1
+            )
+    else:
+        rrdrd_mesh = Mesh(
+            nds_vec_crds,
+            nds_inv_perm[mesh.els_nds_is[els_perm]],
+            nds_vars_is = nds_vars_is,
+            els_tags = mesh.els_tags[els_perm],
+            nds_tags = mesh.nds_tags[nds_perm],
+            els_ords = mesh.els_ords[els_perm],
+            hngng_nds_is = nds_inv_perm[mesh.hngng_nds_is],
+            hngng_nds_mstrs_is = nds_inv_perm[mesh.hngng_nds_mstrs_is],
+            hngng_nds_wghts = mesh.hngng_nds_wghts,
+            vrsn = mesh.vrsn + 1
+            )
+
+    return rrdrd_mesh, rrdrng
@@ -0,0 +1,731 @@
+# Libraries
+import heapq
+import numpy as np
+import scipy.sparse as sps
+import scipy.sparse.csgraph as spsg
+from dataclasses import dataclass
+from enum import Enum
+# Scripts
+from Code.types import *
+from Code.utilities.profiling import PROFILER
+from Code.mesh.mesh import Mesh, MixedMesh, CELL_KINDS_TYPES, CELLS_FACETS_LOC_IS
+from Code.mesh.curves import SpaceFillingCurve
+from Code.mesh.ordering import compute_curve_order
+from Code.elements.quadrature import CellType
+
+
+'''
+Script-specific typing setup
+'''
+
+GraphType : TypeAlias = Annotated[NumericSparseMatrixValueType, Literal["(total vertices, total vertices)"]]
+VerticesWeightsType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total vertices,)"]]
+PartsType : TypeAlias = Annotated[NumericVectorValueType, Literal["(total vertices,)"]]
+MeshType : TypeAlias = Union[Mesh, MixedMesh]
+
+class PartitionMethod(Enum):
+    # Multilevel k-way: heavy-edge matching coarsening, recursive bisection of the coarsest graph, boundary refinement while uncoarsening
+    MULTILEVEL = "multilevel"
+    # Contiguous, equal-weight chunks of the elements sorted along a space-filling curve through their centroids
+    SPACE_FILLING_CURVE = "space-filling curve"
+
+# Default allowed imbalance: every part weighs at most `(1 + tol)` times the average
+IMBALANCE_TOLERANCE = 0.03
+# Coarsening stops at this many vertices per part, or once a level removes less than 10% of the vertices
+COARSEST_VERTICES_PER_PART = 30
+MIN_COARSEST_VERTICES = 100
+COARSENING_MIN_REDUCTION = 0.9
+# Handshake rounds of the heavy-edge matching, and the coarse vertex weight cap (relative to the average coarsest vertex weight)
+MATCHING_ROUNDS = 4
+MAX_COARSE_VERTEX_WEIGHT_FACTOR = 1.5
+# Graph-growing trials per initial bisection, and FM passes/moves past the best prefix before giving up
+BISECTION_TRIALS = 4
+FM_MAX_PASSES = 8
+FM_MAX_UNPRODUCTIVE_MOVES = 64
+# Greedy boundary refinement (and balancing) passes per level, until a pass lowers the cut by less than 0.1%, and the level size up to which adjacent parts are also FM-refined pairwise
+REFINEMENT_PASSES = 8
+REFINEMENT_MIN_GAIN = 1e-3
+FM_MAX_VERTICES = 100_000
+
+
+'''
+Element dual graph
+'''
+
+def get_blocks(
+    mesh : MeshType
+    ) -> List[Tuple[CellType, Annotated[NumericMatrixValueType, Literal["(total cells, vertices per cell)"]]]]:
+
+    if isinstance(mesh, MixedMesh):
+        return list(mesh.blks.items())
+    cell_type = CELL_KINDS_TYPES.get((mesh.dimalty, mesh.els_nds_is.shape[1]))
+    if cell_type is None:
+        raise ValueError(f"No {mesh.dimalty}D cell type has {mesh.els_nds_is.shape[1]} vertices.")
+    return [(cell_type, mesh.els_nds_is)]
+
+def compute_elements_centroids(
+    mesh : MeshType
+    ) -> Annotated[NumericMatrixValueType, Literal["(total elements, dimensions)"]]:
+
+    return np.concatenate([
+        mesh.nds_vec_crds[curr_els_nds_is].mean(axis=1)
+        for _, curr_els_nds_is in get_blocks(mesh)
+        ])
+
+def compute_dual_graph(
+    mesh : MeshType
+    ) -> GraphType:
+    """
+    Element dual graph: elements are vertices, adjacent when they share a facet, with unit edge weights.
+
+    Facets are matched by their sorted vertices (padded, so that triangular and quadrilateral facets of mixed meshes never match), packed two vertices per 64-bit key and sorted once.
+    """
+
+    num_of_els = mesh.num_of_els
+    if mesh.num_of_nds >= (1 << 31) - 1:
+        raise ValueError(f"Dual graphs are only supported for meshes of fewer than 2³¹ - 1 nodes.")
+    max_facet_size = max(len(CELLS_FACETS_LOC_IS[curr_cell_type][0]) for curr_cell_type, _ in get_blocks(mesh)) if num_of_els else 1
+    facets_nds_is = []
+    facets_els_is = []
+    el_offset = 0
+    for curr_cell_type, curr_els_nds_is in get_blocks(mesh):
+        for curr_facet_loc_is in CELLS_FACETS_LOC_IS[curr_cell_type]:
+            # Shifted by one, so that padding (0) sorts last in descending order; 32-bit until packed
+            curr_facets_nds_is = np.zeros((len(curr_els_nds_is), max_facet_size), dtype=np.int32)
+            curr_facets_nds_is[:, :len(curr_facet_loc_is)] = curr_els_nds_is[:, curr_facet_loc_is] + 1
+            facets_nds_is.append(curr_facets_nds_is)
+            facets_els_is.append(el_offset + np.arange(len(curr_els_nds_is)))
+        el_offset += len(curr_els_nds_is)
+    if not facets_nds_is:
+        return sps.csr_array((num_of_els, num_of_els), dtype=np.int64)
+    facets_nds_is = -np.sort(-np.concatenate(facets_nds_is), axis=1)
+    facets_els_is = np.concatenate(facets_els_is)
+
+    # Pairs of node indices per sort key
+    if max_facet_size % 2:
+        facets_nds_is = np.concatenate([facets_nds_is, np.zeros((len(facets_nds_is), 1), dtype=np.int32)], axis=1)
+    keys = (facets_nds_is[:, 0::2].astype(np.int64) << 32) | facets_nds_is[:, 1::2]
+    del facets_nds_is
+    ordr = np.lexsort(keys.T[::-1])
+    srtd_keys = keys[ordr]
+    # Conforming facets appear once (boundary) or twice (interior)
+    pairs_mask = np.all(srtd_keys[1:] == srtd_keys[:-1], axis=1)
+    first_els_is = facets_els_is[ordr[:-1][pairs_mask]]
+    second_els_is = facets_els_is[ordr[1:][pairs_mask]]
+
+    grph = sps.csr_array(
+        (np.ones(2*len(first_els_is), dtype=np.int64), (np.concatenate([first_els_is, second_els_is]), np.concatenate([second_els_is, first_els_is]))),
+        shape = (num_of_els, num_of_els)
+        )
+    grph.sum_duplicates()
+    return grph
+
+
+'''
+Multilevel coarsening
+'''
+
+def compute_edges_rows(
+    grph : GraphType
+    ) -> Annotated[NumericVectorValueType, Literal["(total edges,)"]]:
+
+    return np.repeat(np.arange(grph.shape[0]), np.diff(grph.indptr))
+
+def match_heavy_edges(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    max_vrt_wght : NumericDecimalValueType,
+    rng : np.random.Generator
+    ) -> Tuple[Annotated[NumericVectorValueType, Literal["(total vertices,)"]], NumericIntegerValueType]:
+    """
+    Heavy-edge matching by handshaking: every unmatched vertex proposes to its heaviest unmatched neighbour, and mutual proposals are matched, for a few rounds.
+    This is the data-parallel form of the sequential visit-and-match heuristic, so every round is a handful of passes over the edges.
+    Edges are rated by their weight relative to their vertices' weights, `w(u,v) / (w(u)·w(v))`, which favours light vertices and so keeps coarse vertices compact and evenly sized.
+    Returns the fine ⟼ coarse vertex map (matched pairs share a coarse vertex) and the number of coarse vertices.
+    """
+
+    num_of_vrts = grph.shape[0]
+    rows = compute_edges_rows(grph)
+    cols = grph.indices
+    # Symmetric random tie-breaking, so that neighbours agree on equally rated edges
+    vrts_rnds = rng.random(num_of_vrts)
+    wghts = grph.data / (vrts_wghts[rows] * vrts_wghts[cols]) * (1 + 0.01 * np.modf(vrts_rnds[rows] + vrts_rnds[cols])[0])
+    admsbl = (rows != cols) & (vrts_wghts[rows] + vrts_wghts[cols] <= max_vrt_wght)
+    rows, cols, wghts = rows[admsbl], cols[admsbl], wghts[admsbl]
+
+    mates = np.full(num_of_vrts, -1)
+    for _ in range(MATCHING_ROUNDS):
+        if not len(rows):
+            break
+        # Heaviest admissible edge of every row; rows stay sorted through the filtering
+        rows_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+        rows_max_wghts = np.maximum.reduceat(wghts, rows_starts)
+        is_max = wghts == np.repeat(rows_max_wghts, np.diff(np.r_[rows_starts, len(rows)]))
+        max_is = np.flatnonzero(is_max)
+        max_is = max_is[np.r_[True, rows[max_is[1:]] != rows[max_is[:-1]]]]
+        prpsls = np.full(num_of_vrts, -1)
+        prpsls[rows[max_is]] = cols[max_is]
+        prpsrs_is = rows[max_is]
+        mtchd_is = prpsrs_is[prpsls[prpsls[prpsrs_is]] == prpsrs_is]
+        mates[mtchd_is] = prpsls[mtchd_is]
+        free = mates < 0
+        keep = free[rows] & free[cols]
+        rows, cols, wghts = rows[keep], cols[keep], wghts[keep]
+
+    # Unmatched vertices are carried over on their own; pairs are numbered by their lower vertex
+    unmtchd = mates < 0
+    mates[unmtchd] = np.flatnonzero(unmtchd)
+    is_rep = np.arange(num_of_vrts) <= mates
+    crs_vrts_is = np.cumsum(is_rep) - 1
+    return crs_vrts_is[np.minimum(np.arange(num_of_vrts), mates)], int(is_rep.sum())
+
+def contract_graph(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    crs_vrts_is : Annotated[NumericVectorValueType, Literal["(total vertices,)"]],
+    num_of_crs_vrts : NumericIntegerValueType
+    ) -> Tuple[GraphType, VerticesWeightsType]:
+    """
+    Coarse graph of a matching: coarse vertex weights are the sums of their fine ones, coarse edge weights the sums of the fine edges between them (so the edge cut of a projected partition is preserved).
+    """
+
+    crs_rows = crs_vrts_is[compute_edges_rows(grph)]
+    crs_cols = crs_vrts_is[grph.indices]
+    extrnl = crs_rows != crs_cols
+    crs_grph = sps.csr_array(
+        (grph.data[extrnl], (crs_rows[extrnl], crs_cols[extrnl])),
+        shape = (num_of_crs_vrts, num_of_crs_vrts)
+        )
+    crs_grph.sum_duplicates()
+    return crs_grph, np.bincount(crs_vrts_is, weights=vrts_wghts, minlength=num_of_crs_vrts)
+
+
+'''
+Initial partitioning
+'''
+
+def compute_edge_cut(
+    grph : GraphType,
+    parts : PartsType
+    ) -> NumericDecimalValueType:
+
+    rows = compute_edges_rows(grph)
+    return 0.5 * float(grph.data[parts[rows] != parts[grph.indices]].sum())
+
+def refine_bisection_FM(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    parts : PartsType,
+    max_parts_wghts : Tuple[NumericDecimalValueType, NumericDecimalValueType]
+    ) -> PartsType:
+    """
+    Fiduccia–Mattheyses refinement of a bisection: passes of single-vertex moves in decreasing gain order (each vertex moving at most once per pass, negative gains included, to climb out of local minima), rolled back to the best prefix.
+    Prefixes are ranked by their overweight first, then by their cut, so infeasible bisections are rebalanced at the smallest cost.
+    Sequential, with a lazy-deletion gain heap; only meant for coarse graphs.
+    """
+
+    num_of_vrts = grph.shape[0]
+    rows = compute_edges_rows(grph)
+    indptr = grph.indptr.tolist()
+    indices = grph.indices.tolist()
+    data = grph.data.tolist()
+    wghts = vrts_wghts.tolist()
+    parts = parts.astype(np.int64)
+
+    for _ in range(FM_MAX_PASSES):
+        parts_wghts = np.bincount(parts, weights=vrts_wghts, minlength=2).tolist()
+        # Gain of moving a vertex: its cut edges' weights minus its uncut ones; only boundary vertices start in the heap
+        cut = parts[rows] != parts[grph.indices]
+        gains = np.bincount(rows, weights=np.where(cut, grph.data, -grph.data), minlength=num_of_vrts)
+        bndry_is = np.unique(rows[cut])
+        heap = list(zip((-gains[bndry_is]).tolist(), bndry_is.tolist()))
+        heapq.heapify(heap)
+        gains = gains.tolist()
+        parts = parts.tolist()
+
+        def overweight():
+            return max(parts_wghts[0] - max_parts_wghts[0], 0.0) + max(parts_wghts[1] - max_parts_wghts[1], 0.0)
+        locked = [False] * num_of_vrts
+        moves = []
+        cut_chng = 0.0
+        best = (overweight(), 0.0)
+        best_num_of_moves = 0
+        while heap and len(moves) - best_num_of_moves < FM_MAX_UNPRODUCTIVE_MOVES:
+            neg_gain, curr_vrt_i = heapq.heappop(heap)
+            if locked[curr_vrt_i] or -neg_gain != gains[curr_vrt_i]:
+                continue
+            src = parts[curr_vrt_i]
+            trgt = 1 - src
+            # Moves may not overload the target, unless they relieve a more overloaded source
+            if parts_wghts[trgt] + wghts[curr_vrt_i] > max_parts_wghts[trgt] and parts_wghts[trgt] + wghts[curr_vrt_i] - max_parts_wghts[trgt] >= parts_wghts[src] - max_parts_wghts[src]:
+                locked[curr_vrt_i] = True
+                continue
+            locked[curr_vrt_i] = True
+            parts[curr_vrt_i] = trgt
+            parts_wghts[src] -= wghts[curr_vrt_i]
+            parts_wghts[trgt] += wghts[curr_vrt_i]
+            cut_chng -= gains[curr_vrt_i]
+            moves.append(curr_vrt_i)
+            for curr_edge_i in range(indptr[curr_vrt_i], indptr[curr_vrt_i+1]):
+                curr_nbr_i = indices[curr_edge_i]
+                if locked[curr_nbr_i]:
+                    continue
+                gains[curr_nbr_i] += 2 * data[curr_edge_i] if parts[curr_nbr_i] == src else -2 * data[curr_edge_i]
+                heapq.heappush(heap, (-gains[curr_nbr_i], curr_nbr_i))
+            curr = (overweight(), cut_chng)
+            if curr < best:
+                best = curr
+                best_num_of_moves = len(moves)
+
+        # Roll back past the best prefix
+        for curr_vrt_i in moves[best_num_of_moves:]:
+            parts[curr_vrt_i] = 1 - parts[curr_vrt_i]
+        parts = np.array(parts, dtype=np.int64)
+        if not best_num_of_moves:
+            break
+
+    return parts
+
+def grow_region(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    seed : IndexType,
+    trgt_wght : NumericDecimalValueType
+    ) -> PartsType:
+    """
+    Greedy graph growing: part 0 grows from `seed` by repeatedly absorbing the frontier vertex that most lowers the cut, until it is closest to `trgt_wght` (restarting from the lowest unabsorbed vertex on disconnected graphs).
+    """
+
+    num_of_vrts = grph.shape[0]
+    indptr = grph.indptr.tolist()
+    indices = grph.indices.tolist()
+    data = grph.data.tolist()
+    wghts = vrts_wghts.tolist()
+
+    parts = [1] * num_of_vrts
+    # Gain of absorbing a vertex: its edges' weights to part 0 minus those to part 1
+    gains = [-sum(data[indptr[curr_vrt_i]:indptr[curr_vrt_i+1]]) for curr_vrt_i in range(num_of_vrts)]
+    heap = [(-gains[seed], seed)]
+    grown_wght = 0.0
+    nxt_seed = 0
+    while grown_wght < trgt_wght:
+        if not heap:
+            while parts[nxt_seed] == 0:
+                nxt_seed += 1
+            heap.append((-gains[nxt_seed], nxt_seed))
+        neg_gain, curr_vrt_i = heapq.heappop(heap)
+        if parts[curr_vrt_i] == 0 or -neg_gain != gains[curr_vrt_i]:
+            continue
+        # Stop before overshooting further than undershooting
+        if grown_wght + wghts[curr_vrt_i] - trgt_wght > trgt_wght - grown_wght and grown_wght > 0:
+            break
+        parts[curr_vrt_i] = 0
+        grown_wght += wghts[curr_vrt_i]
+        for curr_edge_i in range(indptr[curr_vrt_i], indptr[curr_vrt_i+1]):
+            curr_nbr_i = indices[curr_edge_i]
+            if parts[curr_nbr_i]:
+                gains[curr_nbr_i] += 2 * data[curr_edge_i]
+                heapq.heappush(heap, (-gains[curr_nbr_i], curr_nbr_i))
+
+    return np.array(parts, dtype=np.int64)
+
+def bisect_graph(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    frac : NumericDecimalValueType,
+    imb_tol : NumericDecimalValueType,
+    rng : np.random.Generator
+    ) -> PartsType:
+    """
+    Bisection with a `frac` share of the weight in part 0, by greedy graph growing from a pseudo-peripheral vertex, then FM-refined.
+    The best of a few randomly started trials is kept.
+    """
+
+    num_of_vrts = grph.shape[0]
+    ttl_wght = vrts_wghts.sum()
+    max_parts_wghts = ((1 + imb_tol) * frac * ttl_wght, (1 + imb_tol) * (1 - frac) * ttl_wght)
+    best_parts, best = None, None
+    for _ in range(min(BISECTION_TRIALS, num_of_vrts)):
+        # A vertex far from a random one (the last reached by a breadth-first search) starts compact regions
+        seed = int(spsg.breadth_first_order(grph, int(rng.integers(num_of_vrts)), directed=False, return_predecessors=False)[-1])
+        parts = grow_region(grph, vrts_wghts, seed, frac * ttl_wght)
+        parts = refine_bisection_FM(grph, vrts_wghts, parts, max_parts_wghts)
+        parts_wghts = np.bincount(parts, weights=vrts_wghts, minlength=2)
+        curr = (max(parts_wghts[0] - max_parts_wghts[0], 0) + max(parts_wghts[1] - max_parts_wghts[1], 0), compute_edge_cut(grph, parts))
+        if best is None or curr < best:
+            best_parts, best = parts, curr
+
+    return best_parts
+
+def partition_recursively(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    num_of_parts : NumericIntegerValueType,
+    imb_tol : NumericDecimalValueType,
+    rng : np.random.Generator
+    ) -> PartsType:
+    """
+    `k`-way partition by recursive bisection, splitting the parts (and the weight) as `⌊k/2⌋ : ⌈k/2⌉` at every level.
+    """
+
+    num_of_vrts = grph.shape[0]
+    if num_of_parts == 1 or num_of_vrts == 0:
+        return np.zeros(num_of_vrts, dtype=np.int64)
+    if num_of_vrts == 1:
+        return np.zeros(1, dtype=np.int64)
+
+    num_of_first_parts = num_of_parts // 2
+    bisctn = bisect_graph(grph, vrts_wghts, num_of_first_parts / num_of_parts, imb_tol, rng)
+    parts = np.empty(num_of_vrts, dtype=np.int64)
+    for curr_side, curr_num_of_parts, curr_offset in ((0, num_of_first_parts, 0), (1, num_of_parts - num_of_first_parts, num_of_first_parts)):
+        curr_vrts_is = np.flatnonzero(bisctn == curr_side)
+        parts[curr_vrts_is] = curr_offset + partition_recursively(grph[curr_vrts_is][:, curr_vrts_is], vrts_wghts[curr_vrts_is], curr_num_of_parts, imb_tol, rng)
+    return parts
+
+
+'''
+k-way refinement
+'''
+
+def compute_boundary_moves(
+    rows : Annotated[NumericVectorValueType, Literal["(total edges,)"]],
+    cols : Annotated[NumericVectorValueType, Literal["(total edges,)"]],
+    wghts : Annotated[NumericVectorValueType, Literal["(total edges,)"]],
+    parts : PartsType,
+    num_of_parts : NumericIntegerValueType,
+    trgts_mask : Annotated[NumericVectorValueType, Literal["(total parts,)"]]
+    ) -> Tuple[
+        Annotated[NumericVectorValueType, Literal["(total boundary vertices,)"]],
+        Annotated[NumericVectorValueType, Literal["(total boundary vertices,)"]],
+        Annotated[NumericVectorValueType, Literal["(total boundary vertices,)"]]
+        ]:
+    """
+    Best move of every boundary vertex to an adjacent part allowed by `trgts_mask`: the vertex, its target part and its gain (the weight of its edges to the target minus that of its edges to its own part).
+    Only the edges of boundary vertices are aggregated, per (vertex, neighbouring part).
+    """
+
+    cut = parts[rows] != parts[cols]
+    bndry = np.zeros(len(parts), dtype=bool)
+    bndry[rows[cut]] = True
+    bndry_edges = bndry[rows]
+    rows, cols, wghts = rows[bndry_edges], cols[bndry_edges], wghts[bndry_edges]
+
+    # Connectivity of every boundary vertex to each of its neighbouring parts
+    keys, inv = np.unique(rows.astype(np.int64) * num_of_parts + parts[cols], return_inverse=True)
+    cnctvts = np.bincount(inv.ravel(), weights=wghts)
+    keys_vrts_is = keys // num_of_parts
+    keys_parts = keys % num_of_parts
+    own = keys_parts == parts[keys_vrts_is]
+    intrnl_cnctvts = np.zeros(len(parts))
+    intrnl_cnctvts[keys_vrts_is[own]] = cnctvts[own]
+
+    cands = ~own & trgts_mask[keys_parts]
+    vrts_is, trgts, gains = keys_vrts_is[cands], keys_parts[cands], cnctvts[cands] - intrnl_cnctvts[keys_vrts_is[cands]]
+    # Best target per vertex
+    ordr = np.lexsort((-gains, vrts_is))
+    vrts_is, trgts, gains = vrts_is[ordr], trgts[ordr], gains[ordr]
+    first = np.r_[True, vrts_is[1:] != vrts_is[:-1]] if len(vrts_is) else np.zeros(0, dtype=bool)
+    return vrts_is[first], trgts[first], gains[first]
+
+def select_independent_moves(
+    rows : Annotated[NumericVectorValueType, Literal["(total edges,)"]],
+    cols : Annotated[NumericVectorValueType, Literal["(total edges,)"]],
+    vrts_is : Annotated[NumericVectorValueType, Literal["(total moves,)"]],
+    gains : Annotated[NumericVectorValueType, Literal["(total moves,)"]],
+    prios : Annotated[NumericVectorValueType, Literal["(total vertices,)"]]
+    ) -> Annotated[NumericVectorValueType, Literal["(total moves,)"]]:
+    """
+    Mask of moves with no adjacent moving vertex of higher (gain, priority), so that the gains of simultaneous moves stay exact.
+    """
+
+    moving_gains = np.full(len(prios), -np.inf)
+    moving_gains[vrts_is] = gains
+    both = np.isfinite(moving_gains[rows]) & np.isfinite(moving_gains[cols])
+    rows, cols = rows[both], cols[both]
+    lsng = (moving_gains[rows] < moving_gains[cols]) | ((moving_gains[rows] == moving_gains[cols]) & (prios[rows] < prios[cols]))
+    is_kept = np.ones(len(prios), dtype=bool)
+    is_kept[rows[lsng]] = False
+    return is_kept[vrts_is]
+
+def cap_moves(
+    grps : Annotated[NumericVectorValueType, Literal["(total moves,)"]],
+    mvd_wghts : Annotated[NumericVectorValueType, Literal["(total moves,)"]],
+    gains : Annotated[NumericVectorValueType, Literal["(total moves,)"]],
+    caps : Annotated[NumericVectorValueType, Literal["(total parts,)"]],
+    strict : bool = True
+    ) -> Annotated[NumericVectorValueType, Literal["(total moves,)"]]:
+    """
+    Mask of the moves kept when every group (source or target part) takes its moves in decreasing gain order, up to its capacity (`strict`), or until its capacity is reached (the move reaching it included).
+    """
+
+    ordr = np.lexsort((-gains, grps))
+    srtd_grps = grps[ordr]
+    cum_wghts = np.cumsum(mvd_wghts[ordr])
+    grps_starts = np.flatnonzero(np.r_[True, srtd_grps[1:] != srtd_grps[:-1]]) if len(ordr) else np.zeros(0, dtype=np.int64)
+    cum_wghts -= np.repeat(cum_wghts[grps_starts] - mvd_wghts[ordr][grps_starts], np.diff(np.r_[grps_starts, len(ordr)]))
+    kept = np.empty(len(ordr), dtype=bool)
+    kept[ordr] = cum_wghts <= caps[srtd_grps] if strict else cum_wghts - mvd_wghts[ordr] < caps[srtd_grps]
+    return kept
+
+def refine_pairs_FM(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    parts : PartsType,
+    max_part_wght : NumericDecimalValueType
+    ) -> PartsType:
+    """
+    FM refinement of every pair of adjacent parts, as a bisection of the subgraph they induce, heaviest shared cut first.
+    """
+
+    rows = compute_edges_rows(grph)
+    cut = parts[rows] != parts[grph.indices]
+    pairs, pairs_cuts = np.unique(np.sort(np.stack([parts[rows[cut]], parts[grph.indices[cut]]], axis=1), axis=1), axis=0, return_counts=True)
+    parts = parts.copy()
+    for curr_part_a, curr_part_b in pairs[np.argsort(-pairs_cuts, kind="stable")].tolist():
+        curr_vrts_is = np.flatnonzero((parts == curr_part_a) | (parts == curr_part_b))
+        curr_parts = refine_bisection_FM(
+            grph[curr_vrts_is][:, curr_vrts_is],
+            vrts_wghts[curr_vrts_is],
+            (parts[curr_vrts_is] == curr_part_b).astype(np.int64),
+            (max_part_wght, max_part_wght)
+            )
+        parts[curr_vrts_is] = np.where(curr_parts == 1, curr_part_b, curr_part_a)
+    return parts
+
+def refine_k_way(
+    grph : GraphType,
+    vrts_wghts : VerticesWeightsType,
+    parts : PartsType,
+    num_of_parts : NumericIntegerValueType,
+    max_part_wght : NumericDecimalValueType,
+    rng : np.random.Generator
+    ) -> PartsType:
+    """
+    Greedy boundary refinement of a `k`-way partition, in data-parallel passes: overloaded parts first shed their boundary vertices (best gains first, negative gains allowed) to adjacent parts with room; then every boundary vertex with a positive gain (or a zero one, towards a lighter part) moves to its best adjacent part, as long as the target stays within the balance bound.
+    Simultaneous moves are restricted to non-adjacent vertices, so their gains stay exact and refinement passes never raise the cut.
+    Levels of at most `FM_MAX_VERTICES` vertices are then FM-refined pair of parts by pair of parts, which can also escape local minima.
+    """
+
+    rows = compute_edges_rows(grph)
+    cols = grph.indices
+    wghts = grph.data.astype(float)
+    prios = rng.random(len(parts))
+    parts = parts.copy()
+    cut = compute_edge_cut(grph, parts)
+
+    for _ in range(REFINEMENT_PASSES):
+        parts_wghts = np.bincount(parts, weights=vrts_wghts, minlength=num_of_parts)
+        num_of_moves = 0
+
+        # Balancing
+        ovrwghts = parts_wghts - max_part_wght
+        if np.any(ovrwghts > 0):
+            vrts_is, trgts, gains = compute_boundary_moves(rows, cols, wghts, parts, num_of_parts, ovrwghts < 0)
+            srcs_ovrld = ovrwghts[parts[vrts_is]] > 0
+            vrts_is, trgts, gains = vrts_is[srcs_ovrld], trgts[srcs_ovrld], gains[srcs_ovrld]
+            kept = cap_moves(parts[vrts_is], vrts_wghts[vrts_is], gains, ovrwghts, strict=False)
+            vrts_is, trgts, gains = vrts_is[kept], trgts[kept], gains[kept]
+            kept = cap_moves(trgts, vrts_wghts[vrts_is], gains, -ovrwghts)
+            parts[vrts_is[kept]] = trgts[kept]
+            num_of_moves += int(kept.sum())
+            parts_wghts = np.bincount(parts, weights=vrts_wghts, minlength=num_of_parts)
+
+        # Refinement: positive gains, or zero gains towards lighter parts (letting flat boundaries drift towards balance)
+        vrts_is, trgts, gains = compute_boundary_moves(rows, cols, wghts, parts, num_of_parts, parts_wghts < max_part_wght)
+        admsbl = (gains > 0) | ((gains == 0) & (parts_wghts[trgts] + vrts_wghts[vrts_is] < parts_wghts[parts[vrts_is]]))
+        vrts_is, trgts, gains = vrts_is[admsbl], trgts[admsbl], gains[admsbl]
+        kept = select_independent_moves(rows, cols, vrts_is, gains, prios)
+        vrts_is, trgts, gains = vrts_is[kept], trgts[kept], gains[kept]
+        kept = cap_moves(trgts, vrts_wghts[vrts_is], gains, max_part_wght - parts_wghts)
+        parts[vrts_is[kept]] = trgts[kept]
+        num_of_moves += int(kept.sum())
+
+        # Passes stop once balanced and (nearly) stagnant
+        cut -= gains[kept].sum()
+        if not num_of_moves or (gains[kept].sum() < REFINEMENT_MIN_GAIN * cut and not np.any(ovrwghts > 0)):
+            break
+
+    if len(parts) <= FM_MAX_VERTICES:
+        parts = refine_pairs_FM(grph, vrts_wghts, parts, max_part_wght)
+    return parts
+
+
+'''
+Partitions
+'''
+
+@PROFILER.instrument(cat="mesh")
+def partition_graph(
+    grph : GraphType,
+    num_of_parts : NumericIntegerValueType,
+    vrts_wghts : VerticesWeightsType = None,
+    imb_tol : NumericDecimalValueType = IMBALANCE_TOLERANCE,
+    seed : IndexType = 0,
+    init_parts : PartsType = None
+    ) -> PartsType:
+    """
+    Multilevel `k`-way partition of a (symmetric, weighted) graph, minimizing the edge cut subject to every part weighing at most `(1 + tol)` times the average:
+        - Coarsening: heavy-edge matchings contract the graph, level by level, down to a few dozen vertices per part
+        - Initial partitioning: recursive bisection of the coarsest graph, by graph growing and Fiduccia–Mattheyses refinement
+        - Uncoarsening: the partition is projected back level by level, and rebalanced and refined on each by greedy boundary moves (and pairwise FM on the levels of at most `FM_MAX_VERTICES` vertices)
+
+    Random matchings leave ragged part boundaries on regular graphs (e.g. structured meshes), where straight geometric cuts are hard to beat; an `init_parts` candidate (e.g. from `partition_curve()`) is refined on the full graph too, and whichever partition is better balanced, then has the smaller cut, is returned.
+    """
+
+    num_of_vrts = grph.shape[0]
+    if vrts_wghts is None:
+        vrts_wghts = np.ones(num_of_vrts)
+    vrts_wghts = np.asarray(vrts_wghts, dtype=float)
+    if num_of_parts < 1:
+        raise ValueError(f"Graphs can only be split into a positive number of parts, not {num_of_parts}.")
+    if num_of_parts == 1 or num_of_vrts <= 1:
+        return np.zeros(num_of_vrts, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+    grph = sps.csr_array(grph, dtype=float)
+    grph.sum_duplicates()
+
+    # Coarsening
+    crsst_num_of_vrts = max(COARSEST_VERTICES_PER_PART * num_of_parts, MIN_COARSEST_VERTICES)
+    max_vrt_wght = MAX_COARSE_VERTEX_WEIGHT_FACTOR * vrts_wghts.sum() / crsst_num_of_vrts
+    lvls = [(grph, vrts_wghts)]
+    crs_vrts_iss = []
+    with PROFILER.timer("partition_graph/coarsening", cat="mesh"):
+        while lvls[-1][0].shape[0] > crsst_num_of_vrts:
+            crs_vrts_is, num_of_crs_vrts = match_heavy_edges(*lvls[-1], max_vrt_wght, rng)
+            if num_of_crs_vrts > COARSENING_MIN_REDUCTION * lvls[-1][0].shape[0]:
+                break
+            lvls.append(contract_graph(*lvls[-1], crs_vrts_is, num_of_crs_vrts))
+            crs_vrts_iss.append(crs_vrts_is)
+    PROFILER.count("partition_graph/levels", len(lvls))
+
+    # Initial partitioning; coarse vertices may be too heavy to meet the tolerance exactly, which the refinement then restores
+    max_part_wght = (1 + imb_tol) * vrts_wghts.sum() / num_of_parts
+    with PROFILER.timer("partition_graph/initial", cat="mesh"):
+        parts = partition_recursively(*lvls[-1], num_of_parts, imb_tol, rng)
+
+    # Uncoarsening
+    with PROFILER.timer("partition_graph/refinement", cat="mesh"):
+        parts = refine_k_way(*lvls[-1], parts, num_of_parts, max_part_wght, rng)
+        for (curr_grph, curr_vrts_wghts), curr_crs_vrts_is in zip(lvls[-2::-1], crs_vrts_iss[::-1]):
+            parts = refine_k_way(curr_grph, curr_vrts_wghts, parts[curr_crs_vrts_is], num_of_parts, max_part_wght, rng)
+
+    # Candidate partition; projecting it onto the coarse levels would blur its boundaries, so it's only refined on the full graph
+    if init_parts is not None:
+        with PROFILER.timer("partition_graph/candidate", cat="mesh"):
+            cand_parts = refine_k_way(grph, vrts_wghts, np.asarray(init_parts, dtype=np.int64), num_of_parts, max_part_wght, rng)
+        def rank(parts):
+            parts_wghts = np.bincount(parts, weights=vrts_wghts, minlength=num_of_parts)
+            return (max(float(parts_wghts.max()) - max_part_wght, 0.0), compute_edge_cut(grph, parts))
+        if rank(cand_parts) < rank(parts):
+            parts = cand_parts
+
+    return parts
+
+def partition_curve(
+    pnts_vec_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]],
+    num_of_parts : NumericIntegerValueType,
+    pnts_wghts : VerticesWeightsType = None,
+    curve : SpaceFillingCurve = SpaceFillingCurve.HILBERT
+    ) -> PartsType:
+    """
+    Splits points, sorted along a space-filling curve, into contiguous chunks of (nearly) equal weight.
+    """
+
+    if pnts_wghts is None:
+        pnts_wghts = np.ones(len(pnts_vec_crds))
+    parts = np.zeros(len(pnts_vec_crds), dtype=np.int64)
+    if not len(parts):
+        return parts
+    ordr = compute_curve_order(pnts_vec_crds, curve)
+    # Chunk of every point's weight midpoint along the curve
+    srtd_wghts = pnts_wghts[ordr]
+    cum_wghts = np.cumsum(srtd_wghts)
+    parts[ordr] = np.minimum((num_of_parts * (cum_wghts - 0.5 * srtd_wghts) / max(cum_wghts[-1], np.finfo(float).tiny)).astype(np.int64), num_of_parts - 1)
+    return parts
+
+@dataclass
+class MeshPartition:
+    """
+    Element partition of a mesh, with each part's owned elements and ghost (halo) layer: the other parts' elements sharing at least one node with it, i.e. everything needed to assemble the part's nodes' rows locally.
+    """
+
+    els_parts_is : Annotated[NumericVectorValueType, Literal["(total elements,)"]]
+    parts_els_is : List[Annotated[NumericVectorValueType, Literal["(total part elements,)"]]]
+    parts_ghsts_els_is : List[Annotated[NumericVectorValueType, Literal["(total part ghost elements,)"]]]
+    # Dual graph (shared facets) cut, and heaviest part weight over the average
+    edge_cut : NumericDecimalValueType
+    imbalance : NumericDecimalValueType
+
+    @property
+    def num_of_parts(self) -> NumericIntegerValueType:
+        return len(self.parts_els_is)
+
+def compute_halos(
+    mesh : MeshType,
+    els_parts_is : Annotated[NumericVectorValueType, Literal["(total elements,)"]],
+    num_of_parts : NumericIntegerValueType
+    ) -> Tuple[List[Annotated[NumericVectorValueType, Literal["(total part elements,)"]]], List[Annotated[NumericVectorValueType, Literal["(total part ghost elements,)"]]]]:
+    """
+    Owned and ghost elements of every part, ghosts being the foreign elements that share a node with the part.
+    """
+
+    # Element/node incidences, and which parts touch every node
+    incdnc_rows = [np.zeros(0, dtype=np.int64)]
+    incdnc_cols = [np.zeros(0, dtype=np.int64)]
+    el_offset = 0
+    for _, curr_els_nds_is in get_blocks(mesh):
+        incdnc_rows.append(np.repeat(el_offset + np.arange(len(curr_els_nds_is)), curr_els_nds_is.shape[1]))
+        incdnc_cols.append(curr_els_nds_is.ravel())
+        el_offset += len(curr_els_nds_is)
+    incdnc_rows = np.concatenate(incdnc_rows)
+    incdnc_cols = np.concatenate(incdnc_cols)
+    incdnc = sps.csr_array((np.ones(len(incdnc_rows), dtype=np.int32), (incdnc_rows, incdnc_cols)), shape=(mesh.num_of_els, mesh.num_of_nds))
+    nds_parts = sps.csr_array((np.ones(len(incdnc_rows), dtype=np.int32), (incdnc_cols, els_parts_is[incdnc_rows])), shape=(mesh.num_of_nds, num_of_parts))
+    # Parts touching every element through its nodes
+    els_parts = (incdnc @ nds_parts).tocoo()
+    ghsts = els_parts.col != els_parts_is[els_parts.row]
+    ghsts_els_is, ghsts_parts_is = els_parts.row[ghsts], els_parts.col[ghsts]
+
+    ordr = np.lexsort((ghsts_els_is, ghsts_parts_is))
+    parts_ghsts_els_is = np.split(ghsts_els_is[ordr], np.cumsum(np.bincount(ghsts_parts_is, minlength=num_of_parts))[:-1])
+    ordr = np.argsort(els_parts_is, kind="stable")
+    parts_els_is = np.split(ordr, np.cumsum(np.bincount(els_parts_is, minlength=num_of_parts))[:-1])
+    return parts_els_is, parts_ghsts_els_is
+
+@PROFILER.instrument(cat="mesh")
+def partition_mesh(
+    mesh : MeshType,
+    num_of_parts : NumericIntegerValueType,
+    mthd : PartitionMethod = PartitionMethod.MULTILEVEL,
+    els_wghts : Annotated[NumericVectorValueType, Literal["(total elements,)"]] = None,
+    imb_tol : NumericDecimalValueType = IMBALANCE_TOLERANCE,
+    curve : SpaceFillingCurve = SpaceFillingCurve.HILBERT,
+    seed : IndexType = 0
+    ) -> MeshPartition:
+    """
+    Partitions the elements of a (homogeneous or mixed) mesh for parallel work, by the multilevel partitioner on its dual graph or along a space-filling curve through its centroids (much cheaper, with typically larger cuts).
+    The multilevel partitioner also refines the curve partition as a candidate (see `partition_graph()`), so its cut is never worse than the curve's.
+    `els_wghts` weigh the elements' work (e.g. their numbers of quadrature points or their orders), uniform by default.
+    """
+
+    if els_wghts is None:
+        els_wghts = np.ones(mesh.num_of_els)
+    with PROFILER.timer("partition_mesh/dual_graph", cat="mesh"):
+        dual_grph = compute_dual_graph(mesh)
+    match mthd:
+        case PartitionMethod.MULTILEVEL:
+            crv_parts_is = partition_curve(compute_elements_centroids(mesh), num_of_parts, els_wghts, curve)
+            els_parts_is = partition_graph(dual_grph, num_of_parts, els_wghts, imb_tol, seed, init_parts=crv_parts_is)
+        case PartitionMethod.SPACE_FILLING_CURVE:
+            els_parts_is = partition_curve(compute_elements_centroids(mesh), num_of_parts, els_wghts, curve)
+
+    with PROFILER.timer("partition_mesh/halos", cat="mesh"):
+        parts_els_is, parts_ghsts_els_is = compute_halos(mesh, els_parts_is, num_of_parts)
+    parts_wghts = np.bincount(els_parts_is, weights=els_wghts, minlength=num_of_parts)
+    return MeshPartition(
+        els_parts_is,
+        parts_els_is,
+        parts_ghsts_els_is,
+        compute_edge_cut(dual_grph, els_parts_is),
+        float(parts_wghts.max() / max(parts_wghts.mean(), np.finfo(float).tiny))
+        )
@@ -9,7 +9,7 @@ class Space(ABC):
 
     def __contains__(self, item):
         # For class-level checking
-        if issubclass(item, self):
+        if isinstance(item, type) and issubclass(item, type(self)):
             return True
         # Class attributes
         if hasattr(item, "HOST_SPCE"):
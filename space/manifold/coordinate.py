@@ -1,9 +1,25 @@
 # Libraries
 import sympy as sp
-from abc import ABC
+import numpy as np
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
+from functools import lru_cache, cached_property
 # Scripts
 from Code.types import *
+from Code.symbolic.types import *
+from Code.utilities.auxilary import make_callable
+from Code.space.base import Space
+from Code.space.manifold.vector import Vector, VectorSpace
+
+
+'''
+Script-specific typing setup
+'''
+
+# Rows are vectors, columns follow the host space's `ordered_crds`
+CoordinateValuesType : TypeAlias = Annotated[NumericMatrixValueType, Literal["(total vectors, dimensions)"]]
+# Per-vector scale factors broadcast over the dimensions
+ScaleType : TypeAlias = Union[NumericScalarValueType, Annotated[NumericVectorValueType, Literal["(total vectors,)"]]]
 
 
 # Individual "coordinates" are mathematically nothing more than consistently-labeled placeholders- that is, a "coordinate" identifies a particular “slot” corresponding to the basis vector scaled by its supplied coordinate vector's concrete argument.
@@ -29,7 +45,7 @@ class CoordinateVector(Vector):
 
     # Input checking
     def __post_init__(self):
-        host_spce_crds = self.host_spce.crds
+        host_spce_crds = set(self.host_spce.crds)
         cmpnts_crds = set(self.cmpnts.keys())
         if host_spce_crds != cmpnts_crds:
             raise ValueError(f"Coordinates provided ({cmpnts_crds}) do not match host space coordinates ({host_spce_crds}).")
@@ -73,6 +89,98 @@ class CoordinateVector(Vector):
             for curr_crd in self.crds
             )
 
+class CoordinateVectorBatch:
+    """
+    Numeric companion of `CoordinateVector` for many vectors at once (e.g. all nodes of a mesh): N vectors of a single host space as one `(N, dimensions)` array, whose columns follow the host space's `ordered_crds`.
+
+    Nothing is validated per vector (or copied): operations only check, once per batch, that both operands share a host space, and then run as single NumPy operations.
+    """
+
+    __slots__ = ("host_spce", "vals")
+
+    def __init__(
+        self,
+        host_spce : "CoordinateSpace",
+        vals : CoordinateValuesType
+        ):
+
+        self.host_spce = host_spce
+        self.vals = vals
+
+    @classmethod
+    def from_vectors(
+        cls,
+        host_spce : "CoordinateSpace",
+        crd_vecs : List[CoordinateVector]
+        ) -> Self:
+
+        return cls(
+            host_spce,
+            np.array([[float(curr_crd_vec[curr_crd]) for curr_crd in host_spce.ordered_crds] for curr_crd_vec in crd_vecs], dtype=float).reshape(-1, host_spce.dimalty)
+            )
+
+    def to_vectors(self) -> List[CoordinateVector]:
+
+        return [self[curr_vec_i] for curr_vec_i in range(len(self))]
+
+    def __len__(self) -> NumericIntegerValueType:
+        return self.vals.shape[0]
+
+    def __getitem__(
+        self,
+        key : Union[IndexType, slice, NumericVectorValueType]
+        ) -> Union[CoordinateVector, Self]:
+
+        # Single vectors come back as (validated) `CoordinateVector`s, anything else as a sub-batch
+        if isinstance(key, RUNTIME_INDEX_TYPE):
+            return CoordinateVector(
+                host_spce = self.host_spce,
+                cmpnts = dict(zip(self.host_spce.ordered_crds, self.vals[key].tolist()))
+                )
+        return CoordinateVectorBatch(self.host_spce, self.vals[key])
+
+    def column(
+        self,
+        crd : Coordinate
+        ) -> Annotated[NumericVectorValueType, Literal["(total vectors,)"]]:
+
+        return self.vals[:, self.host_spce.crds_is[crd]]
+
+    def check_host_space(
+        self,
+        other : Self
+        ):
+
+        if other.host_spce != self.host_spce:
+            raise ValueError(f"Could not combine coordinate vectors of space {self.host_spce} with coordinate vectors of space {other.host_spce}.")
+        if len(other) != len(self):
+            raise ValueError(f"Could not combine batches of {len(self)} and {len(other)} coordinate vectors.")
+
+    def __add__(self, other: Self) -> Self:
+        self.check_host_space(other)
+        return CoordinateVectorBatch(self.host_spce, self.vals + other.vals)
+
+    def __sub__(self, other: Self) -> Self:
+        self.check_host_space(other)
+        return CoordinateVectorBatch(self.host_spce, self.vals - other.vals)
+
+    def __neg__(self) -> Self:
+        return CoordinateVectorBatch(self.host_spce, -self.vals)
+
+    def __mul__(self, other: ScaleType) -> Self:
+        scale = np.asarray(other, dtype=float)
+        return CoordinateVectorBatch(self.host_spce, self.vals * (scale[:, None] if scale.ndim == 1 else scale))
+
+    def __rmul__(self, other: ScaleType) -> Self:
+        return self * other
+
+    def map_to_identity(self) -> Self:
+
+        return self.host_spce.identity_isomorphism_batch(self)
+
+    def __repr__(self):
+        return f"CoordinateVectorBatch({len(self)} vectors of {self.host_spce})"
+
 @dataclass(frozen=True)
 class CoordinateSpace(VectorSpace, ABC):
     crds : Set[Coordinate]
@@ -83,12 +191,26 @@ class CoordinateSpace(VectorSpace, ABC):
         if self.dimalty != crds_dimalty:
             raise ValueError(f"Number of coordinates provided ({crds_dimalty}) does not match dimensionality of host space ({self.dimalty}).")
 
+    @property
+    def dimalty(self) -> NumericIntegerValueType:
+        return self.DIMALTY
+
     def vector(
         self,
         cmpnts : Dict[Coordinate, SymbolicScalarValueType]
-        ):
+        ) -> "CoordinateVector":
+
+        return CoordinateVector(host_spce=self, cmpnts=cmpnts)
 
-        
+    # Fixed coordinate ordering for array-backed (batch) representations: as given if the coordinates are a sequence, else sorted by name
+    @cached_property
+    def ordered_crds(self) -> Tuple[Coordinate, ...]:
+        if isinstance(self.crds, (tuple, list)):
+            return tuple(self.crds)
+        return tuple(sorted(self.crds, key=lambda crd: crd.sym.name))
+    @cached_property
+    def crds_is(self) -> Dict[Coordinate, IndexType]:
+        return {curr_crd: curr_crd_i for curr_crd_i, curr_crd in enumerate(self.ordered_crds)}
 
     # Cartesian coordinate space is used as the identity CoordinateSpace
     @abstractmethod
@@ -100,29 +222,152 @@ class CoordinateSpace(VectorSpace, ABC):
         pass
 
     @cached_property
-    def basis(self) -> Dict[Coordinate, "CoordinateVector"]:
+    def crds_syms(self) -> Tuple[sp.Symbol, ...]:
+        return tuple(curr_crd.sym for curr_crd in self.ordered_crds)
+
+    @cached_property
+    def identity_isomorphism_image(self) -> Tuple["CoordinateSpace", Tuple[SymbolicScalarValueType, ...]]:
+        """
+        The identity isomorphism, applied once to this space's own coordinate symbols: the image space and the image's (ordered) components as expressions of this space's coordinates.
+        Everything derived from the map (kernels, Jacobian, metric) starts from this single evaluation.
+        """
 
+        img = self.identity_isomorphism(CoordinateVector(
+            host_spce = self,
+            cmpnts = dict(zip(self.ordered_crds, self.crds_syms))
+            ))
+        img_spce = img.host_spce
 
-        
+        return img_spce, tuple(img[curr_crd] for curr_crd in img_spce.ordered_crds)
 
+    @cached_property
+    def identity_isomorphism_kernel(self) -> Callable[..., Tuple[NumericValueType, ...]]:
+        return make_callable(self.crds_syms, self.identity_isomorphism_image[1])
 
+    def evaluate_kernel(
+        self,
+        kernel : Callable[..., Tuple[NumericValueType, ...]],
+        crd_vecs : "CoordinateVectorBatch"
+        ) -> Annotated[NumericMatrixValueType, Literal["(total vectors, total outputs)"]]:
 
+        outputs = kernel(*crd_vecs.vals.T)
+        # Constant outputs lambdify to scalars
+        return np.stack([np.broadcast_to(np.asarray(curr_output, dtype=float), (len(crd_vecs),)) for curr_output in outputs], axis=1)
 
+    def identity_isomorphism_batch(
+        self,
+        crd_vecs : "CoordinateVectorBatch"
+        ) -> "CoordinateVectorBatch":
 
-# class 𝑋1(CartesianCoordinateSpace):
+        return CoordinateVectorBatch(self.identity_isomorphism_image[0], self.evaluate_kernel(self.identity_isomorphism_kernel, crd_vecs))
+
+    # Differential geometry of the identity isomorphism, derived symbolically once per space
+    @cached_property
+    def jacobian(self) -> SymbolicMatrixValueType:
+        """
+        `Jᵢⱼ = ∂xᵢ/∂qⱼ`, where `x` are the image (Cartesian) coordinates and `q` this space's coordinates.
+        """
+        return sp.simplify(sp.Matrix(self.identity_isomorphism_image[1]).jacobian(sp.Matrix(self.crds_syms)))
+    @cached_property
+    def metric(self) -> SymbolicMatrixValueType:
+        # gᵢⱼ = ∑ₖ JₖᵢJₖⱼ
+        return sp.simplify(self.jacobian.T @ self.jacobian)
+    @cached_property
+    def inverse_metric(self) -> SymbolicMatrixValueType:
+        return sp.simplify(self.metric.inv())
+    @cached_property
+    def volume_element(self) -> SymbolicScalarValueType:
+        # √det(g) = |det(J)|, taken as det(J) for positively oriented coordinates (e.g. r, θ, ɸ with r ≥ 0 and 0 ≤ θ ≤ π)
+        return sp.simplify(self.jacobian.det())
+    @cached_property
+    def is_orthogonal(self) -> bool:
+        return all(self.metric[curr_row_i, curr_col_i] == 0 for curr_row_i in range(self.dimalty) for curr_col_i in range(self.dimalty) if curr_row_i != curr_col_i)
+    @cached_property
+    def scale_factors(self) -> Tuple[SymbolicScalarValueType, ...]:
+        """
+        Lamé coefficients `hᵢ = √gᵢᵢ` (only meaningful for orthogonal coordinates), taking the coordinates as positive so that e.g. `√r² = r`.
+        """
+        pos_syms = {curr_sym: sp.Dummy(curr_sym.name, positive=True) for curr_sym in self.crds_syms}
+        orig_syms = {curr_pos_sym: curr_sym for curr_sym, curr_pos_sym in pos_syms.items()}
+        return tuple(
+            sp.simplify(sp.sqrt(self.metric[curr_dim_i, curr_dim_i].subs(pos_syms))).subs(orig_syms)
+            for curr_dim_i in range(self.dimalty)
+            )
+
+    # Batched numeric counterparts: arrays of per-vector values over a `CoordinateVectorBatch`
+    @cached_property
+    def jacobian_kernel(self) -> Callable[..., Tuple[NumericValueType, ...]]:
+        return make_callable(self.crds_syms, tuple(self.jacobian))
+    @cached_property
+    def metric_kernel(self) -> Callable[..., Tuple[NumericValueType, ...]]:
+        return make_callable(self.crds_syms, tuple(self.metric))
+    @cached_property
+    def volume_element_kernel(self) -> Callable[..., Tuple[NumericValueType, ...]]:
+        return make_callable(self.crds_syms, (self.volume_element,))
+
+    def compute_jacobians(
+        self,
+        crd_vecs : "CoordinateVectorBatch"
+        ) -> Annotated[NumericTensorValueType, Literal["(total vectors, dimensions, dimensions)"]]:
+
+        return self.evaluate_kernel(self.jacobian_kernel, crd_vecs).reshape(-1, self.dimalty, self.dimalty)
+
+    def compute_metrics(
+        self,
+        crd_vecs : "CoordinateVectorBatch"
+        ) -> Annotated[NumericTensorValueType, Literal["(total vectors, dimensions, dimensions)"]]:
+
+        return self.evaluate_kernel(self.metric_kernel, crd_vecs).reshape(-1, self.dimalty, self.dimalty)
+
+    def compute_volume_elements(
+        self,
+        crd_vecs : "CoordinateVectorBatch"
+        ) -> Annotated[NumericVectorValueType, Literal["(total vectors,)"]]:
+
+        return self.evaluate_kernel(self.volume_element_kernel, crd_vecs)[:, 0]
+
+    @cached_property
+    def basis(self) -> Dict[Coordinate, "CoordinateVector"]:
+
+        return {
+            curr_crd: self.vector({curr_other_crd: int(curr_other_crd == curr_crd) for curr_other_crd in self.crds})
+            for curr_crd in self.crds
+            }
 
 
+# class 𝑋1(CartesianCoordinateSpace):
 
 
+# Dimensions of the symbolic front end's spaces are coordinates by another name
+Dimension = Coordinate
 
+@dataclass(repr=False, eq=False)
+class DimensionalSpace(Space):
+    """
+    Space spanned by named dimensions, as used by the symbolic front end (weak forms, boundaries, domains), whose expressions are written in its dimensions' symbols.
+    Spaces are compared by identity.
+    """
 
-quit()
+    name : NameType
+    dims : Tuple[Dimension, ...]
 
+    @property
+    def dimalty(self) -> NumericIntegerValueType:
+        return len(self.dims)
 
+    def __len__(self) -> NumericIntegerValueType:
+        return len(self.dims)
+    def __getitem__(self, dim_i : IndexType) -> Dimension:
+        return self.dims[dim_i]
 
+    def dims_syms(self) -> Tuple[sp.Symbol, ...]:
+        return tuple(curr_dim.sym for curr_dim in self.dims)
 
-@dataclass(repr=False)
-class PhysicalSpace(Space):
+    def __repr__(self):
+        return self.name
+
+@dataclass(repr=False, eq=False)
+class PhysicalSpace(DimensionalSpace):
     ref_spce : "ReferenceSpace" = None
 
     def create_reference_space(
@@ -149,8 +394,8 @@ class PhysicalSpace(Space):
             phys_spce = self
             )
 
-@dataclass(repr=False)
-class ReferenceSpace(Space):
+@dataclass(repr=False, eq=False)
+class ReferenceSpace(DimensionalSpace):
     phys_spce : PhysicalSpace = None
 
 
@@ -174,41 +419,39 @@ r_crd = Coordinate(sp.Symbol('r'))
 
 
 
-R1_dim = Dimension(sp.Symbol('x'))
-R1_ref_dim = Dimension(sp.Symbol('ξ'))
-
-R1 = PhysicalSpace(
-    name = 'R1', 
-    dims = (x_dim,)
-    )
-R1.create_reference_space(
-    name = 'R1_ref',
-    dims = (x_ref_dim,)
-    )
+# Default spaces (and their reference spaces) are only built on first access, e.g. `from Code.space.manifold.coordinate import R2`, so importing this module stays cheap
+# Name ⟼ ((physical dimension symbol, reference dimension symbol), ...)
+DEFAULT_SPACES_DIMS_SYMS = {
+    'R1': (('x', 'ξ'),),
+    'R2': (('x', 'ξ'), ('y', 'η')),
+    'R3': (('x', 'ξ'), ('y', 'η'), ('z', 'ζ'))
+    }
 
+# Shared between the default spaces, as R1's x is R2's & R3's x
+@lru_cache(maxsize=None)
+def get_default_dimension(sym_name : NameType) -> Dimension:
 
-y_dim = Dimension(sp.Symbol('y'))
-y_ref_dim = Dimension(sp.Symbol('η'))
+    return Dimension(sp.Symbol(sym_name))
 
-R2 = PhysicalSpace(
-    name = 'R2',
-    dims = (x_dim, y_dim)
-    )
-R2.create_reference_space(
-    name = 'R2_ref', 
-    dims = (x_ref_dim, y_ref_dim)
-    )
+def create_default_space(name : NameType) -> PhysicalSpace:
 
+    phys_dims_syms_names, ref_dims_syms_names = zip(*DEFAULT_SPACES_DIMS_SYMS[name])
+    spce = PhysicalSpace(
+        name = name,
+        dims = tuple(get_default_dimension(curr_sym_name) for curr_sym_name in phys_dims_syms_names)
+        )
+    spce.create_reference_space(
+        name = f"{name}_ref",
+        dims = tuple(get_default_dimension(curr_sym_name) for curr_sym_name in ref_dims_syms_names)
+        )
 
-z_dim = Dimension(sp.Symbol('z'))
-z_ref_dim = Dimension(sp.Symbol('ζ'))
+    return spce
 
-R3 = PhysicalSpace(
-    name = 'R3', 
-    dims = (x_dim, y_dim, z_dim)
-    )
-R3.create_reference_space(
-    name = 'R3_ref', 
-    dims = (x_ref_dim, y_ref_dim, z_ref_dim)
-    )
+def __getattr__(name : str) -> Any:
 
+    if name in DEFAULT_SPACES_DIMS_SYMS:
+        spce = create_default_space(name)
+        # Cache as a regular module attribute, so later lookups bypass this function entirely
+        globals()[name] = spce
+        return spce
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -2,11 +2,13 @@
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 # Scripts
-from types import *
+from Code.types import *
+from Code.space.base import Space
 
 
 # Goal: order-based node insertion into Topologies
 # Goal: abstract/templated assembly of CoordinateSpaces into ManifoldSpaces
 
 
-class ManifoldSpace(Space, ABC)
\ No newline at end of file
+class ManifoldSpace(Space, ABC):
+    pass
@@ -1,3 +1,12 @@
+# Libraries
+from abc import ABC
+from dataclasses import dataclass
+# Scripts
+from Code.types import *
+from Code.symbolic.types import *
+from Code.space.manifold.manifold import ManifoldSpace
+from Code.space.topological.base import Point, Curve, Surface, Volume
+
 
 @dataclass
 class Vector(ABC):
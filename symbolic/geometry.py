@@ -4,7 +4,7 @@ from dataclasses import dataclass
 from enum import IntEnum
 # Scripts
 from Code.types import *
-from Code.symbolic.space import Space
+from Code.space.base import Space
 from Code.symbolic.math import SymbolicMathematicalObject
 from Code.utilities.auxilary import make_callable, extract_base_types
 
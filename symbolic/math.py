@@ -1,10 +1,14 @@
 # Libraries
+import copy
+import operator
 import sympy as sp
 from abc import ABC, abstractmethod
 from dataclasses import dataclass
 # Scripts
 from Code.types import *
-from Code.symbolic.space import Space
+from Code.symbolic.types import *
+from Code.space.base import Space
+from Code.utilities.profiling import PROFILER
 
 
 '''
@@ -24,6 +28,12 @@ OperandInputType = SymbolicMathematicalObjectInputType
 RUNTIME_UNCAST_EXPRESSION_TYPE = extract_base_types(UncastExpressionType)
 RUNTIME_UNCAST_ARGUMENT_TYPE = extract_base_types(UncastArgumentType)
 
+# Per-class casting functions, filled on first sight of each input class, so that the `isinstance()` checks against the runtime type tuples run once per class rather than once per operand
+CAST_FNS : Dict[type, Callable[[SymbolicMathematicalObjectInputType], "SymbolicMathematicalObject"]] = {}
+
+# Compiled evaluation: (kernel, source registers' indices, destination register index)
+InstructionType : TypeAlias = Tuple[Callable[..., SymbolicValueType], Tuple[IndexType, ...], IndexType]
+
 
 '''
 Abstract Mathematical Object Superclasses
@@ -39,10 +49,11 @@ class SymbolicMathematicalObject(ABC):
         return Sum(self, other)
     def __radd__(self, other: OperandInputType):
         return Sum(other, self)
+    # Subtraction adds the negation, so that chained differences flatten into one (shallow) `Sum` like chained additions do
     def __sub__(self, other: OperandInputType):
-        return Difference(self, other)
+        return Sum(self, Negation(other))
     def __rsub__(self, other: OperandInputType):
-        return Difference(other, self)
+        return Sum(other, Negation(self))
     def __mul__(self, other: OperandInputType):
         return ScalarMultiplication(self, other)
     def __rmul__(self, other: OperandInputType):
@@ -66,18 +77,29 @@ class SymbolicMathematicalObject(ABC):
 
         cast_inps = []
         for curr_inp in inps:
-            curr_cast_inp = None
-            if isinstance(curr_inp, RUNTIME_UNCAST_EXPRESSION_TYPE):
-                curr_cast_inp = Expression(curr_inp)
-            elif isinstance(curr_inp, RUNTIME_UNCAST_ARGUMENT_TYPE):
-                curr_cast_inp = Argument(curr_inp)
-            elif isinstance(curr_inp, (Expression, Argument, Operator)):
-                curr_cast_inp = curr_inp
-            else:
-                raise TypeError
-            cast_inps.append(curr_cast_inp)
+            curr_cast_fn = CAST_FNS.get(type(curr_inp))
+            if curr_cast_fn is None:
+                curr_cast_fn = SymbolicMathematicalObject.get_cast_function(type(curr_inp))
+            cast_inps.append(curr_cast_fn(curr_inp))
             
         return cast_inps
+
+    @staticmethod
+    def get_cast_function(
+        inp_cls : type
+        ) -> Callable[[SymbolicMathematicalObjectInputType], Self]:
+
+        if issubclass(inp_cls, RUNTIME_UNCAST_EXPRESSION_TYPE):
+            cast_fn = Expression
+        elif issubclass(inp_cls, RUNTIME_UNCAST_ARGUMENT_TYPE):
+            cast_fn = Argument
+        elif issubclass(inp_cls, (Expression, Argument, Operator)):
+            cast_fn = lambda inp: inp
+        else:
+            raise TypeError(f"Can not cast {inp_cls.__name__} objects to symbolic mathematical objects.")
+        CAST_FNS[inp_cls] = cast_fn
+
+        return cast_fn
         
 
 '''
@@ -124,6 +146,9 @@ class Operator(SymbolicMathematicalObject, ABC):
     This class serves as an abstract template for all concrete operators.
     """
 
+    # Optional direct kernel of the evaluated operands (e.g. `operator.add`), used by compiled evaluation to skip `evaluate()`'s tuple packing & unpacking
+    KERNEL : ClassVar[Callable[..., SymbolicValueType]] = None
+
     def __init__(
         self,
         oprnds : List[OperandInputType]
@@ -132,6 +157,7 @@ class Operator(SymbolicMathematicalObject, ABC):
         # Set cast operands
         self.oprnds = self.cast(oprnds)
     
+    @PROFILER.instrument(cat="symbolic", per_class=True)
     def __call__(
         self,
         args : Dict[Union[UncastArgumentType, Argument], SymbolicValueType] = None
@@ -163,6 +189,38 @@ class Operator(SymbolicMathematicalObject, ABC):
 
         return self.evaluate(evald_oprnds)
 
+    def compile(self) -> "CompiledOperator":
+
+        return compile_operator(self)
+
+    def with_operands(
+        self,
+        oprnds : List[SymbolicMathematicalObject]
+        ) -> Self:
+        """
+        Shallow copy with its operands replaced (keeping e.g. a spatial operator's space), for tree rewriting passes.
+        """
+
+        result = copy.copy(self)
+        result.oprnds = list(oprnds)
+
+        return result
+
+    def fold(
+        self,
+        oprnds : List[SymbolicMathematicalObject]
+        ) -> SymbolicMathematicalObject:
+        """
+        Constant folding step, given this operator's already folded operands: an operator of nothing but expressions is itself just an expression.
+        """
+
+        if all(isinstance(curr_oprnd, Expression) for curr_oprnd in oprnds):
+            return Expression(self.evaluate(tuple(curr_oprnd.val for curr_oprnd in oprnds))[0])
+        if all(curr_oprnd is curr_old_oprnd for curr_oprnd, curr_old_oprnd in zip(oprnds, self.oprnds)):
+            return self
+
+        return self.with_operands(oprnds)
+
     @abstractmethod
     def evaluate(
         self, 
@@ -222,6 +280,22 @@ class SpatialOperator(UnaryOperator, ABC):
         super().__init__(oprnd)
         self.spce = spce
 
+    # Coordinate spaces (`space/manifold/coordinate.py`) have an explicit coordinate ordering and cache their metric, which curvilinear operators reuse rather than re-differentiating the coordinate map
+    # Any other space is Cartesian in its dimensions' symbols
+    @property
+    def crds_syms(self) -> Tuple[sp.Symbol, ...]:
+        if hasattr(self.spce, "crds_syms"):
+            return self.spce.crds_syms
+        return tuple(self.spce[curr_dim_idx].sym for curr_dim_idx in range(len(self.spce)))
+    @property
+    def inverse_metric(self) -> SymbolicMatrixValueType:
+        inv_metric = getattr(self.spce, "inverse_metric", None)
+        return None if (inv_metric is None) or inv_metric.is_Identity else inv_metric
+    @property
+    def volume_element(self) -> SymbolicScalarValueType:
+        vol_el = getattr(self.spce, "volume_element", None)
+        return None if (vol_el is None) or (vol_el == 1) else vol_el
+
     @abstractmethod
     def evaluate(
         self, 
@@ -230,47 +304,183 @@ class SpatialOperator(UnaryOperator, ABC):
         
         pass
 
+def find_space(
+    oprnds : List[SymbolicMathematicalObject]
+    ) -> Space:
+    """
+    Space of the first spatial operator in a (depth-first, left-to-right) traversal of `oprnds`' trees, or `None` if there is none.
+    """
+
+    stck = list(reversed(oprnds))
+    while stck:
+        curr_oprnd = stck.pop()
+        if isinstance(curr_oprnd, SpatialOperator):
+            return curr_oprnd.spce
+        if isinstance(curr_oprnd, Operator):
+            stck.extend(reversed(curr_oprnd.oprnds))
+
+    return None
+
+class AssociativeOperator(Operator, ABC):
+    """
+    N-ary operator for associative operations, which absorbs the operands of nested instances of its own (exact) class: `(a+b)+c` is a single `Sum` of `[a, b, c]`, so chained composition builds shallow trees.
+
+    Operands live in a list that may be shared with the instance being extended, much like slices sharing a backing array: the latest instance built from a list appends to it in place, so chaining n operations is O(n) rather than O(n²).
+    Every instance only ever sees the first `num_of_oprnds` entries, so extending an older instance again (branching) copies instead.
+    """
+
+    # Identity element, dropped by constant folding
+    IDENTITY : ClassVar[SymbolicScalarValueType] = None
+
+    def __init__(
+        self,
+        *oprnds : OperandInputType
+        ):
+
+        oprnds = self.cast(oprnds)
+        frst_oprnd = oprnds[0]
+        if (type(frst_oprnd) is type(self)) and (len(frst_oprnd.shrd_oprnds) == frst_oprnd.num_of_oprnds):
+            self.shrd_oprnds = frst_oprnd.shrd_oprnds
+            oprnds = oprnds[1:]
+        else:
+            self.shrd_oprnds = []
+        self.extend(oprnds)
+
+    @property
+    def oprnds(self) -> List[SymbolicMathematicalObject]:
+        return self.shrd_oprnds[:self.num_of_oprnds]
+
+    def extend(
+        self,
+        oprnds : List[SymbolicMathematicalObject]
+        ):
+
+        for curr_oprnd in oprnds:
+            if type(curr_oprnd) is type(self):
+                self.shrd_oprnds.extend(curr_oprnd.oprnds)
+            else:
+                self.shrd_oprnds.append(curr_oprnd)
+        self.num_of_oprnds = len(self.shrd_oprnds)
+
+    def with_operands(
+        self,
+        oprnds : List[SymbolicMathematicalObject]
+        ) -> Self:
+
+        result = copy.copy(self)
+        result.shrd_oprnds = []
+        result.extend(oprnds)
+
+        return result
+
+    def fold(
+        self,
+        oprnds : List[SymbolicMathematicalObject]
+        ) -> SymbolicMathematicalObject:
+        """
+        Also folds every run of adjacent expressions among non-constant operands (order is kept, as products of matrices do not commute), and drops scalar identity elements.
+        """
+
+        if all(isinstance(curr_oprnd, Expression) for curr_oprnd in oprnds):
+            return Expression(self.evaluate(tuple(curr_oprnd.val for curr_oprnd in oprnds))[0])
+
+        fldd_oprnds = []
+        curr_run = []
+        for curr_oprnd in oprnds + [None]:
+            if isinstance(curr_oprnd, Expression):
+                curr_run.append(curr_oprnd)
+                continue
+            if len(curr_run) > 1:
+                curr_run = [Expression(self.evaluate(tuple(curr_const.val for curr_const in curr_run))[0])]
+            fldd_oprnds.extend(
+                curr_const for curr_const in curr_run
+                if not (isinstance(curr_const.val, RUNTIME_SYMBOLIC_SCALAR_VALUE_TYPE) and (curr_const.val == self.IDENTITY))
+                )
+            curr_run = []
+            if curr_oprnd is not None:
+                fldd_oprnds.append(curr_oprnd)
+
+        if len(fldd_oprnds) == 1:
+            return fldd_oprnds[0]
+        if (len(fldd_oprnds) == self.num_of_oprnds) and all(curr_oprnd is curr_old_oprnd for curr_oprnd, curr_old_oprnd in zip(fldd_oprnds, self.oprnds)):
+            return self
+
+        return self.with_operands(fldd_oprnds)
+
 
 '''
-Binary Operators
+Associative Operators
 '''
 
-class Sum(BinaryOperator):    
+def add_all(*vals : SymbolicValueType) -> SymbolicValueType:
+
+    # One SymPy Add rather than n nested ones (each re-flattening its arguments)
+    if all(isinstance(curr_val, sp.Expr) for curr_val in vals):
+        return sp.Add(*vals)
+    result = vals[0]
+    for curr_val in vals[1:]:
+        result = result + curr_val
+
+    return result
+
+def multiply_all(*vals : SymbolicValueType) -> SymbolicValueType:
+
+    if all(isinstance(curr_val, sp.Expr) for curr_val in vals):
+        return sp.Mul(*vals)
+    result = vals[0]
+    for curr_val in vals[1:]:
+        result = result * curr_val
+
+    return result
+
+class Sum(AssociativeOperator):
+
+    IDENTITY = 0
+    KERNEL = staticmethod(add_all)
 
     def evaluate(
         self, 
-        evald_oprnds : Tuple[SymbolicValueType, SymbolicValueType]
+        evald_oprnds : Tuple[SymbolicValueType, ...]
         ) -> Tuple[SymbolicValueType]:
 
-        result = evald_oprnds[0] + evald_oprnds[1]
+        result = add_all(*evald_oprnds)
         return (result,)
 
-class Difference(BinaryOperator):
+class ScalarMultiplication(AssociativeOperator):
+
+    IDENTITY = 1
+    KERNEL = staticmethod(multiply_all)
 
     def evaluate(
         self, 
-        evald_oprnds : Tuple[SymbolicValueType, SymbolicValueType]
+        evald_oprnds : Tuple[SymbolicValueType, ...]
         ) -> Tuple[SymbolicValueType]:
 
-        result = evald_oprnds[0] - evald_oprnds[1]
+        result = multiply_all(*evald_oprnds)
         return (result,)
 
-class ScalarMultiplication(BinaryOperator):
+
+'''
+Binary Operators
+'''
+
+class Difference(BinaryOperator):
+
+    KERNEL = operator.sub
 
     def evaluate(
         self, 
-        evald_oprnds : Union[
-            Tuple[SymbolicScalarValueType, SymbolicValueType], 
-            Tuple[SymbolicValueType, SymbolicScalarValueType]
-            ]
+        evald_oprnds : Tuple[SymbolicValueType, SymbolicValueType]
         ) -> Tuple[SymbolicValueType]:
 
-        result = evald_oprnds[0] * evald_oprnds[1]
+        result = evald_oprnds[0] - evald_oprnds[1]
         return (result,)
 
 # Technically redundant due to ScalarMultiplication, but VERY convenient
 class ScalarDivision(BinaryOperator):
-    
+
+    KERNEL = operator.truediv
+
     def evaluate(
         self, 
         evald_oprnds : Union[
@@ -283,18 +493,43 @@ class ScalarDivision(BinaryOperator):
         return (result,)
 
 class DotProduct(BinaryOperator):
+    """
+    In curvilinear coordinates, vectors from spatial operators (e.g. `Gradient`) have contravariant components, so one factor is lowered with the metric: `a·b = gᵢⱼ·aⁱ·bʲ`.
+    Unless given, the space is that of the first spatial operator found in the operands; without one, components are summed directly.
+    """
+
+    def __init__(
+        self,
+        first_oprnd : OperandInputType,
+        second_oprnd : OperandInputType,
+        spce : Space = None
+        ):
+
+        super().__init__(first_oprnd, second_oprnd)
+        self.spce = spce if spce is not None else find_space(self.oprnds)
+
+    @property
+    def metric(self) -> SymbolicMatrixValueType:
+        metric = getattr(self.spce, "metric", None)
+        return None if (metric is None) or metric.is_Identity else metric
 
     def evaluate(
         self, 
         evald_oprnds : Tuple[SymbolicVectorValueType, SymbolicVectorValueType]
         ) -> Tuple[SymbolicScalarValueType]:
 
-        # SymPy Matrix objects have a .dot() method
-        result = evald_oprnds[0].dot(evald_oprnds[1])
+        metric = self.metric
+        if metric is None:
+            # SymPy Matrix objects have a .dot() method
+            result = evald_oprnds[0].dot(evald_oprnds[1])
+        else:
+            result = (sp.Matrix(evald_oprnds[0]).T @ metric @ sp.Matrix(evald_oprnds[1]))[0, 0]
         return (result,)
 
 class MatrixProduct(BinaryOperator):
 
+    KERNEL = operator.matmul
+
     def evaluate(
         self,
         evald_oprnds : Tuple[SymbolicMatrixValueType, SymbolicMatrixValueType]
@@ -309,7 +544,9 @@ Unary Operators
 '''
 
 class Negation(UnaryOperator):
-    
+
+    KERNEL = operator.neg
+
     def evaluate(
         self,
         evald_oprnd : Tuple[SymbolicValueType]    
@@ -355,10 +592,15 @@ class Gradient(SpatialOperator):
         evald_oprnd : Tuple[SymbolicScalarValueType]
         ) -> Tuple[SymbolicVectorValueType]:
 
-        result = sp.zeros(len(self.spce), 1)
-        for curr_dim_idx in range(len(self.spce)):
-            result[curr_dim_idx, 0] = sp.Derivative(evald_oprnd[0], self.spce[curr_dim_idx].sym)
+        crds_syms = self.crds_syms
+        result = sp.zeros(len(crds_syms), 1)
+        for curr_dim_idx in range(len(crds_syms)):
+            result[curr_dim_idx, 0] = sp.Derivative(evald_oprnd[0], crds_syms[curr_dim_idx])
         result = result.doit()
+        # Curvilinear coordinates: contravariant components (∇f)ⁱ = gⁱʲ·∂f/∂qʲ
+        inv_metric = self.inverse_metric
+        if inv_metric is not None:
+            result = inv_metric @ result
 
         return (result,)
 
@@ -369,10 +611,16 @@ class Divergence(SpatialOperator):
         evald_oprnd : Tuple[SymbolicVectorValueType]
         ) -> Tuple[SymbolicScalarValueType]:
 
+        # Curvilinear coordinates: ∇·v = (1/√g)·∂(√g·vⁱ)/∂qⁱ, for contravariant components vⁱ (as returned by `Gradient`)
+        crds_syms = self.crds_syms
+        vol_el = self.volume_element
         result = 0
-        for curr_dim_idx in range(len(self.spce.dims)):
-            result += sp.Derivative(evald_oprnd[0][curr_dim_idx], self.spce[curr_dim_idx].sym)
+        for curr_dim_idx in range(len(crds_syms)):
+            curr_cmpnt = evald_oprnd[0][curr_dim_idx] if vol_el is None else vol_el * evald_oprnd[0][curr_dim_idx]
+            result += sp.Derivative(curr_cmpnt, crds_syms[curr_dim_idx])
         result = result.doit()
+        if vol_el is not None:
+            result = result / vol_el
 
         return (result,)
 
@@ -396,3 +644,202 @@ class Laplacian(SpatialOperator):
         
         return self.div.evaluate(self.grad.evaluate(evald_oprnd))
 
+
+'''
+Rewriting & compilation
+'''
+
+def fold_constants(
+    obj : SymbolicMathematicalObject
+    ) -> SymbolicMathematicalObject:
+    """
+    Returns an equivalent object in which every operator depending on no `Argument` is replaced by the `Expression` of its value, see `Operator.fold()`.
+    Untouched subtrees are returned as is (not copied), and so is `obj` itself if nothing folds.
+    """
+
+    # Iterative post-order traversal, memoized by identity so shared subtrees fold once (and stay shared)
+    fldd_objs = {}
+    stck = [(obj, None)]
+    while stck:
+        curr_obj, curr_oprnds = stck.pop()
+        if id(curr_obj) in fldd_objs:
+            continue
+        if not isinstance(curr_obj, Operator):
+            fldd_objs[id(curr_obj)] = curr_obj
+        elif curr_oprnds is None:
+            # Operand lists are held on the stack, so their objects (and thus their ids) stay alive
+            curr_oprnds = curr_obj.oprnds
+            stck.append((curr_obj, curr_oprnds))
+            stck.extend((curr_oprnd, None) for curr_oprnd in curr_oprnds)
+        else:
+            fldd_objs[id(curr_obj)] = curr_obj.fold([fldd_objs[id(curr_oprnd)] for curr_oprnd in curr_oprnds])
+
+    return fldd_objs[id(obj)]
+
+class CompiledOperator:
+    """
+    Flat, topologically ordered instruction tape equivalent to a `SymbolicMathematicalObject` tree.
+
+    Registers hold, in order: `Argument` inputs, `Expression` constants, and every operator's result.
+    Evaluation is a single loop over the tape, without recursion, type dispatch, or per-node tuple (re)packing.
+    Operators shared between several parents (i.e. trees that are really DAGs) are evaluated only once.
+    """
+
+    def __init__(
+        self,
+        args : Tuple[Argument, ...],
+        init_regs : List[SymbolicValueType],
+        tape : Tuple[InstructionType, ...],
+        arg_dpndnt_tape : Tuple[InstructionType, ...],
+        out_reg_i : IndexType
+        ):
+
+        self.args = args
+        self.init_regs = init_regs
+        self.tape = tape
+        # Subsequence of the tape which (transitively) depends on arguments; the rest is identical for every argument set
+        self.arg_dpndnt_tape = arg_dpndnt_tape
+        self.out_reg_i = out_reg_i
+
+    @property
+    def num_of_regs(self) -> NumericIntegerValueType:
+        return len(self.init_regs)
+
+    @staticmethod
+    def run(
+        tape : Tuple[InstructionType, ...],
+        regs : List[SymbolicValueType]
+        ):
+
+        for kernel, srcs_regs_is, dest_reg_i in tape:
+            regs[dest_reg_i] = kernel(*map(regs.__getitem__, srcs_regs_is))
+
+    @PROFILER.instrument(cat="symbolic")
+    def __call__(
+        self,
+        args : Dict[Union[UncastArgumentType, Argument], SymbolicValueType] = None
+        ) -> Tuple[SymbolicValueType]:
+        """
+        Same contract as `Operator.__call__()`, including the single-element result tuple.
+        """
+
+        regs = self.init_regs.copy()
+        for curr_arg_i, curr_arg in enumerate(self.args):
+            regs[curr_arg_i] = args[curr_arg]
+        self.run(self.tape, regs)
+
+        return (regs[self.out_reg_i],)
+
+    @PROFILER.instrument(cat="symbolic")
+    def evaluate_batch(
+        self,
+        args_batch : List[Dict[Union[UncastArgumentType, Argument], SymbolicValueType]]
+        ) -> List[SymbolicValueType]:
+        """
+        Evaluates every argument set of `args_batch`, running the argument-independent part of the tape only once for the whole batch.
+        For numeric batches, passing NumPy arrays as argument values to a single call is usually faster still, as every instruction then acts on the whole batch at once.
+        """
+
+        # Argument-independent instructions only read constants, so running them with placeholder argument registers is safe
+        base_regs = self.init_regs.copy()
+        if len(self.arg_dpndnt_tape) < len(self.tape):
+            arg_dpndnt_dests = {curr_dest_reg_i for _, _, curr_dest_reg_i in self.arg_dpndnt_tape}
+            self.run(tuple(curr_instr for curr_instr in self.tape if curr_instr[2] not in arg_dpndnt_dests), base_regs)
+
+        results = []
+        for curr_args in args_batch:
+            regs = base_regs.copy()
+            for curr_arg_i, curr_arg in enumerate(self.args):
+                regs[curr_arg_i] = curr_args[curr_arg]
+            self.run(self.arg_dpndnt_tape, regs)
+            results.append(regs[self.out_reg_i])
+
+        return results
+
+def get_kernel(
+    op_cls : Type[Operator]
+    ) -> Callable[..., SymbolicValueType]:
+
+    # A subclass overriding `evaluate()` must not inherit its parent's kernel, so the most derived definition of either wins
+    for curr_cls in op_cls.__mro__:
+        if "KERNEL" in vars(curr_cls):
+            return curr_cls.KERNEL
+        if "evaluate" in vars(curr_cls):
+            return None
+
+    return None
+
+def compile_operator(
+    obj : SymbolicMathematicalObject,
+    fold : bool = True
+    ) -> CompiledOperator:
+    """
+    Lowers `obj` (constant-folded first, unless `fold` is disabled) into a `CompiledOperator` by an iterative post-order traversal.
+    Operators without a `KERNEL` are wrapped around their (bound) `evaluate()`, so any concrete operator, including user-defined ones, compiles.
+    """
+
+    if fold:
+        obj = fold_constants(obj)
+
+    # First pass: registers for every distinct argument (by name) and every expression, in order of first appearance
+    args = []
+    args_regs_is = {}
+    consts = []
+    consts_regs_is = {}
+    ops = []
+    ops_regs_is = {}
+    stck = [(obj, False)]
+    while stck:
+        curr_obj, curr_is_expanded = stck.pop()
+        match curr_obj:
+            case Argument():
+                if curr_obj not in args_regs_is:
+                    args_regs_is[curr_obj] = len(args)
+                    args.append(curr_obj)
+            case Expression():
+                if id(curr_obj) not in consts_regs_is:
+                    consts_regs_is[id(curr_obj)] = len(consts)
+                    consts.append(curr_obj.val)
+            case Operator():
+                if id(curr_obj) in ops_regs_is:
+                    continue
+                if curr_is_expanded:
+                    # Post-order: all operands already have registers
+                    ops_regs_is[id(curr_obj)] = len(ops)
+                    ops.append(curr_obj)
+                else:
+                    stck.append((curr_obj, True))
+                    stck.extend((curr_oprnd, False) for curr_oprnd in reversed(curr_obj.oprnds))
+            case _:
+                raise TypeError(f"Can not compile {type(curr_obj).__name__} objects.")
+
+    # Register layout: arguments, then constants, then operator results
+    consts_offset = len(args)
+    ops_offset = consts_offset + len(consts)
+    def get_reg_i(curr_obj):
+        match curr_obj:
+            case Argument():
+                return args_regs_is[curr_obj]
+            case Expression():
+                return consts_offset + consts_regs_is[id(curr_obj)]
+            case Operator():
+                return ops_offset + ops_regs_is[id(curr_obj)]
+
+    # Second pass: instructions, in the (topological) order operators were numbered
+    tape = []
+    arg_dpndnt_tape = []
+    arg_dpndnt_regs_is = set(range(len(args)))
+    for curr_op_i, curr_op in enumerate(ops):
+        kernel = get_kernel(type(curr_op))
+        if kernel is None:
+            kernel = (lambda evaluate: lambda *evald_oprnds: evaluate(evald_oprnds)[0])(curr_op.evaluate)
+        srcs_regs_is = tuple(get_reg_i(curr_oprnd) for curr_oprnd in curr_op.oprnds)
+        instr = (kernel, srcs_regs_is, ops_offset + curr_op_i)
+        tape.append(instr)
+        if not arg_dpndnt_regs_is.isdisjoint(srcs_regs_is):
+            arg_dpndnt_regs_is.add(ops_offset + curr_op_i)
+            arg_dpndnt_tape.append(instr)
+
+    init_regs = [None] * len(args) + consts + [None] * len(ops)
+
+    return CompiledOperator(tuple(args), init_regs, tuple(tape), tuple(arg_dpndnt_tape), get_reg_i(obj))
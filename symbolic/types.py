@@ -0,0 +1,83 @@
+# Libraries
+import sympy as sp
+# Scripts
+from Code.types import *
+
+
+# Centralized handling of typing regarding SymPy's convoluted matrix/tensor classes
+SymPyMatrixType : TypeAlias = sp.MatrixBase
+SymPyArrayType : TypeAlias = sp.NDimArray
+
+
+# Supported symbolic value types
+SymbolicScalarValueType : TypeAlias = Union[
+    int, 
+    float, 
+    sp.Expr
+    ]
+SymbolicRowVectorValueType : TypeAlias = Annotated[
+    SymPyMatrixType, 
+    RowVectorValueShape
+    ]
+SymbolicColumnVectorValueType : TypeAlias = Annotated[
+    SymPyMatrixType, 
+    ColumnVectorValueShape
+    ]
+SymbolicVectorValueType : TypeAlias = Union[
+    SymbolicRowVectorValueType, 
+    SymbolicColumnVectorValueType
+    ]
+SymbolicMatrixValueType : TypeAlias = Annotated[
+    SymPyMatrixType, 
+    MatrixValueShape
+    ]
+SymbolicTensorValueType : TypeAlias = Annotated[
+    SymPyArrayType,
+    TensorValueShape
+    ]
+SymbolicValueType : TypeAlias = Union[
+    SymbolicScalarValueType, 
+    SymbolicVectorValueType, 
+    SymbolicMatrixValueType,
+    SymbolicTensorValueType
+    ]
+
+
+# Combined types
+ScalarValueType : TypeAlias = Union[
+    SymbolicScalarValueType, 
+    NumericScalarValueType
+    ]
+RowVectorValueType : TypeAlias = Union[
+    SymbolicRowVectorValueType,
+    NumericRowVectorValueType
+    ]
+ColumnVectorValueType : TypeAlias = Union[
+    SymbolicColumnVectorValueType,
+    NumericColumnVectorValueType
+    ]
+VectorValueType : TypeAlias = Union[
+    RowVectorValueType,
+    ColumnVectorValueType
+    ]
+MatrixValueType : TypeAlias = Union[
+    SymbolicMatrixValueType,
+    NumericMatrixValueType
+    ]
+TensorValueType : TypeAlias = Union[
+    SymbolicTensorValueType,
+    NumericTensorValueType
+    ]
+ValueType : TypeAlias = Union[
+    ScalarValueType,
+    VectorValueType,
+    MatrixValueType,
+    TensorValueType
+    ]
+
+
+# Runtime-usable extractions
+RUNTIME_SYMBOLIC_SCALAR_VALUE_TYPE = extract_base_types(SymbolicScalarValueType)
+RUNTIME_SYMBOLIC_VECTOR_VALUE_TYPE = extract_base_types(SymbolicVectorValueType)
+RUNTIME_SYMBOLIC_MATRIX_VALUE_TYPE = extract_base_types(SymbolicMatrixValueType)
+RUNTIME_SYMBOLIC_TENSOR_VALUE_TYPE = extract_base_types(SymbolicTensorValueType)
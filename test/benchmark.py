@@ -0,0 +1,512 @@
+# Libraries
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import subprocess
+from collections import OrderedDict
+import sympy as sp
+import numpy as np
+import scipy
+import scipy.sparse as sps
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+# Scripts
+from Code.types import *
+from Code.space.manifold.coordinate import R1, R2, R3
+from Code.symbolic.math import SymbolicMathematicalObject, Expression, Argument
+from Code.symbolic.math import Gradient
+from Code.fem.assembly import assemble, compute_simplex_gradients, simplex_sources_kernel
+from Code.fem.solve import FactorizationCache, FactorizationMethod
+from Code.mesh.mesh import Mesh, generate_structured_mesh
+from Code.mesh.curves import SpaceFillingCurve
+from Code.mesh.ordering import reorder_mesh
+from Code.utilities.auxilary import make_callable
+
+
+'''
+Script-specific typing setup
+'''
+
+SPACES = {1: R1, 2: R2, 3: R3}
+STAGES_NAMES = ("symbolic", "lambdify", "mesh", "reorder", "assembly", "bcs", "solve")
+# Default resolutions (elements per dimension), chosen so every dimensionality spans ~10³-10⁶ variables
+DEFAULT_RESOLUTIONS = {
+    1: (1_000, 10_000, 100_000, 1_000_000),
+    2: (32, 128, 512, 1_024),
+    3: (8, 16, 32, 64)
+    }
+# Kuhn (Freudenthal) split of a VTK-ordered hexahedron into 6 tetrahedra around its 0-6 diagonal
+HEXAHEDRON_TETRAHEDRA_LOC_IS = ((0, 1, 2, 6), (0, 2, 3, 6), (0, 3, 7, 6), (0, 7, 4, 6), (0, 4, 5, 6), (0, 5, 1, 6))
+QUADRILATERAL_TRIANGLES_LOC_IS = ((0, 1, 2), (0, 2, 3))
+# Model cache for the locality metric: fully associative LRU, the size of a typical per-core L2
+CACHE_LINE_SIZE = 64
+CACHE_SIZE = 256 * 1024
+# Entry points whose cold import time is tracked: the numeric-only path (what a worker loading cached kernels pays) and the symbolic front end
+STARTUP_MODULES = ("Code.fem.solve", "Code.fem.assembly", "Code.fem.checkpoint", "Code.fem.simulation", "Code.symbolic.math")
+# Run in a fresh interpreter; reports the import's wall time and whether it (transitively) imported SymPy
+STARTUP_SCRIPT = '''
+import sys, time, json, importlib
+start_time = time.perf_counter()
+importlib.import_module(sys.argv[1])
+print(json.dumps({"wall_time": time.perf_counter() - start_time, "sympy_imported": "sympy" in sys.modules}))
+'''
+
+
+'''
+Benchmark records
+'''
+
+@dataclass
+class StageRecord:
+
+    wall_time : NumericDecimalValueType
+    # Process high-water mark after the stage, in bytes
+    peak_rss : NumericIntegerValueType
+    vars_per_sec : NumericDecimalValueType
+
+@dataclass
+class RunRecord:
+
+    dimalty : NumericIntegerValueType
+    num_of_els_per_dim : NumericIntegerValueType
+    # Space-filling curve the mesh was reordered along, if any
+    curve : str = None
+    num_of_vars : NumericIntegerValueType = 0
+    num_of_els : NumericIntegerValueType = 0
+    # Max nodal error against the manufactured solution, as a sanity check that every stage did its job
+    max_err : NumericDecimalValueType = None
+    stages : Dict[str, StageRecord] = field(default_factory=dict)
+    # Model cache miss rates of the irregular access streams, in generation order ("<stream>/original") and after reordering ("<stream>/reordered")
+    cache_miss_rates : Dict[str, NumericDecimalValueType] = field(default_factory=dict)
+
+    @property
+    def key(self) -> str:
+        return f"{self.dimalty}D/{self.num_of_els_per_dim}" + (f"/{self.curve}" if self.curve is not None else "")
+
+@dataclass
+class StartupRecord:
+
+    module_name : str
+    wall_time : NumericDecimalValueType
+    sympy_imported : bool
+
+def measure_peak_rss() -> NumericIntegerValueType:
+
+    # ru_maxrss is in kilobytes on Linux but bytes on macOS
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_rss if sys.platform == "darwin" else 1024 * peak_rss
+
+def count_cache_misses(
+    addrs : Annotated[NumericVectorValueType, Literal["(total accesses,)"]],
+    line_size : NumericIntegerValueType = CACHE_LINE_SIZE,
+    cache_size : NumericIntegerValueType = CACHE_SIZE
+    ) -> NumericIntegerValueType:
+    """
+    Misses of a byte address stream in a fully associative LRU cache.
+    """
+
+    lines = addrs // line_size
+    # Accesses to the line just accessed always hit
+    lines = lines[np.r_[True, lines[1:] != lines[:-1]]] if len(lines) else lines
+    num_of_lines = cache_size // line_size
+    cache = OrderedDict()
+    num_of_misses = 0
+    for curr_line in lines.tolist():
+        if curr_line in cache:
+            cache.move_to_end(curr_line)
+        else:
+            num_of_misses += 1
+            cache[curr_line] = None
+            if len(cache) > num_of_lines:
+                cache.popitem(last=False)
+    return num_of_misses
+
+def estimate_cache_miss_rates(
+    mesh : Mesh,
+    op_coefs : NumericSparseMatrixValueType
+    ) -> Dict[str, NumericDecimalValueType]:
+    """
+    Miss rates of the pipeline's two irregular access streams in the model cache:
+        - assembly: the element-by-element gather of node coordinates
+        - spmv: the row-by-row gather of the input vector of a CSR matrix-vector product (as in every Krylov/multigrid iteration)
+    Hardware counters are neither portable nor readable from NumPy, but a model cache ranks the locality of orderings the same way.
+    """
+
+    op_coefs = sps.csr_array(op_coefs)
+    els_nds_is = mesh.els_nds_is.ravel()
+    return {
+        "assembly": count_cache_misses(els_nds_is * mesh.nds_vec_crds.itemsize * mesh.dimalty) / max(len(els_nds_is), 1),
+        "spmv": count_cache_misses(op_coefs.indices.astype(np.int64) * op_coefs.dtype.itemsize) / max(op_coefs.nnz, 1)
+        }
+
+
+'''
+Pipeline stages: Poisson `-∇²u = f` on the unit box, with the manufactured solution `u = Π sin(πxᵢ)` and linear simplices
+'''
+
+def build_weak_form(
+    dimalty : NumericIntegerValueType
+    ) -> Tuple[SymbolicMathematicalObject, SymbolicMathematicalObject, Tuple[sp.Symbol, ...], sp.Expr]:
+
+    spce = SPACES[dimalty]
+    dims_syms = spce.dims_syms()
+    soln_expr = sp.Mul(*[sp.sin(sp.pi * curr_sym) for curr_sym in dims_syms])
+    src_expr = -sum(sp.diff(soln_expr, curr_sym, 2) for curr_sym in dims_syms)
+
+    # Integration by parts isn't automated yet (see `GoverningEquation.perform_integration_by_parts()`), so the volume term of `∫(-∇²u·w)dΩ = ∫(f·w)dΩ` is written out directly
+    # The boundary term vanishes, since the weighting functions are zero on the (Dirichlet) boundary
+    u = Argument('u')
+    w = Argument('w')
+    weak_op_intgrnd = Gradient(u, spce).dot(Gradient(w, spce))
+    weak_src_intgrnd = Expression(src_expr) * w
+
+    return weak_op_intgrnd, weak_src_intgrnd, dims_syms, soln_expr
+
+def compile_weak_form(
+    weak_op_intgrnd : SymbolicMathematicalObject,
+    weak_src_intgrnd : SymbolicMathematicalObject,
+    dims_syms : Tuple[sp.Symbol, ...],
+    soln_expr : sp.Expr
+    ) -> Tuple[Callable, Callable, Callable]:
+    """
+    Compiles the weak-form integrands into the element kernel & nodal source function fed to `assemble()`, plus the manufactured solution.
+
+    Linear shape functions have constant gradients, so the operator integrand is evaluated on the affine trial & test functions `u = Σgᵢxᵢ`, `w = Σhᵢxᵢ`, and compiled as a function of the coordinates & both gradients.
+    """
+
+    dimalty = len(dims_syms)
+    trial_grad_syms = sp.symbols(f"g:{dimalty}")
+    test_grad_syms = sp.symbols(f"h:{dimalty}")
+    wght_sym = sp.Symbol('w')
+
+    op_expr = weak_op_intgrnd.compile()({
+        Argument('u'): sum(curr_grad_sym * curr_dim_sym for curr_grad_sym, curr_dim_sym in zip(trial_grad_syms, dims_syms)),
+        Argument('w'): sum(curr_grad_sym * curr_dim_sym for curr_grad_sym, curr_dim_sym in zip(test_grad_syms, dims_syms))
+        })[0]
+    src_expr = weak_src_intgrnd.compile()({Argument('w'): wght_sym})[0]
+    op_fn = make_callable(dims_syms + trial_grad_syms + test_grad_syms, op_expr)
+    src_fn = make_callable(dims_syms + (wght_sym,), src_expr)
+    soln_fn = make_callable(dims_syms, soln_expr)
+
+    def el_kernel(
+        els_nds_vec_crds : Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions)"]]
+        ) -> Annotated[NumericTensorValueType, Literal["(total elements, dimensions+1, dimensions+1)"]]:
+
+        # One-point (centroid) quadrature, exact for the constant integrands of linear simplices
+        els_grads, els_vols = compute_simplex_gradients(els_nds_vec_crds)
+        els_ctrs = els_nds_vec_crds.mean(axis=1)
+        els_grads_cmpnts = els_grads.transpose(2, 0, 1)
+        els_intgrnds = op_fn(
+            *els_ctrs.T[:, :, None, None],
+            *els_grads_cmpnts[:, :, :, None],
+            *els_grads_cmpnts[:, :, None, :]
+            )
+        num_of_el_nds = els_grads.shape[1]
+        return els_vols[:, None, None] * np.broadcast_to(els_intgrnds, (len(els_vols), num_of_el_nds, num_of_el_nds))
+
+    # Nodal quadrature of `∫(f·w)dΩ`: each node's weighting function is 1 there, so its source is `f` times its lumped mass
+    def nds_src_fn(*nds_crds):
+        return src_fn(*nds_crds, 1.0)
+
+    return el_kernel, nds_src_fn, soln_fn
+
+def generate_simplex_mesh(
+    dimalty : NumericIntegerValueType,
+    num_of_els_per_dim : NumericIntegerValueType
+    ) -> Mesh:
+
+    mesh = generate_structured_mesh((0.0,)*dimalty, (1.0,)*dimalty, (num_of_els_per_dim,)*dimalty)
+    match dimalty:
+        case 1:
+            return mesh
+        case 2:
+            simplices_loc_is = QUADRILATERAL_TRIANGLES_LOC_IS
+        case 3:
+            simplices_loc_is = HEXAHEDRON_TETRAHEDRA_LOC_IS
+    els_nds_is = np.concatenate([mesh.els_nds_is[:, curr_loc_is] for curr_loc_is in simplices_loc_is])
+
+    return Mesh(mesh.nds_vec_crds, els_nds_is)
+
+def apply_dirichlet_conditions(
+    mesh : Mesh,
+    op_coefs : NumericSparseMatrixValueType,
+    srcs : Annotated[NumericVectorValueType, Literal["(total variables,)"]],
+    soln_fn : Callable
+    ) -> Tuple[
+        NumericSparseMatrixValueType,
+        Annotated[NumericVectorValueType, Literal["(total free variables,)"]],
+        Annotated[NumericVectorValueType, Literal["(total free variables,)"]],
+        Annotated[NumericVectorValueType, Literal["(total fixed variables,)"]],
+        Annotated[NumericVectorValueType, Literal["(total fixed variables,)"]]
+        ]:
+
+    bdry_nds_mask = np.any((mesh.nds_vec_crds <= 0.0) | (mesh.nds_vec_crds >= 1.0), axis=1)
+    fxd_vars_is = mesh.nds_vars_is[bdry_nds_mask, 0]
+    free_vars_is = mesh.nds_vars_is[~bdry_nds_mask, 0]
+    fxd_vals = np.broadcast_to(soln_fn(*mesh.nds_vec_crds[bdry_nds_mask].T), fxd_vars_is.shape)
+
+    # Lift the fixed values onto the free sources
+    op_coefs = sps.csr_array(op_coefs)
+    free_rows = op_coefs[free_vars_is]
+    free_op_coefs = sps.csc_array(free_rows[:, free_vars_is])
+    free_srcs = srcs[free_vars_is] - free_rows[:, fxd_vars_is] @ fxd_vals
+
+    return free_op_coefs, free_srcs, free_vars_is, fxd_vars_is, fxd_vals
+
+def run_pipeline(
+    dimalty : NumericIntegerValueType,
+    num_of_els_per_dim : NumericIntegerValueType,
+    fctrztn_mthd : FactorizationMethod = FactorizationMethod.LU,
+    curve : SpaceFillingCurve = None
+    ) -> RunRecord:
+
+    record = RunRecord(dimalty, num_of_els_per_dim, curve.name if curve is not None else None)
+    stages_times = {}
+    stages_peak_rsss = {}
+    def time_stage(name, fn, *args):
+        start_time = time.perf_counter()
+        result = fn(*args)
+        stages_times[name] = time.perf_counter() - start_time
+        stages_peak_rsss[name] = measure_peak_rss()
+        return result
+
+    weak_op_intgrnd, weak_src_intgrnd, dims_syms, soln_expr = time_stage("symbolic", build_weak_form, dimalty)
+    el_kernel, src_fn, soln_fn = time_stage("lambdify", compile_weak_form, weak_op_intgrnd, weak_src_intgrnd, dims_syms, soln_expr)
+    orig_mesh = time_stage("mesh", generate_simplex_mesh, dimalty, num_of_els_per_dim)
+    # Generation order (simplices grouped by their position in the split box) unless reordered
+    mesh, rrdrng = time_stage("reorder", lambda: reorder_mesh(orig_mesh, curve) if curve is not None else (orig_mesh, None))
+
+    # Sources with nodal quadrature of f: the unit-source vector is the lumped mass, consistent to second order with linear elements
+    def assemble_system():
+        op_coefs, lumped_mass = assemble(mesh.els_nds_is, mesh.nds_vec_crds, el_kernel, el_srcs_kernel=simplex_sources_kernel)
+        return op_coefs, lumped_mass * src_fn(*mesh.nds_vec_crds.T)
+    op_coefs, srcs = time_stage("assembly", assemble_system)
+    free_op_coefs, free_srcs, free_vars_is, fxd_vars_is, fxd_vals = time_stage("bcs", apply_dirichlet_conditions, mesh, op_coefs, srcs, soln_fn)
+
+    fctrztn_cache = FactorizationCache(fctrztn_mthd)
+    free_soln = time_stage("solve", fctrztn_cache.solve, free_op_coefs, free_srcs)
+
+    soln = np.empty(mesh.num_of_vars)
+    soln[free_vars_is] = free_soln
+    soln[fxd_vars_is] = fxd_vals
+    record.max_err = float(np.max(np.abs(soln[mesh.nds_vars_is[:, 0]] - soln_fn(*mesh.nds_vec_crds.T))))
+    # Locality before and after reordering, outside the timed stages; the original operator is the reordered one, permuted back
+    if rrdrng is not None:
+        orig_op_coefs = sps.csr_array(op_coefs)[rrdrng.vars_inv_perm][:, rrdrng.vars_inv_perm]
+        for curr_label, curr_mesh, curr_op_coefs in (("original", orig_mesh, orig_op_coefs), ("reordered", mesh, op_coefs)):
+            for curr_stream, curr_rate in estimate_cache_miss_rates(curr_mesh, curr_op_coefs).items():
+                record.cache_miss_rates[f"{curr_stream}/{curr_label}"] = curr_rate
+    record.num_of_vars = mesh.num_of_vars
+    record.num_of_els = mesh.num_of_els
+    record.stages = {
+        curr_name: StageRecord(
+            wall_time = stages_times[curr_name],
+            peak_rss = stages_peak_rsss[curr_name],
+            vars_per_sec = mesh.num_of_vars / max(stages_times[curr_name], 1e-12)
+            )
+        for curr_name in STAGES_NAMES
+        }
+
+    return record
+
+def run_benchmarks(
+    resolutions : Dict[NumericIntegerValueType, Tuple[NumericIntegerValueType, ...]],
+    num_of_rpts : NumericIntegerValueType = 3,
+    max_num_of_vars : NumericIntegerValueType = None,
+    fctrztn_mthd : FactorizationMethod = FactorizationMethod.LU,
+    curve : SpaceFillingCurve = None
+    ) -> List[RunRecord]:
+    """
+    Runs the pipeline at every resolution, keeping the fastest of `num_of_rpts` repeats per stage (the least noisy estimate of the achievable time).
+    Every repeat runs in a fresh worker process, so its peak RSS (a process-wide high-water mark) only reflects that run, and no warm caches carry over between runs.
+    """
+
+    records = []
+    for curr_dimalty, curr_resolutions in sorted(resolutions.items()):
+        for curr_num_of_els_per_dim in sorted(curr_resolutions):
+            if (max_num_of_vars is not None) and ((curr_num_of_els_per_dim+1)**curr_dimalty > max_num_of_vars):
+                continue
+            curr_rpts = []
+            for _ in range(num_of_rpts):
+                with ProcessPoolExecutor(max_workers=1) as executor:
+                    curr_rpts.append(executor.submit(run_pipeline, curr_dimalty, curr_num_of_els_per_dim, fctrztn_mthd, curve).result())
+            curr_record = curr_rpts[0]
+            for curr_name in STAGES_NAMES:
+                curr_record.stages[curr_name] = min((curr_rpt.stages[curr_name] for curr_rpt in curr_rpts), key=lambda stage: stage.wall_time)
+            records.append(curr_record)
+            print(
+                f"{curr_record.key:>10} | {curr_record.num_of_vars:>9} vars | "
+                + " | ".join(f"{curr_name} {curr_stage.wall_time:.3e}s" for curr_name, curr_stage in curr_record.stages.items())
+                + f" | err {curr_record.max_err:.2e}"
+                + "".join(
+                    f" | {curr_stream} misses {curr_record.cache_miss_rates[f'{curr_stream}/original']:.1%} -> {curr_record.cache_miss_rates[f'{curr_stream}/reordered']:.1%}"
+                    for curr_stream in ("assembly", "spmv")
+                    if f"{curr_stream}/original" in curr_record.cache_miss_rates
+                    )
+                )
+
+    return records
+
+
+def measure_startup(
+    module_name : str,
+    num_of_rpts : NumericIntegerValueType = 5
+    ) -> StartupRecord:
+    """
+    Cold import time of `module_name`, as the fastest of `num_of_rpts` fresh interpreters (bytecode caches are warm after the first, like in production).
+    """
+
+    # Children need the same import paths as this process to find the package
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(curr_path for curr_path in sys.path if curr_path))
+    rpts = []
+    for _ in range(num_of_rpts):
+        output = subprocess.run(
+            [sys.executable, "-c", STARTUP_SCRIPT, module_name],
+            env = env,
+            capture_output = True,
+            text = True,
+            check = True
+            ).stdout
+        rpts.append(json.loads(output.strip().splitlines()[-1]))
+    fastest_rpt = min(rpts, key=lambda rpt: rpt["wall_time"])
+
+    return StartupRecord(module_name, fastest_rpt["wall_time"], fastest_rpt["sympy_imported"])
+
+def run_startup_benchmarks(
+    modules_names : Tuple[str, ...] = STARTUP_MODULES,
+    num_of_rpts : NumericIntegerValueType = 5
+    ) -> List[StartupRecord]:
+
+    records = []
+    for curr_module_name in modules_names:
+        try:
+            curr_record = measure_startup(curr_module_name, num_of_rpts)
+        except subprocess.CalledProcessError as exc:
+            print(f"{curr_module_name:>24} | import failed: {exc.stderr.strip().splitlines()[-1] if exc.stderr.strip() else exc}")
+            continue
+        records.append(curr_record)
+        print(f"{curr_module_name:>24} | import {curr_record.wall_time:.3e}s | SymPy {'imported' if curr_record.sympy_imported else 'not imported'}")
+
+    return records
+
+
+'''
+Results (de)serialization & regression checks
+'''
+
+def collect_metadata() -> Dict[str, Any]:
+
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "platform": platform.platform(),
+        "processor": platform.processor(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "sympy": sp.__version__
+        }
+
+def write_results(
+    path : str,
+    records : List[RunRecord],
+    startup_records : List[StartupRecord] = ()
+    ):
+
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "metadata": collect_metadata(),
+                "runs": {curr_record.key: asdict(curr_record) for curr_record in records},
+                "startup": {curr_record.module_name: asdict(curr_record) for curr_record in startup_records}
+                },
+            file,
+            indent = 2
+            )
+
+def compare_to_baseline(
+    records : List[RunRecord],
+    baseline_path : str,
+    tol : NumericDecimalValueType = 0.2,
+    min_wall_time : NumericDecimalValueType = 1e-3,
+    startup_records : List[StartupRecord] = ()
+    ) -> List[str]:
+    """
+    Flags every (run, stage) whose wall time exceeds its baseline by more than `tol` (relative), or whose peak RSS grew by more than `tol`.
+    Stages faster than `min_wall_time` in the baseline are timer noise and only checked for memory.
+    Import times are held to the same tolerance, and a numeric-only entry point that starts importing SymPy is always flagged.
+    """
+
+    with open(baseline_path, "r") as file:
+        baseline = json.load(file)
+    baseline_runs = baseline["runs"]
+    baseline_startup = baseline.get("startup", {})
+
+    regressions = []
+    for curr_record in records:
+        if curr_record.key not in baseline_runs:
+            continue
+        curr_baseline_stages = baseline_runs[curr_record.key]["stages"]
+        for curr_name, curr_stage in curr_record.stages.items():
+            if curr_name not in curr_baseline_stages:
+                continue
+            curr_baseline_stage = curr_baseline_stages[curr_name]
+            if (curr_baseline_stage["wall_time"] >= min_wall_time) and (curr_stage.wall_time > (1 + tol) * curr_baseline_stage["wall_time"]):
+                regressions.append(f"{curr_record.key} {curr_name}: wall time {curr_stage.wall_time:.3e}s vs. baseline {curr_baseline_stage['wall_time']:.3e}s")
+            if curr_stage.peak_rss > (1 + tol) * curr_baseline_stage["peak_rss"]:
+                regressions.append(f"{curr_record.key} {curr_name}: peak RSS {curr_stage.peak_rss/2**20:.1f}MiB vs. baseline {curr_baseline_stage['peak_rss']/2**20:.1f}MiB")
+
+    for curr_record in startup_records:
+        if curr_record.module_name not in baseline_startup:
+            continue
+        curr_baseline_record = baseline_startup[curr_record.module_name]
+        if curr_record.wall_time > (1 + tol) * curr_baseline_record["wall_time"]:
+            regressions.append(f"import {curr_record.module_name}: {curr_record.wall_time:.3e}s vs. baseline {curr_baseline_record['wall_time']:.3e}s")
+        if curr_record.sympy_imported and not curr_baseline_record["sympy_imported"]:
+            regressions.append(f"import {curr_record.module_name}: now imports SymPy")
+
+    return regressions
+
+
+'''
+Command-line entry point: python -m Code.test.benchmark [--baseline BASELINE.json] [--out RESULTS.json]
+'''
+
+def main(argv : List[str] = None) -> int:
+
+    parser = argparse.ArgumentParser(description="Times the Poisson assembly & solve pipeline stage by stage.")
+    parser.add_argument("--dims", type=int, nargs="+", default=[1, 2, 3])
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--max-vars", type=int, default=None, help="Skip resolutions with more variables than this.")
+    parser.add_argument("--solver", choices=[curr_mthd.name for curr_mthd in FactorizationMethod], default=FactorizationMethod.MULTIGRID.name, help="Sparse direct solves run out of memory on the largest 3D meshes.")
+    parser.add_argument("--out", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None, help="Baseline results to compare against.")
+    parser.add_argument("--tol", type=float, default=0.2, help="Relative slowdown tolerated before flagging a regression.")
+    parser.add_argument("--curve", choices=[curr_curve.name for curr_curve in SpaceFillingCurve], default=None, help="Reorder the meshes along this space-filling curve, and report the model cache miss rates before and after.")
+    parser.add_argument("--startup-repeats", type=int, default=5, help="Fresh interpreters per import-time measurement; 0 skips them.")
+    args = parser.parse_args(argv)
+
+    startup_records = run_startup_benchmarks(num_of_rpts=args.startup_repeats) if args.startup_repeats > 0 else []
+    records = run_benchmarks(
+        {curr_dimalty: DEFAULT_RESOLUTIONS[curr_dimalty] for curr_dimalty in args.dims},
+        num_of_rpts = args.repeats,
+        max_num_of_vars = args.max_vars,
+        fctrztn_mthd = FactorizationMethod[args.solver],
+        curve = SpaceFillingCurve[args.curve] if args.curve is not None else None
+        )
+    write_results(args.out, records, startup_records)
+
+    if args.baseline is not None and os.path.exists(args.baseline):
+        regressions = compare_to_baseline(records, args.baseline, args.tol, startup_records=startup_records)
+        for curr_regression in regressions:
+            print(f"REGRESSION: {curr_regression}")
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+# Libraries
+import numpy as np
+import scipy.sparse.linalg as spsla
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh, generate_structured_mesh
+from Code.mesh.adaptivity import RefinementType, mark_dorfler, refine_h, refine_p, compute_hierarchical_variables, compute_variables_prolongation, adapt
+from Code.fem.hanging import HangingNodeConstraints
+from Code.fem.hierarchical import assemble_hierarchical, evaluate_hierarchical, compute_elements_L2_errors
+
+
+def exact_fn(
+    pnts_vec_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]
+    ) -> Annotated[NumericVectorValueType, Literal["(total points,)"]]:
+
+    return np.prod(np.sin(np.pi * pnts_vec_crds), axis=1)
+
+def src_fn(
+    pnts_vec_crds : Annotated[NumericMatrixValueType, Literal["(total points, dimensions)"]]
+    ) -> Annotated[NumericVectorValueType, Literal["(total points,)"]]:
+
+    return pnts_vec_crds.shape[1] * np.pi**2 * exact_fn(pnts_vec_crds)
+
+def solve_poisson(
+    mesh : Mesh,
+    soln_guess : Annotated[NumericVectorValueType, Literal["(total variables,)"]] = None
+    ) -> Annotated[NumericVectorValueType, Literal["(total variables,)"]]:
+
+    # -∇²u = f with u = 0 on the boundary of the unit box, in the mesh's hierarchical space
+    vars = compute_hierarchical_variables(mesh)
+    op_coefs, srcs = assemble_hierarchical(mesh, src_fn, vars=vars)
+    hngng_cnstrnts = HangingNodeConstraints()
+    rdcd_op_coefs, rdcd_srcs = hngng_cnstrnts.condense(mesh, op_coefs, srcs)
+    fxd_vars_is = hngng_cnstrnts.reduce_indices(mesh, vars.bndry_vars_is, vars.num_of_vars)
+    free_vars_is = np.setdiff1d(np.arange(rdcd_op_coefs.shape[0]), fxd_vars_is)
+
+    rdcd_soln = np.zeros(rdcd_op_coefs.shape[0])
+    rdcd_op_coefs = rdcd_op_coefs.tocsr()
+    rdcd_soln[free_vars_is] = spsla.spsolve(rdcd_op_coefs[free_vars_is][:, free_vars_is].tocsc(), rdcd_srcs[free_vars_is])
+    return hngng_cnstrnts.expand(mesh, rdcd_soln)
+
+def estimate_exact_errors(
+    mesh : Mesh,
+    soln : Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+    ) -> Annotated[NumericVectorValueType, Literal["(total elements,)"]]:
+
+    return compute_elements_L2_errors(mesh, soln, exact_fn)
+
+def compute_global_error(
+    mesh : Mesh,
+    soln : Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+    ) -> NumericDecimalValueType:
+
+    return float(np.linalg.norm(estimate_exact_errors(mesh, soln)))
+
+def test_dorfler_marking():
+
+    # The marked set is the smallest one holding a θ fraction of the squared error: the largest indicators, and no fewer
+    rng = np.random.default_rng(0)
+    errs = rng.lognormal(size=200)
+    for curr_θ in (0.1, 0.5, 0.9, 1.0):
+        marked_els_is = mark_dorfler(errs, curr_θ)
+        marked_errs_sqrd = np.sort(errs[marked_els_is]**2)
+        assert marked_errs_sqrd.sum() >= curr_θ * np.sum(errs**2) * (1 - 1e-12)
+        assert marked_errs_sqrd[1:].sum() < curr_θ * np.sum(errs**2)
+        assert np.min(errs[marked_els_is]) >= np.max(np.delete(errs, marked_els_is), initial=0.0)
+
+def test_refine_h_prolongation_reproduces_linear_fields():
+
+    # Prolongated linear nodal fields match the linear field at the new nodes, hanging ones included
+    lin_fn = lambda crds: 1.0 + 2.0*crds[:, 0] - 3.0*crds[:, 1]
+    quad_mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (4, 4))
+    tri_mesh = Mesh(quad_mesh.nds_vec_crds, np.concatenate([quad_mesh.els_nds_is[:, [0, 1, 2]], quad_mesh.els_nds_is[:, [0, 2, 3]]]))
+    for curr_mesh in (quad_mesh, tri_mesh):
+        for curr_marked_els_is in (np.array([0]), np.array([1, 5, 6])):
+            new_mesh, prlngtn = refine_h(curr_mesh, curr_marked_els_is)
+            np.testing.assert_allclose(prlngtn @ lin_fn(curr_mesh.nds_vec_crds), lin_fn(new_mesh.nds_vec_crds), atol=1e-12)
+            curr_mesh = new_mesh
+        assert len(curr_mesh.hngng_nds_is) > 0
+
+def test_h_adaptivity_reduces_error():
+
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (2, 2))
+    init_err = compute_global_error(mesh, solve_poisson(mesh))
+    mesh, soln, info = adapt(mesh, solve_poisson, tol=0.0, max_num_of_itrs=6)
+
+    assert not info.cnvrgd
+    assert np.all(np.diff(info.nums_of_vars) > 0)
+    assert info.errs[-1] < 0.5 * info.errs[0]
+    assert len(soln) == mesh.num_of_vars
+    assert compute_global_error(mesh, soln) < 0.25 * init_err
+
+def test_p_refinement_adds_variables_and_converges():
+
+    # Uniform orders: (p+1)^d variables per element minus the shared ones, and exponential convergence for a smooth solution
+    for curr_dimalty in (1, 2):
+        mesh = generate_structured_mesh((0.0,)*curr_dimalty, (1.0,)*curr_dimalty, (3,)*curr_dimalty)
+        errs = []
+        for curr_ord in range(1, 6):
+            curr_mesh = Mesh(mesh.nds_vec_crds, mesh.els_nds_is, els_ords=np.full(mesh.num_of_els, curr_ord))
+            assert compute_hierarchical_variables(curr_mesh).num_of_vars == (3*curr_ord + 1)**curr_dimalty
+            errs.append(compute_global_error(curr_mesh, solve_poisson(curr_mesh)))
+        assert np.all(np.array(errs[1:]) < 0.1 * np.array(errs[:-1]))
+
+    # p-refinement nests the spaces, so prolongated solutions are unchanged
+    rng = np.random.default_rng(0)
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (3, 3))
+    mesh = Mesh(mesh.nds_vec_crds, mesh.els_nds_is, els_ords=np.array([1, 2, 3, 2, 1, 4, 3, 3, 2]))
+    soln = solve_poisson(mesh)
+    new_mesh, nds_prlngtn = refine_p(mesh, np.array([0, 4, 5]))
+    new_soln = compute_variables_prolongation(mesh, new_mesh, nds_prlngtn) @ soln
+    assert len(new_soln) > len(soln)
+    ref_pnts_vec_crds = rng.uniform(-1.0, 1.0, (50, 2))
+    els_is = rng.integers(0, mesh.num_of_els, 50)
+    np.testing.assert_allclose(evaluate_hierarchical(new_mesh, new_soln, els_is, ref_pnts_vec_crds), evaluate_hierarchical(mesh, soln, els_is, ref_pnts_vec_crds), atol=1e-12)
+
+    # p-adaptivity reaches tolerances h-adaptivity does not, with far fewer variables
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (2, 2))
+    _, _, p_info = adapt(mesh, solve_poisson, estimate_exact_errors, tol=1e-5, max_num_of_itrs=12, rfnmnt_type=RefinementType.P)
+    _, _, h_info = adapt(mesh, solve_poisson, estimate_exact_errors, tol=1e-5, max_num_of_itrs=12, rfnmnt_type=RefinementType.H)
+    assert p_info.cnvrgd and not h_info.cnvrgd
+    assert p_info.nums_of_vars[-1] < h_info.nums_of_vars[-1]
+
+def test_hp_spaces_are_conforming():
+
+    # Mixed orders around hanging nodes: constrained functions agree on both sides of every shared edge
+    rng = np.random.default_rng(0)
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (4, 4))
+    mesh, _ = refine_h(mesh, np.array([5, 10]))
+    mesh = Mesh(
+        mesh.nds_vec_crds,
+        mesh.els_nds_is,
+        els_ords = rng.integers(1, 6, mesh.num_of_els),
+        hngng_nds_is = mesh.hngng_nds_is,
+        hngng_nds_mstrs_is = mesh.hngng_nds_mstrs_is,
+        hngng_nds_wghts = mesh.hngng_nds_wghts
+        )
+    vars = compute_hierarchical_variables(mesh)
+    cnstrnt_mtrx = HangingNodeConstraints().get_constraint_matrix(mesh, vars.num_of_vars)
+    soln = cnstrnt_mtrx @ rng.standard_normal(cnstrnt_mtrx.shape[1])
+
+    # Axis-aligned elements: reference points follow from the elements' bounding boxes
+    els_lwr_bnds = mesh.nds_vec_crds[mesh.els_nds_is].min(axis=1)
+    els_uppr_bnds = mesh.nds_vec_crds[mesh.els_nds_is].max(axis=1)
+    edge_ref_crds = np.linspace(-1.0, 1.0, 7)
+    num_of_cmprsns = 0
+    for curr_el_i in range(mesh.num_of_els):
+        for curr_dim_i in range(2):
+            ref_pnts_vec_crds = np.zeros((len(edge_ref_crds), 2))
+            ref_pnts_vec_crds[:, curr_dim_i] = 1.0
+            ref_pnts_vec_crds[:, 1 - curr_dim_i] = edge_ref_crds
+            pnts_vec_crds = els_lwr_bnds[curr_el_i] + (ref_pnts_vec_crds + 1.0)/2 * (els_uppr_bnds[curr_el_i] - els_lwr_bnds[curr_el_i])
+            vals = evaluate_hierarchical(mesh, soln, np.full(len(pnts_vec_crds), curr_el_i), ref_pnts_vec_crds, vars)
+            for curr_nghbr_i in np.flatnonzero(np.isclose(els_lwr_bnds[:, curr_dim_i], els_uppr_bnds[curr_el_i, curr_dim_i])):
+                inside_mask = np.all((pnts_vec_crds >= els_lwr_bnds[curr_nghbr_i] - 1e-12) & (pnts_vec_crds <= els_uppr_bnds[curr_nghbr_i] + 1e-12), axis=1)
+                if np.count_nonzero(inside_mask) < 2:
+                    continue
+                nghbr_ref_pnts_vec_crds = 2*(pnts_vec_crds[inside_mask] - els_lwr_bnds[curr_nghbr_i])/(els_uppr_bnds[curr_nghbr_i] - els_lwr_bnds[curr_nghbr_i]) - 1.0
+                nghbr_vals = evaluate_hierarchical(mesh, soln, np.full(len(nghbr_ref_pnts_vec_crds), curr_nghbr_i), nghbr_ref_pnts_vec_crds, vars)
+                np.testing.assert_allclose(nghbr_vals, vals[inside_mask], atol=1e-10)
+                num_of_cmprsns += 1
+    assert num_of_cmprsns > 2 * mesh.num_of_els - 10
+
+    # hp-adaptivity converges through meshes with hanging nodes
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (2, 2))
+    mesh, soln, info = adapt(mesh, solve_poisson, estimate_exact_errors, tol=1e-3, max_num_of_itrs=12, rfnmnt_type=RefinementType.HP, smth_tol=0.05)
+    assert info.cnvrgd
+    assert mesh.els_ords.max() > 1 and mesh.num_of_els > 4
+    assert compute_global_error(mesh, soln) <= 1e-3
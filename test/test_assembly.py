@@ -0,0 +1,149 @@
+# Libraries
+import os
+import pytest
+import numpy as np
+import scipy.sparse as sps
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh, MixedMesh, generate_structured_mesh
+from Code.elements.quadrature import CellType
+import Code.fem.assembly as assembly
+from Code.fem.assembly import assemble, assemble_mixed, assemble_blocks, assemble_out_of_core, flatten_element_blocks, BlockSparsityPattern
+from Code.fem.assembly import make_linear_stiffness_kernel, make_linear_sources_kernel, make_simplex_elasticity_kernel, make_block_diagonal_kernel, simplex_stiffness_kernel, simplex_sources_kernel
+from Code.utilities.profiling import PROFILER
+
+
+def make_simplex_mesh(
+    nums_of_els_per_dim : Tuple[NumericIntegerValueType, ...]
+    ) -> Mesh:
+
+    # Perturbed, randomly numbered triangles/tetrahedra (split from the grid's cells)
+    rng = np.random.default_rng(0)
+    mesh = generate_structured_mesh((0.0,)*len(nums_of_els_per_dim), (1.0,)*len(nums_of_els_per_dim), nums_of_els_per_dim)
+    nds_vec_crds = mesh.nds_vec_crds + rng.uniform(-0.2, 0.2, mesh.nds_vec_crds.shape) / max(nums_of_els_per_dim)
+    if len(nums_of_els_per_dim) == 2:
+        els_nds_is = np.concatenate([mesh.els_nds_is[:, [0, 1, 2]], mesh.els_nds_is[:, [0, 2, 3]]])
+    else:
+        els_nds_is = np.concatenate([mesh.els_nds_is[:, [0, 1, 2, 6]], mesh.els_nds_is[:, [0, 2, 3, 6]], mesh.els_nds_is[:, [0, 3, 7, 6]], mesh.els_nds_is[:, [0, 7, 4, 6]], mesh.els_nds_is[:, [0, 4, 5, 6]], mesh.els_nds_is[:, [0, 5, 1, 6]]])
+    return Mesh(nds_vec_crds, els_nds_is[rng.permutation(len(els_nds_is))])
+
+def test_block_assembly_matches_flattened_assembly():
+
+    for curr_nums_of_els_per_dim in ((6, 5), (3, 4, 2)):
+        mesh = make_simplex_mesh(curr_nums_of_els_per_dim)
+        num_of_nds, dimalty = mesh.nds_vec_crds.shape
+        # Node-major variables, as in the BSR layout
+        nds_vars_is = np.arange(num_of_nds*dimalty).reshape(num_of_nds, dimalty)
+        el_blk_kernel = make_simplex_elasticity_kernel(1.5, 0.7)
+
+        ptrn = BlockSparsityPattern(mesh.els_nds_is, num_of_nds)
+        blk_op_coefs, _ = assemble_blocks(mesh.els_nds_is, mesh.nds_vec_crds, el_blk_kernel, ptrn=ptrn)
+        op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, lambda x: flatten_element_blocks(el_blk_kernel(x)), nds_vars_is)
+        assert isinstance(blk_op_coefs, sps.bsr_array)
+        assert blk_op_coefs.blocksize == (dimalty, dimalty)
+        np.testing.assert_allclose(blk_op_coefs.toarray(), op_coefs.toarray(), rtol=0, atol=1e-12)
+
+        # One stored block per node pair, and the pattern can be reused
+        assert ptrn.num_of_blks * dimalty**2 == sps.csr_array(op_coefs).nnz
+        blk_op_coefs_2, _ = assemble_blocks(mesh.els_nds_is, mesh.nds_vec_crds, el_blk_kernel, ptrn=ptrn)
+        np.testing.assert_array_equal(blk_op_coefs_2.data, blk_op_coefs.data)
+
+        # Rigid translations are in the kernel
+        for curr_dim in range(dimalty):
+            np.testing.assert_allclose(blk_op_coefs @ np.tile(np.eye(dimalty)[curr_dim], num_of_nds), 0.0, atol=1e-12)
+
+def test_block_diagonal_kernel():
+
+    mesh = make_simplex_mesh((5, 5))
+    num_of_nds = len(mesh.nds_vec_crds)
+    blk_size = 3
+
+    def el_srcs_blk_kernel(els_nds_vec_crds):
+        return simplex_sources_kernel(els_nds_vec_crds)[:, :, None] * np.arange(1, blk_size+1)
+
+    blk_op_coefs, blk_srcs = assemble_blocks(mesh.els_nds_is, mesh.nds_vec_crds, make_block_diagonal_kernel(simplex_stiffness_kernel, blk_size), el_srcs_blk_kernel)
+    op_coefs, srcs = assemble(mesh.els_nds_is, mesh.nds_vec_crds, simplex_stiffness_kernel, el_srcs_kernel=simplex_sources_kernel)
+    # Every component decouples into the scalar system
+    np.testing.assert_allclose(blk_op_coefs.toarray(), sps.kron(op_coefs, np.eye(blk_size)).toarray(), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(blk_srcs.reshape(num_of_nds, blk_size), srcs[:, None] * np.arange(1, blk_size+1))
+
+def test_out_of_core_assembly_matches_in_memory_assembly(tmp_path, monkeypatch):
+
+    # Memory-mapped inputs, with two variables per node so the gathered indices are exercised too
+    mesh = make_simplex_mesh((24, 24))
+    num_of_nds = len(mesh.nds_vec_crds)
+    nds_vars_is = np.arange(2*num_of_nds).reshape(num_of_nds, 2)
+    el_kernel = make_block_diagonal_kernel(simplex_stiffness_kernel, 2)
+    el_flat_kernel = lambda els_nds_vec_crds: flatten_element_blocks(el_kernel(els_nds_vec_crds))
+    el_srcs_kernel = lambda els_nds_vec_crds: np.repeat(simplex_sources_kernel(els_nds_vec_crds), 2, axis=1)
+    np.save(tmp_path / "els_nds_is.npy", mesh.els_nds_is)
+    np.save(tmp_path / "nds_vec_crds.npy", mesh.nds_vec_crds)
+    op_coefs, srcs = assemble(mesh.els_nds_is, mesh.nds_vec_crds, el_flat_kernel, nds_vars_is, el_srcs_kernel)
+
+    # Count the merge pass's bands
+    bands_starts_is = set()
+    load_csr_rows = assembly.load_csr_rows
+    def count_bands(blk_path, rows_start_i, rows_stop_i, num_of_cols):
+        bands_starts_is.add(rows_start_i)
+        return load_csr_rows(blk_path, rows_start_i, rows_stop_i, num_of_cols)
+    monkeypatch.setattr(assembly, "load_csr_rows", count_bands)
+
+    # A budget of a few chunks' worth of entries forces several spills and a multi-band merge
+    PROFILER.reset()
+    PROFILER.enable()
+    try:
+        ooc_op_coefs, ooc_srcs = assemble_out_of_core(
+            tmp_path / "els_nds_is.npy",
+            tmp_path / "nds_vec_crds.npy",
+            el_flat_kernel,
+            nds_vars_is,
+            el_srcs_kernel,
+            mem_bdgt = 2**16,
+            spill_dir = tmp_path / "spill"
+            )
+        num_of_spills = PROFILER.cntrs.get("assemble_out_of_core/spills", 0)
+    finally:
+        PROFILER.disable()
+        PROFILER.reset()
+
+    assert num_of_spills >= 3
+    assert len(bands_starts_is) >= 3
+    assert isinstance(ooc_op_coefs, sps.csr_array)
+    np.testing.assert_allclose(ooc_op_coefs.toarray(), op_coefs.toarray(), rtol=0, atol=1e-12)
+    np.testing.assert_allclose(ooc_srcs, srcs, rtol=0, atol=1e-14)
+    # Spilled blocks are cleaned up from a caller-provided directory
+    assert os.listdir(tmp_path / "spill") == []
+
+def test_mixed_assembly_matches_per_block_assembly():
+
+    # Quadrilaterals, with the left half split into triangles; interior nodes perturbed and cells given in shuffled order
+    rng = np.random.default_rng(2)
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (6, 5))
+    intr_nds_mask = np.all((mesh.nds_vec_crds > 0.0) & (mesh.nds_vec_crds < 1.0), axis=1)
+    nds_vec_crds = mesh.nds_vec_crds + intr_nds_mask[:, None] * rng.uniform(-0.03, 0.03, mesh.nds_vec_crds.shape)
+    split_mask = mesh.nds_vec_crds[mesh.els_nds_is].mean(axis=1)[:, 0] < 0.5
+    cells_nds_is = [tuple(curr_els_nds_is) for curr_els_nds_is in mesh.els_nds_is[~split_mask]]
+    cells_nds_is += [tuple(curr_els_nds_is[curr_tri_loc_is]) for curr_els_nds_is in mesh.els_nds_is[split_mask] for curr_tri_loc_is in ([0, 1, 2], [0, 2, 3])]
+    mxd_mesh, _ = MixedMesh.from_cells(nds_vec_crds, [cells_nds_is[curr_cell_i] for curr_cell_i in rng.permutation(len(cells_nds_is))])
+    assert set(mxd_mesh.blks) == {CellType.TRIANGLE, CellType.QUADRILATERAL}
+
+    els_kernels = {curr_cell_type: make_linear_stiffness_kernel(curr_cell_type) for curr_cell_type in mxd_mesh.blks}
+    els_srcs_kernels = {curr_cell_type: make_linear_sources_kernel(curr_cell_type) for curr_cell_type in mxd_mesh.blks}
+    op_coefs, srcs = assemble_mixed(mxd_mesh, els_kernels, els_srcs_kernels)
+
+    blks_op_coefs, blks_srcs = zip(*(
+        assemble(curr_els_nds_is, mxd_mesh.nds_vec_crds, els_kernels[curr_cell_type], mxd_mesh.nds_vars_is, els_srcs_kernels[curr_cell_type])
+        for curr_cell_type, curr_els_nds_is in mxd_mesh.blks.items()
+        ))
+    np.testing.assert_allclose(op_coefs.toarray(), sum(blks_op_coefs).toarray(), atol=1e-13)
+    np.testing.assert_allclose(srcs, sum(blks_srcs), atol=1e-15)
+    # The blocks tile the unit square conformingly: constants are in the stiffness' kernel, and the sources sum to its area
+    np.testing.assert_allclose(op_coefs @ np.ones(mxd_mesh.num_of_vars), 0.0, atol=1e-12)
+    np.testing.assert_allclose(srcs.sum(), 1.0)
+
+    # Default (stiffness) kernels, constraints, and blocks without a kernel
+    cnstrnt_mtrx = sps.random_array((mxd_mesh.num_of_vars, mxd_mesh.num_of_vars - 5), density=0.2, random_state=rng, format="csr")
+    cnstrnd_op_coefs, _ = assemble_mixed(mxd_mesh, cnstrnt_mtrx=cnstrnt_mtrx)
+    np.testing.assert_allclose(cnstrnd_op_coefs.toarray(), (cnstrnt_mtrx.T @ op_coefs @ cnstrnt_mtrx).toarray(), atol=1e-12)
+    with pytest.raises(ValueError):
+        assemble_mixed(mxd_mesh, {CellType.QUADRILATERAL: els_kernels[CellType.QUADRILATERAL]})
@@ -0,0 +1,76 @@
+# Libraries
+import numpy as np
+# Scripts
+from Code.types import *
+from Code.elements.basis import BasisType, TensorProductBasis, compute_1D_basis_values, compute_tensor_product_values, compute_geometric_factors, apply_mass, apply_stiffness
+from Code.elements.quadrature import QuadratureFamily, get_line_rule, compute_tensor_rule
+
+
+def test_GLL_nodal_partition_of_unity_and_Kronecker_property():
+
+    pnts = np.linspace(-1.0, 1.0, 37)
+    for curr_ord in range(1, 11):
+        nds, _ = get_line_rule(curr_ord+1, QuadratureFamily.GLL)
+        nds_vals, nds_derivs = compute_1D_basis_values(curr_ord, nds, BasisType.GLL_NODAL)
+        assert nds_vals.dtype == float
+        np.testing.assert_array_equal(nds_vals, np.eye(curr_ord+1))
+        np.testing.assert_allclose(nds_derivs.sum(axis=1), 0.0, atol=1e-10)
+
+        vals, derivs = compute_1D_basis_values(curr_ord, pnts, BasisType.GLL_NODAL)
+        np.testing.assert_allclose(vals.sum(axis=1), 1.0, atol=1e-12)
+        np.testing.assert_allclose(derivs.sum(axis=1), 0.0, atol=1e-10)
+        # Nodal interpolation of ξ^ord is exact, and so is its derivative
+        np.testing.assert_allclose(vals @ nds**curr_ord, pnts**curr_ord, atol=1e-12)
+        np.testing.assert_allclose(derivs @ nds**curr_ord, curr_ord * pnts**(curr_ord-1), atol=1e-9)
+
+        # Hierarchical vertex modes are a partition of unity too, and bubbles vanish at both ends
+        hrrchcl_vals, _ = compute_1D_basis_values(curr_ord, pnts, BasisType.HIERARCHICAL)
+        np.testing.assert_allclose(hrrchcl_vals[:, :2].sum(axis=1), 1.0, atol=1e-14)
+        np.testing.assert_allclose(hrrchcl_vals[[0, -1], 2:], 0.0, atol=1e-14)
+
+def test_sum_factorization_matches_dense_tensor_products():
+
+    rng = np.random.default_rng(0)
+    pnts, _ = get_line_rule(5)
+    for curr_dimalty in (1, 2, 3):
+        for curr_basis_type in BasisType:
+            basis = TensorProductBasis(3, curr_dimalty, pnts, curr_basis_type)
+            tnsr_pnts, _ = compute_tensor_rule(pnts, np.ones(len(pnts)), curr_dimalty)
+            vals, ref_grads = compute_tensor_product_values(3, tnsr_pnts, curr_basis_type)
+            assert vals.shape == (basis.num_of_pnts, basis.num_of_fns)
+
+            coefs = rng.standard_normal((4, basis.num_of_fns))
+            pnts_vals = rng.standard_normal((4, basis.num_of_pnts))
+            flxs = rng.standard_normal((4, basis.num_of_pnts, curr_dimalty))
+            np.testing.assert_allclose(basis.interpolate(coefs), coefs @ vals.T, atol=1e-12)
+            np.testing.assert_allclose(basis.integrate(pnts_vals), pnts_vals @ vals, atol=1e-12)
+            np.testing.assert_allclose(basis.interpolate_gradients(coefs), np.einsum("qid,ei->eqd", ref_grads, coefs), atol=1e-12)
+            np.testing.assert_allclose(basis.integrate_gradients(flxs), np.einsum("qid,eqd->ei", ref_grads, flxs), atol=1e-12)
+
+def test_matrix_free_operators_match_assembled_element_matrices():
+
+    # Randomly perturbed (non-affine) quadrilaterals, vertices in lexicographic order
+    rng = np.random.default_rng(1)
+    els_vrts_vec_crds = np.array([[0.0, 0.0], [1.0, 0.0], [0.0, 1.0], [1.0, 1.0]])[None] + 0.15 * rng.uniform(-1.0, 1.0, (3, 4, 2))
+    pnts, wghts = get_line_rule(6)
+    tnsr_pnts, tnsr_wghts = compute_tensor_rule(pnts, wghts, 2)
+    for curr_basis_type in BasisType:
+        basis = TensorProductBasis(4, 2, pnts, curr_basis_type)
+        wghtd_dets, stiff_fctrs = compute_geometric_factors(els_vrts_vec_crds, pnts, wghts)
+
+        # Element matrices from physical gradients ∇φ = J⁻ᵀ·∇_ξφ, with the Jacobians of the bilinear geometry
+        vals, ref_grads = compute_tensor_product_values(4, tnsr_pnts, curr_basis_type)
+        _, geo_ref_grads = compute_tensor_product_values(1, tnsr_pnts)
+        jacs = np.einsum("evi,qvj->eqij", els_vrts_vec_crds, geo_ref_grads)
+        dets = np.linalg.det(jacs)
+        grads = np.einsum("qfj,eqji->eqfi", ref_grads, np.linalg.inv(jacs))
+        els_stiff = np.einsum("q,eq,eqfi,eqgi->efg", tnsr_wghts, dets, grads, grads)
+        els_mass = np.einsum("q,eq,qf,qg->efg", tnsr_wghts, dets, vals, vals)
+
+        coefs = rng.standard_normal((len(els_vrts_vec_crds), basis.num_of_fns))
+        np.testing.assert_allclose(apply_stiffness(basis, coefs, stiff_fctrs), np.einsum("efg,eg->ef", els_stiff, coefs), atol=1e-11)
+        np.testing.assert_allclose(apply_mass(basis, coefs, wghtd_dets), np.einsum("efg,eg->ef", els_mass, coefs), atol=1e-12)
+        # Constants are in the kernel of the stiffness, and the mass integrates them to the element areas
+        const_coefs = np.linalg.lstsq(vals, np.ones(len(tnsr_pnts)), rcond=None)[0]
+        np.testing.assert_allclose(apply_stiffness(basis, np.tile(const_coefs, (len(els_vrts_vec_crds), 1)), stiff_fctrs), 0.0, atol=1e-11)
+        np.testing.assert_allclose(const_coefs @ els_mass @ const_coefs, dets @ tnsr_wghts, atol=1e-12)
@@ -0,0 +1,32 @@
+# Libraries
+import numpy as np
+# Scripts
+from Code.types import *
+from Code.fem.assembly import simplex_stiffness_kernel
+from Code.mesh.curves import SpaceFillingCurve
+from Code.test.benchmark import STARTUP_MODULES, build_weak_form, compile_weak_form, generate_simplex_mesh, run_pipeline, measure_startup
+
+
+def test_compiled_weak_form_matches_stiffness_kernel():
+
+    for curr_dimalty in (1, 2, 3):
+        el_kernel, _, _ = compile_weak_form(*build_weak_form(curr_dimalty))
+        mesh = generate_simplex_mesh(curr_dimalty, 3)
+        els_nds_vec_crds = mesh.nds_vec_crds[mesh.els_nds_is]
+        np.testing.assert_allclose(el_kernel(els_nds_vec_crds), simplex_stiffness_kernel(els_nds_vec_crds), atol=1e-12)
+
+def test_pipeline_converges():
+
+    # Linear elements: the nodal error drops ~4x per halving of the element size
+    coarse_record = run_pipeline(2, 8)
+    fine_record = run_pipeline(2, 16, curve=SpaceFillingCurve.HILBERT)
+    assert fine_record.max_err < coarse_record.max_err / 3
+    assert set(fine_record.stages) == set(coarse_record.stages)
+    assert fine_record.cache_miss_rates
+
+def test_numeric_modules_import_without_SymPy():
+
+    for curr_module_name in STARTUP_MODULES:
+        if curr_module_name.startswith("Code.symbolic"):
+            continue
+        assert not measure_startup(curr_module_name, num_of_rpts=1).sympy_imported
@@ -0,0 +1,108 @@
+# Libraries
+import os
+import numpy as np
+import sympy as sp
+import scipy.sparse as sps
+# Scripts
+from Code.types import *
+from Code.space.manifold.coordinate import R2
+from Code.symbolic.math import Expression, Argument, Laplacian
+from Code.symbolic.geometry import Boundary, Domain
+from Code.fem.equation import GoverningEquation
+from Code.fem.simulation import Simulation
+from Code.fem.checkpoint import Checkpointer
+from Code.fem.assembly import assemble, make_linear_stiffness_kernel, make_linear_mass_kernel
+from Code.elements.quadrature import CellType
+from Code.utilities.auxilary import KernelCache, make_callable
+
+
+def make_simulation() -> Simulation:
+
+    x, y = R2.dims_syms()
+    dom = Domain('box', [Boundary('x_min', sp.Ge(x, 0.0), R2), Boundary('x_max', sp.Le(x, 1.0), R2), Boundary('y_min', sp.Ge(y, 0.0), R2), Boundary('y_max', sp.Le(y, 1.0), R2)], R2)
+    eqn = GoverningEquation('Poisson', strong_op=Laplacian(Argument('u'), R2), strong_src=Expression(sp.Integer(1)), host_spce=R2)
+    return Simulation('box', eqn, dom, (4, 4))
+
+def assemble_system(
+    sim : Simulation
+    ):
+
+    # Positive definite stiffness + mass operator, standing in for an assembled weak form
+    stiff_op_coefs, _ = assemble(sim.mesh.els_nds_is, sim.mesh.nds_vec_crds, make_linear_stiffness_kernel(CellType.QUADRILATERAL), sim.mesh.nds_vars_is)
+    mass_op_coefs, _ = assemble(sim.mesh.els_nds_is, sim.mesh.nds_vec_crds, make_linear_mass_kernel(CellType.QUADRILATERAL), sim.mesh.nds_vars_is)
+    sim.glbl_op_coefs = sps.csc_array(stiff_op_coefs + mass_op_coefs)
+    sim.glbl_op_coefs_vrsn += 1
+    sim.glbl_srcs = mass_op_coefs @ np.ones(sim.mesh.num_of_vars)
+
+def test_checkpoint_restore_without_reassembly(tmp_path):
+
+    sim = make_simulation()
+    assemble_system(sim)
+    sim.soln = sim.solve_for_sources(sim.glbl_srcs)
+    sim.itr, sim.t = 7, 0.25
+    chkptr = Checkpointer(tmp_path)
+    assert sim.checkpoint(chkptr, extra_arrays={"soln_prev": sim.soln / 2})
+
+    rstrd_sim = make_simulation()
+    rstrd_sim.restore(Checkpointer(tmp_path))
+    assert (rstrd_sim.itr, rstrd_sim.t, rstrd_sim.glbl_op_coefs_vrsn) == (7, 0.25, sim.glbl_op_coefs_vrsn)
+    np.testing.assert_array_equal(rstrd_sim.soln, sim.soln)
+    np.testing.assert_array_equal(rstrd_sim.soln_prev, sim.soln / 2)
+    np.testing.assert_array_equal(rstrd_sim.mesh.els_nds_is, sim.mesh.els_nds_is)
+    assert (rstrd_sim.glbl_op_coefs != sim.glbl_op_coefs).nnz == 0
+
+    # The restored operator is solved against directly: one factorization, no assembly
+    np.testing.assert_allclose(rstrd_sim.solve_for_sources(rstrd_sim.glbl_srcs), sim.soln, atol=1e-12)
+    assert rstrd_sim.fctrztn_cache.num_of_fctrztns == 1
+
+def test_pruning(tmp_path):
+
+    sim = make_simulation()
+    assemble_system(sim)
+    chkptr = Checkpointer(tmp_path, itr_intrvl=2, num_of_kept_steps=2)
+    wrttn_itrs = []
+    for sim.itr in range(10):
+        # New operator versions half-way through
+        if sim.itr == 5:
+            assemble_system(sim)
+        sim.soln = np.full(sim.mesh.num_of_vars, float(sim.itr))
+        if sim.checkpoint(chkptr):
+            wrttn_itrs.append(sim.itr)
+
+    assert wrttn_itrs == [0, 2, 4, 6, 8]
+    assert chkptr.list_steps() == [6, 8]
+    # Only the static file of the kept steps' version survives
+    assert sorted(curr_name for curr_name in os.listdir(tmp_path) if curr_name.startswith("static_")) == ["static_00000002.fem"]
+    state = chkptr.restore()
+    assert (state["itr"], state["vrsn"]) == (8, 2)
+    np.testing.assert_array_equal(state["soln"], 8.0)
+
+def test_checkpoint_before_first_solve(tmp_path):
+
+    # Nothing assembled or solved yet: the checkpoint holds the mesh & counters only
+    sim = make_simulation()
+    chkptr = Checkpointer(tmp_path)
+    assert sim.checkpoint(chkptr, extra_arrays={"soln_prev": None})
+    assert sorted(curr_name for curr_name in os.listdir(tmp_path) if curr_name.endswith(".fem")) == ["static_00000000.fem", "step_000000000000.fem"]
+
+    rstrd_sim = make_simulation()
+    rstrd_sim.soln = np.ones(rstrd_sim.mesh.num_of_vars)
+    rstrd_sim.restore(Checkpointer(tmp_path))
+    assert rstrd_sim.soln is None
+    assert rstrd_sim.soln_prev is None
+    assert rstrd_sim.glbl_op_coefs is None
+    assert rstrd_sim.glbl_srcs is None
+    np.testing.assert_array_equal(rstrd_sim.mesh.nds_vec_crds, sim.mesh.nds_vec_crds)
+
+def test_reloaded_kernel_matches_original(tmp_path):
+
+    x, y = sp.symbols("x y")
+    expr = sp.sin(x) * sp.exp(-y**2) + x*y
+    chkptr = Checkpointer(tmp_path)
+    fn = make_callable((x, y), expr, cache=chkptr.kernel_cache, key="src")
+
+    # A fresh cache (as after a restart) recompiles the stored source without SymPy
+    rldd_fn = KernelCache(chkptr.kernel_cache.cache_dir).load("src")
+    assert rldd_fn is not fn
+    pnts = np.random.default_rng(0).uniform(-2.0, 2.0, (2, 100))
+    np.testing.assert_array_equal(rldd_fn(*pnts), fn(*pnts))
@@ -0,0 +1,137 @@
+# Libraries
+import os
+import base64
+import numpy as np
+import xml.etree.ElementTree as ET
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import generate_structured_mesh
+from Code.mesh.io import PathType, read_arrays
+from Code.mesh.export import VTKEncoding, VTK_DATA_TYPES, VTK_HEADER_DTYPE, write_vtu, write_pvtu, write_xdmf
+
+
+VTK_DTYPES = {curr_name: curr_dtype for curr_dtype, curr_name in VTK_DATA_TYPES.items()}
+# base64 length of the 8-byte appended block header
+BASE64_HEADER_NUM_OF_BYTES = 12
+
+def read_vtu(
+    path : PathType
+    ) -> Tuple[ET.Element, Dict[Tuple[str, str], np.ndarray]]:
+    """
+    Minimal reader for `write_vtu()` output: parses the XML and decodes every appended array, keyed by (XML section, name).
+    """
+
+    with open(path, "rb") as f:
+        contents = f.read()
+    xml_end = contents.index(b"<AppendedData")
+    root = ET.fromstring(contents[:xml_end] + b"</VTKFile>")
+    appnd_start = contents.index(b"_", xml_end) + 1
+    encoding = VTKEncoding(ET.fromstring(contents[xml_end:appnd_start-1] + b"</AppendedData>").get("encoding"))
+    appnd = contents[appnd_start:contents.rindex(b"\n</AppendedData>")]
+
+    result = {}
+    piece = root.find("UnstructuredGrid/Piece")
+    for curr_section in ("PointData", "CellData", "Points", "Cells"):
+        for curr_data_arr in piece.find(curr_section):
+            offset = int(curr_data_arr.get("offset"))
+            dtype = VTK_DTYPES[curr_data_arr.get("type")].newbyteorder('<')
+            if encoding == VTKEncoding.BASE64:
+                num_of_bytes = int(np.frombuffer(base64.b64decode(appnd[offset:offset+BASE64_HEADER_NUM_OF_BYTES]), dtype=VTK_HEADER_DTYPE)[0])
+                data_start = offset + BASE64_HEADER_NUM_OF_BYTES
+                data = base64.b64decode(appnd[data_start:data_start + 4*(-(-num_of_bytes // 3))])
+            else:
+                num_of_bytes = int(np.frombuffer(appnd[offset:offset+VTK_HEADER_DTYPE.itemsize], dtype=VTK_HEADER_DTYPE)[0])
+                data_start = offset + VTK_HEADER_DTYPE.itemsize
+                data = appnd[data_start:data_start+num_of_bytes]
+            assert len(data) == num_of_bytes
+            arr = np.frombuffer(data, dtype=dtype)
+            num_of_cmpnts = int(curr_data_arr.get("NumberOfComponents"))
+            result[(curr_section, curr_data_arr.get("Name", curr_section))] = arr.reshape(-1, num_of_cmpnts) if num_of_cmpnts > 1 else arr
+    return root, result
+
+def make_fields(
+    nds_vec_crds : Annotated[NumericMatrixValueType, Literal["(total nodes, dimensions)"]],
+    num_of_els : NumericIntegerValueType
+    ) -> Tuple[Dict[NameType, np.ndarray], Dict[NameType, np.ndarray]]:
+
+    pnt_flds = {"u": np.sin(nds_vec_crds[:, 0]) * nds_vec_crds[:, 1], "grad": nds_vec_crds[:, ::-1].copy()}
+    cell_flds = {"tag": np.arange(num_of_els, dtype=np.int32) % 3}
+    return pnt_flds, cell_flds
+
+def test_vtu_round_trip(tmp_path):
+
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 2.0), (5, 3))
+    pnt_flds, cell_flds = make_fields(mesh.nds_vec_crds, mesh.num_of_els)
+    for curr_encoding in VTKEncoding:
+        path = tmp_path / f"mesh_{curr_encoding.value}.vtu"
+        write_vtu(path, mesh.nds_vec_crds, mesh.els_nds_is, pnt_flds, cell_flds, encoding=curr_encoding)
+        root, arrays = read_vtu(path)
+
+        piece = root.find("UnstructuredGrid/Piece")
+        assert (int(piece.get("NumberOfPoints")), int(piece.get("NumberOfCells"))) == (mesh.num_of_nds, mesh.num_of_els)
+        np.testing.assert_array_equal(arrays[("Points", "Points")][:, :2], mesh.nds_vec_crds)
+        np.testing.assert_array_equal(arrays[("Points", "Points")][:, 2], 0.0)
+        np.testing.assert_array_equal(arrays[("Cells", "connectivity")].reshape(mesh.els_nds_is.shape), mesh.els_nds_is)
+        np.testing.assert_array_equal(arrays[("Cells", "offsets")], 4 * np.arange(1, mesh.num_of_els+1))
+        np.testing.assert_array_equal(arrays[("Cells", "types")], 9)
+        for curr_name, curr_fld in pnt_flds.items():
+            np.testing.assert_array_equal(arrays[("PointData", curr_name)], curr_fld)
+        np.testing.assert_array_equal(arrays[("CellData", "tag")], cell_flds["tag"])
+        assert arrays[("CellData", "tag")].dtype == np.int32
+
+def test_pvtu_pieces(tmp_path):
+
+    mesh = generate_structured_mesh((0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (4, 3, 2))
+    pnt_flds, cell_flds = make_fields(mesh.nds_vec_crds, mesh.num_of_els)
+    rng = np.random.default_rng(0)
+    for curr_els_pieces_is in (None, rng.integers(0, 3, mesh.num_of_els)):
+        path = tmp_path / "mesh.pvtu"
+        write_pvtu(path, mesh.nds_vec_crds, mesh.els_nds_is, pnt_flds, cell_flds, num_of_pieces=3, els_pieces_is=curr_els_pieces_is, num_of_wrkrs=2)
+
+        root = ET.parse(path).getroot()
+        assert [curr_data_arr.get("Name") for curr_data_arr in root.find("PUnstructuredGrid/PPointData")] == list(pnt_flds)
+        assert [curr_data_arr.get("Name") for curr_data_arr in root.find("PUnstructuredGrid/PCellData")] == list(cell_flds)
+        pieces_srcs = [curr_piece.get("Source") for curr_piece in root.iter("Piece")]
+        assert pieces_srcs == [f"mesh_{curr_piece_i}.vtu" for curr_piece_i in range(3)]
+
+        # Every element is in exactly one piece, with the same vertices & fields as in the global mesh
+        pieces_els_is = np.array_split(np.arange(mesh.num_of_els), 3) if curr_els_pieces_is is None else [np.flatnonzero(curr_els_pieces_is == curr_piece_i) for curr_piece_i in range(3)]
+        for curr_piece_src, curr_piece_els_is in zip(pieces_srcs, pieces_els_is):
+            _, arrays = read_vtu(tmp_path / curr_piece_src)
+            conn = arrays[("Cells", "connectivity")].reshape(-1, 8)
+            assert len(np.unique(conn)) == len(arrays[("Points", "Points")])
+            np.testing.assert_array_equal(arrays[("Points", "Points")][conn], mesh.nds_vec_crds[mesh.els_nds_is[curr_piece_els_is]])
+            np.testing.assert_array_equal(arrays[("PointData", "u")][conn], pnt_flds["u"][mesh.els_nds_is[curr_piece_els_is]])
+            np.testing.assert_array_equal(arrays[("CellData", "tag")], cell_flds["tag"][curr_piece_els_is])
+
+def test_xdmf_sidecar(tmp_path):
+
+    mesh = generate_structured_mesh((0.0, 0.0), (2.0, 1.0), (3, 4))
+    pnt_flds, cell_flds = make_fields(mesh.nds_vec_crds, mesh.num_of_els)
+    path = tmp_path / "mesh.xdmf"
+    write_xdmf(path, mesh.nds_vec_crds, mesh.els_nds_is, pnt_flds, cell_flds)
+
+    # Every data item is read back the way an XDMF reader would: seeking into the sidecar
+    def read_data_item(data_item):
+        dtype = np.dtype(f"<{ {'Float': 'f', 'Int': 'i', 'UInt': 'u'}[data_item.get('NumberType')] }{data_item.get('Precision')}")
+        dims = tuple(int(curr_dim) for curr_dim in data_item.get("Dimensions").split())
+        with open(tmp_path / data_item.text, "rb") as f:
+            f.seek(int(data_item.get("Seek")))
+            return np.fromfile(f, dtype=dtype, count=int(np.prod(dims))).reshape(dims)
+
+    grid = ET.parse(path).getroot().find("Domain/Grid")
+    assert grid.find("Topology").get("TopologyType") == "Quadrilateral"
+    assert int(grid.find("Topology").get("NumberOfElements")) == mesh.num_of_els
+    np.testing.assert_array_equal(read_data_item(grid.find("Topology/DataItem")), mesh.els_nds_is)
+    np.testing.assert_array_equal(read_data_item(grid.find("Geometry/DataItem"))[:, :2], mesh.nds_vec_crds)
+    attrs = {curr_attr.get("Name"): curr_attr for curr_attr in grid.iter("Attribute")}
+    assert {curr_name: curr_attr.get("AttributeType") for curr_name, curr_attr in attrs.items()} == {"u": "Scalar", "grad": "Vector", "tag": "Scalar"}
+    assert attrs["tag"].get("Center") == "Cell"
+    for curr_name, curr_fld in {**pnt_flds, **cell_flds}.items():
+        np.testing.assert_array_equal(read_data_item(attrs[curr_name].find("DataItem")), curr_fld)
+
+    # The sidecar is also an ordinary binary file
+    assert sorted(os.listdir(tmp_path)) == ["mesh.bin", "mesh.xdmf"]
+    _, arrays = read_arrays(tmp_path / "mesh.bin", kind="XDMF")
+    np.testing.assert_array_equal(arrays["topology"], mesh.els_nds_is)
+    np.testing.assert_array_equal(arrays["node/u"], pnt_flds["u"])
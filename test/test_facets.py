@@ -0,0 +1,38 @@
+# Libraries
+import numpy as np
+import scipy.sparse.linalg as spsla
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import generate_structured_mesh
+from Code.fem.facets import DGSpace, make_interior_penalty_form, assemble_DG, compute_element_values
+
+
+def exact_fn(pnts_vec_crds):
+    return np.sin(np.pi*pnts_vec_crds[..., 0]) * np.sin(np.pi*pnts_vec_crds[..., 1])
+
+def src_fn(pnts_vec_crds):
+    return 2 * np.pi**2 * exact_fn(pnts_vec_crds)
+
+def compute_SIPG_error(
+    num_of_els_per_dim : NumericIntegerValueType,
+    ord : NumericIntegerValueType
+    ) -> NumericDecimalValueType:
+
+    # L² error of -Δu = f on the unit square, with u = 0 on the boundary
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (num_of_els_per_dim, num_of_els_per_dim))
+    spce = DGSpace(mesh, ord)
+    op_coefs, srcs = assemble_DG(spce, make_interior_penalty_form(src_fn, exact_fn, ord))
+    assert abs(op_coefs - op_coefs.T).max() < 1e-10
+
+    soln = spsla.spsolve(op_coefs.tocsc(), srcs)
+    el_vals = compute_element_values(spce)
+    approx_vals = np.einsum("qi,ei->eq", el_vals.vals, soln.reshape(mesh.num_of_els, -1))
+    return np.sqrt(np.sum(el_vals.wghts * (approx_vals - exact_fn(el_vals.pnts_vec_crds))**2))
+
+def test_SIPG_convergence_rate():
+
+    # Optimal L² rate p+1 under uniform refinement
+    for curr_ord in (1, 2):
+        errs = np.array([compute_SIPG_error(curr_num_of_els_per_dim, curr_ord) for curr_num_of_els_per_dim in (4, 8, 16)])
+        rates = np.log2(errs[:-1] / errs[1:])
+        assert np.all(rates > curr_ord + 0.8), (curr_ord, errs, rates)
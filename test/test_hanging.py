@@ -0,0 +1,84 @@
+# Libraries
+import numpy as np
+import scipy.sparse.linalg as spsla
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh, generate_structured_mesh
+from Code.mesh.adaptivity import refine_h
+from Code.elements.quadrature import CellType
+from Code.fem.assembly import assemble, make_linear_stiffness_kernel
+from Code.fem.hanging import HangingNodeConstraints, compute_constraint_matrix
+
+
+def solve_patch_test(
+    mesh : Mesh,
+    cell_type : CellType,
+    exact_fn : Callable
+    ) -> Annotated[NumericVectorValueType, Literal["(total variables,)"]]:
+
+    # -∇²u = 0 with u fixed on the boundary of the unit square
+    hngng_cnstrnts = HangingNodeConstraints()
+    op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_stiffness_kernel(cell_type), mesh.nds_vars_is)
+    rdcd_op_coefs, _ = hngng_cnstrnts.condense(mesh, op_coefs)
+
+    bdry_nds_mask = np.any((mesh.nds_vec_crds <= 0.0) | (mesh.nds_vec_crds >= 1.0), axis=1)
+    fxd_vars_is = hngng_cnstrnts.reduce_indices(mesh, mesh.nds_vars_is[bdry_nds_mask, 0])
+    # Fixed values of the unconstrained variables, which are the nodes' own values
+    rdcd_nds_is = np.flatnonzero(~np.isin(np.arange(mesh.num_of_nds), mesh.hngng_nds_is))
+    rdcd_exact_vals = exact_fn(mesh.nds_vec_crds[rdcd_nds_is])
+    free_vars_is = np.setdiff1d(np.arange(rdcd_op_coefs.shape[0]), fxd_vars_is)
+
+    rdcd_soln = rdcd_exact_vals.copy()
+    rdcd_op_coefs = rdcd_op_coefs.tocsr()
+    rdcd_soln[free_vars_is] = spsla.spsolve(
+        rdcd_op_coefs[free_vars_is][:, free_vars_is].tocsc(),
+        -rdcd_op_coefs[free_vars_is][:, fxd_vars_is] @ rdcd_exact_vals[fxd_vars_is]
+        )
+
+    return hngng_cnstrnts.expand(mesh, rdcd_soln)
+
+def refine_twice(
+    mesh : Mesh
+    ) -> Mesh:
+
+    # A corner element, then one of its children next to an unrefined neighbour, so hanging nodes are reused and chained refinement is closed
+    mesh, _ = refine_h(mesh, np.array([0]))
+    crnr_child_i = int(np.argmin(np.linalg.norm(mesh.nds_vec_crds[mesh.els_nds_is].mean(axis=1) - 0.3, axis=1)))
+    mesh, _ = refine_h(mesh, np.array([crnr_child_i]))
+    return mesh
+
+def test_hanging_node_patch_test():
+
+    # Linear fields are reproduced exactly, at hanging nodes too, on irregularly refined quadrilaterals & triangles
+    exact_fn = lambda crds: 1.0 + 2.0*crds[:, 0] - 3.0*crds[:, 1]
+    quad_mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (4, 4))
+    tri_mesh = Mesh(quad_mesh.nds_vec_crds, np.concatenate([quad_mesh.els_nds_is[:, [0, 1, 2]], quad_mesh.els_nds_is[:, [0, 2, 3]]]))
+    for curr_mesh, curr_cell_type in ((quad_mesh, CellType.QUADRILATERAL), (tri_mesh, CellType.TRIANGLE)):
+        curr_mesh = refine_twice(curr_mesh)
+        assert len(curr_mesh.hngng_nds_is) > 0
+        soln = solve_patch_test(curr_mesh, curr_cell_type, exact_fn)
+        np.testing.assert_allclose(soln[curr_mesh.nds_vars_is[:, 0]], exact_fn(curr_mesh.nds_vec_crds), atol=1e-10)
+
+def test_constraint_matrix():
+
+    mesh = refine_twice(generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (4, 4)))
+    cnstrnt_mtrx = compute_constraint_matrix(mesh)
+    num_of_hngng_nds = len(mesh.hngng_nds_is)
+    assert cnstrnt_mtrx.shape == (mesh.num_of_vars, mesh.num_of_vars - num_of_hngng_nds)
+    # Rows interpolate: every row sums to 1, hanging rows average their masters
+    np.testing.assert_allclose(cnstrnt_mtrx.sum(axis=1), 1.0)
+    hngng_rows = cnstrnt_mtrx.tocsr()[mesh.nds_vars_is[mesh.hngng_nds_is, 0]]
+    assert np.all(np.diff(hngng_rows.indptr) >= 2)
+    np.testing.assert_allclose(
+        hngng_rows @ mesh.nds_vec_crds[~np.isin(np.arange(mesh.num_of_nds), mesh.hngng_nds_is)],
+        mesh.nds_vec_crds[mesh.hngng_nds_is]
+        )
+
+    # Cached until the mesh changes
+    hngng_cnstrnts = HangingNodeConstraints()
+    hngng_cnstrnts.get_constraint_matrix(mesh)
+    hngng_cnstrnts.get_constraint_matrix(mesh)
+    assert hngng_cnstrnts.num_of_blds == 1
+    refined_mesh, _ = refine_h(mesh, np.array([0]))
+    hngng_cnstrnts.get_constraint_matrix(refined_mesh)
+    assert hngng_cnstrnts.num_of_blds == 2
@@ -0,0 +1,103 @@
+# Libraries
+import pytest
+import numpy as np
+import sympy as sp
+# Scripts
+from Code.types import *
+from Code.space.manifold.coordinate import R2
+from Code.symbolic.math import Expression, Argument, Laplacian
+from Code.symbolic.geometry import Boundary, Domain
+from Code.fem.equation import GoverningEquation
+from Code.fem.simulation import Simulation
+from Code.mesh.mesh import Mesh, generate_structured_mesh
+from Code.mesh.io import read_arrays, write_arrays
+
+
+def test_save_load_round_trip(tmp_path):
+
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 2.0), (4, 3))
+    mesh.els_tags[::2] = 7
+    mesh.vrsn = 3
+    path = tmp_path / "mesh.fem"
+    mesh.save(path)
+
+    for curr_mmap in (True, False):
+        loaded_mesh = Mesh.load(path, mmap=curr_mmap)
+        assert loaded_mesh.vrsn == 3
+        for curr_name in Mesh.ARRAYS_NAMES:
+            np.testing.assert_array_equal(getattr(loaded_mesh, curr_name), getattr(mesh, curr_name))
+            assert getattr(loaded_mesh, curr_name).dtype == getattr(mesh, curr_name).dtype
+
+def test_save_over_memory_mapped_source(tmp_path):
+
+    mesh = generate_structured_mesh((0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (6, 5, 4))
+    path = tmp_path / "mesh.fem"
+    mesh.save(path)
+
+    # The loaded arrays map the very file being overwritten
+    mapped_mesh = Mesh.load(path)
+    assert isinstance(mapped_mesh.nds_vec_crds, np.memmap)
+    mapped_mesh.save(path)
+    mapped_mesh.save(path)
+
+    reloaded_mesh = Mesh.load(path)
+    for curr_name in Mesh.ARRAYS_NAMES:
+        np.testing.assert_array_equal(getattr(reloaded_mesh, curr_name), getattr(mesh, curr_name))
+    # Maps of the replaced file stay readable
+    np.testing.assert_array_equal(mapped_mesh.els_nds_is, mesh.els_nds_is)
+    assert [curr_path.name for curr_path in tmp_path.iterdir()] == ["mesh.fem"]
+
+def test_arrays_alignment_and_attributes(tmp_path):
+
+    arrays = {
+        "a": np.arange(7, dtype=np.int8),
+        "b": np.linspace(0.0, 1.0, 13).reshape(13, 1),
+        "empty": np.zeros((0, 3)),
+        # Non-contiguous views are written contiguously
+        "c": np.arange(20.0).reshape(4, 5)[:, ::2]
+        }
+    path = tmp_path / "arrays.fem"
+    write_arrays(path, kind="Test", arrays=arrays, attrs={"name": "test", "t": 0.5})
+
+    attrs, loaded_arrays = read_arrays(path, kind="Test")
+    assert attrs == {"name": "test", "t": 0.5}
+    for curr_name, curr_arr in arrays.items():
+        np.testing.assert_array_equal(loaded_arrays[curr_name], curr_arr)
+        assert loaded_arrays[curr_name].shape == curr_arr.shape
+
+def test_simulation_save_load(tmp_path):
+
+    x, y = R2.dims_syms()
+    dom = Domain(
+        'box',
+        [Boundary('x_min', sp.Ge(x, 0.0), R2), Boundary('x_max', sp.Le(2*x, 3.0), R2), Boundary('y_min', sp.Ge(y, -1.0), R2), Boundary('y_max', sp.Le(y, 1.0), R2)],
+        R2
+        )
+    u = Argument('u')
+    eqn = GoverningEquation('Poisson', strong_op=Laplacian(u, R2), strong_src=Expression(sp.Integer(-1)), host_spce=R2)
+    sim = Simulation('box', eqn, dom, (3, 4))
+    np.testing.assert_array_equal(sim.mesh.nds_vec_crds.min(axis=0), (0.0, -1.0))
+    np.testing.assert_array_equal(sim.mesh.nds_vec_crds.max(axis=0), (1.5, 1.0))
+    assert sim.mesh.num_of_els == 12
+
+    sim.soln = np.arange(sim.mesh.num_of_vars, dtype=float)
+    sim.mesh.vrsn = 2
+    path = tmp_path / "sim.fem"
+    sim.save(path)
+    loaded_sim = Simulation('box', eqn, dom, (1, 1))
+    loaded_sim.load(path)
+    assert loaded_sim.mesh.vrsn == 2
+    np.testing.assert_array_equal(loaded_sim.soln, sim.soln)
+    np.testing.assert_array_equal(loaded_sim.mesh.els_nds_is, sim.mesh.els_nds_is)
+    # Saving over the file the loaded state maps
+    loaded_sim.save(path)
+    loaded_sim.load(path)
+    np.testing.assert_array_equal(loaded_sim.mesh.nds_vec_crds, sim.mesh.nds_vec_crds)
+
+def test_simulation_rejects_non_box_domain():
+
+    x, y = R2.dims_syms()
+    dom = Domain('disk', [Boundary('circle', sp.Le(x**2 + y**2, 1.0), R2)], R2)
+    eqn = GoverningEquation('Poisson', strong_op=Laplacian(Argument('u'), R2), strong_src=Expression(sp.Integer(0)), host_spce=R2)
+    with pytest.raises(ValueError):
+        Simulation('disk', eqn, dom, (2, 2))
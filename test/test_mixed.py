@@ -0,0 +1,64 @@
+# Libraries
+import numpy as np
+import sympy as sp
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import generate_structured_mesh
+from Code.fem.mixed import BlockPreconditionerType, KrylovMethod, TaylorHoodSpaces, SaddlePointInfo, create_Taylor_Hood_spaces, assemble_Stokes, solve_Stokes
+
+
+# Manufactured Stokes flow on the unit square (ν = 1): divergence-free velocities vanishing on the boundary, zero-mean pressure
+x, y = sp.symbols("x y")
+VEL_EXPRS = (sp.pi * sp.sin(sp.pi*x)**2 * sp.sin(2*sp.pi*y), -sp.pi * sp.sin(2*sp.pi*x) * sp.sin(sp.pi*y)**2)
+PRS_EXPR = sp.cos(sp.pi*x) * sp.cos(sp.pi*y)
+FRC_EXPRS = tuple(-sp.diff(curr_expr, x, 2) - sp.diff(curr_expr, y, 2) + sp.diff(PRS_EXPR, curr_sym) for curr_expr, curr_sym in zip(VEL_EXPRS, (x, y)))
+vel_fn = sp.lambdify((x, y), VEL_EXPRS, "numpy")
+prs_fn = sp.lambdify((x, y), PRS_EXPR, "numpy")
+frc_fn = sp.lambdify((x, y), FRC_EXPRS, "numpy")
+
+def solve_manufactured_Stokes(
+    num_of_els_per_dim : NumericIntegerValueType,
+    prcndtnr_type : BlockPreconditionerType,
+    krylov_mthd : KrylovMethod = None,
+    rtol : NumericDecimalValueType = 1e-8
+    ) -> Tuple[TaylorHoodSpaces, NumericMatrixValueType, NumericVectorValueType, SaddlePointInfo, NumericSparseMatrixValueType]:
+
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (num_of_els_per_dim, num_of_els_per_dim))
+    spcs = create_Taylor_Hood_spaces(mesh)
+    sys = assemble_Stokes(spcs, frc_fn=lambda pnts: np.stack(np.broadcast_arrays(*frc_fn(pnts[..., 0], pnts[..., 1])), axis=-1))
+    # No-slip everywhere, so the pressure floats
+    bdry_nds_is = np.flatnonzero(np.any((spcs.vel_nds_vec_crds <= 0.0) | (spcs.vel_nds_vec_crds >= 1.0), axis=1))
+    fxd_vars_is = (bdry_nds_is[:, None] * spcs.dimalty + np.arange(spcs.dimalty)).ravel()
+    vel_soln, prs_soln, info = solve_Stokes(spcs, sys, fxd_vars_is, np.zeros(len(fxd_vars_is)), rtol=rtol, prcndtnr_type=prcndtnr_type, krylov_mthd=krylov_mthd, fltng_prs=True)
+    return spcs, vel_soln, prs_soln, info, sys.prs_mass_coefs
+
+def test_block_preconditioned_Stokes_converges_with_bounded_iterations():
+
+    for curr_prcndtnr_type, curr_krylov_mthd in ((BlockPreconditionerType.BLOCK_DIAGONAL, KrylovMethod.MINRES), (BlockPreconditionerType.BLOCK_TRIANGULAR, KrylovMethod.GMRES)):
+        nums_of_itrs = []
+        vel_errs = []
+        for curr_num_of_els_per_dim in (8, 16, 32):
+            spcs, vel_soln, prs_soln, info, prs_mass_coefs = solve_manufactured_Stokes(curr_num_of_els_per_dim, curr_prcndtnr_type, curr_krylov_mthd)
+            assert info.cnvrgd
+            nums_of_itrs.append(info.num_of_itrs)
+            vel_errs.append(np.max(np.abs(vel_soln - np.stack(vel_fn(*spcs.vel_nds_vec_crds.T), axis=1))))
+
+            # ∫p = 0, and it approximates the exact (zero-mean) pressure
+            prs_nds_vec_crds = spcs.vel_nds_vec_crds[:spcs.num_of_prs_nds]
+            assert abs(prs_mass_coefs.sum(axis=0) @ prs_soln) < 1e-12
+            assert np.max(np.abs(prs_soln - prs_fn(*prs_nds_vec_crds.T))) < 0.1
+
+        # Mesh-independent preconditioning: iteration counts level off rather than growing with the mesh size
+        assert max(nums_of_itrs) <= 50
+        assert nums_of_itrs[2] <= 1.25 * nums_of_itrs[1]
+        # Q2 velocities converge at (at least) third order
+        assert np.all(np.array(vel_errs[:-1]) / vel_errs[1:] > 8.0)
+        assert vel_errs[-1] < 1e-5
+
+def test_block_triangular_preconditioning_needs_fewer_iterations():
+
+    _, diag_vel_soln, diag_prs_soln, diag_info, _ = solve_manufactured_Stokes(16, BlockPreconditionerType.BLOCK_DIAGONAL, rtol=1e-11)
+    _, trngr_vel_soln, trngr_prs_soln, trngr_info, _ = solve_manufactured_Stokes(16, BlockPreconditionerType.BLOCK_TRIANGULAR, rtol=1e-11)
+    assert trngr_info.num_of_itrs < diag_info.num_of_itrs
+    np.testing.assert_allclose(trngr_vel_soln, diag_vel_soln, atol=1e-8)
+    np.testing.assert_allclose(trngr_prs_soln, diag_prs_soln, atol=1e-6)
@@ -0,0 +1,98 @@
+# Libraries
+import numpy as np
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import generate_structured_mesh
+from Code.elements.quadrature import CellType
+from Code.fem.assembly import assemble, make_linear_stiffness_kernel, make_linear_mass_kernel
+from Code.fem.multigrid import SmootherType, MultigridSolver, compute_structured_prolongation, restrict_prolongation
+
+
+NUMS_OF_ELS_PER_DIM = (16, 32, 64)
+
+def compute_free_nodes_indices(
+    num_of_els_per_dim : NumericIntegerValueType
+    ) -> Annotated[NumericVectorValueType, Literal["(total free nodes,)"]]:
+
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (num_of_els_per_dim, num_of_els_per_dim))
+    return np.flatnonzero(np.all((mesh.nds_vec_crds > 0.0) & (mesh.nds_vec_crds < 1.0), axis=1))
+
+def make_Poisson_problem(
+    num_of_els_per_dim : NumericIntegerValueType
+    ) -> Tuple[NumericSparseMatrixValueType, Annotated[NumericVectorValueType, Literal["(total free nodes,)"]], Annotated[NumericVectorValueType, Literal["(total free nodes,)"]]]:
+
+    # -∇²u = 2π²·sin(πx)·sin(πy) on the unit square, u = 0 on its boundary; returns the free operator & sources, and the exact solution at the free nodes
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (num_of_els_per_dim, num_of_els_per_dim))
+    free_nds_is = compute_free_nodes_indices(num_of_els_per_dim)
+    stiff_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_stiffness_kernel(CellType.QUADRILATERAL))
+    mass_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_mass_kernel(CellType.QUADRILATERAL))
+    exact_soln = np.sin(np.pi * mesh.nds_vec_crds[:, 0]) * np.sin(np.pi * mesh.nds_vec_crds[:, 1])
+    srcs = mass_op_coefs @ (2 * np.pi**2 * exact_soln)
+    return stiff_op_coefs[free_nds_is][:, free_nds_is], srcs[free_nds_is], exact_soln[free_nds_is]
+
+def compute_geometric_prolongations(
+    num_of_els_per_dim : NumericIntegerValueType,
+    crs_num_of_els_per_dim : NumericIntegerValueType = 4
+    ) -> List[NumericSparseMatrixValueType]:
+
+    # Finest first, restricted to the free nodes of both levels
+    result = []
+    while num_of_els_per_dim > crs_num_of_els_per_dim:
+        result.append(restrict_prolongation(
+            compute_structured_prolongation((num_of_els_per_dim // 2,) * 2),
+            compute_free_nodes_indices(num_of_els_per_dim),
+            compute_free_nodes_indices(num_of_els_per_dim // 2)
+            ))
+        num_of_els_per_dim //= 2
+    return result
+
+def test_structured_prolongation_interpolates_bilinear_functions():
+
+    crs_mesh = generate_structured_mesh((0.0, 0.0), (1.0, 2.0), (3, 5))
+    fine_mesh = generate_structured_mesh((0.0, 0.0), (1.0, 2.0), (6, 10))
+    prlngtn = compute_structured_prolongation((3, 5))
+    bilinear_fn = lambda nds_vec_crds: 1 + 2*nds_vec_crds[:, 0] - nds_vec_crds[:, 1] + 3*nds_vec_crds[:, 0]*nds_vec_crds[:, 1]
+    assert prlngtn.shape == (fine_mesh.num_of_nds, crs_mesh.num_of_nds)
+    np.testing.assert_allclose(prlngtn @ bilinear_fn(crs_mesh.nds_vec_crds), bilinear_fn(fine_mesh.nds_vec_crds), atol=1e-13)
+
+def test_iteration_counts_stay_bounded_under_refinement():
+
+    geo_nums_of_itrs, amg_nums_of_itrs, pcg_nums_of_itrs = [], [], []
+    for curr_num_of_els_per_dim in NUMS_OF_ELS_PER_DIM:
+        op_coefs, srcs, exact_soln = make_Poisson_problem(curr_num_of_els_per_dim)
+        geo_slvr = MultigridSolver(op_coefs, compute_geometric_prolongations(curr_num_of_els_per_dim))
+        amg_slvr = MultigridSolver(op_coefs, max_crs_size=50)
+        assert geo_slvr.num_of_lvls == int(np.log2(curr_num_of_els_per_dim // 4)) + 1
+        assert amg_slvr.num_of_lvls >= 2
+        assert amg_slvr.op_cmplxty < 1.5
+
+        for curr_slvr, curr_nums_of_itrs in ((geo_slvr, geo_nums_of_itrs), (amg_slvr, amg_nums_of_itrs)):
+            soln, info = curr_slvr.solve(srcs, rtol=1e-8)
+            assert info.cnvrgd
+            assert info.resid_norms[-1] <= 1e-8 * np.linalg.norm(srcs)
+            curr_nums_of_itrs.append(info.num_of_itrs)
+            # Discretization error only: O(h²)
+            assert np.max(np.abs(soln - exact_soln)) < 1.0 / curr_num_of_els_per_dim**2
+        _, info = amg_slvr.solve_preconditioned(srcs, rtol=1e-8)
+        assert info.cnvrgd
+        pcg_nums_of_itrs.append(info.num_of_itrs)
+
+    # Geometric V-cycles converge in a mesh-independent number of iterations; smoothed aggregation grows only slowly, and much less so as a CG preconditioner
+    assert max(geo_nums_of_itrs) <= 8 and max(geo_nums_of_itrs) - min(geo_nums_of_itrs) <= 1
+    assert max(amg_nums_of_itrs) <= 25
+    assert max(pcg_nums_of_itrs) <= 12
+    assert np.all(np.diff(pcg_nums_of_itrs) <= 2)
+
+def test_preconditioned_solve_converges():
+
+    op_coefs, srcs, _ = make_Poisson_problem(32)
+    ref_soln = np.linalg.solve(op_coefs.toarray(), srcs)
+    for curr_smoother in SmootherType:
+        for curr_slvr in (MultigridSolver(op_coefs, compute_geometric_prolongations(32), smoother=curr_smoother), MultigridSolver(op_coefs, smoother=curr_smoother, max_crs_size=50)):
+            soln, info = curr_slvr.solve_preconditioned(srcs, rtol=1e-10)
+            assert info.cnvrgd
+            assert info.num_of_itrs == len(info.resid_norms) <= 20
+            np.testing.assert_allclose(soln, ref_soln, atol=1e-9)
+            # Krylov acceleration needs no more cycles than standalone V-cycles
+            _, mg_info = curr_slvr.solve(srcs, rtol=1e-10)
+            assert info.num_of_itrs <= mg_info.num_of_itrs
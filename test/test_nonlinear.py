@@ -0,0 +1,83 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import generate_structured_mesh
+from Code.elements.quadrature import CellType
+from Code.fem.assembly import assemble, make_linear_stiffness_kernel, make_linear_mass_kernel
+from Code.fem.nonlinear import SemilinearProblem, NewtonKrylovSolver
+
+
+def make_Bratu_problem(
+    λ : NumericDecimalValueType = 5.0
+    ) -> SemilinearProblem:
+
+    # -∇²u = λ·eᵘ on the unit square, u = 0 on its boundary
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (16, 16))
+    stiff_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_stiffness_kernel(CellType.QUADRILATERAL))
+    mass_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_mass_kernel(CellType.QUADRILATERAL))
+    bdry_nds_is = np.flatnonzero(np.any((mesh.nds_vec_crds <= 0.0) | (mesh.nds_vec_crds >= 1.0), axis=1))
+    src_fn = lambda u: -λ * np.exp(u)
+    return SemilinearProblem(stiff_op_coefs, mass_op_coefs, src_fn, src_fn, bdry_nds_is)
+
+def test_quadratic_convergence_with_fresh_Jacobians():
+
+    prblm = make_Bratu_problem()
+    u, info = NewtonKrylovSolver(prblm.resid, prblm.jac, rtol=1e-12).solve(np.zeros(len(prblm.free_vars_is)))
+    resid_norms = np.array(info.resid_norms)
+
+    assert info.cnvrgd and not info.stgntd
+    assert info.num_of_itrs <= 5
+    assert info.num_of_jac_evals == info.num_of_itrs
+    # ‖R_{k+1}‖ ≤ C·‖R_k‖²
+    assert np.all(resid_norms[1:] <= 10.0 * resid_norms[:-1]**2)
+    np.testing.assert_allclose(np.linalg.norm(prblm.resid(u)), resid_norms[-1])
+
+def test_modified_Newton_saves_Jacobian_evaluations():
+
+    prblm = make_Bratu_problem()
+    u0 = np.zeros(len(prblm.free_vars_is))
+    u, info = NewtonKrylovSolver(prblm.resid, prblm.jac, rtol=1e-12).solve(u0)
+    mdfd_u, mdfd_info = NewtonKrylovSolver(prblm.resid, prblm.jac, rtol=1e-12, jac_refresh_intrvl=3).solve(u0)
+
+    assert mdfd_info.cnvrgd
+    assert mdfd_info.num_of_jac_evals < info.num_of_jac_evals
+    assert mdfd_info.num_of_jac_evals == -(-mdfd_info.num_of_itrs // 3)
+    np.testing.assert_allclose(mdfd_u, u, atol=1e-10)
+
+def test_Jacobian_free_steps_keep_Newton_convergence():
+
+    # A stale Jacobian only preconditions the finite-difference Jacobian-vector products, so iterations match full Newton's
+    prblm = make_Bratu_problem()
+    u0 = np.zeros(len(prblm.free_vars_is))
+    u, info = NewtonKrylovSolver(prblm.resid, prblm.jac, rtol=1e-12).solve(u0)
+    _, mdfd_info = NewtonKrylovSolver(prblm.resid, prblm.jac, rtol=1e-12, jac_refresh_intrvl=3).solve(u0)
+    jac_free_u, jac_free_info = NewtonKrylovSolver(prblm.resid, prblm.jac, rtol=1e-12, jac_refresh_intrvl=3, jac_free=True).solve(u0)
+
+    assert jac_free_info.cnvrgd
+    assert jac_free_info.num_of_itrs == info.num_of_itrs < mdfd_info.num_of_itrs
+    assert jac_free_info.num_of_jac_evals < info.num_of_jac_evals
+    np.testing.assert_allclose(jac_free_u, u, atol=1e-10)
+
+def test_line_search_rejections():
+
+    # R(u) = arctan(u): full Newton steps overshoot far from the root, and the Jacobian frozen at u₀ = 3 overshoots near it
+    resid_fn = np.arctan
+    jac_fn = lambda u: sps.diags_array(1 / (1 + u**2)).tocsr()
+    u0 = np.full(4, 3.0)
+
+    # Backtracking from a fresh Jacobian is accepted, but the stale one's steps are too short: they are rejected, keeping the iterate, and retried with a refreshed Jacobian
+    u, info = NewtonKrylovSolver(resid_fn, jac_fn, jac_refresh_intrvl=100, min_step_len=0.2).solve(u0)
+    assert info.cnvrgd and not info.stgntd
+    assert info.num_of_jac_evals >= 2
+    rjctd_itrs_is = np.flatnonzero(np.diff(info.resid_norms) == 0.0)
+    assert len(rjctd_itrs_is) >= 1
+    assert len(info.resid_norms) == info.num_of_itrs + 1
+    np.testing.assert_allclose(u, 0.0, atol=1e-8)
+
+    # A wrong (here negated) Jacobian gives ascent directions even when fresh, so the solve stops where it started
+    u, info = NewtonKrylovSolver(resid_fn, lambda u: -jac_fn(u)).solve(u0)
+    assert info.stgntd and not info.cnvrgd
+    assert info.num_of_itrs == info.num_of_jac_evals == 1
+    np.testing.assert_array_equal(u, u0)
@@ -0,0 +1,70 @@
+# Libraries
+import numpy as np
+import scipy.sparse.linalg as spsla
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh, MixedMesh, generate_structured_mesh
+from Code.mesh.adaptivity import refine_h
+from Code.mesh.curves import SpaceFillingCurve
+from Code.mesh.ordering import invert_permutation, reorder_mesh
+from Code.elements.quadrature import CellType
+from Code.fem.assembly import assemble, make_linear_stiffness_kernel, make_linear_mass_kernel, make_linear_sources_kernel
+from Code.fem.hanging import HangingNodeConstraints
+
+
+def solve_reaction_diffusion(
+    mesh : Mesh
+    ) -> Annotated[NumericVectorValueType, Literal["(total variables,)"]]:
+
+    # -∇²u + u = x·y, with natural boundary conditions and hanging nodes condensed
+    hngng_cnstrnts = HangingNodeConstraints()
+    stff_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_stiffness_kernel(CellType.QUADRILATERAL), mesh.nds_vars_is)
+    mass_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_mass_kernel(CellType.QUADRILATERAL), mesh.nds_vars_is)
+    op_coefs = stff_op_coefs + mass_op_coefs
+    src_vals = np.zeros(mesh.num_of_vars)
+    src_vals[mesh.nds_vars_is[:, 0]] = mesh.nds_vec_crds[:, 0] * mesh.nds_vec_crds[:, 1]
+    srcs = mass_op_coefs @ src_vals
+    rdcd_op_coefs, rdcd_srcs = hngng_cnstrnts.condense(mesh, op_coefs, srcs)
+    return hngng_cnstrnts.expand(mesh, spsla.spsolve(rdcd_op_coefs.tocsc(), rdcd_srcs))
+
+def test_reorder_restore_round_trip():
+
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (9, 7))
+    mesh, _ = refine_h(mesh, np.array([0, 10, 11, 30]))
+    mesh.els_tags[:] = np.arange(mesh.num_of_els) % 5
+    assert len(mesh.hngng_nds_is) > 0
+
+    for curr_curve in SpaceFillingCurve:
+        rrdrd_mesh, rrdrng = reorder_mesh(mesh, curr_curve)
+        assert rrdrd_mesh.vrsn == mesh.vrsn + 1
+        assert np.any(rrdrng.nds_perm != np.arange(mesh.num_of_nds)) and np.any(rrdrng.els_perm != np.arange(mesh.num_of_els))
+        for curr_perm, curr_inv_perm in ((rrdrng.els_perm, rrdrng.els_inv_perm), (rrdrng.nds_perm, rrdrng.nds_inv_perm), (rrdrng.vars_perm, rrdrng.vars_inv_perm)):
+            np.testing.assert_array_equal(curr_perm[curr_inv_perm], np.arange(len(curr_perm)))
+            np.testing.assert_array_equal(invert_permutation(curr_inv_perm), curr_perm)
+
+        # Per-entity data comes back in the original numbering
+        np.testing.assert_array_equal(rrdrng.restore_nodes(rrdrd_mesh.nds_vec_crds), mesh.nds_vec_crds)
+        np.testing.assert_array_equal(rrdrng.restore_elements(rrdrd_mesh.els_tags), mesh.els_tags)
+        np.testing.assert_array_equal(rrdrng.restore_elements(rrdrd_mesh.nds_vec_crds[rrdrd_mesh.els_nds_is]), mesh.nds_vec_crds[mesh.els_nds_is])
+        np.testing.assert_array_equal(rrdrd_mesh.nds_vec_crds[rrdrd_mesh.hngng_nds_is], mesh.nds_vec_crds[mesh.hngng_nds_is])
+        np.testing.assert_array_equal(rrdrd_mesh.nds_vec_crds[rrdrd_mesh.hngng_nds_mstrs_is], mesh.nds_vec_crds[mesh.hngng_nds_mstrs_is])
+
+        # ... and so does a solution computed on the reordered mesh
+        np.testing.assert_allclose(rrdrng.restore_variables(solve_reaction_diffusion(rrdrd_mesh)), solve_reaction_diffusion(mesh), rtol=0, atol=1e-12)
+
+def test_reorder_variables_follow_nodes():
+
+    # Two variables per node, numbered component-major, become node-major
+    mesh = generate_structured_mesh((0.0, 0.0, 0.0), (1.0, 1.0, 1.0), (3, 4, 2))
+    num_of_nds = mesh.num_of_nds
+    mesh = Mesh(mesh.nds_vec_crds, mesh.els_nds_is, np.arange(2*num_of_nds).reshape(2, num_of_nds).T)
+    rrdrd_mesh, rrdrng = reorder_mesh(mesh)
+    np.testing.assert_array_equal(rrdrd_mesh.nds_vars_is, np.arange(2*num_of_nds).reshape(num_of_nds, 2))
+    vars_vals = np.random.default_rng(0).standard_normal(2*num_of_nds)
+    np.testing.assert_array_equal(rrdrng.restore_variables(vars_vals[rrdrng.vars_perm]), vars_vals)
+    np.testing.assert_array_equal(rrdrng.restore_nodes(vars_vals[rrdrng.vars_perm][rrdrd_mesh.nds_vars_is]), vars_vals[mesh.nds_vars_is])
+
+    # Mixed meshes are reordered (and restored) block by block
+    mxd_mesh = MixedMesh.from_mesh(generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (5, 5)))
+    rrdrd_mxd_mesh, mxd_rrdrng = reorder_mesh(mxd_mesh)
+    np.testing.assert_array_equal(mxd_rrdrng.restore_elements(rrdrd_mxd_mesh.nds_vec_crds[rrdrd_mxd_mesh.blks[CellType.QUADRILATERAL]]), mxd_mesh.nds_vec_crds[mxd_mesh.blks[CellType.QUADRILATERAL]])
@@ -0,0 +1,44 @@
+# Libraries
+import numpy as np
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import Mesh, generate_structured_mesh
+from Code.mesh.partitioning import PartitionMethod, IMBALANCE_TOLERANCE, compute_dual_graph, compute_edge_cut, partition_graph, partition_mesh
+
+
+def test_multilevel_cut_never_worse_than_curve_cut():
+
+    for curr_nums_of_els_per_dim, curr_num_of_parts in (((64, 64), 4), ((128, 128), 16), ((20, 20, 20), 8), ((64, 64), 7), ((30, 50), 5)):
+        mesh = generate_structured_mesh((0.0,)*len(curr_nums_of_els_per_dim), (1.0,)*len(curr_nums_of_els_per_dim), curr_nums_of_els_per_dim)
+        ml_prtn = partition_mesh(mesh, curr_num_of_parts)
+        crv_prtn = partition_mesh(mesh, curr_num_of_parts, PartitionMethod.SPACE_FILLING_CURVE)
+        assert ml_prtn.edge_cut <= crv_prtn.edge_cut, (curr_nums_of_els_per_dim, curr_num_of_parts)
+        assert ml_prtn.imbalance <= 1 + IMBALANCE_TOLERANCE + 1e-12
+        assert sorted(np.concatenate(ml_prtn.parts_els_is).tolist()) == list(range(mesh.num_of_els))
+
+    # Straight cuts are optimal on a square grid
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (64, 64))
+    assert partition_mesh(mesh, 4).edge_cut == 128
+
+def test_multilevel_partition_quality_without_candidate():
+
+    # 4 quadrants of a 64² grid cut 128 edges; the plain multilevel partition should stay within 40% of that
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (64, 64))
+    dual_grph = compute_dual_graph(mesh)
+    for curr_seed in range(3):
+        parts = partition_graph(dual_grph, 4, seed=curr_seed)
+        assert compute_edge_cut(dual_grph, parts) <= 1.4 * 128
+        assert np.bincount(parts, minlength=4).max() <= (1 + IMBALANCE_TOLERANCE) * mesh.num_of_els / 4
+
+def test_multilevel_partition_of_unstructured_mesh():
+
+    # Perturbed, randomly numbered triangles
+    rng = np.random.default_rng(0)
+    mesh = generate_structured_mesh((0.0, 0.0), (1.0, 1.0), (40, 40))
+    nds_vec_crds = mesh.nds_vec_crds + rng.uniform(-0.3, 0.3, mesh.nds_vec_crds.shape) / 40
+    els_nds_is = np.concatenate([mesh.els_nds_is[:, [0, 1, 2]], mesh.els_nds_is[:, [0, 2, 3]]])
+    mesh = Mesh(nds_vec_crds, els_nds_is[rng.permutation(len(els_nds_is))])
+    ml_prtn = partition_mesh(mesh, 6)
+    crv_prtn = partition_mesh(mesh, 6, PartitionMethod.SPACE_FILLING_CURVE)
+    assert ml_prtn.edge_cut <= crv_prtn.edge_cut
+    assert ml_prtn.imbalance <= 1 + IMBALANCE_TOLERANCE + 1e-12
@@ -0,0 +1,93 @@
+# Libraries
+import json
+import pytest
+# Scripts
+from Code.types import *
+from Code.utilities.profiling import NULL_TIMER, Profiler
+
+
+class Shape:
+
+    def area(self):
+        return 0.0
+
+class Square(Shape):
+    pass
+
+def test_disabled_profiler_records_nothing():
+
+    prflr = Profiler()
+    instrumented_fn = prflr.instrument(name="fn")(lambda a, b=1: a + b)
+    assert prflr.timer("t") is NULL_TIMER
+    with prflr.timer("t"):
+        prflr.count("c")
+        prflr.record("r", 1.0)
+    assert instrumented_fn(1, b=2) == 3
+    assert (prflr.spans, prflr.cntrs, prflr.series) == ([], {}, {})
+
+    # Enabling only affects what is recorded from then on
+    prflr.enable()
+    assert instrumented_fn(1) == 2
+    prflr.count("c", 3)
+    prflr.disable()
+    instrumented_fn(1)
+    prflr.count("c")
+    assert [curr_span[0] for curr_span in prflr.spans] == ["fn"]
+    assert prflr.cntrs == {"c": 3}
+
+def test_self_times_exclude_nested_spans():
+
+    # (name, start, duration) in ns: a parent with two children, one of which has its own child, then a sibling
+    prflr = Profiler()
+    for curr_name, curr_start_ns, curr_dur_ns in (("parent", 0, 100), ("child", 10, 30), ("grandchild", 15, 10), ("child", 50, 30), ("sibling", 100, 20)):
+        prflr.add_span(curr_name, "test", curr_start_ns, curr_dur_ns)
+    # Overlapping spans of another thread are not nested
+    prflr.spans.append(("other_thread", "test", 5, 50, -1))
+
+    timers = prflr.summarize()["timers"]
+    expctd = {"parent": (1, 100, 40), "child": (2, 60, 50), "grandchild": (1, 10, 10), "sibling": (1, 20, 20), "other_thread": (1, 50, 50)}
+    for curr_name, (curr_num_of_calls, curr_total_ns, curr_self_ns) in expctd.items():
+        assert timers[curr_name]["calls"] == curr_num_of_calls
+        assert timers[curr_name]["total_s"] == pytest.approx(curr_total_ns * 1e-9)
+        assert timers[curr_name]["self_s"] == pytest.approx(curr_self_ns * 1e-9)
+    assert timers["child"]["max_s"] == pytest.approx(30e-9)
+    assert timers["child"]["mean_s"] == pytest.approx(30e-9)
+
+    # Real nested timers: self times add up to the outermost total
+    prflr = Profiler()
+    prflr.enable()
+    area_fn = prflr.instrument(per_class=True)(Shape.area)
+    with prflr.timer("outer"):
+        with prflr.timer("inner"):
+            area_fn(Square())
+        area_fn(Shape())
+    timers = prflr.summarize()["timers"]
+    assert set(timers) == {"outer", "inner", "Square.area", "Shape.area"}
+    assert sum(curr_stats["self_s"] for curr_stats in timers.values()) == pytest.approx(timers["outer"]["total_s"])
+    assert all(curr_stats["self_s"] >= 0.0 for curr_stats in timers.values())
+
+def test_chrome_trace_events(tmp_path):
+
+    prflr = Profiler()
+    prflr.enable()
+    with prflr.timer("solve", cat="solve"):
+        for curr_val in (1.0, 0.1, 0.01):
+            prflr.record("resid_norm", curr_val)
+    path = tmp_path / "trace.json"
+    prflr.write_chrome_trace(path)
+
+    with open(path) as file:
+        trace = json.load(file)
+    span_events = [curr_event for curr_event in trace["traceEvents"] if curr_event["ph"] == "X"]
+    cntr_events = [curr_event for curr_event in trace["traceEvents"] if curr_event["ph"] == "C"]
+    assert len(span_events) + len(cntr_events) == len(trace["traceEvents"])
+
+    assert [(curr_event["name"], curr_event["cat"]) for curr_event in span_events] == [("solve", "solve")]
+    span_event = span_events[0]
+    assert {"ts", "dur", "pid", "tid"} <= set(span_event)
+    assert span_event["ts"] >= 0.0 and span_event["dur"] > 0.0
+    # Series values are counters, timestamped inside the span that recorded them
+    assert [curr_event["args"]["value"] for curr_event in cntr_events] == [1.0, 0.1, 0.01]
+    assert all(curr_event["name"] == "resid_norm" and curr_event["pid"] == span_event["pid"] for curr_event in cntr_events)
+    assert all(span_event["ts"] <= curr_event["ts"] <= span_event["ts"] + span_event["dur"] for curr_event in cntr_events)
+    assert [curr_event["ts"] for curr_event in cntr_events] == sorted(curr_event["ts"] for curr_event in cntr_events)
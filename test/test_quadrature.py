@@ -0,0 +1,67 @@
+# Libraries
+import itertools
+import numpy as np
+from math import factorial
+# Scripts
+from Code.types import *
+from Code.elements.quadrature import CellType, QuadratureFamily, CELLS_DIMALTIES, get_quadrature_rule, get_line_rule
+
+
+def integrate_monomial_exactly(
+    cell_type : CellType,
+    exps : Tuple[NumericIntegerValueType, ...]
+    ) -> NumericDecimalValueType:
+
+    # ∫₋₁¹xᵃdx
+    line_intgrl = lambda a: 2 / (a+1) if a % 2 == 0 else 0.0
+    match cell_type:
+        case CellType.LINE | CellType.QUADRILATERAL | CellType.HEXAHEDRON:
+            return np.prod([line_intgrl(curr_exp) for curr_exp in exps])
+        # Unit simplices: ∫xᵃyᵇ(zᶜ) = a!b!(c!)/(a+b(+c)+d)!
+        case CellType.TRIANGLE | CellType.TETRAHEDRON:
+            return np.prod([factorial(curr_exp) for curr_exp in exps]) / factorial(sum(exps) + len(exps))
+        case CellType.WEDGE:
+            return integrate_monomial_exactly(CellType.TRIANGLE, exps[:2]) * line_intgrl(exps[2])
+        # Cross-sections at height z are [-(1-z), 1-z]²
+        case CellType.PYRAMID:
+            a, b, c = exps
+            return line_intgrl(a) * line_intgrl(b) * factorial(c) * factorial(a+b+2) / factorial(a+b+c+3)
+
+def test_rules_are_exact_to_their_degree():
+
+    for curr_cell_type in CellType:
+        dimalty = CELLS_DIMALTIES[curr_cell_type]
+        for curr_family in (QuadratureFamily.GAUSS, QuadratureFamily.GLL):
+            for curr_deg in range(0, 9):
+                rule = get_quadrature_rule(curr_cell_type, curr_deg, curr_family)
+                assert rule.deg >= curr_deg
+                for curr_exps in itertools.product(range(rule.deg+1), repeat=dimalty):
+                    if sum(curr_exps) > rule.deg:
+                        continue
+                    approx_intgrl = np.sum(rule.wghts * np.prod(rule.pnts ** np.array(curr_exps), axis=1))
+                    assert abs(approx_intgrl - integrate_monomial_exactly(curr_cell_type, curr_exps)) < 1e-10, (curr_cell_type, curr_family, curr_deg, curr_exps)
+
+def test_tensor_rules_are_not_exact_beyond_their_degree():
+
+    # n-point Gauss misses x^(2n), n-point GLL misses x^(2n-2)
+    for curr_family in (QuadratureFamily.GAUSS, QuadratureFamily.GLL):
+        rule = get_quadrature_rule(CellType.LINE, 4, curr_family)
+        exp = rule.deg + 1
+        assert abs(np.sum(rule.wghts * rule.pnts[:, 0]**exp) - integrate_monomial_exactly(CellType.LINE, (exp,))) > 1e-6
+
+def test_equivalent_requests_share_a_rule():
+
+    assert get_quadrature_rule(CellType.TRIANGLE, 4) is get_quadrature_rule(CellType.TRIANGLE, deg=4)
+    assert get_quadrature_rule(CellType.TRIANGLE, 4) is get_quadrature_rule(cell_type=CellType.TRIANGLE, deg=np.int64(4), family=QuadratureFamily.GAUSS)
+    # 2-point Gauss is exact to degree 3
+    assert get_quadrature_rule(CellType.QUADRILATERAL, 2) is get_quadrature_rule(CellType.QUADRILATERAL, 3)
+    # Degrees 0 and 1 both resolve to the 1-point rule
+    assert get_quadrature_rule(CellType.TETRAHEDRON, 0) is get_quadrature_rule(CellType.TETRAHEDRON, 1)
+    # `family` doesn't apply to simplices
+    assert get_quadrature_rule(CellType.TRIANGLE, 2, QuadratureFamily.GLL) is get_quadrature_rule(CellType.TRIANGLE, 2)
+    assert get_quadrature_rule(CellType.QUADRILATERAL, 3, QuadratureFamily.GLL) is not get_quadrature_rule(CellType.QUADRILATERAL, 3)
+    assert get_line_rule(3) is get_line_rule(num_of_pnts=3, family=QuadratureFamily.GAUSS)
+    assert not get_quadrature_rule(CellType.HEXAHEDRON, 5).pnts.flags.writeable
+    for curr_num_of_pnts in range(2, 8):
+        pnts, wghts = get_line_rule(curr_num_of_pnts, QuadratureFamily.GLL)
+        assert pnts.dtype == float and np.all(np.diff(pnts) > 0) and abs(wghts.sum() - 2) < 1e-12
@@ -0,0 +1,77 @@
+# Libraries
+import pytest
+import numpy as np
+import sympy as sp
+import scipy.sparse as sps
+# Scripts
+from Code.types import *
+from Code.space.manifold.coordinate import R2
+from Code.symbolic.math import Expression, Argument, Laplacian
+from Code.symbolic.geometry import Boundary, Domain
+from Code.fem.equation import GoverningEquation
+from Code.fem.solve import FactorizationCache, FactorizationMethod
+from Code.fem.simulation import Simulation
+
+
+def make_operator(
+    num_of_vars : NumericIntegerValueType
+    ) -> NumericSparseMatrixValueType:
+
+    # 1D Dirichlet Laplacian
+    return sps.csc_array(sps.diags_array([-np.ones(num_of_vars-1), 2*np.ones(num_of_vars), -np.ones(num_of_vars-1)], offsets=[-1, 0, 1]))
+
+def test_factorization_reuse_and_version_bump():
+
+    op_coefs = make_operator(50)
+    srcs = np.linspace(0.0, 1.0, 50)
+    fctrztn_cache = FactorizationCache(FactorizationMethod.LU)
+
+    soln = fctrztn_cache.solve(op_coefs, srcs, vrsn=0)
+    np.testing.assert_allclose(op_coefs @ soln, srcs, atol=1e-12)
+    # Same matrix & version: substitutions only, also for blocks of right-hand sides
+    blk_soln = fctrztn_cache.solve(op_coefs, np.stack([srcs, 2*srcs], axis=1), vrsn=0)
+    np.testing.assert_allclose(blk_soln, np.stack([soln, 2*soln], axis=1), atol=1e-12)
+    assert fctrztn_cache.num_of_fctrztns == 1
+    assert fctrztn_cache.num_of_slvs == 3
+
+    # In-place modification with a bumped version refactors
+    op_coefs.data *= 2.0
+    new_soln = fctrztn_cache.solve(op_coefs, srcs, vrsn=1)
+    assert fctrztn_cache.num_of_fctrztns == 2
+    np.testing.assert_allclose(new_soln, soln / 2, atol=1e-12)
+    fctrztn_cache.solve(op_coefs, srcs, vrsn=1)
+    assert fctrztn_cache.num_of_fctrztns == 2
+
+    # An equal but distinct matrix object refactors too
+    fctrztn_cache.solve(op_coefs.copy(), srcs, vrsn=1)
+    assert fctrztn_cache.num_of_fctrztns == 3
+
+    fctrztn_cache.clear()
+    assert not fctrztn_cache.is_current(op_coefs, 1)
+
+def test_multigrid_cache_reuse():
+
+    op_coefs = make_operator(200)
+    srcs = np.ones(200)
+    fctrztn_cache = FactorizationCache(FactorizationMethod.MULTIGRID, rtol=1e-12)
+    soln = fctrztn_cache.solve(op_coefs, srcs)
+    fctrztn_cache.solve(op_coefs, srcs)
+    assert fctrztn_cache.num_of_fctrztns == 1
+    np.testing.assert_allclose(op_coefs @ soln, srcs, atol=1e-8)
+
+def test_solve_input_checks():
+
+    fctrztn_cache = FactorizationCache()
+    with pytest.raises(ValueError):
+        fctrztn_cache.solve(make_operator(5), np.ones(4))
+    with pytest.raises(ValueError):
+        fctrztn_cache.solve(make_operator(5), np.ones((5, 1, 1)))
+
+def test_re_solving_needs_an_assembled_operator():
+
+    x, y = R2.dims_syms()
+    dom = Domain('box', [Boundary('x_min', sp.Ge(x, 0.0), R2), Boundary('x_max', sp.Le(x, 1.0), R2), Boundary('y_min', sp.Ge(y, 0.0), R2), Boundary('y_max', sp.Le(y, 1.0), R2)], R2)
+    eqn = GoverningEquation('Poisson', strong_op=Laplacian(Argument('u'), R2), strong_src=Expression(sp.Integer(0)), host_spce=R2)
+    sim = Simulation('box', eqn, dom, (2, 2))
+    with pytest.raises(RuntimeError):
+        sim.solve_for_sources(np.ones(sim.mesh.num_of_vars))
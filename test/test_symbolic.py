@@ -0,0 +1,194 @@
+# Libraries
+import pytest
+import numpy as np
+import sympy as sp
+from dataclasses import dataclass
+# Scripts
+from Code.types import *
+from Code.symbolic.types import *
+from Code.space.manifold import vector
+from Code.space.manifold.coordinate import Coordinate, CoordinateSpace, CoordinateVector, CoordinateVectorBatch, R2
+from Code.symbolic.math import SymbolicMathematicalObject, Expression, Argument, Operator, UnaryOperator, Sum, Difference, Negation, DotProduct, Gradient, Divergence, Laplacian, compile_operator
+
+
+r, θ, x, y = sp.symbols("r θ x y")
+r_crd, θ_crd, x_crd, y_crd = Coordinate(r), Coordinate(θ), Coordinate(x), Coordinate(y)
+
+@dataclass(frozen=True)
+class CartesianPlane(CoordinateSpace, vector.R2):
+
+    def identity_isomorphism(self, crd_vec : CoordinateVector) -> CoordinateVector:
+        return crd_vec
+
+@dataclass(frozen=True)
+class PolarPlane(CoordinateSpace, vector.R2):
+
+    def identity_isomorphism(self, crd_vec : CoordinateVector) -> CoordinateVector:
+        return CoordinateVector(
+            host_spce = CARTESIAN_PLANE,
+            cmpnts = {x_crd: crd_vec[r_crd] * sp.cos(crd_vec[θ_crd]), y_crd: crd_vec[r_crd] * sp.sin(crd_vec[θ_crd])}
+            )
+
+CARTESIAN_PLANE = CartesianPlane(crds=(x_crd, y_crd))
+POLAR_PLANE = PolarPlane(crds=(r_crd, θ_crd))
+
+def compute_tree_depth(
+    obj : SymbolicMathematicalObject
+    ) -> NumericIntegerValueType:
+
+    # Iterative, so that the check itself can't hit the recursion limit
+    result = 0
+    stck = [(obj, 0)]
+    while stck:
+        curr_obj, curr_depth = stck.pop()
+        result = max(result, curr_depth)
+        if isinstance(curr_obj, Operator):
+            stck.extend((curr_oprnd, curr_depth + 1) for curr_oprnd in curr_obj.oprnds)
+    return result
+
+class Square(UnaryOperator):
+
+    # No `KERNEL`, so compiled evaluation goes through `evaluate()`; calls are counted
+    num_of_evals = 0
+
+    def evaluate(
+        self,
+        evald_oprnd : Tuple[SymbolicValueType]
+        ) -> Tuple[SymbolicValueType]:
+
+        Square.num_of_evals += 1
+        return (evald_oprnd[0]**2,)
+
+def test_gradients_dot_product_in_polar_coordinates():
+
+    u_expr = r**2 * sp.sin(θ)
+    w_expr = r * sp.cos(2*θ)
+    u = Argument('u')
+    w = Argument('w')
+
+    # ∇u·∇w = ∂ᵣu·∂ᵣw + ∂θu·∂θw/r²
+    expctd = sp.diff(u_expr, r) * sp.diff(w_expr, r) + sp.diff(u_expr, θ) * sp.diff(w_expr, θ) / r**2
+    for curr_op in (Gradient(u, POLAR_PLANE).dot(Gradient(w, POLAR_PLANE)), DotProduct(Gradient(u, POLAR_PLANE) * 1, Gradient(w, POLAR_PLANE))):
+        assert sp.simplify(curr_op({u: u_expr, w: w_expr})[0] - expctd) == 0
+        assert sp.simplify(curr_op.compile()({u: u_expr, w: w_expr})[0] - expctd) == 0
+
+    # |∇u|² from the explicit space matches the Laplacian identity ∇²(u²) = 2u∇²u + 2|∇u|²
+    grad_sqrd = DotProduct(Gradient(u, POLAR_PLANE), Gradient(u, POLAR_PLANE))({u: u_expr})[0]
+    lap_u_sqrd = Laplacian(u, POLAR_PLANE)({u: u_expr**2})[0]
+    lap_u = Laplacian(u, POLAR_PLANE)({u: u_expr})[0]
+    assert sp.simplify(lap_u_sqrd - 2*u_expr*lap_u - 2*grad_sqrd) == 0
+
+def test_cartesian_dot_product_sums_components():
+
+    x_sym, y_sym = R2.dims_syms()
+    u = Argument('u')
+    w = Argument('w')
+    op = Gradient(u, R2).dot(Gradient(w, R2))
+    assert op.metric is None
+    assert sp.simplify(op({u: x_sym**2 * y_sym, w: x_sym + y_sym**3})[0] - (2*x_sym*y_sym + 3*x_sym**2*y_sym**2)) == 0
+    # Without any spatial operator, components are summed directly
+    assert DotProduct(Expression(sp.Matrix([1, 2])), Expression(sp.Matrix([3, 4])))({})[0] == 11
+
+def test_chained_sums_and_differences_stay_shallow():
+
+    u = Argument('u')
+    terms = [Argument(f'a_{curr_term_i}') for curr_term_i in range(5000)]
+    vals = {curr_term: curr_term_i for curr_term_i, curr_term in enumerate(terms)}
+
+    op = terms[0]
+    for curr_term in terms[1:]:
+        op = op + curr_term
+    assert isinstance(op, Sum)
+    assert (len(op.oprnds), compute_tree_depth(op)) == (5000, 1)
+    assert op(vals)[0] == sum(range(5000))
+
+    # Differences add negations, so alternating chains are one Sum too
+    op = terms[0]
+    for curr_term_i, curr_term in enumerate(terms[1:], start=1):
+        op = (op - curr_term) if (curr_term_i % 2) else (op + curr_term)
+    assert (len(op.oprnds), compute_tree_depth(op)) == (5000, 2)
+    assert sum(isinstance(curr_oprnd, Negation) for curr_oprnd in op.oprnds) == 2500
+    assert op(vals)[0] == sum(curr_term_i if (curr_term_i % 2 == 0) else -curr_term_i for curr_term_i in range(5000))
+
+def test_long_difference_chains_evaluate():
+
+    # Far deeper than the recursion limit as nested binary operators
+    u = Argument('u')
+    op = Expression(x) - u
+    for _ in range(2999):
+        op = op - u
+    op = 1 - op
+    assert compute_tree_depth(op) <= 4
+    assert sp.expand(op({u: y})[0] - (1 - x + 3000*y)) == 0
+    assert sp.expand(op.compile()({u: y})[0] - (1 - x + 3000*y)) == 0
+
+def test_compiled_evaluation_matches_recursive_evaluation():
+
+    u = Argument('u')
+    w = Argument('w')
+    # A DAG: `shrd` feeds three parents; constant subtrees fold away
+    shrd = Square(u + 2*w)
+    op = Difference(shrd * (Expression(3.0) / 4 - w), shrd / (1 + Square(w))) + Square(shrd) - Expression(2.0) * Expression(5.0)
+    cmpld_op = op.compile()
+    assert len(cmpld_op.arg_dpndnt_tape) == len(cmpld_op.tape)
+
+    # A batch of points, both one by one and as arrays
+    pnts = np.random.default_rng(0).uniform(-1.0, 1.0, (50, 2))
+    args_batch = [{u: curr_u, 'w': curr_w} for curr_u, curr_w in pnts]
+    rcrsv_vals = np.array([op(curr_args)[0] for curr_args in args_batch])
+    np.testing.assert_allclose([cmpld_op(curr_args)[0] for curr_args in args_batch], rcrsv_vals, rtol=1e-14)
+    np.testing.assert_allclose(cmpld_op.evaluate_batch(args_batch), rcrsv_vals, rtol=1e-14)
+    np.testing.assert_allclose(cmpld_op({u: pnts[:, 0], w: pnts[:, 1]})[0], rcrsv_vals, rtol=1e-14)
+
+    # The shared operator is evaluated once per point when compiled, but once per parent recursively
+    Square.num_of_evals = 0
+    cmpld_op.evaluate_batch(args_batch)
+    assert Square.num_of_evals == 3 * len(args_batch)
+    Square.num_of_evals = 0
+    op(args_batch[0])
+    assert Square.num_of_evals == 5
+
+    # Symbolic values, and argument-independent instructions (left unfolded) run once for the whole batch
+    cmpld_op = compile_operator(op + Square(Expression(x)), fold=False)
+    assert len(cmpld_op.arg_dpndnt_tape) < len(cmpld_op.tape)
+    args_batch = [{u: curr_k * x, w: y**curr_k} for curr_k in range(1, 5)]
+    Square.num_of_evals = 0
+    cmpld_vals = cmpld_op.evaluate_batch(args_batch)
+    assert Square.num_of_evals == 1 + 3 * len(args_batch)
+    for curr_args, curr_cmpld_val in zip(args_batch, cmpld_vals):
+        assert sp.expand(curr_cmpld_val - (op(curr_args)[0] + x**2)) == 0
+
+def test_coordinate_vector_batches_match_per_vector_operations():
+
+    rng = np.random.default_rng(0)
+    for curr_spce in (POLAR_PLANE, CARTESIAN_PLANE):
+        frst_vecs = [curr_spce.vector(dict(zip(curr_spce.ordered_crds, curr_vals))) for curr_vals in rng.uniform(0.1, 2.0, (20, 2)).tolist()]
+        scnd_vecs = [curr_spce.vector(dict(zip(curr_spce.ordered_crds, curr_vals))) for curr_vals in rng.uniform(0.1, 2.0, (20, 2)).tolist()]
+        scales = rng.uniform(-2.0, 2.0, 20)
+        frst_batch = CoordinateVectorBatch.from_vectors(curr_spce, frst_vecs)
+        scnd_batch = CoordinateVectorBatch.from_vectors(curr_spce, scnd_vecs)
+
+        def assert_batch_matches(batch, crd_vecs):
+            assert all(curr_crd_vec in batch.host_spce for curr_crd_vec in crd_vecs)
+            np.testing.assert_allclose(
+                batch.vals,
+                [[float(curr_crd_vec[curr_crd]) for curr_crd in batch.host_spce.ordered_crds] for curr_crd_vec in crd_vecs],
+                rtol = 1e-14
+                )
+
+        assert_batch_matches(frst_batch + scnd_batch, [curr_frst + curr_scnd for curr_frst, curr_scnd in zip(frst_vecs, scnd_vecs)])
+        assert_batch_matches(frst_batch - scnd_batch, [curr_frst + curr_scnd * -1 for curr_frst, curr_scnd in zip(frst_vecs, scnd_vecs)])
+        # Scaled by one factor per vector, or one for the whole batch
+        assert_batch_matches(frst_batch * scales, [curr_frst * curr_scale for curr_frst, curr_scale in zip(frst_vecs, scales.tolist())])
+        assert_batch_matches(0.5 * frst_batch, [curr_frst * 0.5 for curr_frst in frst_vecs])
+        assert_batch_matches(frst_batch.map_to_identity(), [curr_spce.identity_isomorphism(curr_frst) for curr_frst in frst_vecs])
+        assert frst_batch.map_to_identity().host_spce == CARTESIAN_PLANE
+
+        # Single vectors come back as vectors
+        assert_batch_matches(frst_batch[[3]], [frst_batch[3]])
+        assert_batch_matches(frst_batch, frst_batch.to_vectors())
+
+    with pytest.raises(ValueError):
+        CoordinateVectorBatch(POLAR_PLANE, np.ones((3, 2))) + CoordinateVectorBatch(CARTESIAN_PLANE, np.ones((3, 2)))
+    with pytest.raises(ValueError):
+        CoordinateVectorBatch(POLAR_PLANE, np.ones((3, 2))) - CoordinateVectorBatch(POLAR_PLANE, np.ones((4, 2)))
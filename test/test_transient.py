@@ -0,0 +1,74 @@
+# Libraries
+import numpy as np
+import scipy.sparse as sps
+from scipy.integrate import solve_ivp
+# Scripts
+from Code.types import *
+from Code.mesh.mesh import generate_structured_mesh
+from Code.elements.quadrature import CellType
+from Code.fem.assembly import assemble, make_linear_stiffness_kernel, make_linear_mass_kernel
+from Code.fem.transient import TimeScheme, TimeIntegrator
+
+
+T_END = 0.2
+
+def make_heat_integrator(
+    scheme : TimeScheme
+    ) -> Tuple[TimeIntegrator, Annotated[NumericVectorValueType, Literal["(total variables,)"]]]:
+
+    # u̇ - u'' = cos(2t)·sin(πx) on [0, 1], u(0) = u(1) = 0 and u(0, x) = sin(πx)
+    mesh = generate_structured_mesh((0.0,), (1.0,), (10,))
+    mass_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_mass_kernel(CellType.LINE))
+    stiff_op_coefs, _ = assemble(mesh.els_nds_is, mesh.nds_vec_crds, make_linear_stiffness_kernel(CellType.LINE))
+    u0 = np.sin(np.pi * mesh.nds_vec_crds[:, 0])
+    src_vals = mass_op_coefs @ u0
+    bdry_nds_is = np.array([0, mesh.num_of_nds - 1])
+
+    intgrtr = TimeIntegrator(mass_op_coefs, stiff_op_coefs, lambda t: np.cos(2*t) * src_vals, scheme, bdry_nds_is)
+    return intgrtr, u0
+
+def compute_reference_solution(
+    intgrtr : TimeIntegrator,
+    u0 : Annotated[NumericVectorValueType, Literal["(total variables,)"]]
+    ) -> Annotated[NumericVectorValueType, Literal["(total variables,)"]]:
+
+    # The same semi-discrete system (lumped for RK4), integrated to round-off
+    mass_op_coefs = sps.diags_array(intgrtr.lumped_mass) if intgrtr.scheme == TimeScheme.EXPLICIT_RK4 else intgrtr.mass_op_coefs
+    mass_op_coefs, stiff_op_coefs = mass_op_coefs.toarray(), intgrtr.stiff_op_coefs.toarray()
+    rate_fn = lambda t, u_free: np.linalg.solve(mass_op_coefs, intgrtr.evaluate_sources(t) - stiff_op_coefs @ u_free)
+    result = np.zeros_like(u0)
+    result[intgrtr.free_vars_is] = solve_ivp(rate_fn, (0.0, T_END), u0[intgrtr.free_vars_is], method="DOP853", rtol=1e-13, atol=1e-15).y[:, -1]
+    return result
+
+def test_convergence_orders():
+
+    dts = T_END / np.array([50, 100, 200])
+    for curr_scheme, curr_ord in ((TimeScheme.IMPLICIT_EULER, 1), (TimeScheme.CRANK_NICOLSON, 2), (TimeScheme.BDF2, 2), (TimeScheme.EXPLICIT_RK4, 4)):
+        intgrtr, u0 = make_heat_integrator(curr_scheme)
+        ref_u = compute_reference_solution(intgrtr, u0)
+        errs = np.array([np.max(np.abs(intgrtr.integrate(u0, 0.0, T_END, curr_dt) - ref_u)) for curr_dt in dts])
+        rates = np.log2(errs[:-1] / errs[1:])
+        np.testing.assert_allclose(rates, curr_ord, atol=0.2)
+
+def test_BDF2_first_step_falls_back_to_implicit_Euler():
+
+    dt = 0.01
+    intgrtr, u0 = make_heat_integrator(TimeScheme.BDF2)
+    ie_intgrtr, _ = make_heat_integrator(TimeScheme.IMPLICIT_EULER)
+    np.testing.assert_allclose(intgrtr.step(u0, 0.0, dt), ie_intgrtr.step(u0, 0.0, dt), rtol=0, atol=1e-14)
+
+    # integrate() does the same on its first step, then switches to the two-step formula
+    slns = []
+    intgrtr.integrate(u0, 0.0, 3*dt, dt, callback=lambda itr, t, u: slns.append(u))
+    np.testing.assert_allclose(slns[0], ie_intgrtr.step(u0, 0.0, dt), rtol=0, atol=1e-14)
+    np.testing.assert_allclose(slns[1], intgrtr.step(slns[0], dt, dt, u0), rtol=0, atol=1e-14)
+    assert np.max(np.abs(slns[1] - ie_intgrtr.step(slns[0], dt, dt))) > 1e-8
+
+def test_constant_steps_factorize_once():
+
+    # BDF2 factors twice: its implicit Euler first step has a different step matrix
+    for curr_scheme, curr_num_of_fctrztns in ((TimeScheme.IMPLICIT_EULER, 1), (TimeScheme.CRANK_NICOLSON, 1), (TimeScheme.BDF2, 2), (TimeScheme.EXPLICIT_RK4, 0)):
+        intgrtr, u0 = make_heat_integrator(curr_scheme)
+        intgrtr.integrate(u0, 0.0, T_END, T_END / 40)
+        assert intgrtr.fctrztn_cache.num_of_fctrztns == curr_num_of_fctrztns
+        assert intgrtr.fctrztn_cache.num_of_slvs == (40 if curr_num_of_fctrztns else 0)
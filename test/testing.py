@@ -3,7 +3,7 @@ import sympy as sp
 import numpy as np
 # Scripts
 from Code.types import *
-from Code.symbolic.space import R2
+from Code.space.manifold.coordinate import R2
 from Code.symbolic.math import Expression, Argument
 from Code.symbolic.math import Derivative, Gradient, Divergence, Laplacian
 from Code.symbolic.geometry import Boundary, Domain
@@ -30,8 +30,8 @@ src = Expression(-ρ / ɛ)
 
 eqn = GoverningEquation(
     name = 'Poisson',
-    op = op,
-    src = src,
+    strong_op = op,
+    strong_src = src,
     host_spce = R2
     )
 
@@ -40,5 +40,5 @@ eqn.construct_weak_form_integrands(wghtng_plchldr = w)
 
 V_sub = sp.Function('V')(x, y)
 w_sub = sp.Function('w')(x, y)
-sp.pprint(eqn.weak_form_op_intgrnd({V: V_sub, w: w_sub})[0])
-sp.pprint(eqn.weak_form_src_intgrnd({w: w_sub})[0])
\ No newline at end of file
+sp.pprint(eqn.weak_op_intgrnd({V: V_sub, w: w_sub})[0])
+sp.pprint(eqn.weak_src_intgrnd({w: w_sub})[0])
\ No newline at end of file
@@ -1,6 +1,6 @@
 # Libraries
-import sympy as sp
 import numpy as np
+import scipy.sparse as sps
 from typing import TYPE_CHECKING
 from typing import TypeAlias, TypeVar, ClassVar, Any
 from typing import Union, Annotated, Literal
@@ -42,51 +42,16 @@ MatrixValueShape       : TypeAlias = Literal["(m, n)"]
 TensorValueShape       : TypeAlias = Literal["(m, n, ..)"]
 
 
-# Centralized handling of typing regarding SymPy's convoluted matrix/tensor classes
-SymPyMatrixType : TypeAlias = sp.MatrixBase
-SymPyArrayType : TypeAlias = sp.NDimArray
-
-
-# Supported symbolic value types
-SymbolicScalarValueType : TypeAlias = Union[
-    int, 
-    float, 
-    sp.Expr
-    ]
-SymbolicRowVectorValueType : TypeAlias = Annotated[
-    SymPyMatrixType, 
-    RowVectorValueShape
-    ]
-SymbolicColumnVectorValueType : TypeAlias = Annotated[
-    SymPyMatrixType, 
-    ColumnVectorValueShape
-    ]
-SymbolicVectorValueType : TypeAlias = Union[
-    SymbolicRowVectorValueType, 
-    SymbolicColumnVectorValueType
-    ]
-SymbolicMatrixValueType : TypeAlias = Annotated[
-    SymPyMatrixType, 
-    MatrixValueShape
-    ]
-SymbolicTensorValueType : TypeAlias = Annotated[
-    SymPyArrayType,
-    TensorValueShape
-    ]
-SymbolicValueType : TypeAlias = Union[
-    SymbolicScalarValueType, 
-    SymbolicVectorValueType, 
-    SymbolicMatrixValueType,
-    SymbolicTensorValueType
-    ]
-
-
 # Centralized handling of NumPy classes
 NumPyIntegerType : TypeAlias = np.integer
 NumPyDecimalType : TypeAlias = np.floating
 NumPyScalarType : TypeAlias = Union[NumPyIntegerType, NumPyDecimalType]
 
 
+# Centralized handling of SciPy sparse classes
+SciPySparseArrayType : TypeAlias = Union[sps.sparray, sps.spmatrix]
+
+
 # Supported numeric value types
 NumericIntegerValueType : TypeAlias = Union[int, NumPyIntegerType]
 NumericDecimalValueType : TypeAlias = Union[float, NumPyDecimalType]
@@ -120,38 +85,9 @@ NumericValueType : TypeAlias = Union[
     NumericMatrixValueType,
     NumericTensorValueType
     ]
-
-
-# Combined types
-ScalarValueType : TypeAlias = Union[
-    SymbolicScalarValueType, 
-    NumericScalarValueType
-    ]
-RowVectorValueType : TypeAlias = Union[
-    SymbolicRowVectorValueType,
-    NumericRowVectorValueType
-    ]
-ColumnVectorValueType : TypeAlias = Union[
-    SymbolicColumnVectorValueType,
-    NumericColumnVectorValueType
-    ]
-VectorValueType : TypeAlias = Union[
-    RowVectorValueType,
-    ColumnVectorValueType
-    ]
-MatrixValueType : TypeAlias = Union[
-    SymbolicMatrixValueType,
-    NumericMatrixValueType
-    ]
-TensorValueType : TypeAlias = Union[
-    SymbolicTensorValueType,
-    NumericTensorValueType
-    ]
-ValueType : TypeAlias = Union[
-    ScalarValueType,
-    VectorValueType,
-    MatrixValueType,
-    TensorValueType
+NumericSparseMatrixValueType : TypeAlias = Annotated[
+    SciPySparseArrayType,
+    MatrixValueShape
     ]
 
 
@@ -161,10 +97,20 @@ NameType: TypeAlias = str
 
 
 # Runtime-usable extractions
-RUNTIME_SYMBOLIC_SCALAR_VALUE_TYPE = extract_base_types(SymbolicScalarValueType)
-RUNTIME_SYMBOLIC_VECTOR_VALUE_TYPE = extract_base_types(SymbolicVectorValueType)
-RUNTIME_SYMBOLIC_MATRIX_VALUE_TYPE = extract_base_types(SymbolicMatrixValueType)
-RUNTIME_SYMBOLIC_TENSOR_VALUE_TYPE = extract_base_types(SymbolicTensorValueType)
+RUNTIME_NUMERIC_SPARSE_MATRIX_VALUE_TYPE = extract_base_types(NumericSparseMatrixValueType)
 RUNTIME_INDEX_TYPE = extract_base_types(IndexType)
 RUNTIME_NAME_TYPE = extract_base_types(NameType)
 
+
+# Symbolic (SymPy-backed) types live in `symbolic/types.py`, so that numeric-only code (meshing, assembly, solving, loading cached kernels) never pays for importing SymPy
+# They stay reachable as attributes of this module, which imports SymPy on first access
+def __getattr__(name : str) -> Any:
+
+    # Star imports probe `__all__` (and tooling other dunders), which must not trigger the SymPy import
+    if name.startswith("__"):
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from Code.symbolic import types as symbolic_types
+    try:
+        return getattr(symbolic_types, name)
+    except AttributeError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
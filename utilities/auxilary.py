@@ -1,16 +1,22 @@
 # Libraries
-import sympy as sp
+import os
+import hashlib
+import inspect
 import numpy as np
 from dataclasses import dataclass
 # Scripts
-from ..types import *
+from Code.types import *
+from Code.utilities.profiling import PROFILER
+# SymPy is only imported where expressions are actually compiled or hashed, so that loading cached kernels stays SymPy-free
+if TYPE_CHECKING:
+    import sympy as sp
 
 
 # Utility/wrapper class for storing values associated with symbols
 @dataclass
 class StoredVariable():
 
-    sym : sp.Symbol
+    sym : "sp.Symbol"
     val : NumericValueType = None
 
     def __repr__(self):
@@ -24,16 +30,101 @@ class StoredVariable():
         return result
 
 
+class KernelCache:
+    """
+    On-disk cache of compiled (lambdified) kernels, stored as the generated NumPy source code.
+
+    Cached kernels are recompiled against a plain NumPy namespace, so a restarted process can recover them by name without importing SymPy or rebuilding the symbolic pipeline that produced them.
+    """
+
+    def __init__(
+        self,
+        cache_dir : str
+        ):
+
+        self.cache_dir = cache_dir
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.kernels = {}
+
+    @staticmethod
+    def compute_key(
+        syms : Tuple["sp.Symbol", ...],
+        expr : "sp.Expr"
+        ) -> NameType:
+
+        import sympy as sp
+        return hashlib.sha256(sp.srepr((tuple(syms), expr)).encode("utf-8")).hexdigest()
+
+    def path(
+        self,
+        key : NameType
+        ) -> str:
+
+        return os.path.join(self.cache_dir, f"{key}.py")
+
+    def __contains__(self, key: NameType) -> bool:
+        return (key in self.kernels) or os.path.exists(self.path(key))
+
+    def load(
+        self,
+        key : NameType
+        ) -> Callable[..., NumericValueType]:
+
+        if key in self.kernels:
+            return self.kernels[key]
+        with open(self.path(key), "r", encoding="utf-8") as f:
+            src = f.read()
+        # Same namespace lambdify uses for the 'numpy' module
+        nmspce = {"I": 1j}
+        exec("import numpy\nfrom numpy import *", nmspce)
+        exec(compile(src, self.path(key), "exec"), nmspce)
+        result = nmspce["_lambdifygenerated"]
+        self.kernels[key] = result
+
+        return result
+
+    def store(
+        self,
+        key : NameType,
+        fn : Callable[..., NumericValueType]
+        ):
+
+        # Write-then-rename so a crash never leaves a truncated kernel behind
+        tmp_path = f"{self.path(key)}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(inspect.getsource(fn))
+        os.replace(tmp_path, self.path(key))
+        self.kernels[key] = fn
+
+
+@PROFILER.instrument(cat="codegen")
 def make_callable(
-    syms : Tuple[sp.Symbol, ...],
-    expr : sp.Expr
+    syms : Tuple["sp.Symbol", ...],
+    expr : "sp.Expr",
+    cache : KernelCache = None,
+    key : NameType = None
     ) -> Callable[..., NumericValueType]:
+    """
+    Compiles `expr` into a NumPy-vectorized callable of `syms`.
+
+    If a `cache` is provided, the compiled kernel is reused from (or stored into) it under `key`, defaulting to a hash of the symbols & expression. Pass an explicit `key` to be able to `cache.load()` the kernel later without the expression.
+    """
+
+    if (cache is not None) and (key is None):
+        key = KernelCache.compute_key(syms, expr)
+    if (cache is not None) and (key in cache):
+        PROFILER.count("make_callable/cache_hits")
+        return cache.load(key)
+    PROFILER.count("make_callable/compilations")
 
+    import sympy as sp
     result = sp.lambdify(
         args = syms, 
         expr = expr, 
         modules = 'numpy'
         )
+    if cache is not None:
+        cache.store(key, result)
 
     return result
 
@@ -46,8 +137,9 @@ Random crap from my previous architecture that I've kept around in case it's use
 def construct_vector_coordinates_symbols(
     base_name   : str,
     num_of_dims : int,
-    ) -> Tuple[sp.Symbol, ...]:
+    ) -> Tuple["sp.Symbol", ...]:
     
+    import sympy as sp
     return tuple(
         sp.Symbol(f"{base_name}_crd_{curr_dim_i}") 
         for curr_dim_i in range(num_of_dims)
@@ -0,0 +1,251 @@
+# Libraries
+import os
+import json
+import time
+import threading
+from functools import wraps
+from contextlib import nullcontext
+# Scripts
+from Code.types import *
+
+
+'''
+Script-specific typing setup
+'''
+
+# Set to a non-empty value to enable profiling at import time, e.g. `FEM_PROFILE=1 python run.py`
+PROFILE_ENV_VAR = "FEM_PROFILE"
+# Shared no-op context, so disabled timers allocate nothing
+NULL_TIMER = nullcontext()
+
+
+'''
+Instrumentation
+'''
+
+class Timer:
+
+    __slots__ = ("prflr", "name", "cat", "start_ns")
+
+    def __init__(
+        self,
+        prflr : "Profiler",
+        name : str,
+        cat : str
+        ):
+
+        self.prflr = prflr
+        self.name = name
+        self.cat = cat
+
+    def __enter__(self):
+
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info):
+
+        self.prflr.add_span(self.name, self.cat, self.start_ns, time.perf_counter_ns() - self.start_ns)
+        return False
+
+class Profiler:
+    """
+    Process-wide collection of named timers, counters and value series (e.g. solver residuals).
+
+    Every hook checks `enabled` first, so a disabled profiler costs one attribute lookup per instrumented call.
+    When enabled, every timed span is kept as an event, which is what the Chrome trace (viewable as a flame chart in `chrome://tracing` or Perfetto) is built from; `report()` aggregates the same events per name.
+    """
+
+    def __init__(self):
+
+        self.enabled = False
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+
+        self.origin_ns = time.perf_counter_ns()
+        # (name, category, start, duration, thread)
+        self.spans = []
+        self.cntrs = {}
+        # name ⟼ [(time, value), ...]
+        self.series = {}
+
+    def enable(self):
+
+        self.enabled = True
+
+    def disable(self):
+
+        self.enabled = False
+
+    def add_span(
+        self,
+        name : str,
+        cat : str,
+        start_ns : NumericIntegerValueType,
+        dur_ns : NumericIntegerValueType
+        ):
+
+        with self.lock:
+            self.spans.append((name, cat, start_ns, dur_ns, threading.get_ident()))
+
+    def timer(
+        self,
+        name : str,
+        cat : str = "fem"
+        ):
+
+        if not self.enabled:
+            return NULL_TIMER
+        return Timer(self, name, cat)
+
+    def count(
+        self,
+        name : str,
+        n : NumericIntegerValueType = 1
+        ):
+
+        if not self.enabled:
+            return
+        with self.lock:
+            self.cntrs[name] = self.cntrs.get(name, 0) + n
+
+    def record(
+        self,
+        name : str,
+        val : NumericDecimalValueType
+        ):
+
+        if not self.enabled:
+            return
+        with self.lock:
+            self.series.setdefault(name, []).append((time.perf_counter_ns(), float(val)))
+
+    def instrument(
+        self,
+        name : str = None,
+        cat : str = "fem",
+        per_class : bool = False
+        ) -> Callable[[Callable], Callable]:
+        """
+        Decorator timing every call of a function under `name` (its qualified name by default).
+        With `per_class`, methods are timed under their receiver's concrete class, e.g. `Laplacian.__call__` rather than `Operator.__call__`.
+        """
+
+        def decorator(fn):
+            fn_name = fn.__qualname__ if name is None else name
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return fn(*args, **kwargs)
+                curr_name = f"{type(args[0]).__name__}.{fn.__name__}" if per_class else fn_name
+                with Timer(self, curr_name, cat):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summarize(self) -> Dict[str, Any]:
+        """
+        Per-name call counts, total/mean/max wall times, and total time excluding nested (child) spans on the same thread.
+        """
+
+        timers = {}
+        # Self time: subtract each span's duration from its innermost enclosing span on the same thread
+        slf_durs = [curr_span[3] for curr_span in self.spans]
+        stcks = {}
+        ordr = sorted(range(len(self.spans)), key=lambda curr_i: (self.spans[curr_i][2], -self.spans[curr_i][3]))
+        for curr_i in ordr:
+            name, cat, start_ns, dur_ns, thrd = self.spans[curr_i]
+            stck = stcks.setdefault(thrd, [])
+            while stck and (self.spans[stck[-1]][2] + self.spans[stck[-1]][3] <= start_ns):
+                stck.pop()
+            if stck:
+                slf_durs[stck[-1]] -= dur_ns
+            stck.append(curr_i)
+
+        for curr_i, (name, cat, start_ns, dur_ns, thrd) in enumerate(self.spans):
+            stats = timers.setdefault(name, {"cat": cat, "calls": 0, "total_s": 0.0, "self_s": 0.0, "max_s": 0.0})
+            stats["calls"] += 1
+            stats["total_s"] += dur_ns * 1e-9
+            stats["self_s"] += slf_durs[curr_i] * 1e-9
+            stats["max_s"] = max(stats["max_s"], dur_ns * 1e-9)
+        for stats in timers.values():
+            stats["mean_s"] = stats["total_s"] / stats["calls"]
+
+        return {
+            "timers": timers,
+            "counters": dict(self.cntrs),
+            "series": {
+                curr_name: [curr_val for _, curr_val in curr_series]
+                for curr_name, curr_series in self.series.items()
+                }
+            }
+
+    def report(self) -> str:
+
+        summary = self.summarize()
+        lines = [f"{'timer':<48} {'calls':>8} {'total [s]':>12} {'self [s]':>12} {'mean [s]':>12} {'max [s]':>12}"]
+        for curr_name, stats in sorted(summary["timers"].items(), key=lambda item: -item[1]["self_s"]):
+            lines.append(f"{curr_name:<48} {stats['calls']:>8} {stats['total_s']:>12.4e} {stats['self_s']:>12.4e} {stats['mean_s']:>12.4e} {stats['max_s']:>12.4e}")
+        if summary["counters"]:
+            lines.append("")
+            lines.append(f"{'counter':<48} {'value':>8}")
+            for curr_name, curr_val in sorted(summary["counters"].items()):
+                lines.append(f"{curr_name:<48} {curr_val:>8}")
+        if summary["series"]:
+            lines.append("")
+            lines.append(f"{'series':<48} {'length':>8} {'first':>12} {'last':>12}")
+            for curr_name, curr_vals in sorted(summary["series"].items()):
+                lines.append(f"{curr_name:<48} {len(curr_vals):>8} {curr_vals[0]:>12.4e} {curr_vals[-1]:>12.4e}")
+
+        return "\n".join(lines)
+
+    def write_report(
+        self,
+        path : str
+        ):
+
+        with open(path, "w") as file:
+            json.dump(self.summarize(), file, indent=2)
+
+    def write_chrome_trace(
+        self,
+        path : str
+        ):
+        """
+        Writes the Chrome trace event format: one complete ("X") event per timed span and one counter ("C") event per recorded series value, in microseconds since `reset()`.
+        """
+
+        pid = os.getpid()
+        events = [
+            {
+                "name": name,
+                "cat": cat,
+                "ph": "X",
+                "ts": (start_ns - self.origin_ns) / 1e3,
+                "dur": dur_ns / 1e3,
+                "pid": pid,
+                "tid": thrd
+                }
+            for name, cat, start_ns, dur_ns, thrd in self.spans
+            ]
+        for curr_name, curr_series in self.series.items():
+            events.extend(
+                {
+                    "name": curr_name,
+                    "ph": "C",
+                    "ts": (curr_ns - self.origin_ns) / 1e3,
+                    "pid": pid,
+                    "args": {"value": curr_val}
+                    }
+                for curr_ns, curr_val in curr_series
+                )
+
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+
+PROFILER = Profiler()
+if os.environ.get(PROFILE_ENV_VAR):
+    PROFILER.enable()